@@ -0,0 +1,258 @@
+"""Offline maintenance jobs for the Kanban Zero backend.
+
+Run with ``kz-admin <command>`` (or ``python -m backend.kz.admin``).
+"""
+
+import asyncio
+import random
+from datetime import timedelta
+from pathlib import Path
+from typing import Annotated, Optional
+
+import typer
+from rich.console import Console
+
+from backend.kz.config import get_settings
+from backend.kz.db.database import get_async_engine, get_async_session_maker
+from backend.kz.models import EnergyColumn
+from backend.kz.repositories import ActivityRepository, AnalyticsRepository, TaskRepository
+from backend.kz.repositories.activity import months_ago
+from backend.kz.repositories.analytics import utc_today
+from backend.kz.services.classifier import EnergyClassifier
+from backend.kz.services.embeddings import embed_missing, get_embedder
+
+app = typer.Typer(
+    name="kz-admin",
+    help="Kanban Zero backend maintenance jobs",
+    no_args_is_help=True,
+)
+console = Console()
+
+
+@app.callback()
+def main() -> None:
+    """Kanban Zero backend maintenance jobs."""
+
+
+async def _load_energy_labels() -> list[tuple[str, str, bool]]:
+    try:
+        async with get_async_session_maker()() as session:
+            return await TaskRepository(session).list_energy_labels()
+    finally:
+        await get_async_engine().dispose()
+
+
+@app.command("train-classifier")
+def train_classifier(
+    output: Annotated[
+        Optional[Path],
+        typer.Option(
+            "--output", "-o", help="Where to write the model (default: ENERGY_CLASSIFIER_PATH)"
+        ),
+    ] = None,
+    corrected_weight: Annotated[
+        float, typer.Option(help="Weight of user corrections relative to accepted labels")
+    ] = 3.0,
+    min_examples: Annotated[int, typer.Option(help="Refuse to train on fewer examples")] = 50,
+    holdout: Annotated[float, typer.Option(help="Fraction held out for evaluation")] = 0.2,
+) -> None:
+    """Retrain the local energy classifier from task history.
+
+    Energy columns users corrected by hand are ground truth; tasks still in
+    the column they were given count as weaker, accepted labels.
+    """
+    settings = get_settings()
+    rows = asyncio.run(_load_energy_labels())
+    if len(rows) < min_examples:
+        console.print(f"[yellow]Only {len(rows)} labelled tasks; need {min_examples}.[/yellow]")
+        raise typer.Exit(1)
+
+    examples = [
+        (raw_input, EnergyColumn(energy), corrected_weight if corrected else 1.0)
+        for raw_input, energy, corrected in rows
+    ]
+    random.Random(0).shuffle(examples)
+    split = int(len(examples) * (1 - holdout))
+    train, test = examples[:split], examples[split:]
+
+    if test:
+        model = EnergyClassifier.train(train)
+        threshold = settings.energy_classifier_threshold
+        confident = correct = 0
+        for raw_input, energy, _ in test:
+            predicted, confidence = model.predict(raw_input)
+            if confidence >= threshold:
+                confident += 1
+                correct += predicted == energy
+        console.print(
+            f"Holdout: {len(test)} tasks, {confident / len(test):.0%} answered locally "
+            f"at threshold {threshold}, "
+            f"{correct / confident if confident else 0:.0%} of those correct"
+        )
+
+    model = EnergyClassifier.train(examples)
+    path = output or Path(settings.energy_classifier_path)
+    model.save(path)
+    console.print(
+        f"[green]Trained on {len(examples)} tasks ({len(model.log_likelihoods)} features) "
+        f"-> {path}[/green]"
+    )
+
+
+async def _backfill_embeddings(batch_size: int) -> int:
+    embedder = get_embedder()
+    session_maker = get_async_session_maker()
+    total = 0
+    try:
+        while embedded := await embed_missing(session_maker, embedder, batch_size):
+            total += embedded
+            console.print(f"[dim]{total} tasks embedded...[/dim]")
+    finally:
+        await get_async_engine().dispose()
+    return total
+
+
+@app.command("backfill-embeddings")
+def backfill_embeddings(
+    batch_size: Annotated[int, typer.Option(help="Tasks embedded per batch")] = 256,
+) -> None:
+    """Embed every task that has no embedding yet.
+
+    Safe to interrupt and re-run: it picks up wherever the table left off.
+    """
+    total = asyncio.run(_backfill_embeddings(batch_size))
+    console.print(f"[green]Embedded {total} tasks.[/green]")
+
+
+async def _rebalance_positions(max_key_length: int | None) -> dict[str, int]:
+    try:
+        async with get_async_session_maker()() as session:
+            tasks = TaskRepository(session)
+            if max_key_length is None:
+                columns = [c.value for c in EnergyColumn if c is not EnergyColumn.SHIPPED]
+            else:
+                columns = await tasks.columns_to_rebalance(max_key_length)
+            return {column: await tasks.rebalance(column) for column in columns}
+    finally:
+        await get_async_engine().dispose()
+
+
+@app.command("rebalance-positions")
+def rebalance_positions(
+    max_key_length: Annotated[
+        Optional[int],
+        typer.Option(help="Only columns with order keys longer than this (default: all)"),
+    ] = None,
+) -> None:
+    """Give board columns fresh, short card order keys, keeping their order.
+
+    ``kz-worker`` does this on its own for columns whose keys grow longer
+    than ``ORDER_KEY_MAX_LENGTH``.
+    """
+    rebalanced = asyncio.run(_rebalance_positions(max_key_length))
+    for column, count in rebalanced.items():
+        console.print(f"[green]{column}:[/green] {count} tasks")
+    if not rebalanced:
+        console.print("[dim]Nothing to rebalance.[/dim]")
+
+
+async def _rebuild_analytics(batch_days: int) -> int:
+    try:
+        async with get_async_session_maker()() as session:
+            analytics = AnalyticsRepository(session)
+            start, today = await analytics.first_ship_day(), utc_today()
+            days = 0
+            while start is not None and start < today:
+                end = min(start + timedelta(days=batch_days), today)
+                rows = await analytics.roll_up(start, end)
+                days += (end - start).days
+                console.print(f"[dim]{start} to {end}: {rows} rows[/dim]")
+                start = end
+            return days
+    finally:
+        await get_async_engine().dispose()
+
+
+@app.command("rebuild-analytics")
+def rebuild_analytics(
+    batch_days: Annotated[int, typer.Option(help="Days rolled up per transaction")] = 31,
+) -> None:
+    """Roll up every closed day of ship history into ``daily_stats`` again.
+
+    Each batch of days is replaced in its own transaction, so the analytics
+    endpoints keep answering throughout. Run it after a first deploy with a
+    long history, or after unshipping tasks from days already rolled up.
+    """
+    days = asyncio.run(_rebuild_analytics(batch_days))
+    console.print(f"[green]Rolled up {days} days.[/green]")
+
+
+async def _archive_shipped(older_than_days: int, batch_size: int) -> int:
+    try:
+        async with get_async_session_maker()() as session:
+            tasks = TaskRepository(session)
+            total = 0
+            retention = timedelta(days=get_settings().tombstone_retention_days)
+            while archived := await tasks.archive_shipped(
+                timedelta(days=older_than_days), batch_size, retention
+            ):
+                total += archived
+                console.print(f"[dim]{total} tasks archived...[/dim]")
+            return total
+    finally:
+        await get_async_engine().dispose()
+
+
+@app.command("archive-shipped")
+def archive_shipped(
+    older_than_days: Annotated[
+        Optional[int],
+        typer.Option(help="Archive tasks shipped longer ago (default: ARCHIVE_AFTER_DAYS)"),
+    ] = None,
+    batch_size: Annotated[int, typer.Option(help="Tasks archived per transaction")] = 500,
+) -> None:
+    """Move tasks shipped long ago from the board to ``task_archive``.
+
+    ``kz-worker`` does this on its own; run it by hand to clear a long
+    history in one go. Each batch is its own short transaction.
+    """
+    days = get_settings().archive_after_days if older_than_days is None else older_than_days
+    total = asyncio.run(_archive_shipped(days, batch_size))
+    console.print(f"[green]Archived {total} tasks.[/green]")
+
+
+async def _prune_activity(retention_months: int) -> list[str]:
+    try:
+        async with get_async_session_maker()() as session:
+            return await ActivityRepository(session).drop_partitions_before(
+                months_ago(retention_months)
+            )
+    finally:
+        await get_async_engine().dispose()
+
+
+@app.command("prune-activity")
+def prune_activity(
+    retention_months: Annotated[
+        Optional[int],
+        typer.Option(
+            help="Months kept besides the current one (default: ACTIVITY_RETENTION_MONTHS)"
+        ),
+    ] = None,
+) -> None:
+    """Drop activity log partitions older than the retention window.
+
+    ``kz-worker`` does this on its own. Each month is one partition, so this
+    is a catalog change per month rather than a DELETE.
+    """
+    if retention_months is None:
+        retention_months = get_settings().activity_retention_months
+    dropped = asyncio.run(_prune_activity(retention_months))
+    for name in dropped:
+        console.print(f"[green]Dropped {name}[/green]")
+    if not dropped:
+        console.print("[dim]Nothing to drop.[/dim]")
+
+
+if __name__ == "__main__":
+    app()
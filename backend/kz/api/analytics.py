@@ -0,0 +1,105 @@
+"""Analytics API endpoints: cycle time, throughput and the ship heatmap.
+
+Every endpoint reads the ``daily_stats`` rollups plus a live aggregate of
+the days not rolled up yet (normally just today), so none scans the task
+table. Closed days are rolled up on the way in, a bounded number at a time.
+"""
+
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.kz.config import get_settings
+from backend.kz.db.database import get_async_session
+from backend.kz.models import CycleTime, CycleTimeReport, HeatmapDay, WeeklyThroughput
+from backend.kz.repositories.analytics import AnalyticsRepository, utc_today
+from backend.kz.sketch import QuantileSketch
+
+router = APIRouter()
+
+
+async def get_analytics_repository(
+    session: Annotated[AsyncSession, Depends(get_async_session)],
+) -> AnalyticsRepository:
+    """Dependency for analytics repository, with closed days rolled up."""
+    repo = AnalyticsRepository(session)
+    await repo.roll_up_closed_days(get_settings().analytics_rollup_batch_days)
+    return repo
+
+
+AnalyticsRepo = Annotated[AnalyticsRepository, Depends(get_analytics_repository)]
+
+
+@router.get("/cycle-time", response_model=CycleTimeReport)
+async def cycle_time(
+    repo: AnalyticsRepo, days: Annotated[int, Query(ge=1, le=366)] = 30
+) -> CycleTimeReport:
+    """Cycle time percentiles for tasks shipped in the last ``days`` days (today included).
+
+    Per energy column the task was shipped from, and overall. Percentiles
+    come from merged sketches and are within 2% of exact.
+    """
+    rows = await repo.daily(utc_today() - timedelta(days=days - 1))
+    overall: list[Row[Any]] = []
+    by_column: dict[str, list[Row[Any]]] = defaultdict(list)
+    for row in rows:
+        overall.append(row)
+        by_column[row.energy_column].append(row)
+    return CycleTimeReport(
+        days=days,
+        overall=_cycle_time(overall),
+        by_column={column: _cycle_time(rows) for column, rows in sorted(by_column.items())},
+    )
+
+
+@router.get("/throughput", response_model=list[WeeklyThroughput])
+async def throughput(
+    repo: AnalyticsRepo, weeks: Annotated[int, Query(ge=1, le=104)] = 12
+) -> list[WeeklyThroughput]:
+    """Tasks shipped per week (weekly velocity), oldest week first, this week last."""
+    today = utc_today()
+    this_week = today - timedelta(days=today.weekday())
+    first_week = this_week - timedelta(weeks=weeks - 1)
+    shipped: dict[date, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    for row in await repo.daily(first_week):
+        shipped[row.day - timedelta(days=row.day.weekday())][row.energy_column] += row.shipped
+    return [
+        WeeklyThroughput(
+            week=week, shipped=sum(shipped[week].values()), by_column=dict(shipped[week])
+        )
+        for week in (first_week + timedelta(weeks=i) for i in range(weeks))
+    ]
+
+
+@router.get("/heatmap", response_model=list[HeatmapDay])
+async def heatmap(
+    repo: AnalyticsRepo, days: Annotated[int, Query(ge=1, le=366)] = 365
+) -> list[HeatmapDay]:
+    """Tasks shipped per day over the last ``days`` days, oldest first, every day listed."""
+    first = utc_today() - timedelta(days=days - 1)
+    shipped: dict[date, int] = defaultdict(int)
+    for row in await repo.daily(first):
+        shipped[row.day] += row.shipped
+    return [
+        HeatmapDay(day=day, shipped=shipped[day])
+        for day in (first + timedelta(days=i) for i in range(days))
+    ]
+
+
+def _cycle_time(rows: list[Row[Any]]) -> CycleTime:
+    sketch = QuantileSketch()
+    for row in rows:
+        sketch.merge(row.cycle_sketch)
+    shipped = sum(row.shipped for row in rows)
+    p50, p75, p90 = sketch.quantiles([0.5, 0.75, 0.9])
+    return CycleTime(
+        shipped=shipped,
+        mean_seconds=sum(row.cycle_seconds for row in rows) / shipped if shipped else None,
+        p50_seconds=p50,
+        p75_seconds=p75,
+        p90_seconds=p90,
+    )
@@ -0,0 +1,60 @@
+"""Entity tags for conditional requests on tasks.
+
+A task's tag is its ``updated_at`` in microseconds, so ``If-Match`` can be
+checked by the UPDATE itself. A listing's tag hashes the board versions of
+the columns it covers together with its query string, so polling clients can
+be answered from the ``board_version`` table without reading any tasks.
+"""
+
+import hashlib
+from datetime import UTC, datetime, timedelta
+
+from backend.kz.models import EnergyColumn
+
+# Tells clients to keep responses but revalidate them before every reuse.
+CACHE_CONTROL = "no-cache"
+
+EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def task_etag(updated_at: datetime) -> str:
+    """Strong ETag for a single task."""
+    return f'"{(updated_at - EPOCH) // MICROSECOND:x}"'
+
+
+def board_etag(versions: dict[str, int], columns: list[EnergyColumn], query: str) -> str:
+    """Strong ETag for a listing of ``columns`` requested with ``query``."""
+    state = ",".join(f"{column.value}={versions.get(column.value, 0)}" for column in columns)
+    digest = hashlib.blake2b(f"{state}?{query}".encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def _tags(header: str) -> list[str]:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def none_match(header: str | None, etag: str) -> bool:
+    """Whether ``If-None-Match`` matches ``etag`` (weak comparison, per RFC 9110)."""
+    if header is None:
+        return False
+    return any(tag == "*" or tag.removeprefix("W/") == etag for tag in _tags(header))
+
+
+def if_match_versions(header: str | None) -> list[datetime] | None:
+    """``updated_at`` values an ``If-Match`` header accepts, or None for any.
+
+    Weak and unparseable tags never match (strong comparison), so a header
+    made only of those yields an empty list and every update is refused.
+    """
+    if header is None or header.strip() == "*":
+        return None
+    versions = []
+    for tag in _tags(header):
+        if not (len(tag) > 2 and tag[0] == tag[-1] == '"'):
+            continue
+        try:
+            versions.append(EPOCH + int(tag[1:-1], 16) * MICROSECOND)
+        except ValueError:
+            continue
+    return versions
@@ -0,0 +1,54 @@
+"""Fast JSON bodies for endpoints that return many tasks.
+
+Returning ``TaskRead`` models makes every task go through validation twice:
+once in ``model_validate`` and once more when FastAPI checks the response
+against ``response_model``. Rows read with ``READ_COLUMNS`` already hold the
+right types, so these bodies skip validation entirely: each row becomes a
+plain dict and a prebuilt pydantic serializer writes the JSON in one call.
+The output is the same as serializing ``TaskRead`` (see test_api).
+"""
+
+from enum import Enum
+from typing import Any
+from uuid import UUID
+
+from fastapi import Response
+from pydantic import TypeAdapter
+from sqlalchemy import Row
+from typing_extensions import TypedDict
+
+from backend.kz.models import TaskRead
+
+
+def _row_type(annotation: Any) -> Any:
+    # Rows carry enum columns as their string values
+    return str if isinstance(annotation, type) and issubclass(annotation, Enum) else annotation
+
+
+TaskRow = TypedDict(  # type: ignore[misc]
+    "TaskRow", {name: _row_type(f.annotation) for name, f in TaskRead.model_fields.items()}
+)
+
+
+class TaskChangesBody(TypedDict):
+    """``TaskChanges`` with its tasks as rows."""
+
+    changed: list[TaskRow]
+    deleted: list[UUID]
+    cursor: str
+    has_more: bool
+
+
+TASK_ROWS = TypeAdapter(list[TaskRow])
+TASK_CHANGES = TypeAdapter(TaskChangesBody)
+
+
+def task_rows(rows: list[Row[Any]]) -> list[TaskRow]:
+    return [row._asdict() for row in rows]  # type: ignore[misc]
+
+
+def json_response(
+    adapter: TypeAdapter[Any], body: Any, headers: dict[str, str] | None = None
+) -> Response:
+    """A JSON response serialized by ``adapter``, without validating ``body``."""
+    return Response(adapter.dump_json(body), media_type="application/json", headers=headers)
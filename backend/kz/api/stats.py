@@ -0,0 +1,32 @@
+"""Stats API endpoints."""
+
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.kz.db.database import get_async_session
+from backend.kz.models import ShipStats
+from backend.kz.repositories.stats import StatsRepository
+
+router = APIRouter()
+
+
+def get_stats_repository(
+    session: Annotated[AsyncSession, Depends(get_async_session)],
+) -> StatsRepository:
+    """Dependency for stats repository."""
+    return StatsRepository(session)
+
+
+StatsRepo = Annotated[StatsRepository, Depends(get_stats_repository)]
+
+
+@router.get("", response_model=ShipStats)
+async def get_stats(repo: StatsRepo) -> ShipStats:
+    """The ship counters: shipped today (UTC), streak in days and all time.
+
+    Read from counters kept by the writes themselves, so this costs the same
+    on any size of board.
+    """
+    return await repo.ship_stats()
@@ -1,20 +1,83 @@
 """Task API endpoints."""
 
-from typing import Annotated
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime, timedelta
+from typing import Annotated, Any
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from backend.kz.db.database import get_async_session
-from backend.kz.models import EnergyColumn, TaskCreate, TaskRead, TaskUpdate
-from backend.kz.repositories.task import TaskRepository
+from backend.kz.api.etags import (
+    CACHE_CONTROL,
+    board_etag,
+    if_match_versions,
+    none_match,
+    task_etag,
+)
+from backend.kz.api.responses import TASK_CHANGES, TASK_ROWS, json_response, task_rows
+from backend.kz.config import get_settings
+from backend.kz.db.database import get_async_session, get_async_session_maker
+from backend.kz.models import (
+    ActivityLogRead,
+    EnergyColumn,
+    EnergySource,
+    TaskBatchCreate,
+    TaskBlocked,
+    TaskBulkRequest,
+    TaskBulkResult,
+    TaskChanges,
+    TaskCreate,
+    TaskEdgeCreate,
+    TaskEdgeRead,
+    TaskGraphNode,
+    TaskLineage,
+    TaskMove,
+    TaskRead,
+    TaskSearch,
+    TaskSearchResult,
+    TaskShipped,
+    TaskUpdate,
+)
+from backend.kz.repositories.activity import ActivityRepository
+from backend.kz.repositories.edge import EdgeCycleError, EdgeRepository
+from backend.kz.repositories.stats import StatsRepository
+from backend.kz.repositories.task import (
+    AmbiguousTaskIdError,
+    ChangeCursor,
+    DuplicateRequestError,
+    MoveConflictError,
+    ShippedCursor,
+    TaskCursor,
+    TaskModifiedError,
+    TaskRepository,
+)
+from backend.kz.services.activity import ActivityWriter
+from backend.kz.services.classifier import get_energy_classifier
+from backend.kz.services.embeddings import Embedder, get_embedder
+from backend.kz.services.events import Subscription, TaskEventBroker
+from backend.kz.services.parse_cache import get_parse_cache
 from backend.kz.services.parser import TaskParser
 
 router = APIRouter()
 
 DbSession = Annotated[AsyncSession, Depends(get_async_session)]
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+ACTIVE_COLUMNS = [c for c in EnergyColumn if c is not EnergyColumn.SHIPPED]
+
 
 def get_task_repository(session: DbSession) -> TaskRepository:
     """Dependency for task repository."""
@@ -24,10 +87,118 @@ def get_task_repository(session: DbSession) -> TaskRepository:
 TaskRepo = Annotated[TaskRepository, Depends(get_task_repository)]
 
 
+async def resolve_task_id(task_id: str, repo: TaskRepo) -> UUID:
+    """Dependency resolving a full task ID or a unique prefix (e.g. ``3f2a``)."""
+    try:
+        resolved = await repo.resolve_id(task_id)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except AmbiguousTaskIdError as e:
+        raise HTTPException(
+            status_code=409,
+            detail={"message": str(e), "matches": [str(m) for m in e.matches]},
+        )
+    if resolved is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return resolved
+
+
+TaskId = Annotated[UUID, Depends(resolve_task_id)]
+
+
+def get_edge_repository(session: DbSession) -> EdgeRepository:
+    """Dependency for edge repository."""
+    return EdgeRepository(session)
+
+
+EdgeRepo = Annotated[EdgeRepository, Depends(get_edge_repository)]
+# Edges followed by graph walks; defaults to the graph_max_depth setting
+Depth = Annotated[int | None, Query(ge=1, le=100)]
+
+
+def get_task_parser(request: Request) -> TaskParser:
+    """Dependency for the app-scoped task parser.
+
+    The lifespan normally creates it; fall back to creating it on first use
+    when the app runs without one (e.g. under a bare ASGI transport).
+    """
+    parser = getattr(request.app.state, "parser", None)
+    if parser is None:
+        parser = request.app.state.parser = TaskParser(
+            cache=get_parse_cache(), classifier=get_energy_classifier()
+        )
+    return parser
+
+
+Parser = Annotated[TaskParser, Depends(get_task_parser)]
+
+
+def create_event_broker() -> TaskEventBroker:
+    settings = get_settings()
+    return TaskEventBroker.from_database_url(
+        settings.database_url,
+        get_async_session_maker(),
+        buffer_size=settings.events_buffer_size,
+        queue_size=settings.events_queue_size,
+    )
+
+
+def create_activity_writer() -> ActivityWriter:
+    return ActivityWriter(
+        get_async_session_maker(), flush_interval=get_settings().activity_flush_interval_seconds
+    )
+
+
+async def get_activity_writer(request: Request) -> ActivityWriter:
+    """The app-scoped activity writer, started on first use if needed."""
+    writer = getattr(request.app.state, "activity", None)
+    if writer is None:
+        writer = request.app.state.activity = create_activity_writer()
+        writer.start()
+    return writer
+
+
+def get_event_broker(request: Request) -> TaskEventBroker:
+    """Dependency for the app-scoped change feed broker, started on first use if needed."""
+    broker = getattr(request.app.state, "events", None)
+    if broker is None:
+        broker = request.app.state.events = create_event_broker()
+        broker.start()
+    return broker
+
+
+EventBroker = Annotated[TaskEventBroker, Depends(get_event_broker)]
+Activity = Annotated[ActivityWriter, Depends(get_activity_writer)]
+TaskEmbedder = Annotated[Embedder, Depends(get_embedder)]
+
+
+async def embed_inline(embedder: Embedder, texts: list[str]) -> list[list[float]] | None:
+    """Embeddings to store with new tasks, if the embedder is cheap enough to run here.
+
+    Remote embedders return None; the worker fills those embeddings in later.
+    """
+    return await embedder.embed(texts) if embedder.local else None
+
+
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=TaskRead)
-async def create_task(data: TaskCreate, repo: TaskRepo) -> TaskRead:
-    """Create a new task with AI parsing."""
-    parser = TaskParser()
+async def create_task(
+    data: TaskCreate, repo: TaskRepo, parser: Parser, embedder: TaskEmbedder
+) -> TaskRead:
+    """Create a new task with AI parsing, storing the tags the parser gave it.
+
+    In deferred parse mode the task is stored immediately with its raw input
+    as a provisional title and parsed later by the background worker.
+    """
+    embeddings = await embed_inline(embedder, [data.raw_input])
+    embedding = embeddings[0] if embeddings else None
+
+    explicit = "energy_column" in data.model_fields_set
+    if get_settings().is_deferred_parsing:
+        task = await repo.create_pending(
+            data, energy_override=data.energy_column if explicit else None, embedding=embedding
+        )
+        return TaskRead.model_validate(task)
+
     parsed = await parser.parse(data.raw_input, energy_override=data.energy_column)
 
     task = await repo.create(
@@ -37,53 +208,501 @@ async def create_task(data: TaskCreate, repo: TaskRepo) -> TaskRead:
             created_via=data.created_via,
         ),
         title=parsed.title,
+        embedding=embedding,
+        tags=parsed.tagged(),
+        # Unless asked for, the column is the schema default: no training label
+        energy_source=parsed.source if explicit else EnergySource.FALLBACK,
     )
     return TaskRead.model_validate(task)
 
 
+@router.post("/batch", status_code=status.HTTP_201_CREATED, response_model=list[TaskRead])
+async def create_tasks(
+    data: TaskBatchCreate,
+    repo: TaskRepo,
+    parser: Parser,
+    embedder: TaskEmbedder,
+    idempotency_key: Annotated[
+        str | None, Header(alias="Idempotency-Key", min_length=1, max_length=64)
+    ] = None,
+) -> list[TaskRead]:
+    """Create many tasks at once, parsed together in batched AI calls.
+
+    Tasks are returned in input order. ``energy_column`` applies to every
+    task when given; otherwise the parser picks one per task. A request
+    repeating an earlier request's ``Idempotency-Key`` creates nothing and
+    gets the earlier request's tasks back (those not deleted since).
+    """
+    if idempotency_key is not None:
+        earlier = await repo.get_for_key(idempotency_key)
+        if earlier is not None:
+            return [TaskRead.model_validate(t) for t in earlier]
+    try:
+        tasks = await _create_batch(data, repo, parser, embedder, idempotency_key)
+    except DuplicateRequestError:
+        # The same request, retried while the first was still running
+        tasks = await repo.get_for_key(idempotency_key) or []
+    return [TaskRead.model_validate(t) for t in tasks]
+
+
+async def _create_batch(
+    data: TaskBatchCreate,
+    repo: TaskRepository,
+    parser: TaskParser,
+    embedder: Embedder,
+    idempotency_key: str | None,
+) -> list[Row[Any]]:
+    embeddings = await embed_inline(embedder, data.raw_inputs)
+
+    if get_settings().is_deferred_parsing:
+        items = [
+            TaskCreate(
+                raw_input=raw_input,
+                energy_column=data.energy_column or EnergyColumn.QUICK_WIN,
+                created_via=data.created_via,
+            )
+            for raw_input in data.raw_inputs
+        ]
+        return await repo.create_many_pending(
+            items,
+            energy_override=data.energy_column,
+            embeddings=embeddings,
+            idempotency_key=idempotency_key,
+        )
+
+    parsed = await parser.parse_many(data.raw_inputs, energy_override=data.energy_column)
+
+    return await repo.create_many(
+        items=[
+            TaskCreate(raw_input=raw_input, energy_column=p.energy, created_via=data.created_via)
+            for raw_input, p in zip(data.raw_inputs, parsed, strict=True)
+        ],
+        titles=[p.title for p in parsed],
+        embeddings=embeddings,
+        tags=[p.tagged() for p in parsed],
+        energy_sources=[p.source for p in parsed],
+        idempotency_key=idempotency_key,
+    )
+
+
+@router.post("/bulk", response_model=list[TaskBulkResult])
+async def bulk_tasks(data: TaskBulkRequest, repo: TaskRepo) -> list[TaskBulkResult]:
+    """Get, ship, move or delete many tasks in one request and one transaction.
+
+    Operations run in order, each as one statement over all of its IDs, and
+    results come back in the same order. IDs that match no task are listed
+    under ``missing`` rather than failing the request.
+    """
+    retention = timedelta(days=get_settings().tombstone_retention_days)
+    try:
+        outcomes = await repo.bulk(data.operations, tombstone_retention=retention)
+    except MoveConflictError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    results = []
+    for operation, (tasks, deleted) in zip(data.operations, outcomes, strict=True):
+        found = {task.id for task in tasks} | set(deleted)
+        results.append(
+            TaskBulkResult(
+                action=operation.action,
+                tasks=[TaskRead.model_validate(task) for task in tasks],
+                deleted=deleted,
+                missing=list(dict.fromkeys(i for i in operation.ids if i not in found)),
+            )
+        )
+    return results
+
+
+@router.post("/search", response_model=list[TaskSearchResult])
+async def search_tasks(
+    data: TaskSearch, repo: TaskRepo, embedder: TaskEmbedder
+) -> list[TaskSearchResult]:
+    """Semantic search: tasks closest in meaning to ``query``, best first.
+
+    ``ef_search`` overrides the HNSW candidate list size for this query
+    (default ``SEARCH_EF_SEARCH``); raise it for better recall.
+    """
+    [embedding] = await embedder.embed([data.query])
+    rows = await repo.search(
+        embedding,
+        limit=data.limit,
+        ef_search=data.ef_search or get_settings().search_ef_search,
+        include_shipped=data.include_shipped,
+    )
+    return [TaskSearchResult.model_validate(row) for row in rows]
+
+
+async def event_stream(
+    broker: TaskEventBroker, subscription: Subscription, keepalive: float
+) -> AsyncIterator[str]:
+    """SSE body for one subscriber; ends when the subscriber is evicted."""
+    try:
+        while not subscription.closed:
+            event = await subscription.get(timeout=keepalive)
+            # Comments keep proxies from timing out idle streams
+            yield event.encode() if event else ": keepalive\n\n"
+    finally:
+        broker.unsubscribe(subscription)
+
+
+@router.get("/events", response_class=StreamingResponse)
+async def task_events(
+    broker: EventBroker, last_event_id: Annotated[str | None, Header()] = None
+) -> StreamingResponse:
+    """Live board changes as Server-Sent Events.
+
+    Emits ``created``, ``updated`` and ``shipped`` events carrying the task,
+    and ``deleted`` events carrying its ID. Reconnecting clients send
+    ``Last-Event-ID`` to receive what they missed; a ``reset`` event means
+    that is not possible and the board should be refetched.
+    """
+    subscription = broker.subscribe(last_event_id)
+    return StreamingResponse(
+        event_stream(broker, subscription, get_settings().events_keepalive_seconds),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/changes", response_model=TaskChanges)
+async def list_changes(
+    repo: TaskRepo,
+    since: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=1000)] = 500,
+) -> Response:
+    """Tasks changed or deleted since a previous sync, for incremental clients.
+
+    Start without ``since`` to get every task, then pass each response's
+    ``cursor`` back as ``since``: while ``has_more`` is true to fetch the
+    rest of this sync, afterwards to fetch what changed since. Applying
+    ``changed`` as upserts and ``deleted`` as removals keeps a local copy
+    current. A cursor older than the tombstone retention gets 410 and the
+    client must start over.
+
+    The body is serialized straight from rows (see
+    ``backend.kz.api.responses``).
+    """
+    retention = timedelta(days=get_settings().tombstone_retention_days)
+    now = datetime.now(UTC)
+    cursor = None
+    if since is not None:
+        try:
+            cursor = ChangeCursor.decode(since)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if cursor.issued_at < now - retention:
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE, detail="Cursor expired; sync from scratch"
+            )
+
+    if cursor is not None and cursor.after is not None:
+        # Continuing a sync that is still paging
+        xmin, issued_at, lower = cursor.xmin, cursor.issued_at, 0
+    else:
+        xmin, issued_at = await repo.snapshot_xmin(), now
+        lower = cursor.xmin if cursor else 0
+
+    changed, deleted, last = await repo.list_changes(
+        since=lower, after=cursor.after if cursor else None, limit=limit
+    )
+    return json_response(
+        TASK_CHANGES,
+        {
+            "changed": task_rows(changed),
+            "deleted": deleted,
+            "cursor": ChangeCursor(xmin, issued_at, after=last).encode(),
+            "has_more": last is not None,
+        },
+    )
+
+
+@router.get("/history", response_model=list[TaskRead])
+async def list_shipped_history(
+    repo: TaskRepo,
+    limit: Annotated[int, Query(ge=1, le=1000)] = 50,
+    cursor: str | None = None,
+) -> Response:
+    """Shipped tasks, most recently shipped first, archived ones included.
+
+    Paged by keyset on ``shipped_at`` like ``GET /api/tasks``: when more
+    tasks follow, the response carries an ``X-Next-Cursor`` header to pass
+    back as ``cursor``.
+    """
+    after = None
+    if cursor is not None:
+        try:
+            after = ShippedCursor.decode(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    tasks = await repo.list_shipped_history(limit + 1, after)
+    headers: dict[str, str] = {}
+    if len(tasks) > limit:
+        tasks = tasks[:limit]
+        headers[NEXT_CURSOR_HEADER] = ShippedCursor.after(tasks[-1]).encode()
+    return json_response(TASK_ROWS, task_rows(tasks), headers)
+
+
+@router.get("/blocked", response_model=list[TaskBlocked])
+async def list_blocked(edges: EdgeRepo) -> list[TaskBlocked]:
+    """Unshipped tasks waiting on unshipped blockers, in board order.
+
+    Cheap enough to call on every board render: answered from an
+    in-process cache until an edge or a task changes.
+    """
+    return [
+        TaskBlocked.model_validate({**task._asdict(), "blocked_by": blocked_by})
+        for task, blocked_by in await edges.list_blocked()
+    ]
+
+
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
+
+
 @router.get("", response_model=list[TaskRead])
 async def list_tasks(
+    request: Request,
     repo: TaskRepo,
     column: EnergyColumn | None = None,
-) -> list[TaskRead]:
-    """List tasks, optionally filtered by column."""
+    tag: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=1000)] = 200,
+    cursor: str | None = None,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
+    """List tasks in board order, optionally filtered by column and tag.
+
+    Results are paged by keyset: when more tasks follow, the response carries
+    an ``X-Next-Cursor`` header to pass back as ``cursor``.
+
+    The ETag changes whenever a task in the listed columns does, so a
+    matching ``If-None-Match`` gets a 304 after reading only the board
+    versions.
+
+    Rows are serialized straight to JSON without building ``TaskRead``
+    models (see ``backend.kz.api.responses``).
+    """
+    after = None
+    if cursor is not None:
+        try:
+            after = TaskCursor.decode(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if column and after.energy_column != column.value:
+            raise HTTPException(status_code=400, detail="Cursor belongs to another column")
+
+    # Versions are read before the tasks: a write landing in between makes the
+    # tag older than the body, which only costs the client one more full read.
+    etag = board_etag(
+        await repo.board_versions(), [column] if column else ACTIVE_COLUMNS, request.url.query
+    )
+    if none_match(if_none_match, etag):
+        return not_modified(etag)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
     if column:
-        tasks = await repo.list_by_column(column)
+        tasks = await repo.list_by_column(column, limit=limit + 1, after=after, tag=tag)
     else:
-        tasks = await repo.list_active()
-    return [TaskRead.model_validate(t) for t in tasks]
+        tasks = await repo.list_active(limit=limit + 1, after=after, tag=tag)
+
+    if len(tasks) > limit:
+        tasks = tasks[:limit]
+        headers[NEXT_CURSOR_HEADER] = TaskCursor.after(tasks[-1]).encode()
+    return json_response(TASK_ROWS, task_rows(tasks), headers)
 
 
 @router.get("/{task_id}", response_model=TaskRead)
-async def get_task(task_id: UUID, repo: TaskRepo) -> TaskRead:
-    """Get a specific task by ID."""
+async def get_task(
+    task_id: TaskId,
+    repo: TaskRepo,
+    response: Response,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> TaskRead | Response:
+    """Get a specific task by ID or unique ID prefix.
+
+    Revalidation with ``If-None-Match`` only reads the task's ``updated_at``.
+    """
+    if if_none_match is not None:
+        updated_at = await repo.get_updated_at(task_id)
+        if updated_at is None:
+            raise HTTPException(status_code=404, detail="Task not found")
+        if none_match(if_none_match, task_etag(updated_at)):
+            return not_modified(task_etag(updated_at))
+
     task = await repo.get_by_id(task_id)
     if task is None:
         raise HTTPException(status_code=404, detail="Task not found")
+    response.headers["ETag"] = task_etag(task.updated_at)
+    response.headers["Cache-Control"] = CACHE_CONTROL
     return TaskRead.model_validate(task)
 
 
 @router.patch("/{task_id}", response_model=TaskRead)
-async def update_task(task_id: UUID, data: TaskUpdate, repo: TaskRepo) -> TaskRead:
-    """Update a task."""
-    task = await repo.update(task_id, data)
+async def update_task(
+    task_id: TaskId,
+    data: TaskUpdate,
+    repo: TaskRepo,
+    response: Response,
+    if_match: Annotated[str | None, Header()] = None,
+) -> TaskRead:
+    """Update a task.
+
+    With ``If-Match`` set to the task's ETag the update is refused with 412
+    if someone else changed the task first.
+    """
+    try:
+        task = await repo.update(task_id, data, expected_updated_at=if_match_versions(if_match))
+    except TaskModifiedError:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Task was changed by someone else; reload it and try again",
+        )
     if task is None:
         raise HTTPException(status_code=404, detail="Task not found")
+    response.headers["ETag"] = task_etag(task.updated_at)
     return TaskRead.model_validate(task)
 
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_task(task_id: UUID, repo: TaskRepo) -> None:
+async def delete_task(task_id: TaskId, repo: TaskRepo) -> None:
     """Delete a task."""
-    deleted = await repo.delete(task_id)
+    retention = timedelta(days=get_settings().tombstone_retention_days)
+    deleted = await repo.delete(task_id, tombstone_retention=retention)
     if not deleted:
         raise HTTPException(status_code=404, detail="Task not found")
 
 
-@router.post("/{task_id}/ship", response_model=TaskRead)
-async def ship_task(task_id: UUID, repo: TaskRepo) -> TaskRead:
-    """Mark a task as shipped (completed)."""
-    task = await repo.ship(task_id)
+@router.post("/{task_id}/ship", response_model=TaskShipped)
+async def ship_task(
+    task_id: TaskId,
+    repo: TaskRepo,
+    session: DbSession,
+    response: Response,
+    if_match: Annotated[str | None, Header()] = None,
+) -> TaskShipped:
+    """Mark a task as shipped (completed), returning the updated ship counters.
+
+    Honours ``If-Match`` like PATCH, so queued offline ships can detect conflicts.
+    """
+    try:
+        task = await repo.ship(task_id, expected_updated_at=if_match_versions(if_match))
+    except TaskModifiedError:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Task was changed by someone else; reload it and try again",
+        )
     if task is None:
         raise HTTPException(status_code=404, detail="Task not found")
+    response.headers["ETag"] = task_etag(task.updated_at)
+    stats = await StatsRepository(session).ship_stats()
+    return TaskShipped.model_validate({**task._asdict(), "stats": stats})
+
+
+@router.post("/{task_id}/move", response_model=TaskRead)
+async def move_task(
+    task_id: TaskId, data: TaskMove, repo: TaskRepo, response: Response
+) -> TaskRead:
+    """Move a task between two neighbouring cards (drag and drop).
+
+    Only the moved task is written: it gets an order key between its
+    neighbours' keys. Neighbours that moved or vanished since the client
+    last looked get 409; reload the board and retry.
+    """
+    try:
+        task = await repo.move(task_id, data)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except MoveConflictError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    response.headers["ETag"] = task_etag(task.updated_at)
     return TaskRead.model_validate(task)
+
+
+@router.get("/{task_id}/activity", response_model=list[ActivityLogRead])
+async def task_activity(
+    task_id: TaskId,
+    session: DbSession,
+    writer: Activity,
+    limit: Annotated[int, Query(ge=1, le=500)] = 50,
+) -> list[ActivityLogRead]:
+    """A task's activity log, newest first.
+
+    Activity is written in the background; what this process still holds
+    is written first, so callers see their own changes.
+    """
+    await writer.flush()
+    entries = await ActivityRepository(session).list_for_task(task_id, limit)
+    return [ActivityLogRead.model_validate(entry) for entry in entries]
+
+
+@router.get("/{task_id}/edges", response_model=list[TaskEdgeRead])
+async def list_task_edges(task_id: TaskId, edges: EdgeRepo) -> list[TaskEdgeRead]:
+    """A task's relationships, both directions, oldest first."""
+    return [TaskEdgeRead.model_validate(edge) for edge in await edges.list_for_task(task_id)]
+
+
+@router.post(
+    "/{task_id}/edges", status_code=status.HTTP_201_CREATED, response_model=TaskEdgeRead
+)
+async def add_task_edge(
+    task_id: TaskId, data: TaskEdgeCreate, repo: TaskRepo, edges: EdgeRepo
+) -> TaskEdgeRead:
+    """Relate the task to ``to_task``, e.g. ``{"to_task": "3f2a", "edge_type": "blocks"}``.
+
+    Edges that would close a cycle of blockers, lineage or duplicates get 409.
+    """
+    to_task_id = await resolve_task_id(data.to_task, repo)
+    try:
+        edge = await edges.add(task_id, to_task_id, data)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except EdgeCycleError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return TaskEdgeRead.model_validate(edge)
+
+
+@router.delete("/{task_id}/edges/{edge_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def remove_task_edge(task_id: TaskId, edge_id: UUID, edges: EdgeRepo) -> None:
+    """Remove one of the task's relationships."""
+    if not await edges.remove(task_id, edge_id):
+        raise HTTPException(status_code=404, detail="Edge not found")
+
+
+@router.get("/{task_id}/blockers", response_model=list[TaskGraphNode])
+async def task_blockers(
+    task_id: TaskId, edges: EdgeRepo, depth: Depth = None
+) -> list[TaskGraphNode]:
+    """Everything the task waits on (``blocks``/``depends_on``), nearest first.
+
+    Shipped blockers are included; they no longer hold the task up.
+    """
+    rows = await edges.blockers(task_id, depth or get_settings().graph_max_depth)
+    return [TaskGraphNode.model_validate(row) for row in rows]
+
+
+@router.get("/{task_id}/impact", response_model=list[TaskGraphNode])
+async def task_impact(
+    task_id: TaskId, edges: EdgeRepo, depth: Depth = None
+) -> list[TaskGraphNode]:
+    """Everything waiting on the task, directly or not, nearest first."""
+    rows = await edges.impact(task_id, depth or get_settings().graph_max_depth)
+    return [TaskGraphNode.model_validate(row) for row in rows]
+
+
+@router.get("/{task_id}/lineage", response_model=TaskLineage)
+async def task_lineage(task_id: TaskId, edges: EdgeRepo, depth: Depth = None) -> TaskLineage:
+    """The tasks this one was spawned from, and those spawned from it."""
+    max_depth = depth or get_settings().graph_max_depth
+    return TaskLineage(
+        ancestors=[
+            TaskGraphNode.model_validate(row) for row in await edges.ancestors(task_id, max_depth)
+        ],
+        descendants=[
+            TaskGraphNode.model_validate(row)
+            for row in await edges.descendants(task_id, max_depth)
+        ],
+    )
@@ -19,6 +19,68 @@ class Settings(BaseSettings):
 
     # AI
     anthropic_api_key: str = ""
+    anthropic_model: str = "claude-sonnet-4-20250514"
+    anthropic_max_connections: int = 10
+    anthropic_max_concurrency: int = 8  # LLM calls in flight per process
+    anthropic_timeout_seconds: float = 15.0  # deadline per call, including queueing
+    anthropic_breaker_threshold: int = 5  # consecutive failures before failing fast
+    anthropic_breaker_reset_seconds: float = 30.0
+
+    # Local energy classifier (train with `kz-admin train-classifier`)
+    energy_classifier_path: str = "data/energy_classifier.json"
+    energy_classifier_threshold: float = 0.9  # below this, escalate to the LLM
+
+    # Embeddings and semantic search
+    embedding_backend: str = "hashing"
+    embedding_batch_size: int = 256
+    search_ef_search: int = 40  # HNSW candidate list size; higher = better recall, slower
+
+    # Live change feed (GET /api/tasks/events)
+    events_buffer_size: int = 1000  # recent events kept for Last-Event-ID resume
+    events_queue_size: int = 256  # undelivered events per subscriber before eviction
+    events_keepalive_seconds: float = 15.0
+
+    # Delta sync (GET /api/tasks/changes)
+    tombstone_retention_days: int = 30  # also how long a sync cursor stays valid
+
+    # Activity log: buffered in each process, written in batches
+    activity_flush_interval_seconds: float = 1.0
+    activity_batch_size: int = 500
+    activity_buffer_size: int = 10_000  # oldest entries dropped beyond this
+    activity_retention_months: int = 12  # older monthly partitions are dropped by kz-worker
+
+    # Archive: kz-worker moves tasks shipped this long ago to task_archive
+    archive_after_days: int = 30
+    archive_batch_size: int = 500
+    archive_interval_seconds: float = 3600.0
+
+    # Analytics: closed days rolled up into daily_stats per analytics request
+    analytics_rollup_batch_days: int = 31
+
+    # Task graph walks (blockers, lineage, impact): edges followed at most
+    graph_max_depth: int = 10
+
+    # Card order keys (see backend.kz.ordering)
+    order_key_max_length: int = 24  # kz-worker rebalances columns with longer keys
+    rebalance_interval_seconds: float = 300.0
+
+    # Parse cache
+    parse_cache_size: int = 1024
+    parse_cache_ttl_seconds: int = 30 * 24 * 3600
+    parse_cache_max_rows: int = 100_000
+    parse_call_cost_usd: float = 0.003  # rough per-call cost, for savings reporting
+
+    # Tags: IDs by name cached in each process (see backend.kz.repositories.tag)
+    tag_cache_size: int = 10_000
+
+    # Parsing: "sync" parses inline on create, "deferred" queues work for kz-worker
+    parse_mode: str = "sync"
+    parse_worker_concurrency: int = 4
+    parse_worker_poll_interval: float = 1.0
+    parse_job_max_attempts: int = 3
+    parse_job_lease_seconds: int = 120
+    parse_batch_size: int = 25
+    parse_batch_max_chars: int = 12_000
 
     # App
     kz_env: str = "development"
@@ -27,6 +89,10 @@ class Settings(BaseSettings):
     def is_development(self) -> bool:
         return self.kz_env == "development"
 
+    @property
+    def is_deferred_parsing(self) -> bool:
+        return self.parse_mode == "deferred"
+
 
 @lru_cache
 def get_settings() -> Settings:
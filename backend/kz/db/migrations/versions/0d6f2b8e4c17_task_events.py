@@ -0,0 +1,70 @@
+"""task events
+
+Revision ID: 0d6f2b8e4c17
+Revises: e91b5d3f7a28
+Create Date: 2026-10-17 16:40:31.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0d6f2b8e4c17'
+down_revision: Union[str, Sequence[str], None] = 'e91b5d3f7a28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_task_event() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            kind text;
+            task_id uuid;
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                kind := 'created';
+                task_id := NEW.id;
+            ELSIF TG_OP = 'DELETE' THEN
+                kind := 'deleted';
+                task_id := OLD.id;
+            ELSIF NEW.energy_column = 'shipped' AND OLD.energy_column <> 'shipped' THEN
+                kind := 'shipped';
+                task_id := NEW.id;
+            ELSE
+                kind := 'updated';
+                task_id := NEW.id;
+            END IF;
+            PERFORM pg_notify(
+                'task_events', json_build_object('type', kind, 'id', task_id)::text
+            );
+            RETURN NULL;
+        END
+        $$
+    """)
+    op.execute(
+        'CREATE TRIGGER task_events_insert AFTER INSERT ON task '
+        'FOR EACH ROW EXECUTE FUNCTION notify_task_event()'
+    )
+    op.execute(
+        'CREATE TRIGGER task_events_update AFTER UPDATE ON task '
+        'FOR EACH ROW WHEN (OLD.updated_at IS DISTINCT FROM NEW.updated_at) '
+        'EXECUTE FUNCTION notify_task_event()'
+    )
+    op.execute(
+        'CREATE TRIGGER task_events_delete AFTER DELETE ON task '
+        'FOR EACH ROW EXECUTE FUNCTION notify_task_event()'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP TRIGGER task_events_delete ON task')
+    op.execute('DROP TRIGGER task_events_update ON task')
+    op.execute('DROP TRIGGER task_events_insert ON task')
+    op.execute('DROP FUNCTION notify_task_event()')
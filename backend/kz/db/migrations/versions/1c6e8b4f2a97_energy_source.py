@@ -0,0 +1,33 @@
+"""energy source
+
+Revision ID: 1c6e8b4f2a97
+Revises: f7c1d4a8e2b6
+Create Date: 2026-10-20 09:27:41.662310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1c6e8b4f2a97'
+down_revision: Union[str, Sequence[str], None] = 'f7c1d4a8e2b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing tasks keep NULL: whether their column came from the model, the
+    # local classifier or a parse fallback is not known, so only their
+    # manual corrections remain training labels.
+    op.add_column('task', sa.Column('energy_source', sa.String(length=20), nullable=True))
+    op.add_column('task_archive', sa.Column('energy_source', sa.String(length=20), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('task_archive', 'energy_source')
+    op.drop_column('task', 'energy_source')
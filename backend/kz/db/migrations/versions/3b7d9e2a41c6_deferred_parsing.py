@@ -0,0 +1,48 @@
+"""deferred parsing
+
+Revision ID: 3b7d9e2a41c6
+Revises: f35f8a22b424
+Create Date: 2026-10-17 09:12:44.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7d9e2a41c6'
+down_revision: Union[str, Sequence[str], None] = 'f35f8a22b424'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'task',
+        sa.Column('parse_status', sa.String(length=20), server_default='parsed', nullable=False),
+    )
+
+    op.create_table(
+        'parse_job',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('task_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('energy_override', sa.String(length=20), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('available_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['task_id'], ['task.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('task_id')
+    )
+    op.create_index('ix_parse_job_available_at', 'parse_job', ['available_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_parse_job_available_at', table_name='parse_job')
+    op.drop_table('parse_job')
+    op.drop_column('task', 'parse_status')
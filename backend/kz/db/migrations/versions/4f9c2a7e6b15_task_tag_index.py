@@ -0,0 +1,28 @@
+"""task tag index
+
+Revision ID: 4f9c2a7e6b15
+Revises: d2a6f4c8e1b3
+Create Date: 2026-10-17 20:11:52.384016
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f9c2a7e6b15'
+down_revision: Union[str, Sequence[str], None] = 'd2a6f4c8e1b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_task_tag_tag', 'task_tag', ['tag_id', 'task_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_task_tag_tag', table_name='task_tag')
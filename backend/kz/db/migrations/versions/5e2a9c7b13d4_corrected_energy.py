@@ -0,0 +1,28 @@
+"""corrected energy
+
+Revision ID: 5e2a9c7b13d4
+Revises: 8c41f0d6a2e3
+Create Date: 2026-10-17 12:41:09.518230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2a9c7b13d4'
+down_revision: Union[str, Sequence[str], None] = '8c41f0d6a2e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('task', sa.Column('corrected_energy', sa.String(length=20), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('task', 'corrected_energy')
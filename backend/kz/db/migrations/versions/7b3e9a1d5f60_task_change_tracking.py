@@ -0,0 +1,41 @@
+"""task change tracking
+
+Revision ID: 7b3e9a1d5f60
+Revises: 0d6f2b8e4c17
+Create Date: 2026-10-17 17:58:12.640295
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '7b3e9a1d5f60'
+down_revision: Union[str, Sequence[str], None] = '0d6f2b8e4c17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('task', sa.Column('change_xid', sa.BigInteger(), server_default=sa.text('CAST(CAST(pg_current_xact_id() AS TEXT) AS BIGINT)'), nullable=False))
+    op.create_index('ix_task_change', 'task', ['change_xid', 'id'], unique=False)
+    op.create_table('task_tombstone',
+    sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('change_xid', sa.BigInteger(), server_default=sa.text('CAST(CAST(pg_current_xact_id() AS TEXT) AS BIGINT)'), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_task_tombstone_change', 'task_tombstone', ['change_xid', 'id'], unique=False)
+    op.create_index('ix_task_tombstone_deleted_at', 'task_tombstone', ['deleted_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_task_tombstone_deleted_at', table_name='task_tombstone')
+    op.drop_index('ix_task_tombstone_change', table_name='task_tombstone')
+    op.drop_table('task_tombstone')
+    op.drop_index('ix_task_change', table_name='task')
+    op.drop_column('task', 'change_xid')
@@ -0,0 +1,37 @@
+"""parse cache
+
+Revision ID: 8c41f0d6a2e3
+Revises: 3b7d9e2a41c6
+Create Date: 2026-10-17 11:03:27.902145
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '8c41f0d6a2e3'
+down_revision: Union[str, Sequence[str], None] = '3b7d9e2a41c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'parse_cache',
+        sa.Column('key', sa.String(length=64), nullable=False),
+        sa.Column('result', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index('ix_parse_cache_expires_at', 'parse_cache', ['expires_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_parse_cache_expires_at', table_name='parse_cache')
+    op.drop_table('parse_cache')
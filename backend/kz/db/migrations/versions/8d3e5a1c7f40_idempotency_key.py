@@ -0,0 +1,36 @@
+"""idempotency key
+
+Revision ID: 8d3e5a1c7f40
+Revises: 1c6e8b4f2a97
+Create Date: 2026-10-21 14:03:18.519274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3e5a1c7f40'
+down_revision: Union[str, Sequence[str], None] = '1c6e8b4f2a97'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('idempotency_key',
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('task_ids', postgresql.ARRAY(postgresql.UUID(as_uuid=True)), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index('ix_idempotency_key_created_at', 'idempotency_key', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_idempotency_key_created_at', table_name='idempotency_key')
+    op.drop_table('idempotency_key')
@@ -0,0 +1,144 @@
+"""ship counters
+
+Revision ID: 9a5e1c3d7f24
+Revises: 4f9c2a7e6b15
+Create Date: 2026-10-17 21:02:36.551274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a5e1c3d7f24'
+down_revision: Union[str, Sequence[str], None] = '4f9c2a7e6b15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('ship_day',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('shipped', sa.Integer(), nullable=False),
+    sa.Column('streak', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day')
+    )
+    op.create_table('ship_total',
+    sa.Column('id', sa.SmallInteger(), nullable=False),
+    sa.Column('shipped', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # Shipped tasks moved there by hand never got a shipped_at; date them by
+    # their last change so they count.
+    op.execute("""
+        UPDATE task SET
+            shipped_at = updated_at,
+            change_xid = CAST(CAST(pg_current_xact_id() AS TEXT) AS BIGINT)
+        WHERE energy_column = 'shipped' AND shipped_at IS NULL
+    """)
+    # Days and streaks so far: days in one run of consecutive days share
+    # day - rank, and a day's streak is its rank within the run.
+    op.execute("""
+        INSERT INTO ship_day (day, shipped, streak)
+        SELECT day, shipped, row_number() OVER (PARTITION BY run ORDER BY day)
+        FROM (
+            SELECT
+                (shipped_at AT TIME ZONE 'UTC')::date AS day,
+                count(*) AS shipped,
+                (shipped_at AT TIME ZONE 'UTC')::date
+                    - (row_number() OVER (ORDER BY (shipped_at AT TIME ZONE 'UTC')::date))::int
+                    AS run
+            FROM task WHERE energy_column = 'shipped'
+            GROUP BY 1
+        ) days
+    """)
+    op.execute("""
+        INSERT INTO ship_total (id, shipped)
+        SELECT 1, count(*) FROM task WHERE energy_column = 'shipped'
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION add_ships(ship_date date, delta integer) RETURNS void
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            count_now integer;
+            run integer;
+            d date := ship_date;
+        BEGIN
+            INSERT INTO ship_total (id, shipped) VALUES (1, delta)
+            ON CONFLICT (id) DO UPDATE SET shipped = ship_total.shipped + delta;
+
+            INSERT INTO ship_day (day, shipped, streak) VALUES (ship_date, delta, 0)
+            ON CONFLICT (day) DO UPDATE SET shipped = ship_day.shipped + delta
+            RETURNING shipped INTO count_now;
+            IF (count_now > 0) = (count_now - delta > 0) THEN
+                RETURN;
+            END IF;
+
+            run := coalesce((SELECT streak FROM ship_day WHERE day = ship_date - 1), 0);
+            LOOP
+                UPDATE ship_day SET streak = CASE WHEN shipped > 0 THEN run + 1 ELSE 0 END
+                WHERE day = d AND streak <> CASE WHEN shipped > 0 THEN run + 1 ELSE 0 END
+                RETURNING streak INTO run;
+                EXIT WHEN NOT FOUND;
+                d := d + 1;
+            END LOOP;
+        END
+        $$
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION count_ships() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            ships record;
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                FOR ships IN
+                    SELECT (shipped_at AT TIME ZONE 'UTC')::date AS day, count(*) AS delta
+                    FROM new_rows
+                    WHERE energy_column = 'shipped' AND shipped_at IS NOT NULL
+                    GROUP BY 1 ORDER BY 1
+                LOOP
+                    PERFORM add_ships(ships.day, ships.delta::integer);
+                END LOOP;
+            ELSE
+                FOR ships IN
+                    SELECT day, sum(delta) AS delta FROM (
+                        SELECT (shipped_at AT TIME ZONE 'UTC')::date AS day, 1 AS delta
+                        FROM new_rows
+                        WHERE energy_column = 'shipped' AND shipped_at IS NOT NULL
+                        UNION ALL
+                        SELECT (shipped_at AT TIME ZONE 'UTC')::date AS day, -1 AS delta
+                        FROM old_rows
+                        WHERE energy_column = 'shipped' AND shipped_at IS NOT NULL
+                    ) changes GROUP BY day HAVING sum(delta) <> 0 ORDER BY day
+                LOOP
+                    PERFORM add_ships(ships.day, ships.delta::integer);
+                END LOOP;
+            END IF;
+            RETURN NULL;
+        END
+        $$
+    """)
+    op.execute(
+        'CREATE TRIGGER task_ship_count_insert AFTER INSERT ON task '
+        'REFERENCING NEW TABLE AS new_rows '
+        'FOR EACH STATEMENT EXECUTE FUNCTION count_ships()'
+    )
+    op.execute(
+        'CREATE TRIGGER task_ship_count_update AFTER UPDATE ON task '
+        'REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows '
+        'FOR EACH STATEMENT EXECUTE FUNCTION count_ships()'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP TRIGGER task_ship_count_update ON task')
+    op.execute('DROP TRIGGER task_ship_count_insert ON task')
+    op.execute('DROP FUNCTION count_ships()')
+    op.execute('DROP FUNCTION add_ships(date, integer)')
+    op.drop_table('ship_total')
+    op.drop_table('ship_day')
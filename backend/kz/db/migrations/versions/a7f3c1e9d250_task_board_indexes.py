@@ -0,0 +1,39 @@
+"""task board indexes
+
+Revision ID: a7f3c1e9d250
+Revises: 5e2a9c7b13d4
+Create Date: 2026-10-17 13:22:47.106384
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7f3c1e9d250'
+down_revision: Union[str, Sequence[str], None] = '5e2a9c7b13d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_task_board',
+        'task',
+        ['energy_column', 'position', sa.literal_column('created_at DESC'), sa.literal_column('id DESC')],
+    )
+    op.create_index(
+        'ix_task_active_board',
+        'task',
+        ['energy_column', 'position', sa.literal_column('created_at DESC'), sa.literal_column('id DESC')],
+        postgresql_where=sa.text("energy_column <> 'shipped'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_task_active_board', table_name='task', postgresql_where=sa.text("energy_column <> 'shipped'"))
+    op.drop_index('ix_task_board', table_name='task')
@@ -0,0 +1,57 @@
+"""daily stats
+
+Revision ID: b6d3f8a2c5e9
+Revises: 9a5e1c3d7f24
+Create Date: 2026-10-17 22:14:08.903512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d3f8a2c5e9'
+down_revision: Union[str, Sequence[str], None] = '9a5e1c3d7f24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('daily_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('energy_column', sa.String(length=20), nullable=False),
+    sa.Column('shipped', sa.Integer(), nullable=False),
+    sa.Column('cycle_seconds', sa.BigInteger(), nullable=False),
+    sa.Column('cycle_sketch', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'energy_column')
+    )
+    op.create_table('analytics_rollup',
+    sa.Column('id', sa.SmallInteger(), nullable=False),
+    sa.Column('rolled_up_through', sa.Date(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.add_column('task', sa.Column('shipped_from', sa.String(length=20), nullable=True))
+    # The last column a shipped task was moved to by hand is the best guess
+    # of where it shipped from; the rest roll up as "unknown".
+    op.execute("""
+        UPDATE task SET shipped_from = corrected_energy
+        WHERE energy_column = 'shipped' AND corrected_energy IS NOT NULL
+    """)
+    op.create_index(
+        'ix_task_shipped_at',
+        'task',
+        ['shipped_at'],
+        postgresql_where=sa.text("energy_column = 'shipped'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_task_shipped_at', table_name='task', postgresql_where=sa.text("energy_column = 'shipped'"))
+    op.drop_column('task', 'shipped_from')
+    op.drop_table('analytics_rollup')
+    op.drop_table('daily_stats')
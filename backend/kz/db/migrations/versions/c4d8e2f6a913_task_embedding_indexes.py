@@ -0,0 +1,42 @@
+"""task embedding indexes
+
+Revision ID: c4d8e2f6a913
+Revises: a7f3c1e9d250
+Create Date: 2026-10-17 14:05:52.331907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d8e2f6a913'
+down_revision: Union[str, Sequence[str], None] = 'a7f3c1e9d250'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_task_embedding_hnsw',
+        'task',
+        ['embedding'],
+        postgresql_using='hnsw',
+        postgresql_with={'m': 16, 'ef_construction': 64},
+        postgresql_ops={'embedding': 'vector_cosine_ops'},
+    )
+    op.create_index(
+        'ix_task_unembedded',
+        'task',
+        ['id'],
+        postgresql_where=sa.text('embedding IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_task_unembedded', table_name='task', postgresql_where=sa.text('embedding IS NULL'))
+    op.drop_index('ix_task_embedding_hnsw', table_name='task', postgresql_using='hnsw')
@@ -0,0 +1,54 @@
+"""partition activity log
+
+Revision ID: c8f2b5e7a9d3
+Revises: e3a7c9d1f6b8
+Create Date: 2026-10-18 14:52:09.446180
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8f2b5e7a9d3'
+down_revision: Union[str, Sequence[str], None] = 'e3a7c9d1f6b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nothing wrote to the old table, so it is replaced rather than copied.
+    # Monthly partitions are created by the activity writer as rows arrive.
+    op.drop_table('activity_log')
+    op.create_table('activity_log',
+    sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('task_id', postgresql.UUID(as_uuid=True), nullable=True),
+    sa.Column('actor', sa.String(length=10), nullable=False),
+    sa.Column('action', sa.String(length=50), nullable=False),
+    sa.Column('details', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id', 'created_at'),
+    postgresql_partition_by='RANGE (created_at)'
+    )
+    op.create_index('ix_activity_log_task', 'activity_log', ['task_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The partitions, and the activity in them, go with the table
+    op.drop_index('ix_activity_log_task', table_name='activity_log')
+    op.drop_table('activity_log')
+    op.create_table('activity_log',
+    sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('task_id', postgresql.UUID(as_uuid=True), nullable=True),
+    sa.Column('actor', sa.String(length=10), nullable=False),
+    sa.Column('action', sa.String(length=50), nullable=False),
+    sa.Column('details', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['task_id'], ['task.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
@@ -0,0 +1,66 @@
+"""task order keys
+
+Revision ID: d2a6f4c8e1b3
+Revises: 7b3e9a1d5f60
+Create Date: 2026-10-17 19:04:31.527118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a6f4c8e1b3'
+down_revision: Union[str, Sequence[str], None] = '7b3e9a1d5f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+
+# Rank of each task in board order within its column, from 0
+RANKS = """
+    SELECT id, row_number() OVER (
+        PARTITION BY energy_column ORDER BY position, created_at DESC, id DESC
+    ) - 1 AS rank
+    FROM task
+"""
+
+
+def _digit(place: int) -> str:
+    return f"substr('{DIGITS}', (rank / {62 ** place} % 62)::int + 1, 1)"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keep the integer order while the column becomes text, then give every
+    # task a distinct key in today's board order: integer-part keys "d" plus
+    # four base-62 digits (see backend.kz.ordering), room for 14.7M a column.
+    op.alter_column('task', 'position',
+               existing_type=sa.Integer(),
+               type_=sa.String(collation='C'),
+               existing_nullable=False,
+               postgresql_using="lpad((position::bigint + 2147483648)::text, 10, '0')")
+    key = " || ".join(["'d'", *(_digit(place) for place in (3, 2, 1, 0))])
+    op.execute(f"""
+        UPDATE task SET
+            position = {key},
+            change_xid = CAST(CAST(pg_current_xact_id() AS TEXT) AS BIGINT)
+        FROM ({RANKS}) ranked
+        WHERE task.id = ranked.id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(f"""
+        UPDATE task SET position = lpad(rank::text, 10, '0')
+        FROM ({RANKS}) ranked
+        WHERE task.id = ranked.id
+    """)
+    op.alter_column('task', 'position',
+               existing_type=sa.String(collation='C'),
+               type_=sa.Integer(),
+               existing_nullable=False,
+               postgresql_using='position::integer')
@@ -0,0 +1,78 @@
+"""task archive
+
+Revision ID: e3a7c9d1f6b8
+Revises: b6d3f8a2c5e9
+Create Date: 2026-10-18 09:41:27.318604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a7c9d1f6b8'
+down_revision: Union[str, Sequence[str], None] = 'b6d3f8a2c5e9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('task_archive',
+    sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('title', sa.String(length=500), nullable=False),
+    sa.Column('body', sa.Text(), nullable=True),
+    sa.Column('raw_input', sa.Text(), nullable=False),
+    sa.Column('energy_column', sa.String(length=20), nullable=False),
+    sa.Column('position', sa.String(collation='C'), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('shipped_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('shipped_from', sa.String(length=20), nullable=True),
+    sa.Column('created_via', sa.String(length=20), nullable=False),
+    sa.Column('parse_status', sa.String(length=20), nullable=False),
+    sa.Column('corrected_energy', sa.String(length=20), nullable=True),
+    sa.Column('tags', postgresql.ARRAY(sa.String(length=100)), server_default='{}', nullable=False),
+    sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_task_archive_shipped_at', 'task_archive', ['shipped_at', 'id'], unique=False)
+    # History pages break ties on id, so the ship index gains it
+    op.drop_index('ix_task_shipped_at', table_name='task', postgresql_where=sa.text("energy_column = 'shipped'"))
+    op.create_index(
+        'ix_task_shipped_at',
+        'task',
+        ['shipped_at', 'id'],
+        postgresql_where=sa.text("energy_column = 'shipped'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Archived tasks go back to the board before the archive is dropped.
+    # Their ships were counted already.
+    op.execute("ALTER TABLE task DISABLE TRIGGER task_ship_count_insert")
+    op.execute("""
+        INSERT INTO task (
+            id, title, body, raw_input, energy_column, position, created_at, updated_at,
+            shipped_at, shipped_from, created_via, parse_status, corrected_energy
+        )
+        SELECT
+            id, title, body, raw_input, energy_column, position, created_at, updated_at,
+            shipped_at, shipped_from, created_via, parse_status, corrected_energy
+        FROM task_archive
+        ON CONFLICT (id) DO NOTHING
+    """)
+    op.execute("ALTER TABLE task ENABLE TRIGGER task_ship_count_insert")
+    op.drop_index('ix_task_shipped_at', table_name='task', postgresql_where=sa.text("energy_column = 'shipped'"))
+    op.create_index(
+        'ix_task_shipped_at',
+        'task',
+        ['shipped_at'],
+        postgresql_where=sa.text("energy_column = 'shipped'"),
+    )
+    op.drop_index('ix_task_archive_shipped_at', table_name='task_archive')
+    op.drop_table('task_archive')
@@ -0,0 +1,78 @@
+"""board version
+
+Revision ID: e91b5d3f7a28
+Revises: c4d8e2f6a913
+Create Date: 2026-10-17 15:22:07.418653
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e91b5d3f7a28'
+down_revision: Union[str, Sequence[str], None] = 'c4d8e2f6a913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('board_version',
+    sa.Column('energy_column', sa.String(length=20), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('energy_column')
+    )
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_board_version() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO board_version (energy_column, version)
+                SELECT DISTINCT energy_column, 1 FROM new_rows ORDER BY energy_column
+                ON CONFLICT (energy_column) DO UPDATE SET version = board_version.version + 1;
+            ELSIF TG_OP = 'DELETE' THEN
+                INSERT INTO board_version (energy_column, version)
+                SELECT DISTINCT energy_column, 1 FROM old_rows ORDER BY energy_column
+                ON CONFLICT (energy_column) DO UPDATE SET version = board_version.version + 1;
+            ELSE
+                INSERT INTO board_version (energy_column, version)
+                SELECT energy_column, 1 FROM (
+                    SELECT n.energy_column FROM new_rows n JOIN old_rows o ON o.id = n.id
+                    WHERE n.updated_at IS DISTINCT FROM o.updated_at
+                    UNION
+                    SELECT o.energy_column FROM new_rows n JOIN old_rows o ON o.id = n.id
+                    WHERE n.updated_at IS DISTINCT FROM o.updated_at
+                ) changed ORDER BY energy_column
+                ON CONFLICT (energy_column) DO UPDATE SET version = board_version.version + 1;
+            END IF;
+            RETURN NULL;
+        END
+        $$
+    """)
+    op.execute(
+        'CREATE TRIGGER task_board_version_insert AFTER INSERT ON task '
+        'REFERENCING NEW TABLE AS new_rows '
+        'FOR EACH STATEMENT EXECUTE FUNCTION bump_board_version()'
+    )
+    op.execute(
+        'CREATE TRIGGER task_board_version_update AFTER UPDATE ON task '
+        'REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows '
+        'FOR EACH STATEMENT EXECUTE FUNCTION bump_board_version()'
+    )
+    op.execute(
+        'CREATE TRIGGER task_board_version_delete AFTER DELETE ON task '
+        'REFERENCING OLD TABLE AS old_rows '
+        'FOR EACH STATEMENT EXECUTE FUNCTION bump_board_version()'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP TRIGGER task_board_version_delete ON task')
+    op.execute('DROP TRIGGER task_board_version_update ON task')
+    op.execute('DROP TRIGGER task_board_version_insert ON task')
+    op.execute('DROP FUNCTION bump_board_version()')
+    op.drop_table('board_version')
@@ -0,0 +1,45 @@
+"""task edges
+
+Revision ID: f7c1d4a8e2b6
+Revises: c8f2b5e7a9d3
+Create Date: 2026-10-19 10:12:53.204117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7c1d4a8e2b6'
+down_revision: Union[str, Sequence[str], None] = 'c8f2b5e7a9d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('task_edge',
+    sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('from_task_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('to_task_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('edge_type', sa.String(length=20), nullable=False),
+    sa.Column('created_by', sa.String(length=10), nullable=False),
+    sa.Column('confidence', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.CheckConstraint('from_task_id <> to_task_id', name='ck_task_edge_not_self'),
+    sa.ForeignKeyConstraint(['from_task_id'], ['task.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['to_task_id'], ['task.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_task_edge_from', 'task_edge', ['from_task_id', 'edge_type', 'to_task_id'], unique=True)
+    op.create_index('ix_task_edge_to', 'task_edge', ['to_task_id', 'edge_type'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_task_edge_to', table_name='task_edge')
+    op.drop_index('ix_task_edge_from', table_name='task_edge')
+    op.drop_table('task_edge')
@@ -1,21 +1,43 @@
 """FastAPI application entry point."""
 
+import logging
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
-from backend.kz.api import tasks
+from backend.kz.api import analytics, stats, tasks
 from backend.kz.config import get_settings
+from backend.kz.services.classifier import get_energy_classifier
+from backend.kz.services.parse_cache import get_parse_cache
+from backend.kz.services.parser import TaskParser
+
+logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """Application lifespan handler."""
     # Startup
+    app.state.parser = TaskParser(cache=get_parse_cache(), classifier=get_energy_classifier())
+    app.state.events = tasks.create_event_broker()
+    app.state.events.start()
+    app.state.activity = tasks.create_activity_writer()
+    app.state.activity.start()
     yield
-    # Shutdown
+    # Shutdown: write out the activity still buffered, then stop the rest.
+    # A service failing to close must not keep the others open.
+    for name in ("activity", "events", "parser"):
+        try:
+            await getattr(app.state, name).aclose()
+        except Exception as e:
+            logger.error(f"Failed to close {name} on shutdown: {e}")
+
+
+def _snapshot(service: Any) -> dict[str, Any]:
+    """A background service's health snapshot, or that it is not running."""
+    return service.snapshot() if service is not None else {"status": "not started"}
 
 
 def create_app() -> FastAPI:
@@ -36,15 +58,26 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[tasks.NEXT_CURSOR_HEADER, "ETag"],
     )
 
     # Routes
     app.include_router(tasks.router, prefix="/api/tasks", tags=["tasks"])
+    app.include_router(stats.router, prefix="/api/stats", tags=["stats"])
+    app.include_router(analytics.router, prefix="/api/analytics", tags=["analytics"])
 
     @app.get("/health")
-    async def health_check() -> dict[str, str]:
+    async def health_check(request: Request) -> dict[str, Any]:
         """Health check endpoint."""
-        return {"status": "healthy", "env": settings.kz_env}
+        parser = tasks.get_task_parser(request)
+        return {
+            "status": "healthy",
+            "env": settings.kz_env,
+            "parser": {"cache": get_parse_cache().snapshot(), **parser.snapshot()},
+            # Read-only: a probe must not start the feed or the writer
+            "events": _snapshot(getattr(request.app.state, "events", None)),
+            "activity": _snapshot(getattr(request.app.state, "activity", None)),
+        }
 
     return app
 
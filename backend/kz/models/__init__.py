@@ -1,22 +1,99 @@
 """Database models."""
 
-from backend.kz.models.activity import ActivityLog, ActivityLogRead, Actor
+from backend.kz.models.activity import ActivityAction, ActivityLog, ActivityLogRead, Actor
+from backend.kz.models.analytics import (
+    AnalyticsRollup,
+    CycleTime,
+    CycleTimeReport,
+    DailyStats,
+    HeatmapDay,
+    WeeklyThroughput,
+)
+from backend.kz.models.archive import TaskArchive
 from backend.kz.models.base import Base
+from backend.kz.models.board_version import BoardVersion
+from backend.kz.models.edge import (
+    EdgeType,
+    TaskBlocked,
+    TaskEdge,
+    TaskEdgeCreate,
+    TaskEdgeRead,
+    TaskGraphNode,
+    TaskLineage,
+)
+from backend.kz.models.idempotency import IdempotencyKey
+from backend.kz.models.parse_cache import ParseCacheEntry
+from backend.kz.models.parse_job import ParseJob
+from backend.kz.models.stats import ShipDay, ShipStats, ShipTotal
 from backend.kz.models.tag import Tag, TagCreate, TagRead, TaskTag
-from backend.kz.models.task import EnergyColumn, Task, TaskCreate, TaskRead, TaskUpdate
+from backend.kz.models.task import (
+    BulkAction,
+    EnergyColumn,
+    EnergySource,
+    ParseStatus,
+    Task,
+    TaskBatchCreate,
+    TaskBulkOperation,
+    TaskBulkRequest,
+    TaskBulkResult,
+    TaskChanges,
+    TaskCreate,
+    TaskMove,
+    TaskRead,
+    TaskSearch,
+    TaskSearchResult,
+    TaskShipped,
+    TaskUpdate,
+)
+from backend.kz.models.tombstone import TaskTombstone
 
 __all__ = [
+    "ActivityAction",
     "ActivityLog",
     "ActivityLogRead",
     "Actor",
+    "AnalyticsRollup",
     "Base",
+    "BoardVersion",
+    "BulkAction",
+    "CycleTime",
+    "CycleTimeReport",
+    "DailyStats",
+    "EdgeType",
     "EnergyColumn",
+    "EnergySource",
+    "HeatmapDay",
+    "IdempotencyKey",
+    "ParseCacheEntry",
+    "ParseJob",
+    "ParseStatus",
+    "ShipDay",
+    "ShipStats",
+    "ShipTotal",
     "Tag",
     "TagCreate",
     "TagRead",
     "Task",
+    "TaskArchive",
+    "TaskBatchCreate",
+    "TaskBlocked",
+    "TaskBulkOperation",
+    "TaskBulkRequest",
+    "TaskBulkResult",
+    "TaskChanges",
     "TaskCreate",
+    "TaskEdge",
+    "TaskEdgeCreate",
+    "TaskEdgeRead",
+    "TaskGraphNode",
+    "TaskLineage",
+    "TaskMove",
     "TaskRead",
+    "TaskSearch",
+    "TaskSearchResult",
+    "TaskShipped",
     "TaskTag",
+    "TaskTombstone",
     "TaskUpdate",
+    "WeeklyThroughput",
 ]
@@ -6,7 +6,7 @@ from typing import Any
 from uuid import UUID, uuid4
 
 from pydantic import BaseModel
-from sqlalchemy import DateTime, ForeignKey, String, func
+from sqlalchemy import DateTime, Index, String, func
 from sqlalchemy.dialects.postgresql import JSONB, UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -21,22 +21,45 @@ class Actor(StrEnum):
     SYSTEM = "system"
 
 
+class ActivityAction(StrEnum):
+    """What happened to the task."""
+
+    CREATED = "created"
+    PARSED = "parsed"
+    UPDATED = "updated"
+    MOVED = "moved"
+    SHIPPED = "shipped"
+    DELETED = "deleted"
+
+
 class ActivityLog(Base):
-    """Activity log database model for audit trail and dopamine fuel."""
+    """Activity log database model for audit trail and dopamine fuel.
+
+    Range-partitioned by month on ``created_at`` (partitions are created as
+    rows arrive, see ``ActivityRepository``), so retention drops whole
+    partitions. Entries are written in batches by
+    ``backend.kz.services.activity.ActivityWriter``. ``task_id`` has no
+    foreign key: a task's history outlives the task, and a batch may land
+    after the task is gone.
+    """
 
     __tablename__ = "activity_log"
+    __table_args__ = (
+        # Per-task history, newest first
+        Index("ix_activity_log_task", "task_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
     id: Mapped[UUID] = mapped_column(
         PG_UUID(as_uuid=True), primary_key=True, default=uuid4
     )
-    task_id: Mapped[UUID | None] = mapped_column(
-        PG_UUID(as_uuid=True), ForeignKey("task.id", ondelete="SET NULL"), nullable=True
-    )
+    task_id: Mapped[UUID | None] = mapped_column(PG_UUID(as_uuid=True), nullable=True)
     actor: Mapped[str] = mapped_column(String(10), nullable=False, default=Actor.USER.value)
     action: Mapped[str] = mapped_column(String(50), nullable=False)
     details: Mapped[dict[str, Any] | None] = mapped_column(JSONB, nullable=True)
+    # Part of the primary key, as the partition key must be
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), nullable=False, server_default=func.now()
+        DateTime(timezone=True), primary_key=True, server_default=func.now()
     )
 
 
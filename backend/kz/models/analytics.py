@@ -0,0 +1,83 @@
+"""Daily analytics rollups and schemas."""
+
+from datetime import date
+from typing import Any
+
+from pydantic import BaseModel
+from sqlalchemy import BigInteger, Date, Integer, SmallInteger, String
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.kz.models.base import Base
+
+# Rollup column for tasks shipped before shipped_from was recorded, or
+# created straight into Shipped.
+UNKNOWN_COLUMN = "unknown"
+
+
+class DailyStats(Base):
+    """Ships of one closed day (UTC) from one energy column.
+
+    Written by ``AnalyticsRepository.roll_up`` once the day is over; reads
+    combine these rows with a live aggregate of the days not rolled up yet.
+    """
+
+    __tablename__ = "daily_stats"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    # The column tasks were shipped from (Task.shipped_from)
+    energy_column: Mapped[str] = mapped_column(String(20), primary_key=True)
+    shipped: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Sum of cycle times (shipped_at - created_at), for means
+    cycle_seconds: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    # Cycle times as bucket counts of a backend.kz.sketch.QuantileSketch
+    cycle_sketch: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False)
+
+
+class AnalyticsRollup(Base):
+    """How far ``daily_stats`` goes: a single row (id 1).
+
+    Days without ships have no ``daily_stats`` rows, so the last rolled-up
+    day is kept here rather than read off them.
+    """
+
+    __tablename__ = "analytics_rollup"
+
+    id: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    rolled_up_through: Mapped[date] = mapped_column(Date, nullable=False)
+
+
+# Pydantic schemas
+
+
+class CycleTime(BaseModel):
+    """Cycle time (created to shipped) percentiles, in seconds."""
+
+    shipped: int
+    mean_seconds: float | None
+    p50_seconds: float | None
+    p75_seconds: float | None
+    p90_seconds: float | None
+
+
+class CycleTimeReport(BaseModel):
+    """Cycle times over the last ``days`` days, overall and per energy column."""
+
+    days: int
+    overall: CycleTime
+    by_column: dict[str, CycleTime]
+
+
+class WeeklyThroughput(BaseModel):
+    """Tasks shipped in the week (Monday to Sunday, UTC) starting ``week``."""
+
+    week: date
+    shipped: int
+    by_column: dict[str, int]
+
+
+class HeatmapDay(BaseModel):
+    """Tasks shipped on one day (UTC)."""
+
+    day: date
+    shipped: int
@@ -0,0 +1,45 @@
+"""Archive of tasks shipped long ago, kept out of the working ``task`` table."""
+
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import DateTime, Index, String, Text, func
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.kz.models.base import Base
+
+
+class TaskArchive(Base):
+    """A shipped task moved out of ``task`` by ``TaskRepository.archive_shipped``.
+
+    Holds what ``TaskRead`` returns plus what analytics and classifier
+    training read. The embedding is dropped, and the task's tags are kept
+    by name.
+    """
+
+    __tablename__ = "task_archive"
+    # Wins history pages newest first by (shipped_at, id)
+    __table_args__ = (Index("ix_task_archive_shipped_at", "shipped_at", "id"),)
+
+    id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True)
+    title: Mapped[str] = mapped_column(String(500), nullable=False)
+    body: Mapped[str | None] = mapped_column(Text, nullable=True)
+    raw_input: Mapped[str] = mapped_column(Text, nullable=False)
+    energy_column: Mapped[str] = mapped_column(String(20), nullable=False)
+    position: Mapped[str] = mapped_column(String(collation="C"), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    shipped_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    shipped_from: Mapped[str | None] = mapped_column(String(20), nullable=True)
+    created_via: Mapped[str] = mapped_column(String(20), nullable=False)
+    parse_status: Mapped[str] = mapped_column(String(20), nullable=False)
+    corrected_energy: Mapped[str | None] = mapped_column(String(20), nullable=True)
+    energy_source: Mapped[str | None] = mapped_column(String(20), nullable=True)
+    tags: Mapped[list[str]] = mapped_column(
+        ARRAY(String(100)), nullable=False, server_default="{}"
+    )
+    archived_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
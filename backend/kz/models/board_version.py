@@ -0,0 +1,72 @@
+"""Per-column board version counters, for cheap conditional GETs."""
+
+from sqlalchemy import DDL, BigInteger, String, event
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.kz.models.base import Base
+
+
+class BoardVersion(Base):
+    """Change counter for one energy column.
+
+    Bumped by statement-level triggers on ``task`` whenever a task enters,
+    leaves or changes within the column, in the same transaction as the
+    change. A column with no row has never changed (version 0).
+    """
+
+    __tablename__ = "board_version"
+
+    energy_column: Mapped[str] = mapped_column(String(20), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+
+# A task "changes" when its updated_at moves: every write the API can see
+# bumps it, while derived data (embeddings) is written without touching it.
+# Columns are bumped in a fixed order so concurrent moves cannot deadlock.
+BUMP_BOARD_VERSION_FUNCTION = """
+CREATE OR REPLACE FUNCTION bump_board_version() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO board_version (energy_column, version)
+        SELECT DISTINCT energy_column, 1 FROM new_rows ORDER BY energy_column
+        ON CONFLICT (energy_column) DO UPDATE SET version = board_version.version + 1;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO board_version (energy_column, version)
+        SELECT DISTINCT energy_column, 1 FROM old_rows ORDER BY energy_column
+        ON CONFLICT (energy_column) DO UPDATE SET version = board_version.version + 1;
+    ELSE
+        INSERT INTO board_version (energy_column, version)
+        SELECT energy_column, 1 FROM (
+            SELECT n.energy_column FROM new_rows n JOIN old_rows o ON o.id = n.id
+            WHERE n.updated_at IS DISTINCT FROM o.updated_at
+            UNION
+            SELECT o.energy_column FROM new_rows n JOIN old_rows o ON o.id = n.id
+            WHERE n.updated_at IS DISTINCT FROM o.updated_at
+        ) changed ORDER BY energy_column
+        ON CONFLICT (energy_column) DO UPDATE SET version = board_version.version + 1;
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+
+BOARD_VERSION_TRIGGERS = [
+    "CREATE TRIGGER task_board_version_insert AFTER INSERT ON task "
+    "REFERENCING NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION bump_board_version()",
+    "CREATE TRIGGER task_board_version_update AFTER UPDATE ON task "
+    "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION bump_board_version()",
+    "CREATE TRIGGER task_board_version_delete AFTER DELETE ON task "
+    "REFERENCING OLD TABLE AS old_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION bump_board_version()",
+]
+
+# Migrations install these too; the listeners cover ``metadata.create_all``.
+event.listen(Base.metadata, "after_create", DDL(BUMP_BOARD_VERSION_FUNCTION))
+for _trigger in BOARD_VERSION_TRIGGERS:
+    event.listen(Base.metadata, "after_create", DDL(_trigger))
+event.listen(
+    Base.metadata, "after_drop", DDL("DROP FUNCTION IF EXISTS bump_board_version()")
+)
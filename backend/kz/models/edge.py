@@ -0,0 +1,111 @@
+"""Task relationship (graph edge) model and schemas."""
+
+from datetime import datetime
+from enum import StrEnum
+from uuid import UUID, uuid4
+
+from pydantic import BaseModel, Field
+from sqlalchemy import CheckConstraint, DateTime, Float, ForeignKey, Index, String, func
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.kz.models.activity import Actor
+from backend.kz.models.base import Base
+from backend.kz.models.task import TaskRead
+
+
+class EdgeType(StrEnum):
+    """How the edge's ``from`` task relates to its ``to`` task."""
+
+    BLOCKS = "blocks"  # from must ship before to
+    DEPENDS_ON = "depends_on"  # from needs to shipped first
+    SPAWNED_FROM = "spawned_from"  # from was split off / grew out of to
+    DUPLICATE_OF = "duplicate_of"
+    RELATED = "related"
+
+
+class TaskEdge(Base):
+    """A directed relationship between two tasks.
+
+    Edges go away with either of their tasks (archiving included: an
+    archived task is shipped, so it blocks nothing).
+    """
+
+    __tablename__ = "task_edge"
+    __table_args__ = (
+        # Walks go both ways: downstream from from_task_id, upstream from
+        # to_task_id. The first index also keeps each edge unique.
+        Index("ix_task_edge_from", "from_task_id", "edge_type", "to_task_id", unique=True),
+        Index("ix_task_edge_to", "to_task_id", "edge_type"),
+        CheckConstraint("from_task_id <> to_task_id", name="ck_task_edge_not_self"),
+    )
+
+    id: Mapped[UUID] = mapped_column(
+        PG_UUID(as_uuid=True), primary_key=True, default=uuid4
+    )
+    from_task_id: Mapped[UUID] = mapped_column(
+        PG_UUID(as_uuid=True), ForeignKey("task.id", ondelete="CASCADE"), nullable=False
+    )
+    to_task_id: Mapped[UUID] = mapped_column(
+        PG_UUID(as_uuid=True), ForeignKey("task.id", ondelete="CASCADE"), nullable=False
+    )
+    edge_type: Mapped[str] = mapped_column(String(20), nullable=False)
+    created_by: Mapped[str] = mapped_column(
+        String(10), nullable=False, default=Actor.USER.value
+    )
+    confidence: Mapped[float | None] = mapped_column(Float, nullable=True)  # If agent-detected
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+
+# Pydantic schemas
+
+
+class TaskEdgeCreate(BaseModel):
+    """Schema for relating a task to another (by ID or unique ID prefix)."""
+
+    to_task: str = Field(..., min_length=1, max_length=36)
+    edge_type: EdgeType
+    created_by: Actor = Actor.USER
+    confidence: float | None = Field(None, ge=0, le=1)
+
+
+class TaskEdgeRead(BaseModel):
+    """Schema for reading an edge."""
+
+    id: UUID
+    from_task_id: UUID
+    to_task_id: UUID
+    edge_type: EdgeType
+    created_by: Actor
+    confidence: float | None
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class TaskGraphNode(TaskRead):
+    """A task reached by walking edges from another.
+
+    ``depth`` counts edges from the starting task along the shortest walk,
+    ``via`` is the task one step back along it and ``edge_type`` the edge
+    between the two.
+    """
+
+    depth: int
+    via: UUID
+    edge_type: EdgeType
+
+
+class TaskBlocked(TaskRead):
+    """An unshipped task waiting on unshipped blockers (``blocks``/``depends_on`` edges)."""
+
+    blocked_by: list[UUID]
+
+
+class TaskLineage(BaseModel):
+    """Where a task came from and what grew out of it (``spawned_from`` edges)."""
+
+    ancestors: list[TaskGraphNode]
+    descendants: list[TaskGraphNode]
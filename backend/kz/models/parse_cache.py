@@ -0,0 +1,24 @@
+"""Persistent parse cache model."""
+
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import DateTime, Index, String, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.kz.models.base import Base
+
+
+class ParseCacheEntry(Base):
+    """Cached AI parse result, keyed by a hash of input, prompt version and model."""
+
+    __tablename__ = "parse_cache"
+    __table_args__ = (Index("ix_parse_cache_expires_at", "expires_at"),)
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    result: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
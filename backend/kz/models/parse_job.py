@@ -0,0 +1,41 @@
+"""Parse job model for deferred AI parsing."""
+
+from datetime import datetime
+from uuid import UUID, uuid4
+
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text, func
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.kz.models.base import Base
+
+
+class ParseJob(Base):
+    """Queued AI parse work for a task captured in deferred mode.
+
+    Rows are claimed with ``FOR UPDATE SKIP LOCKED`` and leased by pushing
+    ``available_at`` into the future, so a crashed worker's jobs become
+    claimable again once the lease expires. Finished jobs are deleted.
+    """
+
+    __tablename__ = "parse_job"
+    __table_args__ = (Index("ix_parse_job_available_at", "available_at"),)
+
+    id: Mapped[UUID] = mapped_column(
+        PG_UUID(as_uuid=True), primary_key=True, default=uuid4
+    )
+    task_id: Mapped[UUID] = mapped_column(
+        PG_UUID(as_uuid=True),
+        ForeignKey("task.id", ondelete="CASCADE"),
+        unique=True,
+        nullable=False,
+    )
+    energy_override: Mapped[str | None] = mapped_column(String(20), nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    available_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
@@ -0,0 +1,137 @@
+"""Ship counters: shipped today, the current streak and all time."""
+
+from datetime import date
+
+from pydantic import BaseModel
+from sqlalchemy import DDL, BigInteger, Date, Integer, SmallInteger, event
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.kz.models.base import Base
+
+
+class ShipDay(Base):
+    """Tasks shipped on one day (UTC), and the streak of days ending with it.
+
+    Maintained by statement-level triggers on ``task`` in the transaction
+    that ships or unships, so reading today's numbers is one key lookup.
+    A day keeps its row after its ships are taken back (``shipped`` 0).
+    """
+
+    __tablename__ = "ship_day"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    shipped: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Consecutive shipping days up to and including this one; 0 if none
+    streak: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class ShipTotal(Base):
+    """All-time shipped count: a single row (id 1), kept by the same triggers."""
+
+    __tablename__ = "ship_total"
+
+    id: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    shipped: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+
+# A task counts as shipped while it sits in the shipped column, on the UTC
+# day of its shipped_at. Deleting a shipped task leaves the counts alone:
+# it was still shipped. Moving it out of the column takes the ship back.
+SHIP_DAY = "(shipped_at AT TIME ZONE 'UTC')::date"
+IS_SHIPPED = "energy_column = 'shipped' AND shipped_at IS NOT NULL"
+
+# Adds ``delta`` ships to a day and the total. When the day starts or stops
+# being a shipping day, streaks are recomputed from it onwards, stopping at
+# the first day whose streak does not change.
+ADD_SHIPS_FUNCTION = """
+CREATE OR REPLACE FUNCTION add_ships(ship_date date, delta integer) RETURNS void
+LANGUAGE plpgsql AS $$
+DECLARE
+    count_now integer;
+    run integer;
+    d date := ship_date;
+BEGIN
+    INSERT INTO ship_total (id, shipped) VALUES (1, delta)
+    ON CONFLICT (id) DO UPDATE SET shipped = ship_total.shipped + delta;
+
+    INSERT INTO ship_day (day, shipped, streak) VALUES (ship_date, delta, 0)
+    ON CONFLICT (day) DO UPDATE SET shipped = ship_day.shipped + delta
+    RETURNING shipped INTO count_now;
+    IF (count_now > 0) = (count_now - delta > 0) THEN
+        RETURN;
+    END IF;
+
+    run := coalesce((SELECT streak FROM ship_day WHERE day = ship_date - 1), 0);
+    LOOP
+        UPDATE ship_day SET streak = CASE WHEN shipped > 0 THEN run + 1 ELSE 0 END
+        WHERE day = d AND streak <> CASE WHEN shipped > 0 THEN run + 1 ELSE 0 END
+        RETURNING streak INTO run;
+        EXIT WHEN NOT FOUND;
+        d := d + 1;
+    END LOOP;
+END
+$$
+"""
+
+COUNT_SHIPS_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION count_ships() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    ships record;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        FOR ships IN
+            SELECT {SHIP_DAY} AS day, count(*) AS delta FROM new_rows
+            WHERE {IS_SHIPPED} GROUP BY 1 ORDER BY 1
+        LOOP
+            PERFORM add_ships(ships.day, ships.delta::integer);
+        END LOOP;
+    ELSE
+        FOR ships IN
+            SELECT day, sum(delta) AS delta FROM (
+                SELECT {SHIP_DAY} AS day, 1 AS delta FROM new_rows WHERE {IS_SHIPPED}
+                UNION ALL
+                SELECT {SHIP_DAY} AS day, -1 AS delta FROM old_rows WHERE {IS_SHIPPED}
+            ) changes GROUP BY day HAVING sum(delta) <> 0 ORDER BY day
+        LOOP
+            PERFORM add_ships(ships.day, ships.delta::integer);
+        END LOOP;
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+
+SHIP_COUNT_TRIGGERS = [
+    "CREATE TRIGGER task_ship_count_insert AFTER INSERT ON task "
+    "REFERENCING NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION count_ships()",
+    "CREATE TRIGGER task_ship_count_update AFTER UPDATE ON task "
+    "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION count_ships()",
+]
+
+# Migrations install these too; the listeners cover ``metadata.create_all``.
+event.listen(Base.metadata, "after_create", DDL(ADD_SHIPS_FUNCTION))
+event.listen(Base.metadata, "after_create", DDL(COUNT_SHIPS_FUNCTION))
+for _trigger in SHIP_COUNT_TRIGGERS:
+    event.listen(Base.metadata, "after_create", DDL(_trigger))
+event.listen(Base.metadata, "after_drop", DDL("DROP FUNCTION IF EXISTS count_ships()"))
+event.listen(
+    Base.metadata, "after_drop", DDL("DROP FUNCTION IF EXISTS add_ships(date, integer)")
+)
+
+
+# Pydantic schemas
+
+
+class ShipStats(BaseModel):
+    """The always-visible counters: shipped today, streak in days, all time.
+
+    The streak counts today once something ships today; until then it is
+    the streak that ended yesterday, still alive.
+    """
+
+    today: int
+    streak: int
+    all_time: int
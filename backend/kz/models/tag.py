@@ -4,7 +4,7 @@ from datetime import datetime
 from uuid import UUID, uuid4
 
 from pydantic import BaseModel, Field
-from sqlalchemy import Boolean, Float, ForeignKey, String, func, DateTime
+from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Index, String, func
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -32,6 +32,8 @@ class TaskTag(Base):
     """Many-to-many junction table for tasks and tags."""
 
     __tablename__ = "task_tag"
+    # The primary key leads with task_id; filtering by tag needs the reverse
+    __table_args__ = (Index("ix_task_tag_tag", "tag_id", "task_id"),)
 
     task_id: Mapped[UUID] = mapped_column(
         PG_UUID(as_uuid=True), ForeignKey("task.id", ondelete="CASCADE"), primary_key=True
@@ -2,15 +2,29 @@
 
 from datetime import datetime
 from enum import StrEnum
+from typing import Annotated, Self
 from uuid import UUID, uuid4
 
 from pgvector.sqlalchemy import Vector
-from pydantic import BaseModel, Field
-from sqlalchemy import DateTime, Integer, String, Text, func
+from pydantic import BaseModel, Field, model_validator
+from sqlalchemy import (
+    DDL,
+    BigInteger,
+    ColumnElement,
+    DateTime,
+    Index,
+    String,
+    Text,
+    cast,
+    event,
+    func,
+)
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
 from backend.kz.models.base import Base
+from backend.kz.models.stats import ShipStats
+from backend.kz.ordering import FIRST_KEY
 
 
 class EnergyColumn(StrEnum):
@@ -22,6 +36,32 @@ class EnergyColumn(StrEnum):
     SHIPPED = "shipped"
 
 
+class ParseStatus(StrEnum):
+    """Where a task is in the AI parsing pipeline."""
+
+    PENDING = "pending"
+    PARSED = "parsed"
+    FAILED = "failed"
+
+
+class EnergySource(StrEnum):
+    """Who picked a task's energy column; only some are classifier training labels."""
+
+    LLM = "llm"
+    LOCAL = "local"  # The local classifier itself: not a label
+    FALLBACK = "fallback"  # The column default, picked by nobody: not a label
+    USER = "user"  # Given explicitly on create
+
+
+class BulkAction(StrEnum):
+    """What a bulk operation does to its tasks."""
+
+    GET = "get"
+    SHIP = "ship"
+    MOVE = "move"
+    DELETE = "delete"
+
+
 class CreatedVia(StrEnum):
     """How the task was created."""
 
@@ -31,6 +71,11 @@ class CreatedVia(StrEnum):
     API = "api"
 
 
+def current_xid() -> ColumnElement[int]:
+    """ID of the writing transaction (a never-wrapping xid8, as bigint)."""
+    return cast(cast(func.pg_current_xact_id(), Text), BigInteger)
+
+
 class Task(Base):
     """Task database model."""
 
@@ -46,9 +91,16 @@ class Task(Base):
     energy_column: Mapped[str] = mapped_column(
         String(20), nullable=False, default=EnergyColumn.QUICK_WIN.value
     )
-    position: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Fractional order key (see backend.kz.ordering), compared byte by byte
+    position: Mapped[str] = mapped_column(
+        String(collation="C"), nullable=False, default=FIRST_KEY
+    )
 
-    embedding: Mapped[list[float] | None] = mapped_column(Vector(1536), nullable=True)
+    # ~6 KB per row and never part of TaskRead: not loaded unless asked for
+    # explicitly, and touching it on an instance that did not load it raises.
+    embedding: Mapped[list[float] | None] = mapped_column(
+        Vector(1536), nullable=True, deferred=True, deferred_raiseload=True
+    )
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, server_default=func.now()
@@ -59,9 +111,103 @@ class Task(Base):
     shipped_at: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True), nullable=True
     )
+    # Energy column the task was shipped from, for per-column analytics
+    shipped_from: Mapped[str | None] = mapped_column(String(20), nullable=True)
     created_via: Mapped[str] = mapped_column(
         String(20), nullable=False, default=CreatedVia.CLI.value
     )
+    parse_status: Mapped[str] = mapped_column(
+        String(20), nullable=False, default=ParseStatus.PARSED.value
+    )
+    # Energy column the user moved the task to by hand; training signal for
+    # the local classifier that outlives shipping.
+    corrected_energy: Mapped[str | None] = mapped_column(String(20), nullable=True)
+    # Where the energy column came from (EnergySource); NULL until parsed
+    energy_source: Mapped[str | None] = mapped_column(String(20), nullable=True)
+    # Transaction that last changed the task, for delta sync. Moves together
+    # with updated_at; see TaskRepository.list_changes.
+    change_xid: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default=current_xid(), onupdate=current_xid()
+    )
+
+
+# Board order is (energy_column, position, created_at DESC, id DESC); keyset
+# pages are contiguous range scans on these. The partial index keeps the
+# active board's scans off the ever-growing shipped pile.
+_board_key = (Task.energy_column, Task.position, Task.created_at.desc(), Task.id.desc())
+Index("ix_task_board", *_board_key)
+Index(
+    "ix_task_active_board",
+    *_board_key,
+    postgresql_where=Task.energy_column != EnergyColumn.SHIPPED.value,
+)
+Index(
+    "ix_task_embedding_hnsw",
+    Task.embedding,
+    postgresql_using="hnsw",
+    postgresql_with={"m": 16, "ef_construction": 64},
+    postgresql_ops={"embedding": "vector_cosine_ops"},
+)
+Index("ix_task_change", Task.change_xid, Task.id)
+# Lets the embedding backfill find its remaining work without a scan.
+Index("ix_task_unembedded", Task.id, postgresql_where=Task.embedding.is_(None))
+# Ships by time, for analytics rollups, archiving and the wins history.
+Index(
+    "ix_task_shipped_at",
+    Task.shipped_at,
+    Task.id,
+    postgresql_where=Task.energy_column == EnergyColumn.SHIPPED.value,
+)
+
+# Every visible change to a task is announced on this channel as
+# {"type": "created" | "updated" | "shipped" | "deleted", "id": <task id>}.
+# NOTIFY is transactional, so listeners only ever hear about committed
+# changes. As for board versions, writes that leave updated_at alone
+# (embeddings) are not announced.
+TASK_EVENTS_CHANNEL = "task_events"
+
+NOTIFY_TASK_EVENT_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION notify_task_event() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    kind text;
+    task_id uuid;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        kind := 'created';
+        task_id := NEW.id;
+    ELSIF TG_OP = 'DELETE' THEN
+        kind := 'deleted';
+        task_id := OLD.id;
+    ELSIF NEW.energy_column = 'shipped' AND OLD.energy_column <> 'shipped' THEN
+        kind := 'shipped';
+        task_id := NEW.id;
+    ELSE
+        kind := 'updated';
+        task_id := NEW.id;
+    END IF;
+    PERFORM pg_notify(
+        '{TASK_EVENTS_CHANNEL}', json_build_object('type', kind, 'id', task_id)::text
+    );
+    RETURN NULL;
+END
+$$
+"""
+
+TASK_EVENT_TRIGGERS = [
+    "CREATE TRIGGER task_events_insert AFTER INSERT ON task "
+    "FOR EACH ROW EXECUTE FUNCTION notify_task_event()",
+    "CREATE TRIGGER task_events_update AFTER UPDATE ON task "
+    "FOR EACH ROW WHEN (OLD.updated_at IS DISTINCT FROM NEW.updated_at) "
+    "EXECUTE FUNCTION notify_task_event()",
+    "CREATE TRIGGER task_events_delete AFTER DELETE ON task "
+    "FOR EACH ROW EXECUTE FUNCTION notify_task_event()",
+]
+
+event.listen(Base.metadata, "after_create", DDL(NOTIFY_TASK_EVENT_FUNCTION))
+for _trigger in TASK_EVENT_TRIGGERS:
+    event.listen(Base.metadata, "after_create", DDL(_trigger))
+event.listen(Base.metadata, "after_drop", DDL("DROP FUNCTION IF EXISTS notify_task_event()"))
 
 
 # Pydantic schemas
@@ -75,6 +221,16 @@ class TaskCreate(BaseModel):
     created_via: CreatedVia = CreatedVia.CLI
 
 
+class TaskBatchCreate(BaseModel):
+    """Schema for creating many tasks at once, e.g. from a brain dump."""
+
+    raw_inputs: list[Annotated[str, Field(min_length=1, max_length=5000)]] = Field(
+        ..., min_length=1, max_length=500
+    )
+    energy_column: EnergyColumn | None = None
+    created_via: CreatedVia = CreatedVia.CLI
+
+
 class TaskRead(BaseModel):
     """Schema for reading a task."""
 
@@ -83,19 +239,109 @@ class TaskRead(BaseModel):
     body: str | None
     raw_input: str
     energy_column: EnergyColumn
-    position: int
+    position: str
     created_at: datetime
     updated_at: datetime
     shipped_at: datetime | None
     created_via: CreatedVia
+    parse_status: ParseStatus
 
     model_config = {"from_attributes": True}
 
 
+class TaskChanges(BaseModel):
+    """Schema for one page of a delta sync."""
+
+    changed: list[TaskRead]
+    deleted: list[UUID]
+    cursor: str
+    has_more: bool
+
+
+class TaskSearch(BaseModel):
+    """Schema for a semantic search over tasks."""
+
+    query: str = Field(..., min_length=1, max_length=1000)
+    limit: int = Field(10, ge=1, le=100)
+    ef_search: int | None = Field(None, ge=1, le=1000)
+    include_shipped: bool = False
+
+
+class TaskSearchResult(TaskRead):
+    """A task matched by semantic search, with cosine similarity to the query."""
+
+    score: float
+
+
+class TaskShipped(TaskRead):
+    """A task just shipped, with the ship counters it moved."""
+
+    stats: ShipStats
+
+
 class TaskUpdate(BaseModel):
     """Schema for updating a task."""
 
     title: str | None = None
     body: str | None = None
     energy_column: EnergyColumn | None = None
-    position: int | None = None
+
+
+class TaskMove(BaseModel):
+    """Schema for moving a task between two neighbouring cards.
+
+    ``before`` is the card the task lands right after and ``after`` the card
+    it lands right before; leave one out to move to the bottom or the top of
+    the column, both to move to the top. The column is ``energy_column``,
+    else the neighbours', else the task's own.
+    """
+
+    energy_column: EnergyColumn | None = None
+    before: UUID | None = None
+    after: UUID | None = None
+
+
+class TaskBulkOperation(BaseModel):
+    """One operation of a bulk request, applied to every task in ``ids``.
+
+    ``move`` places the tasks side by side, in the order of ``ids``, between
+    ``before`` and ``after`` as in ``TaskMove``; it needs an ``energy_column``
+    or a neighbour to know where to.
+    """
+
+    action: BulkAction
+    ids: list[UUID] = Field(..., min_length=1, max_length=1000)
+    energy_column: EnergyColumn | None = None
+    before: UUID | None = None
+    after: UUID | None = None
+
+    @model_validator(mode="after")
+    def check_move(self) -> Self:
+        placement = (self.energy_column, self.before, self.after)
+        if self.action is not BulkAction.MOVE:
+            if placement != (None, None, None):
+                raise ValueError(f"{self.action} takes no energy_column or neighbours")
+        elif placement == (None, None, None):
+            raise ValueError("move needs an energy_column or a neighbour")
+        elif {self.before, self.after} & set(self.ids):
+            raise ValueError("a moved task cannot be its own neighbour")
+        return self
+
+
+class TaskBulkRequest(BaseModel):
+    """Schema for bulk operations, applied in order in one transaction."""
+
+    operations: list[TaskBulkOperation] = Field(..., min_length=1, max_length=100)
+
+
+class TaskBulkResult(BaseModel):
+    """Outcome of one bulk operation.
+
+    ``tasks`` are the tasks read, shipped or moved (as they are now), in the
+    order of the operation's ``ids``; ``missing`` are the IDs that matched no task.
+    """
+
+    action: BulkAction
+    tasks: list[TaskRead] = []
+    deleted: list[UUID] = []
+    missing: list[UUID] = []
@@ -0,0 +1,29 @@
+"""Tombstones for deleted tasks, so delta sync can report deletions."""
+
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import BigInteger, DateTime, Index, func
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.kz.models.base import Base
+from backend.kz.models.task import current_xid
+
+
+class TaskTombstone(Base):
+    """Marker left behind by a deleted task, kept for a retention window."""
+
+    __tablename__ = "task_tombstone"
+    __table_args__ = (
+        Index("ix_task_tombstone_change", "change_xid", "id"),
+        Index("ix_task_tombstone_deleted_at", "deleted_at"),
+    )
+
+    id: Mapped[UUID] = mapped_column(PG_UUID(as_uuid=True), primary_key=True)
+    change_xid: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default=current_xid()
+    )
+    deleted_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
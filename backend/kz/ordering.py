@@ -0,0 +1,171 @@
+"""Fractional order keys for card positions.
+
+A card's position is a string key, and cards sort by comparing keys byte by
+byte (the column uses the "C" collation). There is always a key between any
+two others, so moving a card rewrites that card alone, never its neighbours.
+
+Keys follow David Greenspan's "Implementing Fractional Indexing": an integer
+part, whose first character encodes its length, then an optional fraction
+in base 62 that never ends in ``0``. Adding cards at either end of a column
+steps the integer part, so those keys grow logarithmically; repeatedly
+inserting into the same gap lengthens the fraction by a character every
+five or six moves, which is what rebalancing (``TaskRepository.rebalance``)
+cleans up.
+"""
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+
+# Key for the first card of an empty column.
+FIRST_KEY = "a0"
+
+# The smallest integer part; a key needs room before it, so it is never used alone.
+_SMALLEST_INTEGER = "A" + DIGITS[0] * 26
+
+
+def key_between(before: str | None, after: str | None) -> str:
+    """A key sorting after ``before`` and before ``after`` (None: that end is open).
+
+    Raises ValueError if either key is malformed or ``before >= after``.
+    """
+    if before is not None:
+        _validate(before)
+    if after is not None:
+        _validate(after)
+    if before is not None and after is not None and before >= after:
+        raise ValueError(f"Order keys out of order: {before!r} >= {after!r}")
+
+    if before is None:
+        if after is None:
+            return FIRST_KEY
+        integer = _integer_part(after)
+        if integer == _SMALLEST_INTEGER:
+            return integer + _midpoint("", after[len(integer) :])
+        if integer < after:
+            return integer
+        smaller = _decrement_integer(integer)
+        if smaller is None:
+            raise ValueError("Cannot create an order key before the smallest key")
+        return smaller
+
+    integer = _integer_part(before)
+    fraction = before[len(integer) :]
+    if after is None:
+        larger = _increment_integer(integer)
+        return larger if larger is not None else integer + _midpoint(fraction, None)
+
+    after_integer = _integer_part(after)
+    if integer == after_integer:
+        return integer + _midpoint(fraction, after[len(after_integer) :])
+    larger = _increment_integer(integer)
+    if larger is None:
+        raise ValueError("Cannot create an order key after the largest key")
+    return larger if larger < after else integer + _midpoint(fraction, None)
+
+
+def keys_between(before: str | None, after: str | None, count: int) -> list[str]:
+    """``count`` ascending keys between ``before`` and ``after``, as short as possible."""
+    if count <= 0:
+        return []
+    if count == 1:
+        return [key_between(before, after)]
+    if after is None:
+        keys = [key_between(before, None)]
+        while len(keys) < count:
+            keys.append(key_between(keys[-1], None))
+        return keys
+    if before is None:
+        keys = [key_between(None, after)]
+        while len(keys) < count:
+            keys.append(key_between(None, keys[-1]))
+        return keys[::-1]
+    middle = count // 2
+    key = key_between(before, after)
+    return [
+        *keys_between(before, key, middle),
+        key,
+        *keys_between(key, after, count - middle - 1),
+    ]
+
+
+def _midpoint(low: str, high: str | None) -> str:
+    """A fraction strictly between ``low`` and ``high`` (None: no upper bound)."""
+    if high is not None:
+        # Skip the common prefix, reading a missing digit of ``low`` as 0
+        n = 0
+        while (low[n] if n < len(low) else DIGITS[0]) == high[n]:
+            n += 1
+        if n > 0:
+            return high[:n] + _midpoint(low[n:], high[n:])
+    low_digit = DIGITS.index(low[0]) if low else 0
+    high_digit = DIGITS.index(high[0]) if high is not None else len(DIGITS)
+    if high_digit - low_digit > 1:
+        return DIGITS[(low_digit + high_digit + 1) // 2]
+    # Adjacent digits: extend ``low`` (or take ``high``'s first digit when it has more)
+    if high is not None and len(high) > 1:
+        return high[0]
+    return DIGITS[low_digit] + _midpoint(low[1:], None)
+
+
+def _integer_length(head: str) -> int:
+    if "a" <= head <= "z":
+        return ord(head) - ord("a") + 2
+    if "A" <= head <= "Z":
+        return ord("Z") - ord(head) + 2
+    raise ValueError(f"Invalid order key head: {head!r}")
+
+
+def _integer_part(key: str) -> str:
+    length = _integer_length(key[0]) if key else 0
+    if not key or length > len(key):
+        raise ValueError(f"Invalid order key: {key!r}")
+    return key[:length]
+
+
+def _validate(key: str) -> None:
+    integer = _integer_part(key)
+    if integer == _SMALLEST_INTEGER or key.endswith(DIGITS[0]) and len(key) > len(integer):
+        raise ValueError(f"Invalid order key: {key!r}")
+    if any(c not in DIGITS for c in key[1:]):
+        raise ValueError(f"Invalid order key: {key!r}")
+
+
+def _increment_integer(integer: str) -> str | None:
+    head, digits = integer[0], list(integer[1:])
+    for i in reversed(range(len(digits))):
+        digit = DIGITS.index(digits[i]) + 1
+        if digit < len(DIGITS):
+            digits[i] = DIGITS[digit]
+            return head + "".join(digits)
+        digits[i] = DIGITS[0]
+    # Carried out of every digit: move to the next length
+    if head == "Z":
+        return "a" + DIGITS[0]
+    if head == "z":
+        return None
+    head = chr(ord(head) + 1)
+    if head > "a":
+        digits.append(DIGITS[0])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def _decrement_integer(integer: str) -> str | None:
+    head, digits = integer[0], list(integer[1:])
+    for i in reversed(range(len(digits))):
+        digit = DIGITS.index(digits[i]) - 1
+        if digit >= 0:
+            digits[i] = DIGITS[digit]
+            return head + "".join(digits)
+        digits[i] = DIGITS[-1]
+    # Borrowed out of every digit: move to the previous length
+    if head == "a":
+        return "Z" + DIGITS[-1]
+    if head == "A":
+        return None
+    head = chr(ord(head) - 1)
+    if head < "Z":
+        digits.append(DIGITS[-1])
+    else:
+        digits.pop()
+    return head + "".join(digits)
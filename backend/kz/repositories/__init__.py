@@ -1,5 +1,21 @@
 """Data repositories."""
 
+from backend.kz.repositories.activity import ActivityRepository
+from backend.kz.repositories.analytics import AnalyticsRepository
+from backend.kz.repositories.edge import EdgeRepository
+from backend.kz.repositories.parse_cache import ParseCacheRepository
+from backend.kz.repositories.parse_job import ParseJobRepository
+from backend.kz.repositories.stats import StatsRepository
+from backend.kz.repositories.tag import TagRepository
 from backend.kz.repositories.task import TaskRepository
 
-__all__ = ["TaskRepository"]
+__all__ = [
+    "ActivityRepository",
+    "AnalyticsRepository",
+    "EdgeRepository",
+    "ParseCacheRepository",
+    "ParseJobRepository",
+    "StatsRepository",
+    "TagRepository",
+    "TaskRepository",
+]
@@ -0,0 +1,162 @@
+"""Activity repository: the buffered task activity log and its monthly partitions."""
+
+import re
+from collections import deque
+from collections.abc import Callable, Iterable
+from datetime import UTC, date, datetime
+from functools import lru_cache
+from typing import Any
+from uuid import UUID, uuid4
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.kz.config import get_settings
+from backend.kz.models import ActivityAction, ActivityLog, Actor
+
+PARTITION_NAME = re.compile(r"activity_log_y(\d{4})m(\d{2})")
+
+
+def month_of(moment: datetime) -> date:
+    """First day of the (UTC) month ``moment`` falls in."""
+    return moment.astimezone(UTC).date().replace(day=1)
+
+
+def next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def months_ago(months: int) -> date:
+    """First day of the month ``months`` months before the current (UTC) one."""
+    month = month_of(datetime.now(UTC))
+    index = month.year * 12 + month.month - 1 - months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"activity_log_y{month.year}m{month.month:02d}"
+
+
+class ActivityBuffer:
+    """Activity entries waiting to be written, kept in memory.
+
+    Recording costs the write path no database work; an
+    ``ActivityWriter`` takes entries off in batches. Bounded: when full,
+    the oldest entries are dropped (and counted) rather than blocking.
+    """
+
+    def __init__(self, max_entries: int = 10_000, batch_size: int = 500) -> None:
+        self.batch_size = batch_size
+        self.dropped = 0
+        # Called once a batch is waiting, so a writer can flush early
+        self.on_batch: Callable[[], None] | None = None
+        self._entries: deque[dict[str, Any]] = deque(maxlen=max_entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def record(
+        self,
+        action: ActivityAction,
+        task_ids: Iterable[UUID],
+        actor: Actor = Actor.USER,
+        details: dict[str, Any] | None = None,
+    ) -> None:
+        """Queue one entry per task, timestamped now."""
+        now = datetime.now(UTC)
+        for task_id in task_ids:
+            if len(self._entries) == self._entries.maxlen:
+                self.dropped += 1
+            self._entries.append(
+                {
+                    "id": uuid4(),
+                    "task_id": task_id,
+                    "actor": actor.value,
+                    "action": action.value,
+                    "details": details,
+                    "created_at": now,
+                }
+            )
+        if self.on_batch is not None and len(self._entries) >= self.batch_size:
+            self.on_batch()
+
+    def take(self, limit: int) -> list[dict[str, Any]]:
+        """Remove and return up to ``limit`` of the oldest entries."""
+        return [self._entries.popleft() for _ in range(min(limit, len(self._entries)))]
+
+    def put_back(self, entries: list[dict[str, Any]]) -> None:
+        """Return entries from a failed write to the front, space permitting."""
+        room = (self._entries.maxlen or 0) - len(self._entries)
+        kept = entries[len(entries) - room :] if room > 0 else []
+        self.dropped += len(entries) - len(kept)
+        self._entries.extendleft(reversed(kept))
+
+
+@lru_cache
+def get_activity_buffer() -> ActivityBuffer:
+    """Get the process-wide activity buffer."""
+    settings = get_settings()
+    return ActivityBuffer(
+        max_entries=settings.activity_buffer_size, batch_size=settings.activity_batch_size
+    )
+
+
+class ActivityRepository:
+    """Repository for the activity log."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def insert_many(self, entries: list[dict[str, Any]]) -> None:
+        """Write entries (from ``ActivityBuffer.take``) with one multi-row INSERT.
+
+        Their months need partitions first (see ``ensure_partitions``).
+        Entries already written are skipped, so a batch can be retried.
+        """
+        await self.session.execute(insert(ActivityLog).values(entries).on_conflict_do_nothing())
+        await self.session.commit()
+
+    async def ensure_partitions(self, months: Iterable[date]) -> None:
+        """Create the partitions of ``months`` (first days) that do not exist yet."""
+        for month in sorted(set(months)):
+            await self.session.execute(
+                text(
+                    f"CREATE TABLE IF NOT EXISTS {partition_name(month)} "
+                    "PARTITION OF activity_log FOR VALUES "
+                    f"FROM ('{month.isoformat()} 00:00+00') "
+                    f"TO ('{next_month(month).isoformat()} 00:00+00')"
+                )
+            )
+        await self.session.commit()
+
+    async def drop_partitions_before(self, month: date) -> list[str]:
+        """Drop the partitions of months before ``month``; returns their names.
+
+        Retention costs a catalog change per month, however many entries
+        the month holds.
+        """
+        result = await self.session.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = 'activity_log'::regclass"
+            )
+        )
+        dropped = []
+        for name in sorted(result.scalars()):
+            match = PARTITION_NAME.fullmatch(name)
+            if match and date(int(match[1]), int(match[2]), 1) < month:
+                await self.session.execute(text(f"DROP TABLE IF EXISTS {name}"))
+                dropped.append(name)
+        await self.session.commit()
+        return dropped
+
+    async def list_for_task(self, task_id: UUID, limit: int) -> list[ActivityLog]:
+        """A task's activity, newest first, from the ``(task_id, created_at)`` index."""
+        result = await self.session.execute(
+            select(ActivityLog)
+            .where(ActivityLog.task_id == task_id)
+            .order_by(ActivityLog.created_at.desc(), ActivityLog.id.desc())
+            .limit(limit)
+        )
+        return list(result.scalars())
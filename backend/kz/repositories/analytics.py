@@ -0,0 +1,177 @@
+"""Analytics repository: daily rollups of shipped tasks."""
+
+from datetime import UTC, date, datetime, time, timedelta
+from typing import Any
+
+from sqlalchemy import (
+    BigInteger,
+    ColumnElement,
+    Date,
+    Integer,
+    Row,
+    Select,
+    cast,
+    delete,
+    func,
+    literal,
+    select,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.kz.models import AnalyticsRollup, DailyStats, EnergyColumn, Task, TaskArchive
+from backend.kz.models.analytics import UNKNOWN_COLUMN
+from backend.kz.sketch import LOG_GAMMA
+
+
+def utc_today() -> date:
+    return datetime.now(UTC).date()
+
+
+def _midnight(day: date) -> datetime:
+    return datetime.combine(day, time(), UTC)
+
+
+def _ship_day(shipped_at: Any) -> ColumnElement[date]:
+    return cast(func.timezone("UTC", shipped_at), Date)
+
+
+class AnalyticsRepository:
+    """Repository for the ``daily_stats`` rollups.
+
+    A day is rolled up once it is over (UTC). Reads take rolled-up days
+    from ``daily_stats`` and aggregate the days after them (normally just
+    today) live, from the ``ix_task_shipped_at`` index. Ships are read from
+    ``task`` and ``task_archive`` alike, so archiving changes no figure.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def rolled_up_through(self) -> date | None:
+        """The last rolled-up day (None before the first rollup)."""
+        return await self.session.scalar(
+            select(AnalyticsRollup.rolled_up_through).where(AnalyticsRollup.id == 1)
+        )
+
+    async def first_ship_day(self) -> date | None:
+        first = select(func.min(_ship_day(Task.shipped_at))).where(
+            Task.energy_column == EnergyColumn.SHIPPED.value
+        )
+        first_archived = select(func.min(_ship_day(TaskArchive.shipped_at)))
+        # least() skips NULLs: either table may be empty
+        return await self.session.scalar(
+            select(func.least(first.scalar_subquery(), first_archived.scalar_subquery()))
+        )
+
+    async def roll_up(self, start: date, end: date) -> int:
+        """Aggregate the days in ``[start, end)`` into ``daily_stats``, replacing their rows.
+
+        Moves ``analytics_rollup`` up to ``end`` if it is behind. Returns how
+        many rows it wrote.
+        """
+        await self.session.execute(
+            delete(DailyStats).where(DailyStats.day >= start, DailyStats.day < end)
+        )
+        aggregate = _aggregate(_midnight(start), _midnight(end)).subquery()
+        stmt = insert(DailyStats).from_select(
+            ["day", "energy_column", "shipped", "cycle_seconds", "cycle_sketch"],
+            select(aggregate),
+        )
+        # Another reader may be rolling up the same days
+        result = await self.session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[DailyStats.day, DailyStats.energy_column],
+                set_={
+                    "shipped": stmt.excluded.shipped,
+                    "cycle_seconds": stmt.excluded.cycle_seconds,
+                    "cycle_sketch": stmt.excluded.cycle_sketch,
+                },
+            )
+        )
+        last = end - timedelta(days=1)
+        watermark = insert(AnalyticsRollup).values(id=1, rolled_up_through=last)
+        await self.session.execute(
+            watermark.on_conflict_do_update(
+                index_elements=[AnalyticsRollup.id],
+                set_={
+                    "rolled_up_through": func.greatest(
+                        AnalyticsRollup.rolled_up_through, watermark.excluded.rolled_up_through
+                    )
+                },
+            )
+        )
+        await self.session.commit()
+        return result.rowcount
+
+    async def roll_up_closed_days(self, max_days: int) -> int:
+        """Roll up at most ``max_days`` closed days after the last rollup.
+
+        Days beyond that stay live until the next call (or a rebuild).
+        Returns how many days it rolled up.
+        """
+        through = await self.rolled_up_through()
+        start = through + timedelta(days=1) if through else await self.first_ship_day()
+        if start is None:
+            return 0
+        end = min(utc_today(), start + timedelta(days=max_days))
+        if start >= end:
+            return 0
+        await self.roll_up(start, end)
+        return (end - start).days
+
+    async def daily(self, since: date) -> list[Row[Any]]:
+        """Per-day, per-column ship rows from ``since`` to now, in one query.
+
+        Rolled-up days come from ``daily_stats`` and later days are
+        aggregated from ``task`` on the fly, with the same columns.
+        """
+        through = await self.rolled_up_through()
+        live_from = max(since, through + timedelta(days=1)) if through else since
+        stored = select(
+            DailyStats.day,
+            DailyStats.energy_column,
+            DailyStats.shipped,
+            DailyStats.cycle_seconds,
+            DailyStats.cycle_sketch,
+        ).where(DailyStats.day >= since)
+        live = _aggregate(_midnight(live_from), None)
+        result = await self.session.execute(union_all(stored, live))
+        return list(result.all())
+
+
+def _aggregate(start: datetime, end: datetime | None) -> Select[Any]:
+    """Ships in ``[start, end)`` as ``daily_stats`` rows (without storing them)."""
+
+    def shipped(table: Any, *conditions: ColumnElement[bool]) -> Select[Any]:
+        window = [table.shipped_at >= start, *conditions]
+        if end is not None:
+            window.append(table.shipped_at < end)
+        return select(table.shipped_at, table.created_at, table.shipped_from).where(*window)
+
+    ships = union_all(
+        shipped(Task, Task.energy_column == EnergyColumn.SHIPPED.value), shipped(TaskArchive)
+    ).subquery("ships")
+    cycle_seconds = func.greatest(func.extract("epoch", ships.c.shipped_at - ships.c.created_at), 0)
+    keys = (
+        _ship_day(ships.c.shipped_at).label("day"),
+        func.coalesce(ships.c.shipped_from, literal(UNKNOWN_COLUMN)).label("energy_column"),
+        # backend.kz.sketch.bucket, in SQL
+        cast(
+            func.greatest(func.ceil(func.ln(func.greatest(cycle_seconds, 1)) / LOG_GAMMA), 0),
+            Integer,
+        ).label("bucket"),
+    )
+    per_bucket = (
+        select(*keys, func.count().label("shipped"), func.sum(cycle_seconds).label("cycle_seconds"))
+        .group_by(*keys)
+        .subquery()
+    )
+    return select(
+        per_bucket.c.day,
+        per_bucket.c.energy_column,
+        cast(func.sum(per_bucket.c.shipped), Integer).label("shipped"),
+        cast(func.sum(per_bucket.c.cycle_seconds), BigInteger).label("cycle_seconds"),
+        func.jsonb_object_agg(per_bucket.c.bucket, per_bucket.c.shipped).label("cycle_sketch"),
+    ).group_by(per_bucket.c.day, per_bucket.c.energy_column)
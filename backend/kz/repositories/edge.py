@@ -0,0 +1,314 @@
+"""Edge repository: task relationships and the graph walks over them."""
+
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import (
+    CTE,
+    Row,
+    Subquery,
+    delete,
+    exists,
+    literal,
+    or_,
+    select,
+    text,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import distinct_on, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from backend.kz.models import (
+    BoardVersion,
+    EdgeType,
+    EnergyColumn,
+    Task,
+    TaskEdge,
+    TaskEdgeCreate,
+)
+from backend.kz.repositories.task import READ_COLUMNS, board_order
+
+# Blockers by blocked task
+Blockers = dict[UUID, list[UUID]]
+
+
+@dataclass(frozen=True)
+class Arc:
+    """How edges of one type run through a graph: upstream first, then downstream."""
+
+    edge_type: EdgeType
+    reverse: bool = False  # True: to_task_id is upstream of from_task_id
+
+
+# Graphs walked by the queries below. Upstream tasks come first: a blocker
+# ships before what it blocks, a task exists before what is spawned from it.
+BLOCKING = (Arc(EdgeType.BLOCKS), Arc(EdgeType.DEPENDS_ON, reverse=True))
+LINEAGE = (Arc(EdgeType.SPAWNED_FROM, reverse=True),)
+# Graphs that must stay acyclic, by the edge types that make them up
+ACYCLIC = {
+    EdgeType.BLOCKS: BLOCKING,
+    EdgeType.DEPENDS_ON: BLOCKING,
+    EdgeType.SPAWNED_FROM: LINEAGE,
+    EdgeType.DUPLICATE_OF: (Arc(EdgeType.DUPLICATE_OF),),
+}
+
+
+class EdgeCycleError(Exception):
+    """The edge would make a task (indirectly) block, spawn or duplicate itself."""
+
+    def __init__(self, from_task_id: UUID, to_task_id: UUID, edge_type: EdgeType) -> None:
+        self.from_task_id = from_task_id
+        self.to_task_id = to_task_id
+        super().__init__(
+            f"Task {str(from_task_id)[:8]} {edge_type.value.replace('_', ' ')} "
+            f"{str(to_task_id)[:8]} would create a cycle"
+        )
+
+
+class BlockerCache:
+    """Blocked tasks and their blockers, kept for the life of the process.
+
+    Whether a task is blocked depends on edges and on which tasks are
+    shipped. Edge writes through ``EdgeRepository`` clear the cache; task
+    writes are caught by the board versions it was loaded at, which move
+    with every ship, move and delete. Edges written by another process
+    show up after the next task change.
+    """
+
+    def __init__(self) -> None:
+        self.generation = 0  # Bumped by every edge write
+        self._versions: dict[str, int] | None = None
+        self._blockers: Blockers = {}
+
+    def get(self, versions: dict[str, int]) -> Blockers | None:
+        return self._blockers if versions == self._versions else None
+
+    def put(self, versions: dict[str, int], blockers: Blockers, generation: int) -> None:
+        # A load that raced an edge write may predate it: do not keep it
+        if generation == self.generation:
+            self._versions, self._blockers = versions, blockers
+
+    def invalidate(self) -> None:
+        self.generation += 1
+        self._versions, self._blockers = None, {}
+
+
+@lru_cache
+def get_blocker_cache() -> BlockerCache:
+    """Get the process-wide blocker cache."""
+    return BlockerCache()
+
+
+class EdgeRepository:
+    """Repository for task edges.
+
+    Walks are recursive CTEs over ``task_edge``; each step is an index
+    lookup on ``(from_task_id, edge_type)`` or ``(to_task_id, edge_type)``.
+    """
+
+    def __init__(self, session: AsyncSession, cache: BlockerCache | None = None) -> None:
+        self.session = session
+        self.cache = cache if cache is not None else get_blocker_cache()
+
+    async def add(
+        self, from_task_id: UUID, to_task_id: UUID, data: TaskEdgeCreate
+    ) -> TaskEdge:
+        """Relate two tasks; adding an existing edge again updates its confidence.
+
+        Raises ``EdgeCycleError`` if the edge would close a cycle in its
+        graph, and ValueError for an edge from a task to itself.
+        """
+        if from_task_id == to_task_id:
+            raise ValueError("A task cannot be related to itself")
+        graph = ACYCLIC.get(data.edge_type)
+        if graph is not None:
+            # One edge writer at a time, so two concurrent inserts cannot
+            # close a cycle neither sees on its own. Reads are not blocked.
+            await self.session.execute(text("LOCK TABLE task_edge IN SHARE ROW EXCLUSIVE MODE"))
+            upstream, downstream = _arc_ends(graph, data.edge_type, from_task_id, to_task_id)
+            reachable = _reachable(downstream, graph)
+            if await self.session.scalar(select(exists().where(reachable.c.id == upstream))):
+                await self.session.rollback()
+                raise EdgeCycleError(from_task_id, to_task_id, data.edge_type)
+        stmt = insert(TaskEdge).values(
+            from_task_id=from_task_id,
+            to_task_id=to_task_id,
+            edge_type=data.edge_type.value,
+            created_by=data.created_by.value,
+            confidence=data.confidence,
+        )
+        result = await self.session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[TaskEdge.from_task_id, TaskEdge.edge_type, TaskEdge.to_task_id],
+                set_={"confidence": stmt.excluded.confidence},
+            ).returning(TaskEdge)
+        )
+        edge = result.scalar_one()
+        await self.session.commit()
+        self.cache.invalidate()
+        return edge
+
+    async def remove(self, task_id: UUID, edge_id: UUID) -> bool:
+        """Delete an edge of ``task_id`` (either end)."""
+        result = await self.session.execute(
+            delete(TaskEdge)
+            .where(
+                TaskEdge.id == edge_id,
+                or_(TaskEdge.from_task_id == task_id, TaskEdge.to_task_id == task_id),
+            )
+            .returning(TaskEdge.id)
+        )
+        removed = result.scalar_one_or_none() is not None
+        await self.session.commit()
+        if removed:
+            self.cache.invalidate()
+        return removed
+
+    async def list_for_task(self, task_id: UUID) -> list[TaskEdge]:
+        """A task's edges in both directions, oldest first."""
+        result = await self.session.execute(
+            select(TaskEdge)
+            .where(or_(TaskEdge.from_task_id == task_id, TaskEdge.to_task_id == task_id))
+            .order_by(TaskEdge.created_at, TaskEdge.id)
+        )
+        return list(result.scalars())
+
+    async def blockers(self, task_id: UUID, max_depth: int) -> list[Row[Any]]:
+        """Everything ``task_id`` waits on, directly or not, shipped or not."""
+        return await self._walk(task_id, BLOCKING, downstream=False, max_depth=max_depth)
+
+    async def impact(self, task_id: UUID, max_depth: int) -> list[Row[Any]]:
+        """Everything waiting on ``task_id``, directly or not."""
+        return await self._walk(task_id, BLOCKING, downstream=True, max_depth=max_depth)
+
+    async def ancestors(self, task_id: UUID, max_depth: int) -> list[Row[Any]]:
+        """The tasks ``task_id`` was spawned from, up the chain."""
+        return await self._walk(task_id, LINEAGE, downstream=False, max_depth=max_depth)
+
+    async def descendants(self, task_id: UUID, max_depth: int) -> list[Row[Any]]:
+        """The tasks spawned from ``task_id``, down the chain."""
+        return await self._walk(task_id, LINEAGE, downstream=True, max_depth=max_depth)
+
+    async def blocked(self) -> Blockers:
+        """Unshipped tasks with unshipped direct blockers, and those blockers.
+
+        A blocker that ships releases what it blocks, even if it has
+        blockers of its own left. Served from the blocker cache while no
+        edge or task changed, at the cost of reading the board versions.
+        """
+        result = await self.session.execute(
+            select(BoardVersion.energy_column, BoardVersion.version)
+        )
+        versions = {column: version for column, version in result}
+        blockers = self.cache.get(versions)
+        if blockers is None:
+            generation = self.cache.generation
+            blockers = await self._load_blocked()
+            self.cache.put(versions, blockers, generation)
+        return blockers
+
+    async def list_blocked(self) -> list[tuple[Row[Any], list[UUID]]]:
+        """Blocked tasks in board order, each with its unshipped blockers."""
+        blockers = await self.blocked()
+        if not blockers:
+            return []
+        result = await self.session.execute(
+            select(*READ_COLUMNS)
+            .where(Task.id.in_(list(blockers)))
+            .order_by(*board_order(Task))
+        )
+        return [(task, blockers[task.id]) for task in result]
+
+    async def _load_blocked(self) -> Blockers:
+        arcs = _arcs(BLOCKING)
+        blocker, blocked = aliased(Task), aliased(Task)
+        shipped = EnergyColumn.SHIPPED.value
+        result = await self.session.execute(
+            select(arcs.c.downstream, arcs.c.upstream)
+            .join(blocker, blocker.id == arcs.c.upstream)
+            .join(blocked, blocked.id == arcs.c.downstream)
+            .where(blocker.energy_column != shipped, blocked.energy_column != shipped)
+            .order_by(arcs.c.downstream, arcs.c.upstream)
+        )
+        blockers: Blockers = defaultdict(list)
+        for task_id, blocker_id in result:
+            blockers[task_id].append(blocker_id)
+        return dict(blockers)
+
+    async def _walk(
+        self, task_id: UUID, graph: tuple[Arc, ...], downstream: bool, max_depth: int
+    ) -> list[Row[Any]]:
+        """Tasks reachable from ``task_id`` within ``max_depth`` edges, nearest first.
+
+        Each comes once, at its shortest distance (``depth``), with the task
+        one step back (``via``) and the type of the edge between them.
+        """
+        arcs = _arcs(graph)
+        near, far = (
+            (arcs.c.upstream, arcs.c.downstream) if downstream
+            else (arcs.c.downstream, arcs.c.upstream)
+        )
+        walk = (
+            select(far.label("id"), near.label("via"), literal(1).label("depth"), arcs.c.edge_type)
+            .where(near == task_id)
+            .cte("walk", recursive=True)
+        )
+        # UNION drops repeated (task, via, depth) rows, so a walk costs at
+        # most one row per edge and level, however the paths fan out.
+        walk = walk.union(
+            select(far, near, walk.c.depth + 1, arcs.c.edge_type)
+            .join_from(walk, arcs, near == walk.c.id)
+            .where(walk.c.depth < max_depth)
+        )
+        nearest = (
+            select(walk)
+            .ext(distinct_on(walk.c.id))
+            .order_by(walk.c.id, walk.c.depth, walk.c.via)
+            .subquery("nearest")
+        )
+        result = await self.session.execute(
+            select(*READ_COLUMNS, nearest.c.depth, nearest.c.via, nearest.c.edge_type)
+            .join(nearest, nearest.c.id == Task.id)
+            .where(Task.id != task_id)
+            .order_by(nearest.c.depth, *board_order(Task))
+        )
+        return list(result.all())
+
+
+def _arcs(graph: tuple[Arc, ...]) -> Subquery:
+    """The edges of ``graph`` as (upstream, downstream, edge_type) rows."""
+    parts = [
+        select(
+            (TaskEdge.to_task_id if arc.reverse else TaskEdge.from_task_id).label("upstream"),
+            (TaskEdge.from_task_id if arc.reverse else TaskEdge.to_task_id).label("downstream"),
+            TaskEdge.edge_type,
+        ).where(TaskEdge.edge_type == arc.edge_type.value)
+        for arc in graph
+    ]
+    return (union_all(*parts) if len(parts) > 1 else parts[0]).subquery("arc")
+
+
+def _arc_ends(
+    graph: tuple[Arc, ...], edge_type: EdgeType, from_task_id: UUID, to_task_id: UUID
+) -> tuple[UUID, UUID]:
+    """(upstream, downstream) of an edge in ``graph``."""
+    reverse = next(arc.reverse for arc in graph if arc.edge_type is edge_type)
+    return (to_task_id, from_task_id) if reverse else (from_task_id, to_task_id)
+
+
+def _reachable(task_id: UUID, graph: tuple[Arc, ...]) -> CTE:
+    """Every task downstream of ``task_id`` in ``graph``, however far.
+
+    No depth limit: UNION visits each task once, so the walk ends even if
+    the graph has a cycle.
+    """
+    arcs = _arcs(graph)
+    reach = select(arcs.c.downstream.label("id")).where(arcs.c.upstream == task_id)
+    reach = reach.cte("reach", recursive=True)
+    return reach.union(
+        select(arcs.c.downstream).join_from(reach, arcs, arcs.c.upstream == reach.c.id)
+    )
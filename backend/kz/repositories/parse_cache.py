@@ -0,0 +1,67 @@
+"""Parse cache repository: the persistent tier of the parse cache."""
+
+from datetime import timedelta
+from typing import Any
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.kz.models import ParseCacheEntry
+
+
+class ParseCacheRepository:
+    """Repository for cached parse results."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def get(self, key: str) -> dict[str, Any] | None:
+        """Get an unexpired cached result by key."""
+        return (await self.get_many([key])).get(key)
+
+    async def get_many(self, keys: list[str]) -> dict[str, dict[str, Any]]:
+        """Get unexpired cached results for several keys in one query."""
+        result = await self.session.execute(
+            select(ParseCacheEntry.key, ParseCacheEntry.result).where(
+                ParseCacheEntry.key.in_(keys), ParseCacheEntry.expires_at > func.now()
+            )
+        )
+        return {row.key: row.result for row in result}
+
+    async def put(self, key: str, value: dict[str, Any], ttl_seconds: int) -> None:
+        """Store a result, replacing any previous entry for the key."""
+        await self.put_many({key: value}, ttl_seconds)
+
+    async def put_many(self, entries: dict[str, dict[str, Any]], ttl_seconds: int) -> None:
+        """Store several results with one multi-row upsert."""
+        expires_at = func.now() + timedelta(seconds=ttl_seconds)
+        stmt = insert(ParseCacheEntry).values(
+            [
+                {"key": key, "result": value, "expires_at": expires_at}
+                for key, value in entries.items()
+            ]
+        )
+        await self.session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[ParseCacheEntry.key],
+                set_={"result": stmt.excluded.result, "expires_at": stmt.excluded.expires_at},
+            )
+        )
+        await self.session.commit()
+
+    async def evict(self, max_rows: int) -> int:
+        """Delete expired entries, then the soonest-to-expire ones beyond ``max_rows``."""
+        expired = await self.session.execute(
+            delete(ParseCacheEntry).where(ParseCacheEntry.expires_at <= func.now())
+        )
+        overflow = (
+            select(ParseCacheEntry.key)
+            .order_by(ParseCacheEntry.expires_at.desc())
+            .offset(max_rows)
+        )
+        trimmed = await self.session.execute(
+            delete(ParseCacheEntry).where(ParseCacheEntry.key.in_(overflow.scalar_subquery()))
+        )
+        await self.session.commit()
+        return expired.rowcount + trimmed.rowcount
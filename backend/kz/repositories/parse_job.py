@@ -0,0 +1,73 @@
+"""Parse job repository: a Postgres-backed work queue."""
+
+from collections.abc import Sequence
+from datetime import timedelta
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import Row, delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.kz.models import ParseJob, Task
+
+
+class ParseJobRepository:
+    """Repository for claiming and settling deferred parse jobs."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def claim(self, limit: int, lease_seconds: int) -> Sequence[Row[Any]]:
+        """Claim up to ``limit`` due jobs and lease them for ``lease_seconds``.
+
+        Concurrent workers skip rows another worker has locked, so each job is
+        handed to exactly one claimer. Returned rows carry the job fields plus
+        the task's ``raw_input``.
+        """
+        due = (
+            select(ParseJob.id)
+            .where(ParseJob.available_at <= func.now())
+            .order_by(ParseJob.available_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.session.execute(
+            update(ParseJob)
+            .where(ParseJob.id.in_(due.scalar_subquery()), ParseJob.task_id == Task.id)
+            .values(
+                attempts=ParseJob.attempts + 1,
+                available_at=func.now() + timedelta(seconds=lease_seconds),
+            )
+            .returning(
+                ParseJob.id,
+                ParseJob.task_id,
+                ParseJob.energy_override,
+                ParseJob.attempts,
+                Task.raw_input,
+            )
+        )
+        jobs = result.all()
+        await self.session.commit()
+        return jobs
+
+    async def complete(self, job_id: UUID) -> None:
+        """Remove a finished job from the queue."""
+        await self.session.execute(delete(ParseJob).where(ParseJob.id == job_id))
+        await self.session.commit()
+
+    async def retry(self, job_id: UUID, error: str, delay_seconds: float) -> None:
+        """Release a job so it becomes claimable again after ``delay_seconds``."""
+        await self.session.execute(
+            update(ParseJob)
+            .where(ParseJob.id == job_id)
+            .values(
+                last_error=error,
+                available_at=func.now() + timedelta(seconds=delay_seconds),
+            )
+        )
+        await self.session.commit()
+
+    async def count_pending(self) -> int:
+        """Number of jobs still queued or in flight."""
+        result = await self.session.execute(select(func.count()).select_from(ParseJob))
+        return result.scalar_one()
@@ -0,0 +1,40 @@
+"""Stats repository: reads of the counters kept up to date by triggers."""
+
+from sqlalchemy import Date, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.kz.models import ShipDay, ShipStats, ShipTotal
+
+
+class StatsRepository:
+    """Repository for board statistics."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def ship_stats(self) -> ShipStats:
+        """Shipped today, the live streak and all time, in one query.
+
+        Each is a primary-key lookup on the counter tables (see
+        ``backend.kz.models.stats``), whatever the size of the board.
+        """
+        today = cast(func.timezone("UTC", func.now()), Date)
+        shipped_today = select(ShipDay.shipped).where(ShipDay.day == today)
+        # Yesterday's streak stays alive until today ends without a ship
+        streak = (
+            select(ShipDay.streak)
+            .where(ShipDay.day.in_([today, today - 1]), ShipDay.shipped > 0)
+            .order_by(ShipDay.day.desc())
+            .limit(1)
+        )
+        all_time = select(ShipTotal.shipped).where(ShipTotal.id == 1)
+        row = (
+            await self.session.execute(
+                select(
+                    func.coalesce(shipped_today.scalar_subquery(), 0).label("today"),
+                    func.coalesce(streak.scalar_subquery(), 0).label("streak"),
+                    func.coalesce(all_time.scalar_subquery(), 0).label("all_time"),
+                )
+            )
+        ).one()
+        return ShipStats.model_validate(row, from_attributes=True)
@@ -0,0 +1,153 @@
+"""Tag repository: AI-assigned tags and the tasks carrying them."""
+
+from collections import OrderedDict
+from collections.abc import Iterable
+from functools import lru_cache
+from uuid import UUID
+
+from sqlalchemy import Float, bindparam, column, func, select
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.kz.config import get_settings
+from backend.kz.models import Tag, TaskTag
+
+# Tags by task: tag names and the confidence they were assigned with
+TaskTags = dict[UUID, dict[str, float | None]]
+
+TAG_NAME_MAX_LENGTH = 100
+
+
+class TagCache:
+    """Tag IDs by name, kept for the life of the process (LRU-bounded).
+
+    Tags are never renamed, so a cached ID stays right until its tag is
+    deleted; ``TagRepository.attach`` notices that and resolves it again.
+    """
+
+    def __init__(self, max_entries: int = 10_000) -> None:
+        self.max_entries = max_entries
+        self._ids: OrderedDict[str, UUID] = OrderedDict()
+
+    def get(self, name: str) -> UUID | None:
+        tag_id = self._ids.get(name)
+        if tag_id is not None:
+            self._ids.move_to_end(name)
+        return tag_id
+
+    def put(self, name: str, tag_id: UUID) -> None:
+        self._ids[name] = tag_id
+        self._ids.move_to_end(name)
+        while len(self._ids) > self.max_entries:
+            self._ids.popitem(last=False)
+
+    def forget(self, names: Iterable[str]) -> None:
+        for name in names:
+            self._ids.pop(name, None)
+
+
+@lru_cache
+def get_tag_cache() -> TagCache:
+    """Get the process-wide tag cache."""
+    return TagCache(max_entries=get_settings().tag_cache_size)
+
+
+class TagRepository:
+    """Repository for tags.
+
+    Tags are written as part of task writes, so these methods run in the
+    caller's transaction and leave committing to it.
+    """
+
+    def __init__(self, session: AsyncSession, cache: TagCache | None = None) -> None:
+        self.session = session
+        self.cache = cache or get_tag_cache()
+
+    async def resolve(self, names: list[str]) -> dict[str, UUID]:
+        """Tag IDs by name, creating the tags that do not exist yet.
+
+        Cached names cost no query; the rest take one INSERT ... ON CONFLICT,
+        which returns existing and new tags alike. It inserts them in name
+        order, so concurrent writers lock tag rows in the same order and
+        cannot deadlock on overlapping names.
+        """
+        ids: dict[str, UUID] = {}
+        missing = []
+        for name in sorted(set(names)):
+            tag_id = self.cache.get(name)
+            if tag_id is None:
+                missing.append(name)
+            else:
+                ids[name] = tag_id
+        if missing:
+            stmt = insert(Tag).values([{"name": name, "auto_generated": True} for name in missing])
+            result = await self.session.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[Tag.name], set_={"name": stmt.excluded.name}
+                ).returning(Tag.name, Tag.id)
+            )
+            for name, tag_id in result:
+                self.cache.put(name, tag_id)
+                ids[name] = tag_id
+        return ids
+
+    async def attach(self, tagged: TaskTags) -> None:
+        """Tag tasks with one multi-row insert into ``task_tag``.
+
+        Tagging a task again with the same tag only updates its confidence.
+        """
+        links = [
+            (task_id, name, confidence)
+            for task_id, tags in tagged.items()
+            for name, confidence in _normalized(tags).items()
+        ]
+        if not links:
+            return
+        ids = await self.resolve([name for _, name, _ in links])
+        stale = await self._insert_links(links, ids)
+        if stale:
+            # Cached tags deleted since: create them again and link those
+            self.cache.forget(stale)
+            ids = await self.resolve(list(stale))
+            await self._insert_links([link for link in links if link[1] in stale], ids)
+
+    async def _insert_links(
+        self, links: list[tuple[UUID, str, float | None]], ids: dict[str, UUID]
+    ) -> set[str]:
+        """Insert task-tag links; returns the names whose tag no longer exists.
+
+        Links are joined to ``tag`` by ID, so a stale cached ID skips its
+        link instead of failing the statement on the foreign key.
+        """
+        rows = func.unnest(
+            bindparam("task_ids", [task_id for task_id, _, _ in links], ARRAY(PG_UUID)),
+            bindparam("tag_ids", [ids[name] for _, name, _ in links], ARRAY(PG_UUID)),
+            bindparam("confidences", [c for _, _, c in links], ARRAY(Float)),
+        ).table_valued(
+            column("task_id", PG_UUID), column("tag_id", PG_UUID), column("confidence", Float)
+        ).render_derived(name="link")
+        stmt = insert(TaskTag).from_select(
+            ["task_id", "tag_id", "confidence"],
+            select(rows.c.task_id, rows.c.tag_id, rows.c.confidence).join(
+                Tag, Tag.id == rows.c.tag_id
+            ),
+        )
+        result = await self.session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[TaskTag.task_id, TaskTag.tag_id],
+                set_={"confidence": stmt.excluded.confidence},
+            ).returning(TaskTag.tag_id)
+        )
+        linked = set(result.scalars())
+        return {name for _, name, _ in links if ids[name] not in linked}
+
+
+def _normalized(tags: dict[str, float | None]) -> dict[str, float | None]:
+    """Non-empty tag names cut to the column's length, each once."""
+    normalized: dict[str, float | None] = {}
+    for name, confidence in tags.items():
+        name = name.strip()[:TAG_NAME_MAX_LENGTH]
+        if name:
+            normalized.setdefault(name, confidence)
+    return normalized
@@ -1,99 +1,1188 @@
 """Task repository for database operations."""
 
-from datetime import datetime, timezone
-from uuid import UUID
+import base64
+import json
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Any, Self
+from uuid import UUID, uuid4
 
-from sqlalchemy import select
+from sqlalchemy import (
+    CTE,
+    BigInteger,
+    BindParameter,
+    ColumnElement,
+    Row,
+    Select,
+    String,
+    Text,
+    any_,
+    bindparam,
+    case,
+    cast,
+    delete,
+    func,
+    literal,
+    select,
+    tuple_,
+    type_coerce,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import Grouping
 
-from backend.kz.models import EnergyColumn, Task, TaskCreate, TaskUpdate
+from backend.kz.models import (
+    ActivityAction,
+    Actor,
+    BoardVersion,
+    BulkAction,
+    EnergyColumn,
+    EnergySource,
+    IdempotencyKey,
+    ParseJob,
+    ParseStatus,
+    Tag,
+    Task,
+    TaskBulkOperation,
+    TaskCreate,
+    TaskArchive,
+    TaskMove,
+    TaskRead,
+    TaskTag,
+    TaskTombstone,
+    TaskUpdate,
+)
+from backend.kz.ordering import keys_between
+from backend.kz.repositories.activity import ActivityBuffer, get_activity_buffer
+from backend.kz.repositories.tag import TagRepository
+
+TITLE_MAX_LENGTH = 500
+
+# Board reads select exactly what TaskRead returns, never the embedding.
+READ_COLUMNS = tuple(getattr(Task, name) for name in TaskRead.model_fields)
+ARCHIVE_READ_COLUMNS = tuple(getattr(TaskArchive, name) for name in TaskRead.model_fields)
+
+# How many candidates to report when a short ID is ambiguous.
+AMBIGUOUS_MATCHES_SHOWN = 5
+
+
+class AmbiguousTaskIdError(Exception):
+    """A short task ID matches more than one task."""
+
+    def __init__(self, prefix: str, matches: list[UUID]) -> None:
+        self.prefix = prefix
+        self.matches = matches
+        shown = ", ".join(str(m)[:8] for m in matches)
+        super().__init__(f"Task ID '{prefix}' is ambiguous; matches {shown}, ...")
+
+
+class MoveConflictError(Exception):
+    """The neighbours of a move are gone, elsewhere or out of order.
+
+    The client's view of the board is stale; it should reload and retry.
+    """
+
+
+class DuplicateRequestError(Exception):
+    """A concurrent request with the same idempotency key created its tasks first."""
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+        super().__init__(f"A request with idempotency key '{key}' already ran")
+
+
+class TaskModifiedError(Exception):
+    """A conditional update found the task changed since the client read it."""
+
+    def __init__(self, task_id: UUID) -> None:
+        self.task_id = task_id
+        super().__init__(f"Task {task_id} was modified since it was read")
+
+
+def uuid_prefix_range(prefix: str) -> tuple[UUID, UUID]:
+    """Smallest and largest UUIDs starting with ``prefix`` (dashes ignored).
+
+    Raises ValueError unless the prefix is 1-32 hex digits.
+    """
+    digits = prefix.replace("-", "").lower()
+    if not 0 < len(digits) <= 32 or any(c not in "0123456789abcdef" for c in digits):
+        raise ValueError(f"Invalid task ID: {prefix!r}")
+    return UUID(digits.ljust(32, "0")), UUID(digits.ljust(32, "f"))
+
+
+def provisional_title(raw_input: str) -> str:
+    """Title shown for a task until its deferred parse lands."""
+    return raw_input[:TITLE_MAX_LENGTH]
+
+
+def _encode_token(payload: list[Any]) -> str:
+    """Opaque, URL-safe token for clients."""
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def _decode_token(token: str) -> Any:
+    return json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+
+
+@dataclass(frozen=True)
+class TaskCursor:
+    """Board position of the last task on a page, for keyset pagination."""
+
+    energy_column: str
+    position: str
+    created_at: datetime
+    id: UUID
+
+    @classmethod
+    def after(cls, task: Task | Row[Any]) -> Self:
+        return cls(task.energy_column, task.position, task.created_at, task.id)
+
+    def encode(self) -> str:
+        return _encode_token(
+            [self.energy_column, self.position, self.created_at.isoformat(), str(self.id)]
+        )
+
+    @classmethod
+    def decode(cls, token: str) -> Self:
+        """Parse a token from ``encode``. Raises ValueError if it is malformed."""
+        try:
+            energy_column, position, created_at, task_id = _decode_token(token)
+            return cls(
+                str(energy_column), str(position), datetime.fromisoformat(created_at), UUID(task_id)
+            )
+        except (ValueError, TypeError) as e:
+            raise ValueError("Invalid cursor") from e
+
+
+@dataclass(frozen=True)
+class ChangeCursor:
+    """Position in the task change stream, for delta sync.
+
+    ``xmin`` is where the next sync starts: the oldest transaction still
+    running when this sync began, so changes committed later are never
+    skipped, only occasionally sent twice. ``after`` is the last change
+    returned while a sync is still paging.
+    """
+
+    xmin: int
+    issued_at: datetime
+    after: tuple[int, UUID] | None = None
+
+    def encode(self) -> str:
+        after = [self.after[0], str(self.after[1])] if self.after else None
+        return _encode_token([self.xmin, self.issued_at.isoformat(), after])
+
+    @classmethod
+    def decode(cls, token: str) -> Self:
+        """Parse a token from ``encode``. Raises ValueError if it is malformed."""
+        try:
+            xmin, issued_at, after = _decode_token(token)
+            return cls(
+                int(xmin),
+                datetime.fromisoformat(issued_at),
+                (int(after[0]), UUID(after[1])) if after else None,
+            )
+        except (ValueError, TypeError, IndexError) as e:
+            raise ValueError("Invalid cursor") from e
+
+
+@dataclass(frozen=True)
+class ShippedCursor:
+    """Ship time of the last task on a wins history page, for keyset pagination."""
+
+    shipped_at: datetime
+    id: UUID
+
+    @classmethod
+    def after(cls, task: Task | Row[Any]) -> Self:
+        return cls(task.shipped_at, task.id)
+
+    def encode(self) -> str:
+        return _encode_token([self.shipped_at.isoformat(), str(self.id)])
+
+    @classmethod
+    def decode(cls, token: str) -> Self:
+        """Parse a token from ``encode``. Raises ValueError if it is malformed."""
+        try:
+            shipped_at, task_id = _decode_token(token)
+            return cls(datetime.fromisoformat(shipped_at), UUID(task_id))
+        except (ValueError, TypeError) as e:
+            raise ValueError("Invalid cursor") from e
+
+
+def board_order(task: Any) -> tuple:
+    """Board ordering; matches the ix_task_board / ix_task_active_board indexes."""
+    return (task.energy_column, task.position, task.created_at.desc(), task.id.desc())
 
 
 class TaskRepository:
-    """Repository for Task database operations."""
+    """Repository for Task database operations.
 
-    def __init__(self, session: AsyncSession) -> None:
+    Writes record what they did to ``activity`` once committed; it is
+    written to the activity log in the background (see
+    ``backend.kz.services.activity``).
+    """
+
+    def __init__(self, session: AsyncSession, activity: ActivityBuffer | None = None) -> None:
         self.session = session
+        self.activity = activity if activity is not None else get_activity_buffer()
+
+    async def create(
+        self,
+        data: TaskCreate,
+        title: str,
+        body: str | None = None,
+        embedding: list[float] | None = None,
+        tags: dict[str, float | None] | None = None,
+        energy_source: EnergySource | None = None,
+    ) -> Row[Any]:
+        """Create a new task, at the top of its column, with one INSERT ... RETURNING.
+
+        The order key is computed in Python (see ``backend.kz.ordering``),
+        so the column's current top key is read first: two round trips.
 
-    async def create(self, data: TaskCreate, title: str, body: str | None = None) -> Task:
-        """Create a new task."""
-        task = Task(
-            title=title,
-            body=body,
-            raw_input=data.raw_input,
-            energy_column=data.energy_column.value,
-            created_via=data.created_via.value,
+        ``tags`` maps tag names to the confidence they were assigned with;
+        they are stored in the same transaction. ``energy_source`` says who
+        picked the column (see ``list_energy_labels``).
+        """
+        [position] = await self._top_positions([data.energy_column.value])
+        result = await self.session.execute(
+            insert(Task)
+            .values(
+                _task_values(
+                    data,
+                    title,
+                    body=body,
+                    embedding=embedding,
+                    position=position,
+                    energy_source=energy_source and energy_source.value,
+                )
+            )
+            .returning(*READ_COLUMNS)
         )
-        self.session.add(task)
+        task = result.one()
+        if tags:
+            await TagRepository(self.session).attach({task.id: tags})
         await self.session.commit()
-        await self.session.refresh(task)
+        self._record_created([task])
         return task
 
-    async def get_by_id(self, task_id: UUID) -> Task | None:
-        """Get a task by ID."""
-        result = await self.session.execute(select(Task).where(Task.id == task_id))
+    async def create_pending(
+        self,
+        data: TaskCreate,
+        energy_override: EnergyColumn | None = None,
+        embedding: list[float] | None = None,
+    ) -> Row[Any]:
+        """Create a task with a provisional title and queue it for AI parsing.
+
+        The task and its parse job are inserted by one statement, after
+        reading the top key of its column.
+        """
+        tasks = await self._insert_pending(
+            [data], energy_override, [embedding] if embedding is not None else None
+        )
+        await self.session.commit()
+        self._record_created(tasks)
+        return tasks[0]
+
+    async def create_many(
+        self,
+        items: list[TaskCreate],
+        titles: list[str],
+        embeddings: list[list[float]] | None = None,
+        tags: list[dict[str, float | None]] | None = None,
+        energy_sources: list[EnergySource] | None = None,
+        idempotency_key: str | None = None,
+    ) -> list[Row[Any]]:
+        """Create many tasks with one multi-row INSERT ... RETURNING.
+
+        Tasks are returned in the order of ``items``, and stacked in that order
+        at the top of their columns, whose top keys are read first in one
+        query. ``tags`` holds each task's tags, and ``energy_sources`` who
+        picked each column, as for ``create``; all tags are stored with one
+        more insert. With ``idempotency_key`` the key is stored in the same
+        transaction (see ``get_for_key``); raises DuplicateRequestError,
+        creating nothing, if it is taken.
+        """
+        embeddings = embeddings or [None] * len(items)
+        sources = [s.value for s in energy_sources] if energy_sources else [None] * len(items)
+        positions = await self._top_positions([data.energy_column.value for data in items])
+        result = await self.session.execute(
+            insert(Task).returning(*READ_COLUMNS, sort_by_parameter_order=True),
+            [
+                _task_values(
+                    data, title, embedding=embedding, position=position, energy_source=source
+                )
+                for data, title, embedding, position, source in zip(
+                    items, titles, embeddings, positions, sources, strict=True
+                )
+            ],
+        )
+        created = list(result.all())
+        if tags:
+            await TagRepository(self.session).attach(
+                {task.id: task_tags for task, task_tags in zip(created, tags, strict=True)}
+            )
+        await self._claim_key(idempotency_key, created)
+        await self.session.commit()
+        self._record_created(created)
+        return created
+
+    async def create_many_pending(
+        self,
+        items: list[TaskCreate],
+        energy_override: EnergyColumn | None = None,
+        embeddings: list[list[float]] | None = None,
+        idempotency_key: str | None = None,
+    ) -> list[Row[Any]]:
+        """Bulk version of ``create_pending``, with the same two round trips.
+
+        ``idempotency_key`` works as for ``create_many``.
+        """
+        created = await self._insert_pending(items, energy_override, embeddings)
+        await self._claim_key(idempotency_key, created)
+        await self.session.commit()
+        self._record_created(created)
+        return created
+
+    async def _insert_pending(
+        self,
+        items: list[TaskCreate],
+        energy_override: EnergyColumn | None,
+        embeddings: list[list[float]] | None = None,
+    ) -> list[Row[Any]]:
+        """Insert pending tasks and their parse jobs with one CTE statement.
+
+        Reads the top keys of the tasks' columns first. Returns the tasks in
+        the order of ``items``.
+        """
+        ids = [uuid4() for _ in items]
+        embeddings = embeddings or [None] * len(items)
+        positions = await self._top_positions([data.energy_column.value for data in items])
+        new_tasks = (
+            insert(Task)
+            .values(
+                [
+                    _task_values(
+                        data,
+                        provisional_title(data.raw_input),
+                        id=task_id,
+                        parse_status=ParseStatus.PENDING.value,
+                        embedding=embedding,
+                        position=position,
+                        # A column given on create stays; otherwise the parse picks it
+                        energy_source=EnergySource.USER.value if energy_override else None,
+                    )
+                    for task_id, data, embedding, position in zip(
+                        ids, items, embeddings, positions, strict=True
+                    )
+                ]
+            )
+            .returning(*READ_COLUMNS)
+            .cte("new_tasks")
+        )
+        new_jobs = (
+            insert(ParseJob)
+            .from_select(
+                ["id", "task_id", "energy_override", "attempts"],
+                select(
+                    func.gen_random_uuid(),
+                    new_tasks.c.id,
+                    literal(energy_override.value if energy_override else None, String),
+                    literal(0),
+                ),
+                include_defaults=False,
+            )
+            .cte("new_jobs")
+        )
+        result = await self.session.execute(select(new_tasks).add_cte(new_jobs))
+        by_id = {row.id: row for row in result}
+        return [by_id[task_id] for task_id in ids]
+
+    async def apply_parse(
+        self,
+        task_id: UUID,
+        title: str,
+        energy: EnergyColumn,
+        provisional_energy: EnergyColumn,
+        tags: dict[str, float | None] | None = None,
+        energy_source: EnergySource = EnergySource.LLM,
+    ) -> bool:
+        """Write a deferred parse result back onto its task.
+
+        Title and energy are only replaced while they still hold their
+        provisional values, so edits made while the parse was queued win. A
+        task the parse moves to another column goes to the top of it, which
+        takes a read of that column's top key first. Tags are always stored.
+        """
+        still_provisional = Task.energy_column == provisional_energy.value
+        values: dict[str, Any] = {
+            "title": case(
+                (
+                    Task.title == func.left(Task.raw_input, TITLE_MAX_LENGTH),
+                    title[:TITLE_MAX_LENGTH],
+                ),
+                else_=Task.title,
+            ),
+            "energy_column": case((still_provisional, energy.value), else_=Task.energy_column),
+            "energy_source": case(
+                (still_provisional, energy_source.value), else_=Task.energy_source
+            ),
+            "parse_status": ParseStatus.PARSED.value,
+        }
+        if energy is not provisional_energy:
+            [position] = await self._top_positions([energy.value])
+            values["position"] = case((still_provisional, position), else_=Task.position)
+            if energy is EnergyColumn.SHIPPED:
+                values["shipped_at"] = case((still_provisional, func.now()), else_=Task.shipped_at)
+        result = await self.session.execute(
+            update(Task).where(Task.id == task_id).values(values).returning(Task.id)
+        )
+        updated = result.scalar_one_or_none() is not None
+        if updated and tags:
+            await TagRepository(self.session).attach({task_id: tags})
+        await self.session.commit()
+        if updated:
+            self.activity.record(ActivityAction.PARSED, [task_id], actor=Actor.AGENT)
+        return updated
+
+    async def mark_parse_failed(self, task_id: UUID) -> None:
+        """Give up on parsing a task, keeping its provisional title."""
+        await self.session.execute(
+            update(Task)
+            .where(Task.id == task_id)
+            .values(parse_status=ParseStatus.FAILED.value)
+        )
+        await self.session.commit()
+
+    async def get_by_id(self, task_id: UUID) -> Row[Any] | None:
+        """Get a task by ID, projected to the columns of TaskRead."""
+        result = await self.session.execute(select(*READ_COLUMNS).where(Task.id == task_id))
+        return result.one_or_none()
+
+    async def get_many(self, task_ids: list[UUID]) -> list[Row[Any]]:
+        """Get tasks by ID in one query, in no particular order; missing IDs are skipped."""
+        result = await self.session.execute(select(*READ_COLUMNS).where(Task.id.in_(task_ids)))
+        return list(result.all())
+
+    async def get_for_key(self, idempotency_key: str) -> list[Row[Any]] | None:
+        """The tasks created by the request with ``idempotency_key``, in its order.
+
+        None if no request used the key. Tasks deleted since are skipped.
+        """
+        task_ids = await self.session.scalar(
+            select(IdempotencyKey.task_ids).where(IdempotencyKey.key == idempotency_key)
+        )
+        if task_ids is None:
+            return None
+        by_id = {task.id: task for task in await self.get_many(task_ids)}
+        return [by_id[task_id] for task_id in task_ids if task_id in by_id]
+
+    async def get_updated_at(self, task_id: UUID) -> datetime | None:
+        """A task's ``updated_at`` alone, for cheap freshness checks."""
+        result = await self.session.execute(select(Task.updated_at).where(Task.id == task_id))
         return result.scalar_one_or_none()
 
-    async def get_by_short_id(self, short_id: str) -> Task | None:
-        """Get a task by partial ID match (first N characters)."""
+    async def board_versions(self) -> dict[str, int]:
+        """Change counter of every energy column that has ever changed."""
+        result = await self.session.execute(
+            select(BoardVersion.energy_column, BoardVersion.version)
+        )
+        return {column: version for column, version in result}
+
+    async def snapshot_xmin(self) -> int:
+        """Oldest transaction still running; every older one is committed and visible."""
         result = await self.session.execute(
-            select(Task).where(Task.id.cast(str).startswith(short_id))
+            select(cast(cast(func.pg_snapshot_xmin(func.pg_current_snapshot()), Text), BigInteger))
         )
+        return result.scalar_one()
+
+    async def list_changes(
+        self, since: int, after: tuple[int, UUID] | None, limit: int
+    ) -> tuple[list[Row[Any]], list[UUID], tuple[int, UUID] | None]:
+        """Tasks changed and deleted by transactions from ``since`` on.
+
+        Changes are read in ``(change_xid, id)`` order, one keyset page at a
+        time: pass the returned last key as ``after`` to continue. Returns
+        changed tasks, deleted task IDs, and the last key if more follow.
+        Both reads are range scans on ``(change_xid, id)`` indexes, so the cost
+        follows the size of the delta rather than of the board.
+        """
+
+        def page(table: Any, *columns: Any) -> Select[Any]:
+            key = tuple_(table.change_xid, table.id)
+            bound = key > tuple_(*after) if after else table.change_xid >= since
+            return (
+                select(*columns, table.change_xid)
+                .where(bound)
+                .order_by(table.change_xid, table.id)
+                .limit(limit + 1)
+            )
+
+        tasks = (await self.session.execute(page(Task, *READ_COLUMNS))).all()
+        tombstones = (await self.session.execute(page(TaskTombstone, TaskTombstone.id))).all()
+        merged = sorted(
+            [(row.change_xid, row.id, row) for row in tasks]
+            + [(row.change_xid, row.id, None) for row in tombstones],
+            key=lambda change: change[:2],
+        )
+        has_more = len(merged) > limit
+        merged = merged[:limit]
+        changed = [row for _, _, row in merged if row is not None]
+        deleted = [task_id for _, task_id, row in merged if row is None]
+        last = merged[-1][:2] if has_more else None
+        return changed, deleted, last
+
+    async def get_embedding(self, task_id: UUID) -> list[float] | None:
+        """Get a task's embedding; the only read path that loads it."""
+        result = await self.session.execute(select(Task.embedding).where(Task.id == task_id))
         return result.scalar_one_or_none()
 
-    async def list_by_column(self, column: EnergyColumn) -> list[Task]:
-        """List all tasks in a specific energy column."""
+    async def list_unembedded(self, limit: int) -> list[tuple[UUID, str]]:
+        """IDs and raw inputs of tasks still waiting for an embedding."""
+        result = await self.session.execute(
+            select(Task.id, Task.raw_input)
+            .where(Task.embedding.is_(None))
+            .order_by(Task.id)
+            .limit(limit)
+        )
+        return [tuple(row) for row in result]
+
+    async def set_embeddings(self, embeddings: list[tuple[UUID, list[float]]]) -> None:
+        """Store computed embeddings in one executemany UPDATE.
+
+        Embeddings are derived data, so ``updated_at`` and ``change_xid`` are
+        left alone.
+        """
+        table = Task.__table__
+        await self.session.execute(
+            update(table)
+            .where(table.c.id == bindparam("task_id"))
+            .values(
+                embedding=bindparam("vector"),
+                updated_at=table.c.updated_at,
+                change_xid=table.c.change_xid,
+            ),
+            [{"task_id": task_id, "vector": vector} for task_id, vector in embeddings],
+        )
+        await self.session.commit()
+
+    async def search(
+        self,
+        embedding: list[float],
+        limit: int,
+        ef_search: int,
+        include_shipped: bool = False,
+    ) -> list[Row[Any]]:
+        """Nearest tasks by cosine similarity, via the HNSW index.
+
+        ``ef_search`` sizes the index's candidate list for this transaction:
+        higher values trade latency for recall.
+        """
+        await self.session.execute(
+            select(func.set_config("hnsw.ef_search", str(ef_search), True))
+        )
+        distance = Task.embedding.cosine_distance(embedding)
+        query = (
+            select(*READ_COLUMNS, (1 - distance).label("score"))
+            .where(Task.embedding.is_not(None))
+            .order_by(distance)
+            .limit(limit)
+        )
+        if not include_shipped:
+            query = query.where(Task.energy_column != EnergyColumn.SHIPPED.value)
+        result = await self.session.execute(query)
+        return list(result.all())
+
+    async def resolve_id(self, id_or_prefix: str) -> UUID | None:
+        """Resolve a full task ID or a unique prefix of one to the full ID.
+
+        A full ID is returned as is, without a lookup. Prefixes are matched as
+        a primary-key range scan, so the lookup is an index seek regardless of
+        table size. Raises ValueError for input that is not hex and
+        AmbiguousTaskIdError when several tasks match.
+        """
+        lo, hi = uuid_prefix_range(id_or_prefix)
+        if lo == hi:
+            return lo
         result = await self.session.execute(
-            select(Task)
-            .where(Task.energy_column == column.value)
-            .order_by(Task.position, Task.created_at.desc())
+            select(Task.id)
+            .where(Task.id.between(lo, hi))
+            .order_by(Task.id)
+            .limit(AMBIGUOUS_MATCHES_SHOWN)
         )
-        return list(result.scalars().all())
+        matches = list(result.scalars().all())
+        if len(matches) > 1:
+            raise AmbiguousTaskIdError(id_or_prefix, matches)
+        return matches[0] if matches else None
+
+    async def get_by_short_id(self, short_id: str) -> Row[Any] | None:
+        """Get a task by partial ID match (first N characters), like ``get_by_id``."""
+        task_id = await self.resolve_id(short_id)
+        return None if task_id is None else await self.get_by_id(task_id)
 
-    async def list_active(self) -> list[Task]:
-        """List all non-shipped tasks."""
+    async def list_by_column(
+        self,
+        column: EnergyColumn,
+        limit: int | None = None,
+        after: TaskCursor | None = None,
+        tag: str | None = None,
+    ) -> list[Row[Any]]:
+        """List tasks in a specific energy column in board order.
+
+        Pass the cursor of the last task of the previous page as ``after``
+        to fetch the next page, and a tag name as ``tag`` to list only the
+        tasks carrying it.
+        """
+        query = _tagged(select(*READ_COLUMNS).where(Task.energy_column == column.value), tag)
+        if after is None:
+            return await self._page(query, limit)
+        return await self._page_after(query, after, limit, include_later_columns=False)
+
+    async def list_active(
+        self, limit: int | None = None, after: TaskCursor | None = None, tag: str | None = None
+    ) -> list[Row[Any]]:
+        """List non-shipped tasks in board order, optionally one page at a time or by tag."""
+        query = _tagged(
+            select(*READ_COLUMNS).where(Task.energy_column != EnergyColumn.SHIPPED.value), tag
+        )
+        if after is None:
+            return await self._page(query, limit)
+        return await self._page_after(query, after, limit, include_later_columns=True)
+
+    async def _page(self, query: Select[Any], limit: int | None) -> list[Row[Any]]:
+        result = await self.session.execute(query.order_by(*board_order(Task)).limit(limit))
+        return list(result.all())
+
+    async def _page_after(
+        self,
+        query: Select[Any],
+        after: TaskCursor,
+        limit: int | None,
+        include_later_columns: bool,
+    ) -> list[Row[Any]]:
+        """Keyset page following ``after``.
+
+        Board order mixes ascending and descending keys, so "after the
+        cursor" is not a single row comparison. It is split into disjoint
+        ranges that each map to one contiguous index scan: the rest of the
+        cursor's position, later positions in its column, and (across
+        columns) later columns. Each range is limited before being merged.
+        """
+        ranges = [
+            query.where(
+                Task.energy_column == after.energy_column,
+                Task.position == after.position,
+                tuple_(Task.created_at, Task.id) < tuple_(after.created_at, after.id),
+            ),
+            query.where(
+                Task.energy_column == after.energy_column, Task.position > after.position
+            ),
+        ]
+        if include_later_columns:
+            ranges.append(query.where(Task.energy_column > after.energy_column))
+
+        page = union_all(
+            *(r.order_by(*board_order(Task)).limit(limit).subquery().select() for r in ranges)
+        ).subquery()
         result = await self.session.execute(
-            select(Task)
-            .where(Task.energy_column != EnergyColumn.SHIPPED.value)
-            .order_by(Task.energy_column, Task.position, Task.created_at.desc())
+            select(page).order_by(*board_order(page.c)).limit(limit)
         )
-        return list(result.scalars().all())
+        return list(result.all())
 
-    async def update(self, task_id: UUID, data: TaskUpdate) -> Task | None:
-        """Update a task."""
-        task = await self.get_by_id(task_id)
-        if task is None:
-            return None
+    async def list_shipped_history(
+        self, limit: int, after: ShippedCursor | None = None
+    ) -> list[Row[Any]]:
+        """Shipped tasks, most recently shipped first, archived ones included.
 
-        update_data = data.model_dump(exclude_unset=True)
-        for key, value in update_data.items():
-            if key == "energy_column" and value is not None:
-                value = value.value
-            setattr(task, key, value)
+        Pass the cursor of the last task of the previous page as ``after``
+        to fetch the next page. Each table is read by a keyset seek on its
+        ``(shipped_at, id)`` index, so later pages cost the same as the first.
+        """
 
+        def page(table: Any, columns: tuple[Any, ...], *conditions: Any) -> Select[Any]:
+            if after is not None:
+                key = tuple_(table.shipped_at, table.id)
+                conditions += (key < tuple_(after.shipped_at, after.id),)
+            return (
+                select(*columns)
+                .where(*conditions)
+                .order_by(table.shipped_at.desc(), table.id.desc())
+                .limit(limit)
+            )
+
+        hot = page(Task, READ_COLUMNS, Task.energy_column == EnergyColumn.SHIPPED.value)
+        history = union_all(
+            hot.subquery().select(), page(TaskArchive, ARCHIVE_READ_COLUMNS).subquery().select()
+        ).subquery()
+        result = await self.session.execute(
+            select(history)
+            .order_by(history.c.shipped_at.desc(), history.c.id.desc())
+            .limit(limit)
+        )
+        return list(result.all())
+
+    async def archive_shipped(
+        self, older_than: timedelta, limit: int, tombstone_retention: timedelta | None = None
+    ) -> int:
+        """Move up to ``limit`` tasks shipped over ``older_than`` ago to ``task_archive``.
+
+        One statement deletes the oldest ships, copies them (with their tag
+        names) into the archive and leaves tombstones so synced clients drop
+        them too. With ``tombstone_retention`` it also purges tombstones and
+        idempotency keys older than that, even when there is nothing left to
+        archive. Rows
+        another transaction holds are skipped, so a batch never waits on the
+        board. Returns how many tasks it archived.
+        """
+        batch = (
+            select(Task.id)
+            .where(
+                Task.energy_column == EnergyColumn.SHIPPED.value,
+                Task.shipped_at < func.now() - older_than,
+            )
+            .order_by(Task.shipped_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .cte("batch")
+        )
+        names = [c.name for c in TaskArchive.__table__.c if c.name not in ("tags", "archived_at")]
+        tags = func.array(
+            select(Tag.name)
+            .join(TaskTag, TaskTag.tag_id == Tag.id)
+            .where(TaskTag.task_id == Task.id)
+            .order_by(Tag.name)
+            .scalar_subquery()
+        )
+        gone = (
+            delete(Task)
+            .where(Task.id.in_(select(batch.c.id)))
+            .returning(*(Task.__table__.c[name] for name in names), tags.label("tags"))
+            .cte("gone")
+        )
+        archived = (
+            insert(TaskArchive)
+            .from_select([*names, "tags"], select(*(gone.c[name] for name in [*names, "tags"])))
+            .returning(TaskArchive.id)
+            .cte("archived")
+        )
+        tombstone = insert(TaskTombstone).from_select(["id"], select(gone.c.id)).cte("tombstone")
+        statement = select(func.count()).select_from(archived).add_cte(tombstone)
+        if tombstone_retention is not None:
+            statement = statement.add_cte(
+                _purge_tombstones(tombstone_retention), _purge_keys(tombstone_retention)
+            )
+        archived_count = await self.session.scalar(statement)
         await self.session.commit()
-        await self.session.refresh(task)
+        return archived_count or 0
+
+    async def list_energy_labels(self) -> list[tuple[str, str, bool]]:
+        """Labelled inputs for training the local energy classifier.
+
+        Returns ``(raw_input, energy, corrected)`` for every task whose energy
+        is known: the user's correction where there is one (archived tasks
+        included), otherwise the column of tasks not yet shipped, if the
+        model or the user picked it. Columns the local classifier picked
+        would only teach it its own guesses, and parse fallbacks an outage.
+        """
+        label = func.coalesce(Task.corrected_energy, Task.energy_column)
+        labelled = (EnergySource.LLM.value, EnergySource.USER.value)
+        result = await self.session.execute(
+            union_all(
+                select(Task.raw_input, label, Task.corrected_energy.is_not(None)).where(
+                    label != EnergyColumn.SHIPPED.value,
+                    Task.corrected_energy.is_not(None)
+                    | (
+                        (Task.parse_status == ParseStatus.PARSED.value)
+                        & Task.energy_source.in_(labelled)
+                    ),
+                ),
+                select(TaskArchive.raw_input, TaskArchive.corrected_energy, literal(True)).where(
+                    TaskArchive.corrected_energy.is_not(None),
+                    TaskArchive.corrected_energy != EnergyColumn.SHIPPED.value,
+                ),
+            )
+        )
+        return [tuple(row) for row in result]
+
+    async def update(
+        self,
+        task_id: UUID,
+        data: TaskUpdate,
+        expected_updated_at: list[datetime] | None = None,
+    ) -> Row[Any] | None:
+        """Update a task with a single UPDATE ... RETURNING.
+
+        Changing its column reads the new column's top key first. With
+        ``expected_updated_at`` the update only applies while the task's
+        ``updated_at`` is one of those values, and raises TaskModifiedError
+        otherwise (optimistic concurrency).
+        """
+        values = data.model_dump(exclude_unset=True)
+        if not values:
+            task = await self.get_by_id(task_id)
+            if task is not None and expected_updated_at is not None:
+                if task.updated_at not in expected_updated_at:
+                    raise TaskModifiedError(task_id)
+            return task
+
+        energy = values.pop("energy_column", None)
+        if energy is not None:
+            # A task changing columns goes to the top of its new one
+            [position] = await self._top_positions([energy.value])
+            values |= _move_values(energy)
+            values["position"] = case(
+                (Task.energy_column != energy.value, position), else_=Task.position
+            )
+
+        task = await self._conditional_update(task_id, values, expected_updated_at)
+        if task is not None:
+            fields = sorted(data.model_dump(exclude_unset=True))
+            self.activity.record(ActivityAction.UPDATED, [task.id], details={"fields": fields})
         return task
 
-    async def ship(self, task_id: UUID) -> Task | None:
-        """Mark a task as shipped."""
-        task = await self.get_by_id(task_id)
-        if task is None:
-            return None
+    async def move(self, task_id: UUID, data: TaskMove) -> Row[Any] | None:
+        """Move a task between two neighbours, rewriting the task's row alone.
 
-        task.energy_column = EnergyColumn.SHIPPED.value
-        task.shipped_at = datetime.now(timezone.utc)
+        Its new order key is picked between the neighbours' keys, so no other
+        card is renumbered. Raises MoveConflictError if the neighbours no
+        longer sit where the client saw them.
+        """
+        if task_id in (data.before, data.after):
+            raise ValueError("A task cannot be its own neighbour")
+        column = data.energy_column.value if data.energy_column else None
+        if column is None and data.before is None and data.after is None:
+            column = await self.session.scalar(
+                select(Task.energy_column).where(Task.id == task_id)
+            )
+            if column is None:
+                return None
+        column, [position] = await self._placement([task_id], column, data.before, data.after)
+        values = _move_values(EnergyColumn(column)) | {"position": position}
+        task = await self._update_returning(task_id, values)
+        if task is not None:
+            self.activity.record(
+                ActivityAction.MOVED, [task.id], details={"energy_column": column}
+            )
+        return task
 
-        await self.session.commit()
-        await self.session.refresh(task)
+    async def ship(
+        self, task_id: UUID, expected_updated_at: list[datetime] | None = None
+    ) -> Row[Any] | None:
+        """Mark a task as shipped, optionally only if unchanged (see ``update``)."""
+        task = await self._conditional_update(task_id, _ship_values(), expected_updated_at)
+        if task is not None:
+            self.activity.record(ActivityAction.SHIPPED, [task.id])
         return task
 
-    async def delete(self, task_id: UUID) -> bool:
-        """Delete a task."""
-        task = await self.get_by_id(task_id)
-        if task is None:
-            return False
+    async def delete(self, task_id: UUID, tombstone_retention: timedelta | None = None) -> bool:
+        """Delete a task, leaving a tombstone for delta sync, in one statement.
+
+        With ``tombstone_retention``, tombstones older than that are purged
+        by the same statement.
+        """
+        deleted = await self._delete_returning(Task.id == task_id, tombstone_retention)
+        await self.session.commit()
+        self.activity.record(ActivityAction.DELETED, deleted)
+        return bool(deleted)
+
+    async def bulk(
+        self, operations: list[TaskBulkOperation], tombstone_retention: timedelta | None = None
+    ) -> list[tuple[list[Row[Any]], list[UUID]]]:
+        """Apply bulk operations in order, in one transaction.
+
+        Each operation is a single set-based statement over ``id = ANY(:ids)``
+        (a move first reads its neighbours' order keys).
+        Returns, per operation, the tasks it read, shipped or moved (in the
+        order of its ``ids``) and the IDs it deleted.
+        """
+        outcomes: list[tuple[list[Row[Any]], list[UUID]]] = []
+        done: list[tuple[ActivityAction, list[UUID], dict[str, str] | None]] = []
+        for operation in operations:
+            ids = bindparam("ids", operation.ids, type_=ARRAY(PG_UUID(as_uuid=True)))
+            matches = Task.id == any_(ids)
+            action = ActivityAction.SHIPPED
+            details: dict[str, str] | None = None
+            if operation.action is BulkAction.DELETE:
+                deleted = await self._delete_returning(matches, tombstone_retention)
+                outcomes.append(([], deleted))
+                done.append((ActivityAction.DELETED, deleted, None))
+                continue
 
-        await self.session.delete(task)
+            if operation.action is BulkAction.GET:
+                result = await self.session.execute(select(*READ_COLUMNS).where(matches))
+            else:
+                values = _ship_values()
+                if operation.action is BulkAction.MOVE:
+                    column, positions = await self._placement(
+                        operation.ids,
+                        operation.energy_column.value if operation.energy_column else None,
+                        operation.before,
+                        operation.after,
+                    )
+                    # Side by side, in the order the IDs were given
+                    values = _move_values(EnergyColumn(column)) | {
+                        "position": _nth_of(positions, ids)
+                    }
+                    action, details = ActivityAction.MOVED, {"energy_column": column}
+                result = await self.session.execute(
+                    update(Task)
+                    .where(matches)
+                    .values(values)
+                    .returning(*READ_COLUMNS)
+                    .execution_options(synchronize_session=False)
+                )
+            order = {task_id: i for i, task_id in reversed(list(enumerate(operation.ids)))}
+            tasks = sorted(result.all(), key=lambda row: order[row.id])
+            outcomes.append((tasks, []))
+            if operation.action is not BulkAction.GET:
+                done.append((action, [task.id for task in tasks], details))
         await self.session.commit()
-        return True
+        for action, task_ids, details in done:
+            self.activity.record(action, task_ids, details=details)
+        return outcomes
+
+    async def rebalance(self, energy_column: str) -> int:
+        """Give a column fresh, short order keys, keeping its order.
+
+        Keys lengthen as cards keep landing in the same gap; this rewrites the
+        whole column in one statement. Returns how many tasks it rewrote.
+        """
+        rebalanced = await self._rebalance(energy_column)
+        await self.session.commit()
+        return rebalanced
+
+    async def columns_to_rebalance(self, max_key_length: int) -> list[str]:
+        """Active columns holding an order key longer than ``max_key_length``."""
+        result = await self.session.execute(
+            select(Task.energy_column)
+            .where(Task.energy_column != EnergyColumn.SHIPPED.value)
+            .group_by(Task.energy_column)
+            .having(func.max(func.length(Task.position)) > max_key_length)
+            .order_by(Task.energy_column)
+        )
+        return list(result.scalars())
+
+    async def _rebalance(self, energy_column: str) -> int:
+        # Locking the column keeps a concurrent move from being overwritten
+        result = await self.session.execute(
+            select(Task.id)
+            .where(Task.energy_column == energy_column)
+            .order_by(*board_order(Task))
+            .with_for_update()
+        )
+        task_ids = list(result.scalars())
+        if not task_ids:
+            return 0
+        ids = bindparam("ids", task_ids, type_=ARRAY(PG_UUID(as_uuid=True)))
+        await self.session.execute(
+            update(Task)
+            .where(Task.id == any_(ids))
+            .values(position=_nth_of(keys_between(None, None, len(task_ids)), ids))
+            .execution_options(synchronize_session=False)
+        )
+        return len(task_ids)
+
+    async def _top_positions(self, columns: list[str]) -> list[str]:
+        """Order keys for new tasks at the top of ``columns``, stacked in the order given.
+
+        One query for all the columns. It is a round trip of its own: keys
+        are made by ``keys_between``, which has no SQL counterpart.
+        """
+        distinct = list(dict.fromkeys(columns))
+        tops = [
+            select(func.min(Task.position)).where(Task.energy_column == column).scalar_subquery()
+            for column in distinct
+        ]
+        result = await self.session.execute(select(*tops))
+        keys = {
+            column: iter(keys_between(None, top, columns.count(column)))
+            for column, top in zip(distinct, result.one(), strict=True)
+        }
+        return [next(keys[column]) for column in columns]
+
+    async def _placement(
+        self,
+        task_ids: list[UUID],
+        energy_column: str | None,
+        before: UUID | None,
+        after: UUID | None,
+    ) -> tuple[str, list[str]]:
+        """Column and order keys putting ``task_ids`` between ``before`` and ``after``.
+
+        Without neighbours the tasks go to the top of ``energy_column``.
+        """
+        neighbour_ids = [i for i in (before, after) if i is not None]
+        neighbours = {}
+        if neighbour_ids:
+            result = await self.session.execute(
+                select(Task.id, Task.energy_column, Task.position).where(
+                    Task.id.in_(neighbour_ids)
+                )
+            )
+            neighbours = {row.id: row for row in result}
+        for neighbour_id in neighbour_ids:
+            if neighbour_id not in neighbours:
+                raise MoveConflictError(f"Neighbour {neighbour_id} no longer exists")
+        if energy_column is None:
+            energy_column = neighbours[neighbour_ids[0]].energy_column
+        if any(n.energy_column != energy_column for n in neighbours.values()):
+            raise MoveConflictError(f"Neighbours are no longer in {energy_column}")
+
+        if not neighbour_ids:
+            low, high = None, await self.session.scalar(
+                select(func.min(Task.position)).where(
+                    Task.energy_column == energy_column, Task.id.not_in(task_ids)
+                )
+            )
+        else:
+            low = neighbours[before].position if before else None
+            high = neighbours[after].position if after else None
+        if low is not None and high is not None and low >= high:
+            if low > high:
+                raise MoveConflictError("Neighbours are no longer in that order")
+            # Tied neighbours (say, tasks created at the same moment) leave no
+            # gap between them: spread the column's keys out first.
+            await self._rebalance(energy_column)
+            return await self._placement(task_ids, energy_column, before, after)
+        return energy_column, keys_between(low, high, len(task_ids))
+
+    async def _claim_key(self, idempotency_key: str | None, tasks: list[Row[Any]]) -> None:
+        """Store ``idempotency_key`` with the tasks just created, or undo them if it is taken."""
+        if idempotency_key is None:
+            return
+        claimed = await self.session.scalar(
+            insert(IdempotencyKey)
+            .values(key=idempotency_key, task_ids=[task.id for task in tasks])
+            .on_conflict_do_nothing(index_elements=[IdempotencyKey.key])
+            .returning(IdempotencyKey.key)
+        )
+        if claimed is None:
+            await self.session.rollback()
+            raise DuplicateRequestError(idempotency_key)
+
+    def _record_created(self, tasks: list[Row[Any]]) -> None:
+        for task in tasks:
+            self.activity.record(
+                ActivityAction.CREATED,
+                [task.id],
+                details={"energy_column": task.energy_column, "created_via": task.created_via},
+            )
+
+    async def _delete_returning(
+        self, condition: ColumnElement[bool], tombstone_retention: timedelta | None
+    ) -> list[UUID]:
+        gone = delete(Task).where(condition).returning(Task.id).cte("gone")
+        tombstone = (
+            insert(TaskTombstone)
+            .from_select(["id"], select(gone.c.id))
+            .returning(TaskTombstone.id)
+            .cte("tombstone")
+        )
+        statement = select(tombstone.c.id)
+        if tombstone_retention is not None:
+            statement = statement.add_cte(_purge_tombstones(tombstone_retention))
+        result = await self.session.execute(statement)
+        return list(result.scalars())
+
+    async def _conditional_update(
+        self, task_id: UUID, values: dict[str, Any], expected_updated_at: list[datetime] | None
+    ) -> Row[Any] | None:
+        if expected_updated_at is None:
+            return await self._update_returning(task_id, values)
+        task = await self._update_returning(
+            task_id, values, Task.updated_at.in_(expected_updated_at)
+        )
+        if task is None and await self.get_updated_at(task_id) is not None:
+            raise TaskModifiedError(task_id)
+        return task
+
+    async def _update_returning(
+        self, task_id: UUID, values: dict[str, Any], *conditions: Any
+    ) -> Row[Any] | None:
+        result = await self.session.execute(
+            update(Task)
+            .where(Task.id == task_id, *conditions)
+            .values(values)
+            .returning(*READ_COLUMNS)
+            .execution_options(synchronize_session=False)
+        )
+        task = result.one_or_none()
+        await self.session.commit()
+        return task
+
+
+def _purge_tombstones(retention: timedelta) -> CTE:
+    """A CTE deleting tombstones older than ``retention``, to add to a write."""
+    return (
+        delete(TaskTombstone)
+        .where(TaskTombstone.deleted_at < func.now() - retention)
+        .cte("purged")
+    )
+
+
+def _purge_keys(retention: timedelta) -> CTE:
+    """A CTE deleting idempotency keys older than ``retention``, to add to a write."""
+    return (
+        delete(IdempotencyKey)
+        .where(IdempotencyKey.created_at < func.now() - retention)
+        .cte("purged_keys")
+    )
+
+
+def _tagged(query: Select[Any], tag: str | None) -> Select[Any]:
+    """``query`` restricted to tasks tagged ``tag``.
+
+    The tag's tasks come from ix_task_tag_tag, so the cost follows how many
+    tasks carry the tag rather than the size of the board.
+    """
+    if tag is None:
+        return query
+    tagged = select(TaskTag.task_id).join(Tag, Tag.id == TaskTag.tag_id).where(Tag.name == tag)
+    return query.where(Task.id.in_(tagged))
+
+
+def _nth_of(positions: list[str], ids: BindParameter[Any]) -> ColumnElement[str]:
+    """``positions[i]`` for the task at index ``i`` of the ``ids`` array."""
+    # Parenthesized, as Postgres only subscripts an array literal in parentheses
+    keys = Grouping(bindparam("positions", positions, type_=ARRAY(String)))
+    return type_coerce(keys, ARRAY(String))[func.array_position(ids, Task.id)]
+
+
+def _ship_values() -> dict[str, Any]:
+    """Values shipping a task; shipping it again keeps the first ship's day."""
+    already_shipped = Task.energy_column == EnergyColumn.SHIPPED.value
+    return {
+        "energy_column": EnergyColumn.SHIPPED.value,
+        "shipped_at": case((already_shipped, Task.shipped_at), else_=func.now()),
+        "shipped_from": case((already_shipped, Task.shipped_from), else_=Task.energy_column),
+    }
+
+
+def _move_values(energy: EnergyColumn) -> dict[str, Any]:
+    """Values moving a task to ``energy`` by hand."""
+    if energy is EnergyColumn.SHIPPED:
+        return _ship_values()
+    return {
+        "energy_column": energy.value,
+        # Remember manual moves as training labels for the classifier
+        "corrected_energy": case(
+            (Task.energy_column != energy.value, energy.value), else_=Task.corrected_energy
+        ),
+    }
+
+
+def _task_values(data: TaskCreate, title: str, **extra: Any) -> dict[str, Any]:
+    """Column values for inserting a task from its create schema."""
+    return {
+        "title": title,
+        "raw_input": data.raw_input,
+        "energy_column": data.energy_column.value,
+        "created_via": data.created_via.value,
+        # Every row names the same columns, as executemany requires
+        "shipped_at": datetime.now(UTC) if data.energy_column is EnergyColumn.SHIPPED else None,
+        **extra,
+    }
@@ -1,5 +1,15 @@
 """Business logic services."""
 
+from backend.kz.services.embeddings import Embedder, HashingEmbedder, get_embedder
+from backend.kz.services.parse_cache import ParseCache, get_parse_cache
 from backend.kz.services.parser import ParsedTask, TaskParser
 
-__all__ = ["ParsedTask", "TaskParser"]
+__all__ = [
+    "Embedder",
+    "HashingEmbedder",
+    "ParseCache",
+    "ParsedTask",
+    "TaskParser",
+    "get_embedder",
+    "get_parse_cache",
+]
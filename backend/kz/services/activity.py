@@ -0,0 +1,111 @@
+"""Background writer draining the activity buffer into the activity log.
+
+Task writes record activity into an in-process ``ActivityBuffer`` and return
+without touching ``activity_log``. The writer flushes the buffer with one
+multi-row INSERT per batch: every ``flush_interval`` seconds, or as soon as
+a batch is waiting. On shutdown it drains whatever is left.
+"""
+
+import asyncio
+import logging
+from datetime import date
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.kz.repositories.activity import (
+    ActivityBuffer,
+    ActivityRepository,
+    get_activity_buffer,
+    month_of,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityWriter:
+    """Flushes an ``ActivityBuffer`` in batches, creating monthly partitions as needed.
+
+    A failed batch goes back to the buffer and is retried on the next flush;
+    entries are only lost when the buffer overflows meanwhile.
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        buffer: ActivityBuffer | None = None,
+        flush_interval: float = 1.0,
+    ) -> None:
+        self.session_maker = session_maker
+        self.buffer = buffer if buffer is not None else get_activity_buffer()
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.failures = 0
+        self._months: set[date] = set()  # Months whose partitions are known to exist
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        """Start flushing in the background."""
+        if self._task is None:
+            loop, wakeup = asyncio.get_running_loop(), asyncio.Event()
+
+            def wake() -> None:
+                # Recording must never fail, even after this loop is gone
+                if not loop.is_closed():
+                    wakeup.set()
+
+            self.buffer.on_batch = wake
+            self._task = asyncio.create_task(self._run(wakeup))
+
+    async def aclose(self) -> None:
+        """Stop flushing in the background, then write out what is left."""
+        if self._task is not None:
+            self.buffer.on_batch = None
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def flush(self) -> int:
+        """Write every buffered entry, a batch at a time; returns how many."""
+        written = 0
+        while entries := self.buffer.take(self.buffer.batch_size):
+            try:
+                async with self.session_maker() as session:
+                    repo = ActivityRepository(session)
+                    months = {month_of(entry["created_at"]) for entry in entries}
+                    if not months <= self._months:
+                        await repo.ensure_partitions(months - self._months)
+                        self._months |= months
+                    await repo.insert_many(entries)
+            except asyncio.CancelledError:
+                self.buffer.put_back(entries)
+                raise
+            except Exception as e:
+                # The partitions may be gone (dropped, or a rebuilt schema)
+                self._months.clear()
+                self.failures += 1
+                self.buffer.put_back(entries)
+                logger.error(f"Activity log write failed, will retry: {e}")
+                break
+            written += len(entries)
+        self.written += written
+        return written
+
+    def snapshot(self) -> dict[str, Any]:
+        """Writer state for health reporting."""
+        return {
+            "buffered": len(self.buffer),
+            "written": self.written,
+            "dropped": self.buffer.dropped,
+            "failures": self.failures,
+        }
+
+    async def _run(self, wakeup: asyncio.Event) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(wakeup.wait(), timeout=self.flush_interval)
+            except TimeoutError:
+                pass
+            wakeup.clear()
+            await self.flush()
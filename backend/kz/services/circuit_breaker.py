@@ -0,0 +1,89 @@
+"""Circuit breaker for calls to the AI provider."""
+
+import time
+from collections.abc import Callable
+from enum import StrEnum
+from typing import Any
+
+
+class BreakerState(StrEnum):
+    """Circuit breaker states."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider that is known to be failing."""
+
+
+class CircuitBreaker:
+    """Fail fast after repeated errors instead of waiting out every timeout.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    rejects calls for ``reset_seconds``. It then lets a single trial call
+    through (half-open): success closes it again, failure re-opens it.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self.state = BreakerState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: float | None = None
+        self.rejected = 0
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        """Whether a call may go through right now."""
+        if self.state is BreakerState.OPEN:
+            assert self.opened_at is not None
+            if self.clock() - self.opened_at < self.reset_seconds:
+                self.rejected += 1
+                return False
+            self.state = BreakerState.HALF_OPEN
+        if self.state is BreakerState.HALF_OPEN:
+            if self._trial_in_flight:
+                self.rejected += 1
+                return False
+            self._trial_in_flight = True
+        return True
+
+    def release(self) -> None:
+        """Give back an allowed call that never reached the provider."""
+        self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        self.state = BreakerState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self._trial_in_flight = False
+        if (
+            self.state is BreakerState.HALF_OPEN
+            or self.consecutive_failures >= self.failure_threshold
+        ):
+            self.state = BreakerState.OPEN
+            self.opened_at = self.clock()
+
+    def snapshot(self) -> dict[str, Any]:
+        """Breaker state for health reporting."""
+        retry_in = None
+        if self.state is BreakerState.OPEN and self.opened_at is not None:
+            retry_in = max(0.0, round(self.reset_seconds - (self.clock() - self.opened_at), 1))
+        return {
+            "state": self.state.value,
+            "consecutive_failures": self.consecutive_failures,
+            "rejected": self.rejected,
+            "retry_in_seconds": retry_in,
+        }
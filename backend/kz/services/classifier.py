@@ -0,0 +1,161 @@
+"""Local first-tier energy classifier.
+
+A multinomial naive Bayes model over word unigrams and bigrams, trained
+offline (``kz-admin train-classifier``) on our own task history and served
+in-process. Scoring is a handful of dict lookups, so confident predictions
+skip the model call entirely.
+"""
+
+import json
+import math
+import re
+from collections import Counter, defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from backend.kz.config import get_settings
+from backend.kz.models import EnergyColumn, EnergySource
+from backend.kz.services.parser import ParsedTask
+
+MODEL_VERSION = 1
+
+# Longer inputs usually need real rewriting into a title, so leave them to the LLM.
+LOCAL_MAX_WORDS = 12
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+FILLER_PREFIX = re.compile(
+    r"^(?:(?:i|we)\s+(?:need|have|want)\s+to|(?:i\s+)?(?:should|must|gotta|gonna)|"
+    r"need\s+to|have\s+to|remember\s+to|todo:?|to\s+do:?)\s+",
+    re.IGNORECASE,
+)
+
+LABELS = [EnergyColumn.HYPERFOCUS, EnergyColumn.QUICK_WIN, EnergyColumn.LOW_ENERGY]
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word unigrams plus adjacent-word bigrams."""
+    words = TOKEN_PATTERN.findall(text.lower())
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def clean_title(raw_input: str) -> str:
+    """Turn a short raw input into a title without a model call."""
+    title = " ".join(raw_input.split())
+    title = FILLER_PREFIX.sub("", title).rstrip(".!;,")
+    return title[:1].upper() + title[1:]
+
+
+@dataclass
+class EnergyClassifier:
+    """Naive Bayes energy classifier with per-label log probabilities."""
+
+    labels: list[EnergyColumn]
+    log_priors: list[float]
+    log_likelihoods: dict[str, list[float]]
+    examples: int = 0
+
+    @classmethod
+    def train(
+        cls, examples: Iterable[tuple[str, EnergyColumn, float]], alpha: float = 1.0
+    ) -> "EnergyClassifier":
+        """Fit from ``(raw_input, energy, weight)`` examples with Laplace smoothing."""
+        label_weight: Counter[EnergyColumn] = Counter()
+        token_counts: dict[EnergyColumn, Counter[str]] = defaultdict(Counter)
+        n = 0
+        for raw_input, energy, weight in examples:
+            label_weight[energy] += weight
+            for token in tokenize(raw_input):
+                token_counts[energy][token] += weight
+            n += 1
+
+        vocab = set().union(*token_counts.values()) if token_counts else set()
+        total_weight = sum(label_weight.values()) or 1.0
+        log_priors = [
+            math.log((label_weight[label] + alpha) / (total_weight + alpha * len(LABELS)))
+            for label in LABELS
+        ]
+        denominators = [
+            sum(token_counts[label].values()) + alpha * len(vocab) for label in LABELS
+        ]
+        log_likelihoods = {
+            token: [
+                math.log((token_counts[label][token] + alpha) / denom)
+                for label, denom in zip(LABELS, denominators, strict=True)
+            ]
+            for token in vocab
+        }
+        return cls(list(LABELS), log_priors, log_likelihoods, examples=n)
+
+    def predict(self, text: str) -> tuple[EnergyColumn, float]:
+        """Most likely energy column and its posterior probability.
+
+        Inputs with no known tokens get zero confidence, since the prior
+        alone says nothing about them.
+        """
+        scores = list(self.log_priors)
+        known = 0
+        for token in tokenize(text):
+            likelihoods = self.log_likelihoods.get(token)
+            if likelihoods is None:
+                continue
+            known += 1
+            for i, value in enumerate(likelihoods):
+                scores[i] += value
+        best = max(range(len(scores)), key=scores.__getitem__)
+        if known == 0:
+            return self.labels[best], 0.0
+        norm = sum(math.exp(score - scores[best]) for score in scores)
+        return self.labels[best], 1.0 / norm
+
+    def parse(self, raw_input: str) -> ParsedTask | None:
+        """Parse locally, or return None for inputs the local tier should not handle."""
+        if len(raw_input.split()) > LOCAL_MAX_WORDS:
+            return None
+        energy, confidence = self.predict(raw_input)
+        return ParsedTask(
+            title=clean_title(raw_input),
+            energy=energy,
+            tags=[],
+            confidence=confidence,
+            source=EnergySource.LOCAL,
+        )
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "version": MODEL_VERSION,
+            "examples": self.examples,
+            "labels": [label.value for label in self.labels],
+            "log_priors": self.log_priors,
+            "log_likelihoods": self.log_likelihoods,
+        }
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> "EnergyClassifier":
+        if data.get("version") != MODEL_VERSION:
+            raise ValueError(f"Unsupported classifier model version: {data.get('version')}")
+        return cls(
+            labels=[EnergyColumn(label) for label in data["labels"]],
+            log_priors=data["log_priors"],
+            log_likelihoods=data["log_likelihoods"],
+            examples=data["examples"],
+        )
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_json()))
+
+    @classmethod
+    def load(cls, path: Path) -> "EnergyClassifier":
+        return cls.from_json(json.loads(path.read_text()))
+
+
+@lru_cache
+def get_energy_classifier() -> EnergyClassifier | None:
+    """Load the trained classifier, or None when none has been trained yet."""
+    path = Path(get_settings().energy_classifier_path)
+    if not path.exists():
+        return None
+    return EnergyClassifier.load(path)
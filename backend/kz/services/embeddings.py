@@ -0,0 +1,107 @@
+"""Task embeddings for semantic search, behind a pluggable backend."""
+
+import hashlib
+import logging
+import math
+import re
+from collections import Counter
+from collections.abc import Callable
+from functools import lru_cache
+from typing import Protocol
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.kz.config import get_settings
+from backend.kz.repositories.task import TaskRepository
+
+logger = logging.getLogger(__name__)
+
+# Matches the task.embedding column.
+EMBEDDING_DIMENSIONS = 1536
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+class Embedder(Protocol):
+    """Turns texts into fixed-size vectors.
+
+    ``local`` embedders run in-process without network and are cheap enough
+    to call inline on task creation; others are left to the worker.
+    """
+
+    dimensions: int
+    local: bool
+
+    async def embed(self, texts: list[str]) -> list[list[float]]: ...
+
+
+class HashingEmbedder:
+    """Offline embedder: hashed, sublinear-tf bag of words and character n-grams.
+
+    Each feature is hashed to one of ``dimensions`` buckets with a hash-derived
+    sign, and the vector is L2-normalized so cosine distance compares texts.
+    Words carry meaning; character trigrams add tolerance for typos and
+    inflections ("deploy" vs "deploying").
+    """
+
+    local = True
+
+    def __init__(self, dimensions: int = EMBEDDING_DIMENSIONS) -> None:
+        self.dimensions = dimensions
+
+    async def embed(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_one(text) for text in texts]
+
+    def embed_one(self, text: str) -> list[float]:
+        vector = [0.0] * self.dimensions
+        for feature, count in _features(text).items():
+            digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:7], "little") % self.dimensions
+            sign = 1.0 if digest[7] & 1 else -1.0
+            vector[bucket] += sign * (1.0 + math.log(count))
+        norm = math.sqrt(sum(v * v for v in vector))
+        return [v / norm for v in vector] if norm else vector
+
+
+def _features(text: str) -> Counter[str]:
+    words = TOKEN_PATTERN.findall(text.lower())
+    features: Counter[str] = Counter(f"w:{word}" for word in words)
+    for word in words:
+        padded = f"#{word}#"
+        features.update(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+    return features
+
+
+# Backends selectable with EMBEDDING_BACKEND; register remote ones here.
+EMBEDDERS: dict[str, Callable[[], Embedder]] = {"hashing": HashingEmbedder}
+
+
+@lru_cache
+def get_embedder() -> Embedder:
+    """Get the embedder selected by ``EMBEDDING_BACKEND``."""
+    backend = get_settings().embedding_backend
+    try:
+        return EMBEDDERS[backend]()
+    except KeyError:
+        raise ValueError(f"Unknown embedding backend: {backend!r}") from None
+
+
+async def embed_missing(
+    session_maker: async_sessionmaker[AsyncSession], embedder: Embedder, batch_size: int = 256
+) -> int:
+    """Embed one batch of tasks that have no embedding yet. Returns the batch size.
+
+    Progress lives in the table itself, so a backfill can stop and resume
+    anywhere, and runs alongside the worker without coordination.
+    """
+    async with session_maker() as session:
+        repo = TaskRepository(session)
+        pending = await repo.list_unembedded(limit=batch_size)
+        if not pending:
+            return 0
+        vectors = await embedder.embed([raw_input for _, raw_input in pending])
+        await repo.set_embeddings(
+            [(task_id, vector) for (task_id, _), vector in zip(pending, vectors, strict=True)]
+        )
+    logger.info(f"Embedded {len(pending)} tasks")
+    return len(pending)
@@ -0,0 +1,279 @@
+"""Live task change feed, fanned out from Postgres LISTEN/NOTIFY.
+
+Triggers on ``task`` NOTIFY every committed change. Each API process holds a
+single LISTEN connection, turns notifications into events, and pushes them
+to any number of in-process subscribers (the SSE streams), so an idle
+subscriber costs a queue and a coroutine but no database work.
+"""
+
+import asyncio
+import json
+import logging
+from collections import deque
+from dataclasses import dataclass
+from enum import StrEnum
+from typing import Any
+from uuid import UUID, uuid4
+
+import asyncpg
+from sqlalchemy import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.kz.models import TaskRead
+from backend.kz.models.task import TASK_EVENTS_CHANNEL
+from backend.kz.repositories.task import TaskRepository
+
+logger = logging.getLogger(__name__)
+
+# Notifications are collected for at most this many at a time, so a burst
+# (e.g. a brain dump) costs one task query rather than one per task.
+DELIVERY_BATCH_SIZE = 100
+RECONNECT_DELAY_SECONDS = 1.0
+MAX_RECONNECT_DELAY_SECONDS = 30.0
+# What a dropped or refused LISTEN connection raises
+CONNECTION_ERRORS = (OSError, asyncpg.PostgresError, asyncpg.InterfaceError)
+
+
+class EventType(StrEnum):
+    """Kinds of change feed events."""
+
+    CREATED = "created"
+    UPDATED = "updated"
+    SHIPPED = "shipped"
+    DELETED = "deleted"
+    # Events may have been missed: refetch the board, then carry on.
+    RESET = "reset"
+
+
+@dataclass(frozen=True)
+class TaskEvent:
+    """One change feed event, serialized once and shared by all subscribers."""
+
+    id: str
+    seq: int
+    type: EventType
+    data: str
+
+    def encode(self) -> str:
+        """Server-Sent Events wire format."""
+        return f"id: {self.id}\nevent: {self.type}\ndata: {self.data}\n\n"
+
+
+class Subscription:
+    """A subscriber's view of the feed: replayed events, then live ones.
+
+    Live events wait in a bounded queue. A subscriber that lets it fill up is
+    evicted: it gets what is already queued, then its stream ends and the
+    client reconnects with ``Last-Event-ID`` to catch up from the buffer.
+    """
+
+    def __init__(self, backlog: list[TaskEvent], queue_size: int) -> None:
+        self.backlog = deque(backlog)
+        self.queue: asyncio.Queue[TaskEvent] = asyncio.Queue(queue_size)
+        self.evicted = False
+
+    @property
+    def closed(self) -> bool:
+        return self.evicted and not self.backlog and self.queue.empty()
+
+    async def get(self, timeout: float) -> TaskEvent | None:
+        """Next event, or None if none arrived within ``timeout`` or the stream closed."""
+        if self.backlog:
+            return self.backlog.popleft()
+        if self.evicted:
+            return None if self.queue.empty() else self.queue.get_nowait()
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except TimeoutError:
+            return None
+
+
+class TaskEventBroker:
+    """Shares one LISTEN connection between all subscribers of this process.
+
+    Event IDs are ``<epoch>-<seq>``: ``seq`` counts events in the order this
+    process received them, and the epoch changes whenever the broker may have
+    missed notifications (startup, lost connection). A client resuming within
+    the current epoch and the last ``buffer_size`` events gets exactly what it
+    missed; anyone else gets a ``reset`` event.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        session_maker: async_sessionmaker[AsyncSession],
+        buffer_size: int = 1000,
+        queue_size: int = 256,
+    ) -> None:
+        self.dsn = dsn
+        self.session_maker = session_maker
+        self.queue_size = queue_size
+        self.epoch = uuid4().hex[:8]
+        self.seq = 0
+        self.connected = False
+        self.evictions = 0
+        self._buffer: deque[TaskEvent] = deque(maxlen=buffer_size)
+        self._subscribers: set[Subscription] = set()
+        self._notifications: asyncio.Queue[str] = asyncio.Queue()
+        self._tasks: list[asyncio.Task[None]] = []
+
+    @classmethod
+    def from_database_url(
+        cls, database_url: str, session_maker: async_sessionmaker[AsyncSession], **kwargs: Any
+    ) -> "TaskEventBroker":
+        """Broker listening on the database of a SQLAlchemy URL."""
+        dsn = make_url(database_url).set(drivername="postgresql")
+        return cls(dsn.render_as_string(hide_password=False), session_maker, **kwargs)
+
+    def start(self) -> None:
+        """Start listening and delivering in the background."""
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._listen()),
+                asyncio.create_task(self._deliver()),
+            ]
+
+    async def aclose(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for subscription in list(self._subscribers):
+            self._evict(subscription, count=False)
+
+    def subscribe(self, last_event_id: str | None = None) -> Subscription:
+        """Subscribe to live events, first replaying those after ``last_event_id``."""
+        backlog: list[TaskEvent] = []
+        if last_event_id is not None:
+            missed = self._replay(last_event_id)
+            backlog = missed if missed is not None else [self._reset_event()]
+        subscription = Subscription(backlog, self.queue_size)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    def publish(self, type: EventType, data: str) -> TaskEvent:
+        """Record an event and hand it to every subscriber."""
+        self.seq += 1
+        event = TaskEvent(f"{self.epoch}-{self.seq}", self.seq, type, data)
+        self._buffer.append(event)
+        for subscription in list(self._subscribers):
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._evict(subscription)
+        return event
+
+    def reset(self) -> None:
+        """Start a new epoch after possibly missing notifications."""
+        self.epoch = uuid4().hex[:8]
+        self.seq = 0
+        self._buffer.clear()
+        self.publish(EventType.RESET, "{}")
+
+    def snapshot(self) -> dict[str, Any]:
+        """Feed state for health reporting."""
+        return {
+            "connected": self.connected,
+            "subscribers": len(self._subscribers),
+            "evictions": self.evictions,
+            "buffered": len(self._buffer),
+            "last_event_id": f"{self.epoch}-{self.seq}",
+        }
+
+    def _replay(self, last_event_id: str) -> list[TaskEvent] | None:
+        """Buffered events after ``last_event_id``, or None if some are gone."""
+        epoch, _, seq = last_event_id.partition("-")
+        if epoch != self.epoch or not seq.isdigit() or int(seq) > self.seq:
+            return None
+        oldest = self._buffer[0].seq if self._buffer else self.seq + 1
+        if int(seq) < oldest - 1:
+            return None
+        return [event for event in self._buffer if event.seq > int(seq)]
+
+    def _reset_event(self) -> TaskEvent:
+        # Carries the current position, so resuming from it replays what follows.
+        return TaskEvent(f"{self.epoch}-{self.seq}", self.seq, EventType.RESET, "{}")
+
+    def _evict(self, subscription: Subscription, count: bool = True) -> None:
+        subscription.evicted = True
+        self._subscribers.discard(subscription)
+        if count:
+            self.evictions += 1
+            logger.warning("Evicted slow change feed subscriber")
+
+    def _on_notify(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        self._notifications.put_nowait(payload)
+
+    async def _listen(self) -> None:
+        """Hold the LISTEN connection, reconnecting with backoff when it drops."""
+        delay = RECONNECT_DELAY_SECONDS
+        listened = False
+        while True:
+            try:
+                connection = await asyncpg.connect(self.dsn)
+            except CONNECTION_ERRORS as e:
+                logger.warning(f"Change feed cannot connect, retrying in {delay:.0f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY_SECONDS)
+                continue
+
+            lost = asyncio.Event()
+            connection.add_termination_listener(lambda _: lost.set())
+            failed = False
+            try:
+                await connection.add_listener(TASK_EVENTS_CHANNEL, self._on_notify)
+                self.connected = True
+                delay = RECONNECT_DELAY_SECONDS
+                if listened:
+                    # Changes made while we were not listening were never seen.
+                    self.reset()
+                listened = True
+                await lost.wait()
+                logger.warning("Change feed lost its database connection")
+            except CONNECTION_ERRORS as e:
+                logger.warning(f"Change feed cannot listen, retrying in {delay:.0f}s: {e}")
+                failed = True
+            finally:
+                self.connected = False
+                try:
+                    await connection.close()
+                except CONNECTION_ERRORS as e:
+                    logger.warning(f"Change feed could not close its connection: {e}")
+            if failed:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY_SECONDS)
+
+    async def _deliver(self) -> None:
+        """Turn notifications into events, fetching changed tasks in batches."""
+        while True:
+            payloads = [await self._notifications.get()]
+            while len(payloads) < DELIVERY_BATCH_SIZE and not self._notifications.empty():
+                payloads.append(self._notifications.get_nowait())
+            try:
+                await self._publish_batch([json.loads(p) for p in payloads])
+            except Exception as e:
+                logger.error(f"Change feed delivery failed, resetting subscribers: {e}")
+                self.reset()
+
+    async def _publish_batch(self, notifications: list[dict[str, str]]) -> None:
+        ids = {
+            UUID(n["id"]) for n in notifications if n["type"] != EventType.DELETED.value
+        }
+        tasks = {}
+        if ids:
+            async with self.session_maker() as session:
+                rows = await TaskRepository(session).get_many(list(ids))
+            tasks = {row.id: TaskRead.model_validate(row).model_dump_json() for row in rows}
+
+        for notification in notifications:
+            event_type = EventType(notification["type"])
+            task_id = UUID(notification["id"])
+            if event_type is EventType.DELETED:
+                self.publish(event_type, json.dumps({"id": str(task_id)}))
+            elif task_id in tasks:
+                # Events carry the task as it is now. A task already deleted
+                # again is skipped; its deleted event follows.
+                self.publish(event_type, tasks[task_id])
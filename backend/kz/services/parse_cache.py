@@ -0,0 +1,253 @@
+"""Two-tier, content-addressed cache for AI parse results."""
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.kz.config import get_settings
+from backend.kz.db.database import get_async_session_maker
+from backend.kz.models import EnergyColumn
+from backend.kz.repositories.parse_cache import ParseCacheRepository
+from backend.kz.services.parser import ParsedTask
+
+logger = logging.getLogger(__name__)
+
+EVICT_EVERY_WRITES = 256
+
+
+def normalize_input(raw_input: str) -> str:
+    """Collapse whitespace and case so trivially different inputs share a key."""
+    return " ".join(raw_input.split()).casefold()
+
+
+def cache_key(raw_input: str, model: str, prompt_version: str) -> str:
+    """Content address for a parse: hash of normalized input, prompt version and model."""
+    material = "\0".join((prompt_version, model, normalize_input(raw_input)))
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+def _to_json(parsed: ParsedTask) -> dict[str, Any]:
+    return {
+        "title": parsed.title,
+        "energy": parsed.energy.value,
+        "tags": parsed.tags,
+        "tag_confidence": parsed.tag_confidence,
+    }
+
+
+def _from_json(data: dict[str, Any]) -> ParsedTask:
+    return ParsedTask(
+        title=data["title"],
+        energy=EnergyColumn(data["energy"]),
+        tags=list(data["tags"]),
+        tag_confidence=dict(data.get("tag_confidence", {})),
+    )
+
+
+@dataclass
+class ParseCacheStats:
+    """Counters for how parse lookups were served."""
+
+    memory_hits: int = 0
+    db_hits: int = 0
+    coalesced: int = 0
+    misses: int = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.memory_hits + self.db_hits + self.coalesced + self.misses
+
+    @property
+    def saved_calls(self) -> int:
+        return self.lookups - self.misses
+
+
+class ParseCache:
+    """In-memory LRU in front of a Postgres table, with in-flight coalescing.
+
+    Lookups try the process-local LRU first, then join an identical parse
+    already in flight (singleflight), then the persistent tier, and only then
+    call ``compute``. Only successful parses reach the cache, since
+    ``compute`` raises on failure.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: int = 30 * 24 * 3600,
+        session_maker: async_sessionmaker[AsyncSession] | None = None,
+        max_rows: int = 100_000,
+        cost_per_call_usd: float = 0.0,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.session_maker = session_maker
+        self.max_rows = max_rows
+        self.cost_per_call_usd = cost_per_call_usd
+        self.stats = ParseCacheStats()
+        self._memory: OrderedDict[str, tuple[float, ParsedTask]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task[ParsedTask]] = {}
+        self._writes = 0
+
+    async def get_or_compute(
+        self,
+        raw_input: str,
+        model: str,
+        prompt_version: str,
+        compute: Callable[[str], Awaitable[ParsedTask]],
+    ) -> ParsedTask:
+        """Return the cached parse for ``raw_input``, computing it at most once."""
+        key = cache_key(raw_input, model, prompt_version)
+
+        cached = self._memory_get(key)
+        if cached is not None:
+            self.stats.memory_hits += 1
+            return cached
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.stats.coalesced += 1
+        else:
+            # The parse belongs to the cache, not to the first caller: a
+            # caller cancelled while waiting (say, its client went away)
+            # leaves it running for everyone else waiting on it.
+            inflight = asyncio.create_task(self._fill(key, raw_input, compute))
+            self._inflight[key] = inflight
+            inflight.add_done_callback(lambda task: self._settle(key, task))
+        return await asyncio.shield(inflight)
+
+    async def _fill(
+        self, key: str, raw_input: str, compute: Callable[[str], Awaitable[ParsedTask]]
+    ) -> ParsedTask:
+        parsed = await self._store_get(key)
+        if parsed is not None:
+            self.stats.db_hits += 1
+        else:
+            self.stats.misses += 1
+            parsed = await compute(raw_input)
+            await self._store_put(key, parsed)
+        self._memory_put(key, parsed)
+        return parsed
+
+    def _settle(self, key: str, task: asyncio.Task[ParsedTask]) -> None:
+        del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved when nobody was left waiting
+
+    async def lookup_many(
+        self, raw_inputs: list[str], model: str, prompt_version: str
+    ) -> list[ParsedTask | None]:
+        """Return cached parses for many inputs without computing misses.
+
+        Inputs missing from memory are fetched from the persistent tier in a
+        single query.
+        """
+        keys = [cache_key(raw_input, model, prompt_version) for raw_input in raw_inputs]
+        results = [self._memory_get(key) for key in keys]
+        self.stats.memory_hits += sum(1 for r in results if r is not None)
+
+        missing = [key for key, r in zip(keys, results, strict=True) if r is None]
+        stored = await self._store_get_many(missing) if missing else {}
+        for i, key in enumerate(keys):
+            if results[i] is None and key in stored:
+                results[i] = stored[key]
+                self._memory_put(key, stored[key])
+                self.stats.db_hits += 1
+        self.stats.misses += sum(1 for r in results if r is None)
+        return results
+
+    async def store_many(
+        self, items: list[tuple[str, ParsedTask]], model: str, prompt_version: str
+    ) -> None:
+        """Cache parses computed outside ``get_or_compute``, e.g. by a batch call."""
+        entries = {cache_key(raw_input, model, prompt_version): p for raw_input, p in items}
+        for key, parsed in entries.items():
+            self._memory_put(key, parsed)
+        await self._store_put_many(entries)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Hit-rate and savings summary for health reporting."""
+        lookups = self.stats.lookups
+        return {
+            "lookups": lookups,
+            "memory_hits": self.stats.memory_hits,
+            "db_hits": self.stats.db_hits,
+            "coalesced": self.stats.coalesced,
+            "misses": self.stats.misses,
+            "hit_rate": round(self.stats.saved_calls / lookups, 4) if lookups else 0.0,
+            "llm_calls_saved": self.stats.saved_calls,
+            "usd_saved": round(self.stats.saved_calls * self.cost_per_call_usd, 4),
+            "entries": len(self._memory),
+        }
+
+    def _memory_get(self, key: str) -> ParsedTask | None:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        expires_at, parsed = entry
+        if expires_at <= time.monotonic():
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return parsed
+
+    def _memory_put(self, key: str, parsed: ParsedTask) -> None:
+        self._memory[key] = (time.monotonic() + self.ttl_seconds, parsed)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def _store_get(self, key: str) -> ParsedTask | None:
+        return (await self._store_get_many([key])).get(key)
+
+    async def _store_get_many(self, keys: list[str]) -> dict[str, ParsedTask]:
+        if self.session_maker is None:
+            return {}
+        try:
+            async with self.session_maker() as session:
+                rows = await ParseCacheRepository(session).get_many(keys)
+            return {key: _from_json(data) for key, data in rows.items()}
+        except Exception as e:
+            logger.warning(f"Parse cache lookup failed: {e}")
+            return {}
+
+    async def _store_put(self, key: str, parsed: ParsedTask) -> None:
+        await self._store_put_many({key: parsed})
+
+    async def _store_put_many(self, entries: dict[str, ParsedTask]) -> None:
+        if self.session_maker is None or not entries:
+            return
+        try:
+            async with self.session_maker() as session:
+                repo = ParseCacheRepository(session)
+                await repo.put_many(
+                    {key: _to_json(parsed) for key, parsed in entries.items()},
+                    self.ttl_seconds,
+                )
+                writes_before = self._writes
+                self._writes += len(entries)
+                if writes_before // EVICT_EVERY_WRITES != self._writes // EVICT_EVERY_WRITES:
+                    await repo.evict(self.max_rows)
+        except Exception as e:
+            logger.warning(f"Parse cache write failed: {e}")
+
+
+@lru_cache
+def get_parse_cache() -> ParseCache:
+    """Get the process-wide parse cache."""
+    settings = get_settings()
+    return ParseCache(
+        max_entries=settings.parse_cache_size,
+        ttl_seconds=settings.parse_cache_ttl_seconds,
+        session_maker=get_async_session_maker(),
+        max_rows=settings.parse_cache_max_rows,
+        cost_per_call_usd=settings.parse_call_cost_usd,
+    )
@@ -1,16 +1,31 @@
 """AI-powered task parsing service."""
 
+import asyncio
 import json
 import logging
-from dataclasses import dataclass
+from collections.abc import Iterator
+from copy import copy
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Any
 
-from anthropic import AsyncAnthropic
+from anthropic import DEFAULT_CONNECTION_LIMITS, AsyncAnthropic, DefaultAsyncHttpxClient
 
 from backend.kz.config import get_settings
-from backend.kz.models import EnergyColumn
+from backend.kz.models import EnergyColumn, EnergySource
+from backend.kz.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+if TYPE_CHECKING:
+    from backend.kz.services.classifier import EnergyClassifier
+    from backend.kz.services.parse_cache import ParseCache
 
 logger = logging.getLogger(__name__)
 
+MAX_BATCH_TOKENS = 8192
+
+# Bump whenever PARSE_PROMPT or BATCH_PARSE_PROMPT changes so cached parses from
+# the old prompts are ignored.
+PROMPT_VERSION = "2"
+
 PARSE_PROMPT = """You are a task parser for a Kanban board. Parse the user's input and extract:
 
 1. **title**: A clean, concise task title (imperative form, e.g., "Fix auth bug" not "Fixing auth bug")
@@ -18,13 +33,30 @@ PARSE_PROMPT = """You are a task parser for a Kanban board. Parse the user's inp
    - "hyperfocus" - Deep work, complex, requires concentration (>30 min)
    - "quick_win" - Small tasks, quick dopamine hits (<15 min)
    - "low_energy" - Mindless but useful (docs, cleanup, admin)
-3. **tags**: 1-3 relevant lowercase tags (e.g., ["auth", "bug", "backend"])
+3. **tags**: 1-3 relevant lowercase tags (e.g., "auth", "bug", "backend"), each with your
+   confidence (0-1) that it applies
 
 Respond ONLY with valid JSON:
-{{"title": "...", "energy": "...", "tags": ["...", "..."]}}
+{{"title": "...", "energy": "...", "tags": [{{"name": "...", "confidence": 0.9}}, ...]}}
 
 User input: {input}"""
 
+BATCH_PARSE_PROMPT = """You are a task parser for a Kanban board. Parse EACH numbered input below and extract:
+
+1. **title**: A clean, concise task title (imperative form, e.g., "Fix auth bug" not "Fixing auth bug")
+2. **energy**: Which energy column fits best:
+   - "hyperfocus" - Deep work, complex, requires concentration (>30 min)
+   - "quick_win" - Small tasks, quick dopamine hits (<15 min)
+   - "low_energy" - Mindless but useful (docs, cleanup, admin)
+3. **tags**: 1-3 relevant lowercase tags (e.g., "auth", "bug", "backend"), each with your
+   confidence (0-1) that it applies
+
+Respond ONLY with a valid JSON array holding exactly one object per input, in input order:
+[{{"title": "...", "energy": "...", "tags": [{{"name": "...", "confidence": 0.9}}, ...]}}, ...]
+
+Inputs:
+{inputs}"""
+
 
 @dataclass
 class ParsedTask:
@@ -33,48 +65,277 @@ class ParsedTask:
     title: str
     energy: EnergyColumn
     tags: list[str]
+    fallback: bool = False
+    confidence: float | None = None  # set by the local classifier tier
+    source: EnergySource = EnergySource.LLM  # who picked ``energy``
+    tag_confidence: dict[str, float] = field(default_factory=dict)  # by tag, if the model gave one
+
+    def tagged(self) -> dict[str, float | None]:
+        """Tags with the confidence each was assigned with, as stored on the task."""
+        return {tag: self.tag_confidence.get(tag) for tag in self.tags}
 
 
 class TaskParser:
-    """AI-powered task intent parser."""
+    """AI-powered task intent parser.
+
+    Meant to be long-lived: one instance owns a keep-alive connection pool,
+    a limit on concurrent model calls and a circuit breaker, so create it
+    once per process and ``aclose`` it on shutdown.
+    """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        cache: "ParseCache | None" = None,
+        classifier: "EnergyClassifier | None" = None,
+    ) -> None:
         settings = get_settings()
-        self.client = AsyncAnthropic(api_key=settings.anthropic_api_key)
+        limits = copy(DEFAULT_CONNECTION_LIMITS)
+        limits.max_connections = settings.anthropic_max_connections
+        limits.max_keepalive_connections = settings.anthropic_max_connections
+        self.client = AsyncAnthropic(
+            api_key=settings.anthropic_api_key,
+            timeout=settings.anthropic_timeout_seconds,
+            http_client=DefaultAsyncHttpxClient(limits=limits),
+        )
+        self.model = settings.anthropic_model
+        self.cache = cache
+        self.batch_size = settings.parse_batch_size
+        self.batch_max_chars = settings.parse_batch_max_chars
+        self.timeout = settings.anthropic_timeout_seconds
+        self.max_concurrency = settings.anthropic_max_concurrency
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.anthropic_breaker_threshold,
+            reset_seconds=settings.anthropic_breaker_reset_seconds,
+        )
+        self._limiter = asyncio.Semaphore(self.max_concurrency)
+        self._in_flight = 0
+        self.classifier = classifier
+        self.local_threshold = settings.energy_classifier_threshold
+        self.local_hits = 0
+        self.local_escalations = 0
+
+    async def aclose(self) -> None:
+        """Close the underlying connection pool."""
+        await self.client.close()
+
+    def snapshot(self) -> dict[str, Any]:
+        """Limiter and breaker state for health reporting."""
+        return {
+            "breaker": self.breaker.snapshot(),
+            "in_flight": self._in_flight,
+            "max_concurrency": self.max_concurrency,
+            "local": {
+                "enabled": self.classifier is not None,
+                "threshold": self.local_threshold,
+                "hits": self.local_hits,
+                "escalations": self.local_escalations,
+            },
+        }
 
     async def parse(
         self,
         raw_input: str,
         energy_override: EnergyColumn | None = None,
     ) -> ParsedTask:
-        """Parse raw task input into structured data."""
-        try:
-            response = await self.client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=256,
-                messages=[
-                    {"role": "user", "content": PARSE_PROMPT.format(input=raw_input)}
-                ],
-            )
-
-            result = json.loads(response.content[0].text)
-
-            energy = energy_override or EnergyColumn(result.get("energy", "quick_win"))
-            tags = result.get("tags", [])
-            if isinstance(tags, str):
-                tags = [tags]
+        """Parse raw task input into structured data.
 
-            return ParsedTask(
-                title=result.get("title", raw_input),
-                energy=energy,
-                tags=[t.lower().strip() for t in tags[:5]],  # Max 5 tags
-            )
+        The local classifier answers first; the model is only called when it
+        is missing or below its confidence threshold.
+        """
+        local = self._parse_locally(raw_input)
+        if local is not None:
+            return _overridden(local, energy_override)
 
+        try:
+            if self.cache is not None:
+                parsed = await self.cache.get_or_compute(
+                    raw_input, self.model, PROMPT_VERSION, self._complete
+                )
+            else:
+                parsed = await self._complete(raw_input)
         except Exception as e:
             logger.warning(f"Failed to parse task with AI: {e}")
             # Graceful fallback
-            return ParsedTask(
-                title=raw_input,
-                energy=energy_override or EnergyColumn.QUICK_WIN,
-                tags=[],
+            return _fallback(raw_input, energy_override)
+
+        return _overridden(parsed, energy_override)
+
+    async def parse_many(
+        self,
+        raw_inputs: list[str],
+        energy_override: EnergyColumn | None = None,
+    ) -> list[ParsedTask]:
+        """Parse many inputs with one model call per chunk instead of one per input.
+
+        Inputs the local classifier is confident about and cached inputs
+        skip the model; the rest are packed into
+        chunks bounded by ``parse_batch_size`` items and
+        ``parse_batch_max_chars`` characters. A chunk that fails falls back
+        per input, like ``parse``.
+        """
+        results = [self._parse_locally(raw_input) for raw_input in raw_inputs]
+        pending = [i for i, parsed in enumerate(results) if parsed is None]
+        if self.cache is not None and pending:
+            cached = await self.cache.lookup_many(
+                [raw_inputs[i] for i in pending], self.model, PROMPT_VERSION
             )
+            for i, parsed in zip(pending, cached, strict=True):
+                results[i] = parsed
+        misses = [i for i, parsed in enumerate(results) if parsed is None]
+
+        chunks = list(self._chunk(misses, raw_inputs))
+        parsed_chunks = await asyncio.gather(
+            *(self._complete_many([raw_inputs[i] for i in chunk]) for chunk in chunks),
+            return_exceptions=True,
+        )
+        for chunk, parsed in zip(chunks, parsed_chunks, strict=True):
+            if isinstance(parsed, BaseException):
+                logger.warning(f"Failed to batch-parse {len(chunk)} tasks with AI: {parsed}")
+                continue
+            for i, item in zip(chunk, parsed, strict=True):
+                results[i] = item
+            if self.cache is not None:
+                await self.cache.store_many(
+                    [(raw_inputs[i], item) for i, item in zip(chunk, parsed, strict=True)],
+                    self.model,
+                    PROMPT_VERSION,
+                )
+
+        return [
+            _fallback(raw_input, energy_override)
+            if parsed is None
+            else _overridden(parsed, energy_override)
+            for raw_input, parsed in zip(raw_inputs, results, strict=True)
+        ]
+
+    def _parse_locally(self, raw_input: str) -> ParsedTask | None:
+        """Local classifier result, or None when the input should go to the model."""
+        if self.classifier is None:
+            return None
+        parsed = self.classifier.parse(raw_input)
+        if parsed is None or (parsed.confidence or 0.0) < self.local_threshold:
+            self.local_escalations += 1
+            return None
+        self.local_hits += 1
+        return parsed
+
+    def _chunk(self, indices: list[int], raw_inputs: list[str]) -> Iterator[list[int]]:
+        """Group input indices into chunks that respect the batch size and char budget."""
+        chunk: list[int] = []
+        chars = 0
+        for i in indices:
+            size = len(raw_inputs[i])
+            if chunk and (len(chunk) >= self.batch_size or chars + size > self.batch_max_chars):
+                yield chunk
+                chunk, chars = [], 0
+            chunk.append(i)
+            chars += size
+        if chunk:
+            yield chunk
+
+    async def _create(self, **kwargs: Any) -> Any:
+        """Call the model through the breaker, the concurrency limit and the deadline.
+
+        The deadline covers time spent waiting for a slot, so a backed-up
+        process falls back instead of queueing indefinitely. Only errors from
+        the call itself count against the breaker.
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError("AI provider circuit is open")
+        called = False
+        try:
+            async with asyncio.timeout(self.timeout), self._limiter:
+                called = True
+                self._in_flight += 1
+                try:
+                    response = await self.client.messages.create(**kwargs)
+                finally:
+                    self._in_flight -= 1
+        except BaseException as e:
+            if called and not isinstance(e, asyncio.CancelledError):
+                self.breaker.record_failure()
+            else:
+                self.breaker.release()
+            raise
+        self.breaker.record_success()
+        return response
+
+    async def _complete(self, raw_input: str) -> ParsedTask:
+        """Ask the model to parse one input. Raises on any API or format error."""
+        response = await self._create(
+            model=self.model,
+            max_tokens=256,
+            messages=[
+                {"role": "user", "content": PARSE_PROMPT.format(input=raw_input)}
+            ],
+        )
+
+        result = json.loads(response.content[0].text)
+        return _to_parsed(result, raw_input)
+
+    async def _complete_many(self, raw_inputs: list[str]) -> list[ParsedTask]:
+        """Ask the model to parse a chunk of inputs in one call."""
+        numbered = "\n".join(
+            f"{n}. {json.dumps(raw_input)}" for n, raw_input in enumerate(raw_inputs, start=1)
+        )
+        response = await self._create(
+            model=self.model,
+            max_tokens=min(256 * len(raw_inputs), MAX_BATCH_TOKENS),
+            messages=[
+                {"role": "user", "content": BATCH_PARSE_PROMPT.format(inputs=numbered)}
+            ],
+        )
+
+        results = json.loads(response.content[0].text)
+        if not isinstance(results, list) or len(results) != len(raw_inputs):
+            raise ValueError(f"Expected {len(raw_inputs)} parsed tasks, got {len(results)}")
+        return [
+            _to_parsed(result, raw_input)
+            for result, raw_input in zip(results, raw_inputs, strict=True)
+        ]
+
+
+def _to_parsed(result: dict[str, Any], raw_input: str) -> ParsedTask:
+    """Build a ParsedTask from one model-produced JSON object.
+
+    Tags come as ``{"name", "confidence"}`` objects; bare names are accepted
+    too, with no confidence.
+    """
+    tags = result.get("tags", [])
+    if isinstance(tags, str | dict):
+        tags = [tags]
+
+    names: list[str] = []
+    confidence: dict[str, float] = {}
+    for tag in tags[:5]:  # Max 5 tags
+        name = tag.get("name", "") if isinstance(tag, dict) else tag
+        name = str(name).lower().strip()
+        names.append(name)
+        score = tag.get("confidence") if isinstance(tag, dict) else None
+        if isinstance(score, int | float) and 0 <= score <= 1:
+            confidence[name] = float(score)
+
+    return ParsedTask(
+        title=result.get("title", raw_input),
+        energy=EnergyColumn(result.get("energy", "quick_win")),
+        tags=names,
+        tag_confidence=confidence,
+    )
+
+
+def _overridden(parsed: ParsedTask, energy_override: EnergyColumn | None) -> ParsedTask:
+    """``parsed`` with the energy the user asked for, if they asked."""
+    if energy_override is None:
+        return parsed
+    return replace(parsed, energy=energy_override, source=EnergySource.USER)
+
+
+def _fallback(raw_input: str, energy_override: EnergyColumn | None) -> ParsedTask:
+    """Parse result used when the model cannot be reached or answers badly."""
+    return ParsedTask(
+        title=raw_input,
+        energy=energy_override or EnergyColumn.QUICK_WIN,
+        tags=[],
+        fallback=True,
+        source=EnergySource.USER if energy_override else EnergySource.FALLBACK,
+    )
@@ -0,0 +1,68 @@
+"""Mergeable quantile sketches for cycle times.
+
+A sketch counts values in logarithmic buckets, as in DDSketch (Masson et
+al., "DDSketch: A Fast and Fully-Mergeable Quantile Sketch with Relative-
+Error Guarantees"): bucket ``k`` holds values in ``(GAMMA**(k-1), GAMMA**k]``.
+Any quantile read back is within ``RELATIVE_ACCURACY`` of a true value of
+that rank, and sketches of different days merge by adding their counts, so
+daily rollups answer percentiles over any range of days.
+
+Values are seconds; anything under a second lands in bucket 0. A year of
+cycle times spans some 430 buckets, and a day's tasks fill a handful.
+"""
+
+import math
+from collections import Counter
+from collections.abc import Iterable, Mapping
+
+RELATIVE_ACCURACY = 0.02
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+LOG_GAMMA = math.log(GAMMA)
+
+
+def bucket(seconds: float) -> int:
+    """The bucket counting ``seconds``; matches the SQL in AnalyticsRepository."""
+    return max(math.ceil(math.log(max(seconds, 1.0)) / LOG_GAMMA), 0)
+
+
+class QuantileSketch:
+    """Counts of values per bucket, merged from any number of days."""
+
+    def __init__(self) -> None:
+        self.counts: Counter[int] = Counter()
+
+    @property
+    def count(self) -> int:
+        return self.counts.total()
+
+    def add(self, seconds: float) -> None:
+        self.counts[bucket(seconds)] += 1
+
+    def merge(self, counts: Mapping[str | int, int]) -> None:
+        """Add bucket counts, as stored in ``daily_stats.cycle_sketch`` (JSON keys)."""
+        for key, n in counts.items():
+            self.counts[int(key)] += n
+
+    def quantile(self, q: float) -> float | None:
+        """The ``q``-quantile in seconds (None while empty)."""
+        if not 0 <= q <= 1:
+            raise ValueError(f"Quantile must be within [0, 1], got {q}")
+        if not self.counts:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for k in sorted(self.counts):
+            seen += self.counts[k]
+            if seen > rank:
+                return _value(k)
+        return _value(max(self.counts))
+
+    def quantiles(self, qs: Iterable[float]) -> list[float | None]:
+        return [self.quantile(q) for q in qs]
+
+
+def _value(k: int) -> float:
+    """The value representing bucket ``k``, at most RELATIVE_ACCURACY off any in it."""
+    if k == 0:
+        return 1.0
+    return 2 * GAMMA**k / (GAMMA + 1)
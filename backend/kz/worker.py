@@ -0,0 +1,239 @@
+"""Background worker that drains deferred AI parse jobs and embeds tasks.
+
+Run with ``kz-worker`` (or ``python -m backend.kz.worker``) alongside the API
+when ``PARSE_MODE=deferred`` or when the embedding backend is not local. When
+idle it also rebalances card order keys that grew long, archives tasks
+shipped long ago and drops activity log partitions past retention.
+"""
+
+import asyncio
+import logging
+import signal
+from datetime import timedelta
+from typing import Any
+
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.kz.config import get_settings
+from backend.kz.db.database import get_async_engine, get_async_session_maker
+from backend.kz.models import EnergyColumn, TaskCreate
+from backend.kz.repositories import ActivityRepository, ParseJobRepository, TaskRepository
+from backend.kz.repositories.activity import months_ago
+from backend.kz.services.activity import ActivityWriter
+from backend.kz.services.classifier import get_energy_classifier
+from backend.kz.services.embeddings import Embedder, embed_missing, get_embedder
+from backend.kz.services.parse_cache import get_parse_cache
+from backend.kz.services.parser import TaskParser
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRY_DELAY_SECONDS = 300
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff between parse attempts, capped at five minutes."""
+    return float(min(5 * 2 ** (attempts - 1), MAX_RETRY_DELAY_SECONDS))
+
+
+class ParseWorker:
+    """Claims parse jobs in batches and enriches their tasks concurrently.
+
+    With an ``embedder`` it also fills in missing task embeddings whenever
+    the parse queue is empty. With ``order_key_max_length`` it rebalances,
+    at most every ``rebalance_interval`` seconds, columns holding longer keys.
+    With ``archive_after`` it moves tasks shipped longer ago than that to
+    the archive, a batch at a time, every ``archive_interval`` seconds until
+    none are left, purging tombstones older than ``tombstone_retention``
+    as it goes. With ``activity_retention_months`` it drops activity log
+    partitions older than that, along with rebalancing.
+    """
+
+    def __init__(
+        self,
+        parser: TaskParser,
+        session_maker: async_sessionmaker[AsyncSession],
+        concurrency: int = 4,
+        poll_interval: float = 1.0,
+        max_attempts: int = 3,
+        lease_seconds: int = 120,
+        embedder: Embedder | None = None,
+        embedding_batch_size: int = 256,
+        order_key_max_length: int | None = None,
+        rebalance_interval: float = 300.0,
+        archive_after: timedelta | None = None,
+        archive_batch_size: int = 500,
+        archive_interval: float = 3600.0,
+        tombstone_retention: timedelta | None = None,
+        activity_retention_months: int | None = None,
+    ) -> None:
+        self.parser = parser
+        self.session_maker = session_maker
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.embedder = embedder
+        self.embedding_batch_size = embedding_batch_size
+        self.order_key_max_length = order_key_max_length
+        self.rebalance_interval = rebalance_interval
+        self.archive_after = archive_after
+        self.archive_batch_size = archive_batch_size
+        self.archive_interval = archive_interval
+        self.tombstone_retention = tombstone_retention
+        self.activity_retention_months = activity_retention_months
+        self._rebalance_due = 0.0
+        self._archive_due = 0.0
+
+    async def run_once(self) -> int:
+        """Claim and process one batch of due jobs. Returns the batch size."""
+        async with self.session_maker() as session:
+            jobs = await ParseJobRepository(session).claim(
+                limit=self.concurrency, lease_seconds=self.lease_seconds
+            )
+        if jobs:
+            await asyncio.gather(*(self._process(job) for job in jobs))
+        return len(jobs)
+
+    async def rebalance(self) -> int:
+        """Rebalance columns whose order keys grew too long; returns how many."""
+        if self.order_key_max_length is None:
+            return 0
+        async with self.session_maker() as session:
+            tasks = TaskRepository(session)
+            columns = await tasks.columns_to_rebalance(self.order_key_max_length)
+            for column in columns:
+                rebalanced = await tasks.rebalance(column)
+                logger.info("Rebalanced order keys of %d tasks in %s", rebalanced, column)
+        return len(columns)
+
+    async def archive(self) -> int:
+        """Archive one batch of tasks shipped long ago; returns how many."""
+        if self.archive_after is None:
+            return 0
+        async with self.session_maker() as session:
+            archived = await TaskRepository(session).archive_shipped(
+                self.archive_after, self.archive_batch_size, self.tombstone_retention
+            )
+        if archived:
+            logger.info("Archived %d shipped tasks", archived)
+        return archived
+
+    async def prune_activity(self) -> list[str]:
+        """Drop activity log partitions past retention; returns their names."""
+        if self.activity_retention_months is None:
+            return []
+        async with self.session_maker() as session:
+            dropped = await ActivityRepository(session).drop_partitions_before(
+                months_ago(self.activity_retention_months)
+            )
+        if dropped:
+            logger.info("Dropped activity log partitions %s", ", ".join(dropped))
+        return dropped
+
+    async def run(self, stop: asyncio.Event) -> None:
+        """Process jobs until ``stop`` is set, sleeping while the queue is empty."""
+        logger.info("Parse worker started (concurrency=%d)", self.concurrency)
+        while not stop.is_set():
+            try:
+                processed = await self.run_once()
+                if processed == 0 and self.embedder is not None:
+                    processed = await embed_missing(
+                        self.session_maker, self.embedder, self.embedding_batch_size
+                    )
+                now = asyncio.get_running_loop().time()
+                if processed == 0 and now >= self._rebalance_due:
+                    self._rebalance_due = now + self.rebalance_interval
+                    await self.rebalance()
+                    await self.prune_activity()
+                if processed == 0 and now >= self._archive_due:
+                    processed = await self.archive()
+                    # A full batch means more are waiting: go again once idle
+                    if processed < self.archive_batch_size:
+                        self._archive_due = now + self.archive_interval
+            except Exception:
+                logger.exception("Parse worker batch failed")
+                processed = 0
+            if processed == 0:
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=self.poll_interval)
+                except TimeoutError:
+                    pass
+        logger.info("Parse worker stopped")
+
+    async def _process(self, job: Row[Any]) -> None:
+        """Parse one claimed job and settle it."""
+        override = EnergyColumn(job.energy_override) if job.energy_override else None
+        parsed = await self.parser.parse(job.raw_input, energy_override=override)
+
+        async with self.session_maker() as session:
+            jobs = ParseJobRepository(session)
+            tasks = TaskRepository(session)
+
+            if parsed.fallback:
+                if job.attempts < self.max_attempts:
+                    await jobs.retry(job.id, "AI parse failed", retry_delay(job.attempts))
+                    return
+                logger.warning("Giving up on parsing task %s", job.task_id)
+                await tasks.mark_parse_failed(job.task_id)
+            else:
+                provisional = override or TaskCreate.model_fields["energy_column"].default
+                await tasks.apply_parse(
+                    job.task_id,
+                    parsed.title,
+                    parsed.energy,
+                    provisional_energy=provisional,
+                    tags=parsed.tagged(),
+                    energy_source=parsed.source,
+                )
+
+            await jobs.complete(job.id)
+
+
+async def _run() -> None:
+    settings = get_settings()
+    parser = TaskParser(cache=get_parse_cache(), classifier=get_energy_classifier())
+    worker = ParseWorker(
+        parser=parser,
+        session_maker=get_async_session_maker(),
+        concurrency=settings.parse_worker_concurrency,
+        poll_interval=settings.parse_worker_poll_interval,
+        max_attempts=settings.parse_job_max_attempts,
+        lease_seconds=settings.parse_job_lease_seconds,
+        embedder=get_embedder(),
+        embedding_batch_size=settings.embedding_batch_size,
+        order_key_max_length=settings.order_key_max_length,
+        rebalance_interval=settings.rebalance_interval_seconds,
+        archive_after=timedelta(days=settings.archive_after_days),
+        archive_batch_size=settings.archive_batch_size,
+        archive_interval=settings.archive_interval_seconds,
+        tombstone_retention=timedelta(days=settings.tombstone_retention_days),
+        activity_retention_months=settings.activity_retention_months,
+    )
+    # Parse results are recorded as agent activity
+    activity = ActivityWriter(
+        get_async_session_maker(), flush_interval=settings.activity_flush_interval_seconds
+    )
+    activity.start()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    try:
+        await worker.run(stop)
+    finally:
+        await activity.aclose()
+        await parser.aclose()
+        await get_async_engine().dispose()
+
+
+def main() -> None:
+    """Entry point for the ``kz-worker`` script."""
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s [%(name)s] %(message)s")
+    asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    main()
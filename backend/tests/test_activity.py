@@ -0,0 +1,127 @@
+import asyncio
+from datetime import UTC, date, datetime
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+
+from backend.kz.db.database import get_async_engine, get_async_session_maker
+from backend.kz.models import (
+    ActivityAction,
+    Actor,
+    Base,
+    BulkAction,
+    EnergyColumn,
+    TaskBulkOperation,
+    TaskCreate,
+    TaskMove,
+)
+from backend.kz.repositories.activity import (
+    ActivityBuffer,
+    ActivityRepository,
+    month_of,
+    partition_name,
+)
+from backend.kz.repositories.task import TaskRepository
+from backend.kz.services.activity import ActivityWriter
+
+
+@pytest_asyncio.fixture
+async def session_maker():
+    """Set up a clean database."""
+    engine = get_async_engine()
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    yield get_async_session_maker()
+    await engine.dispose()
+
+
+async def _partitions(session_maker):
+    async with session_maker() as session:
+        result = await session.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = 'activity_log'::regclass ORDER BY 1"
+            )
+        )
+        return list(result.scalars())
+
+
+@pytest.mark.asyncio
+async def test_task_writes_reach_the_log_in_batches(session_maker):
+    """Test that repository writes are buffered, then flushed on size and on close."""
+    buffer = ActivityBuffer(batch_size=3)
+    writer = ActivityWriter(session_maker, buffer, flush_interval=60)
+    writer.start()
+    async with session_maker() as session:
+        repo = TaskRepository(session, activity=buffer)
+        a, b = await repo.create_many(
+            [TaskCreate(raw_input=name) for name in "ab"], titles=["a", "b"]
+        )
+        await repo.move(a.id, TaskMove(energy_column=EnergyColumn.HYPERFOCUS))
+        # The third entry fills a batch: written without waiting for the interval
+        for _ in range(100):
+            if not buffer:
+                break
+            await asyncio.sleep(0.02)
+        assert writer.written == 3
+
+        await repo.bulk([TaskBulkOperation(action=BulkAction.SHIP, ids=[a.id, b.id])])
+        await repo.delete(b.id)
+        assert len(buffer) == 3
+    await writer.aclose()
+    assert (len(buffer), writer.written) == (0, 6)
+
+    async with session_maker() as session:
+        history = await ActivityRepository(session).list_for_task(a.id, limit=10)
+    assert [entry.action for entry in history] == [
+        ActivityAction.SHIPPED,
+        ActivityAction.MOVED,
+        ActivityAction.CREATED,
+    ]
+    assert history[1].details == {"energy_column": "hyperfocus"}
+    assert await _partitions(session_maker) == [partition_name(month_of(datetime.now(UTC)))]
+
+
+@pytest.mark.asyncio
+async def test_retention_drops_whole_months(session_maker):
+    """Test that old months go by partition, and a failed batch is kept for a retry."""
+    buffer = ActivityBuffer()
+    writer = ActivityWriter(session_maker, buffer)
+    task_id = uuid4()
+    for month in (date(2026, 1, 1), date(2026, 2, 1), date(2026, 3, 1)):
+        buffer.record(ActivityAction.CREATED, [task_id], actor=Actor.AGENT)
+        buffer._entries[-1]["created_at"] = datetime.combine(month, datetime.min.time(), UTC)
+    assert await writer.flush() == 3
+
+    async with session_maker() as session:
+        repo = ActivityRepository(session)
+        dropped = await repo.drop_partitions_before(date(2026, 3, 1))
+        assert dropped == ["activity_log_y2026m01", "activity_log_y2026m02"]
+        assert len(await repo.list_for_task(task_id, limit=10)) == 1
+
+    # The writer still thinks January exists: the batch fails, then lands
+    buffer.record(ActivityAction.UPDATED, [task_id])
+    buffer._entries[-1]["created_at"] = datetime(2026, 1, 15, tzinfo=UTC)
+    assert await writer.flush() == 0
+    assert (len(buffer), writer.failures) == (1, 1)
+    assert await writer.flush() == 1
+    assert "activity_log_y2026m01" in await _partitions(session_maker)
+
+
+def test_buffer_drops_oldest_when_full():
+    """Test that a full buffer keeps the newest entries and counts the rest."""
+    buffer = ActivityBuffer(max_entries=3)
+    ids = [uuid4() for _ in range(5)]
+    buffer.record(ActivityAction.CREATED, ids)
+    assert buffer.dropped == 2
+    taken = buffer.take(2)
+    assert [entry["task_id"] for entry in taken] == ids[2:4]
+
+    buffer.record(ActivityAction.SHIPPED, ids[:1])
+    buffer.put_back(taken)
+    assert [entry["task_id"] for entry in buffer.take(10)] == [ids[3], ids[4], ids[0]]
+    assert buffer.dropped == 3
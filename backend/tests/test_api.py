@@ -1,11 +1,21 @@
+import json
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock
+from uuid import UUID, uuid4
+
 import pytest
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
-from sqlalchemy import text
+from sqlalchemy import select, text, update
 
+from backend.kz.config import get_settings
 from backend.kz.db.database import get_async_engine, get_async_session_maker
-from backend.kz.main import app
-from backend.kz.models import Base
+from backend.kz.api.tasks import get_task_parser
+from backend.kz.main import app, create_app, lifespan
+from backend.kz.models import Base, EnergyColumn, Task, TaskTag
+from backend.kz.repositories import ParseJobRepository
+from backend.kz.repositories.task import ChangeCursor
+from backend.kz.services.parser import ParsedTask
 
 
 @pytest_asyncio.fixture
@@ -65,6 +75,83 @@ async def test_list_tasks(client):
     assert len(data) >= 1
 
 
+@pytest.mark.asyncio
+async def test_list_tasks_by_tag(client):
+    """Test that parsed tags are stored and filter the listing."""
+    parser = AsyncMock()
+    parser.parse_many.return_value = [
+        ParsedTask(
+            title="Fix login",
+            energy=EnergyColumn.QUICK_WIN,
+            tags=["auth", "bug"],
+            tag_confidence={"auth": 0.8},
+        ),
+        ParsedTask(title="Write docs", energy=EnergyColumn.LOW_ENERGY, tags=["docs"]),
+        ParsedTask(title="Rotate keys", energy=EnergyColumn.HYPERFOCUS, tags=["auth"]),
+    ]
+    app.dependency_overrides[get_task_parser] = lambda: parser
+    try:
+        response = await client.post(
+            "/api/tasks/batch", json={"raw_inputs": ["fix login", "write docs", "rotate keys"]}
+        )
+    finally:
+        del app.dependency_overrides[get_task_parser]
+    assert response.status_code == 201
+    async with get_async_session_maker()() as session:
+        links = await session.execute(select(TaskTag.task_id, TaskTag.confidence))
+        confidences = sorted(c for _, c in links if c is not None)
+    # The model's confidence is stored per tag; tags it gave none for stay NULL
+    assert confidences == [0.8]
+
+    auth = await client.get("/api/tasks", params={"tag": "auth"})
+    assert sorted(t["title"] for t in auth.json()) == ["Fix login", "Rotate keys"]
+    in_column = await client.get("/api/tasks", params={"tag": "auth", "column": "quick_win"})
+    assert [t["title"] for t in in_column.json()] == ["Fix login"]
+    assert (await client.get("/api/tasks", params={"tag": "nope"})).json() == []
+    # The filter is part of the listing's ETag
+    assert auth.headers["ETag"] != (await client.get("/api/tasks")).headers["ETag"]
+
+
+@pytest.mark.asyncio
+async def test_list_tasks_serializes_like_task_read(client):
+    """Test listings serialized from rows match the TaskRead form of each task."""
+    ids = [
+        (await client.post("/api/tasks", json={"raw_input": name})).json()["id"]
+        for name in ["one", "two"]
+    ]
+    await client.post(f"/api/tasks/{ids[1]}/ship")
+    singles = {i: (await client.get(f"/api/tasks/{i}")).content for i in ids}
+
+    listed = await client.get("/api/tasks", params={"column": "shipped"})
+    changes = await client.get("/api/tasks/changes")
+
+    assert listed.headers["content-type"] == "application/json"
+    assert listed.content == b"[" + singles[ids[1]] + b"]"
+    assert sorted(changes.json()["changed"], key=lambda t: t["id"]) == sorted(
+        [json.loads(task) for task in singles.values()], key=lambda t: t["id"]
+    )
+
+
+@pytest.mark.asyncio
+async def test_list_tasks_paginates_with_cursor(client, monkeypatch):
+    """Test keyset paging through GET /api/tasks via the next-cursor header."""
+    monkeypatch.setattr(get_settings(), "parse_mode", "deferred")
+    await client.post("/api/tasks/batch", json={"raw_inputs": [f"task {i}" for i in range(5)]})
+
+    first = await client.get("/api/tasks", params={"limit": 3})
+    assert len(first.json()) == 3
+    cursor = first.headers["X-Next-Cursor"]
+
+    second = await client.get("/api/tasks", params={"limit": 3, "cursor": cursor})
+    assert len(second.json()) == 2
+    assert "X-Next-Cursor" not in second.headers
+    ids = [t["id"] for t in first.json() + second.json()]
+    assert len(set(ids)) == 5
+
+    bad = await client.get("/api/tasks", params={"cursor": "not-a-cursor"})
+    assert bad.status_code == 400
+
+
 @pytest.mark.asyncio
 async def test_ship_task(client):
     """Test shipping a task."""
@@ -81,3 +168,486 @@ async def test_ship_task(client):
     data = response.json()
     assert data["energy_column"] == "shipped"
     assert data["shipped_at"] is not None
+    assert data["stats"] == {"today": 1, "streak": 1, "all_time": 1}
+
+    # Shipping again does not count twice
+    await client.post(f"/api/tasks/{task_id}/ship")
+    stats = await client.get("/api/stats")
+    assert stats.json() == {"today": 1, "streak": 1, "all_time": 1}
+
+
+@pytest.mark.asyncio
+async def test_create_task_deferred(client, monkeypatch):
+    """Test deferred parse mode stores the task without waiting on the parser."""
+    monkeypatch.setattr(get_settings(), "parse_mode", "deferred")
+
+    response = await client.post(
+        "/api/tasks",
+        json={"raw_input": "fix the auth bug thats been bothering me"},
+    )
+    assert response.status_code == 201
+    data = response.json()
+    assert data["title"] == "fix the auth bug thats been bothering me"
+    assert data["parse_status"] == "pending"
+
+    async with get_async_session_maker()() as session:
+        assert await ParseJobRepository(session).count_pending() == 1
+
+
+@pytest.mark.asyncio
+async def test_create_tasks_batch(client, monkeypatch):
+    """Test batch capture stores every input in order with one request."""
+    monkeypatch.setattr(get_settings(), "parse_mode", "deferred")
+
+    raw_inputs = [f"brain dump item {i}" for i in range(30)]
+    response = await client.post("/api/tasks/batch", json={"raw_inputs": raw_inputs})
+    assert response.status_code == 201
+    data = response.json()
+    assert [t["raw_input"] for t in data] == raw_inputs
+
+    async with get_async_session_maker()() as session:
+        assert await ParseJobRepository(session).count_pending() == 30
+
+
+@pytest.mark.asyncio
+async def test_create_tasks_batch_is_idempotent_with_key(client, monkeypatch):
+    """Test a batch retried with the same Idempotency-Key creates its tasks once."""
+    monkeypatch.setattr(get_settings(), "parse_mode", "deferred")
+    body = {"raw_inputs": ["call the dentist", "book flights"]}
+    headers = {"Idempotency-Key": "offline-1"}
+
+    first = await client.post("/api/tasks/batch", json=body, headers=headers)
+    again = await client.post("/api/tasks/batch", json=body, headers=headers)
+    other = await client.post("/api/tasks/batch", json=body)
+
+    assert first.status_code == again.status_code == 201
+    assert [t["id"] for t in again.json()] == [t["id"] for t in first.json()]
+    assert len({t["id"] for t in first.json() + other.json()}) == 4
+    async with get_async_session_maker()() as session:
+        assert await ParseJobRepository(session).count_pending() == 4
+
+
+@pytest.mark.asyncio
+async def test_create_tasks_batch_rejects_empty(client):
+    """Test that an empty batch is a validation error."""
+    response = await client.post("/api/tasks/batch", json={"raw_inputs": []})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_health_reports_parse_cache(client):
+    """Test that parse cache hit-rate stats are exposed on /health."""
+    response = await client.get("/health")
+    cache = response.json()["parser"]["cache"]
+    assert {"hit_rate", "llm_calls_saved", "usd_saved"} <= cache.keys()
+
+
+@pytest.mark.asyncio
+async def test_health_reports_parser_breaker(client):
+    """Test that circuit breaker state is exposed on /health."""
+    response = await client.get("/health")
+    parser = response.json()["parser"]
+    assert parser["breaker"]["state"] == "closed"
+    assert parser["max_concurrency"] == get_settings().anthropic_max_concurrency
+
+
+@pytest.mark.asyncio
+async def test_task_endpoints_accept_id_prefix(client):
+    """Test short-ID resolution, including ambiguity and bad input."""
+    created = await client.post("/api/tasks", json={"raw_input": "ship me"})
+    task_id = created.json()["id"]
+
+    response = await client.post(f"/api/tasks/{task_id[:6]}/ship")
+    assert response.status_code == 200
+    assert response.json()["id"] == task_id
+
+    assert (await client.get("/api/tasks/zzzz")).status_code == 422
+    missing = "0000" if not task_id.startswith("0000") else "ffff"
+    assert (await client.get(f"/api/tasks/{missing}")).status_code == 404
+
+    async with get_async_session_maker()() as session:
+        for suffix in ("1", "2"):
+            session.add(
+                Task(
+                    id=UUID(f"3f2a{suffix}000-0000-0000-0000-000000000000"),
+                    title="dup",
+                    raw_input="dup",
+                )
+            )
+        await session.commit()
+
+    ambiguous = await client.get("/api/tasks/3f2a")
+    assert ambiguous.status_code == 409
+    assert len(ambiguous.json()["detail"]["matches"]) == 2
+    assert (await client.get("/api/tasks/3f2a1")).json()["title"] == "dup"
+
+
+@pytest.mark.asyncio
+async def test_search_tasks(client):
+    """Test semantic search returns the closest task first."""
+    for raw_input in ["fix the auth bug in login", "buy groceries", "call mom"]:
+        await client.post("/api/tasks", json={"raw_input": raw_input})
+
+    response = await client.post("/api/tasks/search", json={"query": "authentication bug"})
+    assert response.status_code == 200
+    results = response.json()
+    assert results[0]["raw_input"] == "fix the auth bug in login"
+    assert results[0]["score"] > results[-1]["score"]
+    assert "embedding" not in results[0]
+
+
+@pytest.mark.asyncio
+async def test_list_tasks_conditional_get(client):
+    """Test that an unchanged board answers If-None-Match with 304."""
+    await client.post("/api/tasks", json={"raw_input": "quick one", "energy_column": "quick_win"})
+    await client.post(
+        "/api/tasks", json={"raw_input": "deep one", "energy_column": "hyperfocus"}
+    )
+
+    response = await client.get("/api/tasks")
+    etag = response.headers["etag"]
+    column_etag = (await client.get("/api/tasks?column=hyperfocus")).headers["etag"]
+    assert response.headers["cache-control"] == "no-cache"
+
+    response = await client.get("/api/tasks", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+
+    # A change in another column leaves this column's listing valid
+    quick = (await client.get("/api/tasks?column=quick_win")).json()[0]
+    await client.patch(f"/api/tasks/{quick['id']}", json={"title": "Renamed"})
+    response = await client.get(
+        "/api/tasks?column=hyperfocus", headers={"If-None-Match": column_etag}
+    )
+    assert response.status_code == 304
+    response = await client.get("/api/tasks", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+    # Shipping moves the task out of the active board
+    etag = response.headers["etag"]
+    await client.post(f"/api/tasks/{quick['id']}/ship")
+    response = await client.get("/api/tasks", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert [t["raw_input"] for t in response.json()] == ["deep one"]
+
+
+@pytest.mark.asyncio
+async def test_get_task_conditional_and_if_match(client):
+    """Test task ETags for revalidation and optimistic concurrency."""
+    task = (await client.post("/api/tasks", json={"raw_input": "edit me"})).json()
+    url = f"/api/tasks/{task['id']}"
+
+    response = await client.get(url)
+    etag = response.headers["etag"]
+    response = await client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    response = await client.patch(url, json={"title": "Mine"}, headers={"If-Match": etag})
+    assert response.status_code == 200
+    new_etag = response.headers["etag"]
+    assert new_etag != etag
+
+    # A second writer holding the old ETag is refused and changes nothing
+    response = await client.patch(url, json={"title": "Theirs"}, headers={"If-Match": etag})
+    assert response.status_code == 412
+    response = await client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["title"] == "Mine"
+    assert response.headers["etag"] == new_etag
+
+    response = await client.patch(url, json={"title": "Any"}, headers={"If-Match": "*"})
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_ship_if_match(client):
+    """Test that a ship made against an old version of the task is refused."""
+    task = (await client.post("/api/tasks", json={"raw_input": "ship me"})).json()
+    url = f"/api/tasks/{task['id']}"
+    etag = (await client.get(url)).headers["etag"]
+    await client.patch(url, json={"title": "Renamed"})
+
+    response = await client.post(f"{url}/ship", headers={"If-Match": etag})
+    assert response.status_code == 412
+    assert (await client.get(url)).json()["energy_column"] != "shipped"
+
+    etag = (await client.get(url)).headers["etag"]
+    response = await client.post(f"{url}/ship", headers={"If-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["energy_column"] == "shipped"
+    assert response.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_bulk_operations(client):
+    """Test many tasks read, moved, shipped and deleted in one request."""
+    a, b, c, d = [
+        (await client.post("/api/tasks", json={"raw_input": name})).json()["id"]
+        for name in "abcd"
+    ]
+    nowhere = str(uuid4())
+
+    response = await client.post(
+        "/api/tasks/bulk",
+        json={
+            "operations": [
+                {"action": "get", "ids": [a, nowhere]},
+                {"action": "move", "ids": [c, b], "energy_column": "hyperfocus"},
+                {"action": "ship", "ids": [a]},
+                {"action": "delete", "ids": [d, nowhere]},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    got, moved, shipped, deleted = response.json()
+    assert [t["id"] for t in got["tasks"]] == [a] and got["missing"] == [nowhere]
+    assert [(t["id"], t["energy_column"]) for t in moved["tasks"]] == [
+        (c, "hyperfocus"),
+        (b, "hyperfocus"),
+    ]
+    assert moved["tasks"][0]["position"] < moved["tasks"][1]["position"]
+    assert shipped["tasks"][0]["shipped_at"] is not None
+    assert deleted["deleted"] == [d] and deleted["missing"] == [nowhere]
+
+    assert (await client.get(f"/api/tasks/{a}")).json()["energy_column"] == "shipped"
+    assert (await client.get(f"/api/tasks/{d}")).status_code == 404
+
+    response = await client.post(
+        "/api/tasks/bulk", json={"operations": [{"action": "move", "ids": [a]}]}
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_move_task_between_neighbours(client):
+    """Test drag and drop: a task moved between two cards lands between them."""
+    a, b, c = [
+        (await client.post("/api/tasks", json={"raw_input": name})).json()["id"]
+        for name in "abc"
+    ]
+    board = [t["id"] for t in (await client.get("/api/tasks")).json()]
+    assert board == [c, b, a]  # newest on top
+
+    response = await client.post(f"/api/tasks/{a[:8]}/move", json={"before": c, "after": b})
+    assert response.status_code == 200
+    assert "etag" in response.headers
+    assert [t["id"] for t in (await client.get("/api/tasks")).json()] == [c, a, b]
+
+    response = await client.post(
+        f"/api/tasks/{c}/move", json={"energy_column": "low_energy"}
+    )
+    assert response.json()["energy_column"] == "low_energy"
+
+    # The client's view is stale: c is no longer above a
+    response = await client.post(f"/api/tasks/{b}/move", json={"before": c, "after": a})
+    assert response.status_code == 409
+    response = await client.post(f"/api/tasks/{b}/move", json={"before": b})
+    assert response.status_code == 422
+    response = await client.post(f"/api/tasks/{uuid4()}/move", json={})
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_changes_delta_sync(client):
+    """Test that delta sync returns only what changed, including deletions."""
+    ids = []
+    for raw_input in ["one", "two", "three"]:
+        ids.append((await client.post("/api/tasks", json={"raw_input": raw_input})).json()["id"])
+
+    # Initial sync, paged
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"since": cursor} if cursor else {})}
+        page = (await client.get("/api/tasks/changes", params=params)).json()
+        seen += [t["id"] for t in page["changed"]]
+        cursor = page["cursor"]
+        if not page["has_more"]:
+            break
+    assert sorted(seen) == sorted(ids)
+
+    await client.patch(f"/api/tasks/{ids[0]}", json={"title": "One!"})
+    await client.delete(f"/api/tasks/{ids[1]}")
+
+    page = (await client.get("/api/tasks/changes", params={"since": cursor})).json()
+    assert [t["id"] for t in page["changed"]] == [ids[0]]
+    assert page["deleted"] == [ids[1]]
+    assert page["has_more"] is False
+
+    page = (await client.get("/api/tasks/changes", params={"since": page["cursor"]})).json()
+    assert page["changed"] == [] and page["deleted"] == []
+
+
+@pytest.mark.asyncio
+async def test_changes_rejects_bad_and_expired_cursors(client):
+    """Test that unusable sync cursors are refused."""
+    response = await client.get("/api/tasks/changes", params={"since": "nope"})
+    assert response.status_code == 400
+
+    expired = ChangeCursor(0, datetime.now(UTC) - timedelta(days=365)).encode()
+    response = await client.get("/api/tasks/changes", params={"since": expired})
+    assert response.status_code == 410
+
+
+@pytest.mark.asyncio
+async def test_analytics_endpoints(client):
+    """Test cycle time, throughput and heatmap over rolled-up and live days."""
+    ids = []
+    for raw_input in ("old ship", "new ship"):
+        created = await client.post("/api/tasks", json={"raw_input": raw_input})
+        ids.append(created.json()["id"])
+        await client.post(f"/api/tasks/{ids[-1]}/ship")
+    async with get_async_session_maker()() as session:
+        await session.execute(
+            update(Task)
+            .where(Task.id == UUID(ids[0]))
+            .values(shipped_at=Task.shipped_at - timedelta(days=8))
+        )
+        await session.commit()
+
+    response = await client.get("/api/analytics/cycle-time", params={"days": 30})
+    assert response.status_code == 200
+    report = response.json()
+    assert report["days"] == 30
+    assert report["overall"]["shipped"] == 2
+    assert sum(column["shipped"] for column in report["by_column"].values()) == 2
+    recent = await client.get("/api/analytics/cycle-time", params={"days": 7})
+    assert recent.json()["overall"]["shipped"] == 1
+
+    response = await client.get("/api/analytics/heatmap", params={"days": 9})
+    heatmap = response.json()
+    assert [day["shipped"] for day in heatmap] == [1] + [0] * 7 + [1]
+    assert heatmap[-1]["day"] == datetime.now(UTC).date().isoformat()
+
+    response = await client.get("/api/analytics/throughput", params={"weeks": 3})
+    weeks = response.json()
+    assert len(weeks) == 3
+    assert sum(week["shipped"] for week in weeks) == 2
+    assert weeks[-1]["shipped"] >= 1
+
+    response = await client.get("/api/analytics/cycle-time", params={"days": 0})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_shipped_history_pages_by_ship_time(client):
+    """Test the wins history, newest ship first, one page at a time."""
+    ids = []
+    for i in range(3):
+        created = await client.post("/api/tasks", json={"raw_input": f"win {i}"})
+        ids.append(created.json()["id"])
+        await client.post(f"/api/tasks/{ids[-1]}/ship")
+
+    response = await client.get("/api/tasks/history", params={"limit": 2})
+    assert response.status_code == 200
+    first = [task["id"] for task in response.json()]
+    cursor = response.headers["X-Next-Cursor"]
+    response = await client.get("/api/tasks/history", params={"limit": 2, "cursor": cursor})
+    assert "X-Next-Cursor" not in response.headers
+    assert first + [task["id"] for task in response.json()] == ids[::-1]
+
+    response = await client.get("/api/tasks/history", params={"cursor": "nope"})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_task_activity_lists_own_changes(client):
+    """Test that a task's activity includes the caller's writes, newest first."""
+    created = await client.post("/api/tasks", json={"raw_input": "log me"})
+    task_id = created.json()["id"]
+    await client.patch(f"/api/tasks/{task_id}", json={"title": "Logged"})
+    await client.post(f"/api/tasks/{task_id}/ship")
+
+    response = await client.get(f"/api/tasks/{task_id}/activity")
+    assert response.status_code == 200
+    entries = response.json()
+    assert [entry["action"] for entry in entries] == ["shipped", "updated", "created"]
+    assert entries[1]["details"] == {"fields": ["title"]}
+    assert {entry["task_id"] for entry in entries} == {task_id}
+
+
+@pytest.mark.asyncio
+async def test_task_graph_endpoints(client):
+    """Test relating tasks by ID prefix, walking the graph and listing blocked tasks."""
+    ids = {}
+    for name in ["design", "build", "launch", "follow up"]:
+        created = await client.post("/api/tasks", json={"raw_input": name})
+        ids[name] = created.json()["id"]
+
+    for from_name, to_name, edge_type in [
+        ("design", "build", "blocks"),
+        ("launch", "build", "depends_on"),
+        ("follow up", "launch", "spawned_from"),
+    ]:
+        response = await client.post(
+            f"/api/tasks/{ids[from_name][:8]}/edges",
+            json={"to_task": ids[to_name][:8], "edge_type": edge_type},
+        )
+        assert response.status_code == 201
+        assert response.json()["to_task_id"] == ids[to_name]
+
+    cycle = await client.post(
+        f"/api/tasks/{ids['launch']}/edges", json={"to_task": ids["design"], "edge_type": "blocks"}
+    )
+    assert cycle.status_code == 409
+    self_edge = await client.post(
+        f"/api/tasks/{ids['launch']}/edges", json={"to_task": ids["launch"], "edge_type": "related"}
+    )
+    assert self_edge.status_code == 422
+
+    blockers = (await client.get(f"/api/tasks/{ids['launch']}/blockers")).json()
+    assert [(task["raw_input"], task["depth"]) for task in blockers] == [
+        ("build", 1),
+        ("design", 2),
+    ]
+    assert blockers[1]["via"] == ids["build"]
+    impact = (await client.get(f"/api/tasks/{ids['design']}/impact?depth=1")).json()
+    assert [task["raw_input"] for task in impact] == ["build"]
+    lineage = (await client.get(f"/api/tasks/{ids['follow up']}/lineage")).json()
+    assert [task["raw_input"] for task in lineage["ancestors"]] == ["launch"]
+    assert lineage["descendants"] == []
+
+    blocked = (await client.get("/api/tasks/blocked")).json()
+    assert {task["raw_input"]: task["blocked_by"] for task in blocked} == {
+        "build": [ids["design"]],
+        "launch": [ids["build"]],
+    }
+    await client.post(f"/api/tasks/{ids['design']}/ship")
+    blocked = (await client.get("/api/tasks/blocked")).json()
+    assert [task["raw_input"] for task in blocked] == ["launch"]
+
+    edges = (await client.get(f"/api/tasks/{ids['build']}/edges")).json()
+    assert len(edges) == 2
+    response = await client.delete(f"/api/tasks/{ids['build']}/edges/{edges[1]['id']}")
+    assert response.status_code == 204
+    assert (await client.get("/api/tasks/blocked")).json() == []
+    response = await client.delete(f"/api/tasks/{ids['build']}/edges/{edges[1]['id']}")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_health_does_not_start_background_services(setup_db):
+    """Test that /health reports services the lifespan did not start without starting them."""
+    fresh = create_app()
+    async with AsyncClient(transport=ASGITransport(app=fresh), base_url="http://test") as ac:
+        response = await ac.get("/health")
+    assert response.status_code == 200
+    assert response.json()["events"] == {"status": "not started"}
+    assert response.json()["activity"] == {"status": "not started"}
+    assert getattr(fresh.state, "events", None) is None
+    assert getattr(fresh.state, "activity", None) is None
+
+
+@pytest.mark.asyncio
+async def test_shutdown_closes_every_service_despite_failures(setup_db):
+    """Test that one service failing to close does not keep the others open."""
+    fresh = create_app()
+    async with lifespan(fresh):
+        await fresh.state.activity.aclose()
+        fresh.state.activity = AsyncMock()
+        fresh.state.activity.aclose.side_effect = OSError("database went away")
+        events, parser = fresh.state.events, fresh.state.parser
+    fresh.state.activity.aclose.assert_awaited_once()
+    assert events._tasks == []
+    assert parser.client.is_closed()
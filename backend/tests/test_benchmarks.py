@@ -0,0 +1,118 @@
+import random
+import statistics
+import time
+
+import pytest
+import pytest_asyncio
+from pydantic import TypeAdapter
+from sqlalchemy import func, insert, literal_column, select, text
+from sqlalchemy.orm import undefer
+
+from backend.kz.api.responses import TASK_ROWS, task_rows
+from backend.kz.db.database import get_async_engine, get_async_session_maker
+from backend.kz.models import Base, Task, TaskRead
+from backend.kz.repositories.task import READ_COLUMNS, TaskRepository
+
+ROWS = 1000
+RUNS = 5
+
+
+@pytest_asyncio.fixture
+async def populated_session():
+    """Set up a clean database with ROWS embedded tasks."""
+    engine = get_async_engine()
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    rng = random.Random(0)
+    async with get_async_session_maker()() as session:
+        await session.execute(
+            insert(Task),
+            [
+                {
+                    "title": f"Task {i}",
+                    "raw_input": f"task number {i}",
+                    "embedding": [rng.random() for _ in range(1536)],
+                }
+                for i in range(ROWS)
+            ],
+        )
+        await session.commit()
+        yield session
+
+    await engine.dispose()
+
+
+async def _median_ms(session, query) -> float:
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        (await session.execute(query)).all()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+@pytest.mark.asyncio
+async def test_board_reads_skip_embedding(populated_session):
+    """Benchmark board reads with and without the embedding column.
+
+    Run with ``-s`` to see the numbers.
+    """
+    session = populated_session
+
+    full_bytes = await session.scalar(
+        select(func.avg(func.pg_column_size(literal_column("task.*")))).select_from(Task)
+    )
+    read_bytes = await session.scalar(
+        select(func.avg(func.pg_column_size(func.row(*READ_COLUMNS))))
+    )
+    full_ms = await _median_ms(session, select(Task).options(undefer(Task.embedding)))
+    read_ms = await _median_ms(session, select(*READ_COLUMNS))
+
+    print(
+        f"\n{ROWS} rows: full row {full_bytes:.0f} B, {full_ms:.1f} ms; "
+        f"TaskRead columns {read_bytes:.0f} B, {read_ms:.1f} ms"
+    )
+    # Timings are only printed: wall clock is too noisy to assert on
+    assert full_bytes > 10 * read_bytes
+
+    # The repository's read paths never touch the embedding
+    tasks = await TaskRepository(session).list_active()
+    assert len(tasks) == ROWS
+    assert "embedding" not in tasks[0]._fields
+
+
+def _rows_per_second(serialize, rows) -> float:
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        serialize(rows)
+        timings.append(time.perf_counter() - start)
+    return len(rows) / statistics.median(timings)
+
+
+@pytest.mark.asyncio
+async def test_listing_serializes_rows_directly(populated_session):
+    """Benchmark serializing a board listing from rows, against via TaskRead.
+
+    Run with ``-s`` to see the numbers.
+    """
+    rows = await TaskRepository(populated_session).list_active()
+    response_field = TypeAdapter(list[TaskRead])
+
+    def via_models(rows):
+        # What returning models costs: model_validate, then FastAPI
+        # validating the response against response_model and dumping it
+        tasks = [TaskRead.model_validate(row) for row in rows]
+        return response_field.dump_json(response_field.validate_python(tasks))
+
+    def from_rows(rows):
+        return TASK_ROWS.dump_json(task_rows(rows))
+
+    assert from_rows(rows) == via_models(rows)
+    before = _rows_per_second(via_models, rows)
+    after = _rows_per_second(from_rows, rows)
+
+    print(f"\n{ROWS} rows: via TaskRead {before:,.0f} rows/s; from rows {after:,.0f} rows/s")
@@ -0,0 +1,137 @@
+import asyncio
+import json
+
+import asyncpg
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+
+from backend.kz.api.tasks import event_stream
+from backend.kz.config import get_settings
+from backend.kz.db.database import get_async_engine, get_async_session_maker
+from backend.kz.models import Base, TaskCreate, TaskUpdate
+from backend.kz.repositories.task import TaskRepository
+from backend.kz.services import events
+from backend.kz.services.events import EventType, TaskEventBroker
+
+
+@pytest_asyncio.fixture
+async def broker():
+    """Set up a clean database and a listening change feed broker."""
+    engine = get_async_engine()
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    broker = TaskEventBroker.from_database_url(
+        get_settings().database_url, get_async_session_maker()
+    )
+    broker.start()
+    for _ in range(100):
+        if broker.connected:
+            break
+        await asyncio.sleep(0.05)
+    yield broker
+
+    await broker.aclose()
+    await engine.dispose()
+
+
+async def _next_events(subscription, n):
+    events = []
+    while len(events) < n:
+        event = await subscription.get(timeout=5)
+        assert event is not None, f"timed out after {events}"
+        events.append(event)
+    return events
+
+
+@pytest.mark.asyncio
+async def test_repository_writes_reach_subscribers(broker):
+    """Test that committed task changes are pushed to every subscriber."""
+    first, second = broker.subscribe(), broker.subscribe()
+
+    async with get_async_session_maker()() as session:
+        repo = TaskRepository(session)
+        task = await repo.create(TaskCreate(raw_input="stream me"), title="Stream me")
+        await repo.set_embeddings([(task.id, [0.1] * 1536)])
+        await repo.update(task.id, TaskUpdate(title="Streamed"))
+        await repo.ship(task.id)
+        await repo.delete(task.id)
+
+    events = await _next_events(first, 4)
+    assert [e.type for e in events] == [
+        EventType.CREATED,
+        EventType.UPDATED,
+        EventType.SHIPPED,
+        EventType.DELETED,
+    ]
+    assert json.loads(events[0].data)["id"] == str(task.id)
+    assert json.loads(events[3].data) == {"id": str(task.id)}
+    # The embedding write is not a visible change
+    assert await first.get(timeout=0.2) is None
+    assert [e.id for e in await _next_events(second, 4)] == [e.id for e in events]
+
+
+def test_resume_replays_missed_events_or_resets():
+    """Test Last-Event-ID resume from the buffer, and reset when it cannot."""
+    broker = TaskEventBroker("postgresql://unused", get_async_session_maker(), buffer_size=3)
+    events = [broker.publish(EventType.UPDATED, "{}") for _ in range(5)]
+
+    resumed = broker.subscribe(last_event_id=events[1].id)
+    assert list(resumed.backlog) == events[2:]
+
+    for stale in [events[0].id, "0000-1", "garbage"]:
+        [reset] = broker.subscribe(last_event_id=stale).backlog
+        assert reset.type is EventType.RESET
+        assert reset.id == events[-1].id
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_is_evicted_and_stream_ends():
+    """Test that a full subscriber queue evicts it without affecting others."""
+    broker = TaskEventBroker("postgresql://unused", get_async_session_maker(), queue_size=2)
+    slow, fast = broker.subscribe(), broker.subscribe()
+
+    for i in range(3):
+        broker.publish(EventType.UPDATED, "{}")
+        await fast.get(timeout=1)
+
+    assert slow.evicted and not fast.evicted
+    assert broker.snapshot()["subscribers"] == 1
+    chunks = [chunk async for chunk in event_stream(broker, slow, keepalive=0.1)]
+    assert [c.split("\n")[0] for c in chunks] == [
+        f"id: {broker.epoch}-1",
+        f"id: {broker.epoch}-2",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_broker_relistens_after_listen_fails(monkeypatch):
+    """Test that an error setting up LISTEN is retried rather than ending the feed."""
+    monkeypatch.setattr(events, "RECONNECT_DELAY_SECONDS", 0.01)
+    add_listener = asyncpg.Connection.add_listener
+    calls = 0
+
+    async def flaky_add_listener(self, channel, callback):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise asyncpg.PostgresError("listen failed")
+        await add_listener(self, channel, callback)
+
+    monkeypatch.setattr(asyncpg.Connection, "add_listener", flaky_add_listener)
+    broker = TaskEventBroker.from_database_url(
+        get_settings().database_url, get_async_session_maker()
+    )
+    broker.start()
+    try:
+        for _ in range(100):
+            if broker.connected:
+                break
+            await asyncio.sleep(0.05)
+        assert broker.connected
+        assert calls == 2
+    finally:
+        await broker.aclose()
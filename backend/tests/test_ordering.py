@@ -0,0 +1,52 @@
+import random
+
+import pytest
+
+from backend.kz.ordering import FIRST_KEY, key_between, keys_between
+
+
+def test_key_between_ends_and_gaps():
+    """Test keys for empty columns, both ends, and between neighbours."""
+    assert key_between(None, None) == FIRST_KEY
+    assert key_between(FIRST_KEY, None) == "a1"
+    assert key_between(None, FIRST_KEY) == "Zz"
+    assert key_between("az", None) == "b00"
+    assert key_between("a0", "a1") == "a0V"
+    assert "a0" < key_between("a0", "a0V") < "a0V"
+
+
+def test_key_between_rejects_bad_keys():
+    """Test malformed or misordered neighbours are refused."""
+    for before, after in [("a1", "a0"), ("a0", "a0"), ("a0V0", None), ("?", None), ("b0", None)]:
+        with pytest.raises(ValueError):
+            key_between(before, after)
+
+
+def test_random_inserts_stay_ordered_and_short():
+    """Test many inserts at random places keep keys distinct, sorted and short."""
+    rng = random.Random(0)
+    keys: list[str] = []
+    for _ in range(5000):
+        i = rng.randint(0, len(keys))
+        keys.insert(i, key_between(keys[i - 1] if i else None, keys[i] if i < len(keys) else None))
+    assert keys == sorted(keys)
+    assert len(set(keys)) == len(keys)
+    assert max(len(key) for key in keys) <= 8
+
+
+def test_prepending_grows_keys_logarithmically():
+    """Test new tasks stacked on top of a column keep short keys."""
+    key = None
+    for _ in range(10_000):
+        key = key_between(None, key)
+    assert len(key) <= 4
+
+
+def test_keys_between():
+    """Test a run of keys fits between neighbours, in order."""
+    assert keys_between(None, None, 3) == ["a0", "a1", "a2"]
+    assert keys_between("a0", "a1", 0) == []
+    keys = keys_between("a0", "a1", 50)
+    assert keys == sorted(set(keys)) and "a0" < keys[0] and keys[-1] < "a1"
+    keys = keys_between(None, "a0", 5)
+    assert keys == sorted(set(keys)) and keys[-1] < "a0"
@@ -1,10 +1,47 @@
+from datetime import timedelta
+from uuid import uuid4
+
 import pytest
 import pytest_asyncio
-from sqlalchemy import text
+from sqlalchemy import delete, func, select, text, update
 
 from backend.kz.db.database import get_async_engine, get_async_session_maker
-from backend.kz.models import Base, EnergyColumn, TaskCreate
-from backend.kz.repositories.task import TaskRepository
+from backend.kz.models import (
+    Base,
+    BulkAction,
+    EdgeType,
+    EnergyColumn,
+    EnergySource,
+    IdempotencyKey,
+    ParseStatus,
+    ShipStats,
+    Tag,
+    Task,
+    TaskArchive,
+    TaskBulkOperation,
+    TaskCreate,
+    TaskEdge,
+    TaskEdgeCreate,
+    TaskMove,
+    TaskTag,
+    TaskTombstone,
+    TaskUpdate,
+)
+from backend.kz.repositories.analytics import AnalyticsRepository, utc_today
+from backend.kz.repositories.edge import BlockerCache, EdgeCycleError, EdgeRepository
+from backend.kz.repositories.parse_cache import ParseCacheRepository
+from backend.kz.repositories.parse_job import ParseJobRepository
+from backend.kz.repositories.stats import StatsRepository
+from backend.kz.repositories.tag import TagCache, TagRepository
+from backend.kz.repositories.task import (
+    DuplicateRequestError,
+    MoveConflictError,
+    ShippedCursor,
+    TaskCursor,
+    TaskRepository,
+)
+from backend.kz.services.embeddings import HashingEmbedder, embed_missing
+from backend.kz.sketch import QuantileSketch
 
 
 @pytest_asyncio.fixture
@@ -86,3 +123,577 @@ async def test_ship_task(db_session):
     assert shipped is not None
     assert shipped.energy_column == EnergyColumn.SHIPPED.value
     assert shipped.shipped_at is not None
+
+
+@pytest.mark.asyncio
+async def test_bulk_operations(db_session):
+    """Test bulk operations run set-based, in order, keeping the order of their IDs."""
+    repo = TaskRepository(db_session)
+    a, b, c, d = [
+        await repo.create(TaskCreate(raw_input=name), title=name) for name in "abcd"
+    ]
+
+    outcomes = await repo.bulk(
+        [
+            TaskBulkOperation(
+                action=BulkAction.MOVE,
+                ids=[c.id, a.id, b.id],
+                energy_column=EnergyColumn.HYPERFOCUS,
+            ),
+            TaskBulkOperation(action=BulkAction.SHIP, ids=[b.id]),
+            TaskBulkOperation(action=BulkAction.DELETE, ids=[d.id, uuid4()]),
+            TaskBulkOperation(action=BulkAction.GET, ids=[b.id, a.id, d.id]),
+        ]
+    )
+
+    moved, shipped, deleted, got = outcomes
+    assert [t.title for t in moved[0]] == ["c", "a", "b"]
+    assert [t.position for t in moved[0]] == sorted(t.position for t in moved[0])
+    assert [t.energy_column for t in shipped[0]] == [EnergyColumn.SHIPPED.value]
+    assert deleted == ([], [d.id])
+    assert [(t.title, t.energy_column) for t in got[0]] == [
+        ("b", EnergyColumn.SHIPPED.value),
+        ("a", EnergyColumn.HYPERFOCUS.value),
+    ]
+    # Moves by hand are remembered as classifier labels, as with update
+    labels = await repo.list_energy_labels()
+    assert ("a", EnergyColumn.HYPERFOCUS.value, True) in labels
+
+
+@pytest.mark.asyncio
+async def test_create_many_returns_tasks_in_input_order(db_session):
+    """Test the multi-row insert keeps input order and the pending variant queues jobs."""
+    repo = TaskRepository(db_session)
+    items = [TaskCreate(raw_input=f"task {i}") for i in range(20)]
+
+    tasks = await repo.create_many(items, titles=[f"Task {i}" for i in range(20)])
+    assert [t.title for t in tasks] == [f"Task {i}" for i in range(20)]
+    assert len({t.id for t in tasks}) == 20
+
+    pending = await repo.create_many_pending(items[:3], energy_override=EnergyColumn.LOW_ENERGY)
+    assert [t.raw_input for t in pending] == ["task 0", "task 1", "task 2"]
+    assert all(t.parse_status == ParseStatus.PENDING.value for t in pending)
+    assert await ParseJobRepository(db_session).count_pending() == 3
+
+
+@pytest.mark.asyncio
+async def test_claim_parse_jobs_leases_each_job_once(db_session):
+    """Test that a claimed parse job is not handed out again while leased."""
+    repo = TaskRepository(db_session)
+    task = await repo.create_pending(TaskCreate(raw_input="update readme"))
+
+    jobs = ParseJobRepository(db_session)
+    claimed = await jobs.claim(limit=10, lease_seconds=60)
+    assert [job.task_id for job in claimed] == [task.id]
+    assert claimed[0].raw_input == "update readme"
+    assert claimed[0].attempts == 1
+
+    assert await jobs.claim(limit=10, lease_seconds=60) == []
+
+
+@pytest.mark.asyncio
+async def test_apply_parse_keeps_user_edits(db_session):
+    """Test that a deferred parse does not clobber edits made while queued."""
+    repo = TaskRepository(db_session)
+    task = await repo.create_pending(TaskCreate(raw_input="update readme"))
+    task_id = task.id
+    await repo.update(task_id, TaskUpdate(title="Rewrite the README"))
+
+    await repo.apply_parse(
+        task_id,
+        "Update README",
+        EnergyColumn.LOW_ENERGY,
+        provisional_energy=EnergyColumn.QUICK_WIN,
+    )
+
+    db_session.expire_all()
+    updated = await repo.get_by_id(task_id)
+    assert updated.title == "Rewrite the README"
+    assert updated.energy_column == EnergyColumn.LOW_ENERGY.value
+    assert updated.parse_status == ParseStatus.PARSED.value
+
+
+@pytest.mark.asyncio
+async def test_parse_cache_store_round_trip(db_session):
+    """Test the persistent parse cache tier, including expiry."""
+    repo = ParseCacheRepository(db_session)
+    value = {"title": "Update README", "energy": "low_energy", "tags": ["docs"]}
+
+    await repo.put("fresh", value, ttl_seconds=60)
+    await repo.put("stale", value, ttl_seconds=-1)
+
+    assert await repo.get("fresh") == value
+    assert await repo.get("stale") is None
+    assert await repo.evict(max_rows=10) == 1
+
+
+@pytest.mark.asyncio
+async def test_energy_corrections_become_training_labels(db_session):
+    """Test that manual energy changes and model picks are labels, and nothing else is."""
+    repo = TaskRepository(db_session)
+    corrected = await repo.create(
+        TaskCreate(raw_input="write migration"),
+        title="Write migration",
+        energy_source=EnergySource.LOCAL,
+    )
+    await repo.create(
+        TaskCreate(raw_input="reply to sam"), title="Reply to Sam", energy_source=EnergySource.LLM
+    )
+    # Picked by the local classifier itself, and by a parse that failed
+    await repo.create_many(
+        [TaskCreate(raw_input="tidy desk"), TaskCreate(raw_input="plan the offsite")],
+        titles=["Tidy desk", "plan the offsite"],
+        energy_sources=[EnergySource.LOCAL, EnergySource.FALLBACK],
+    )
+    await repo.create(
+        TaskCreate(raw_input="file taxes", energy_column=EnergyColumn.LOW_ENERGY),
+        title="file taxes",
+        energy_source=EnergySource.USER,
+    )
+
+    await repo.update(corrected.id, TaskUpdate(energy_column=EnergyColumn.HYPERFOCUS))
+    await repo.ship(corrected.id)
+
+    labels = sorted(await repo.list_energy_labels())
+    assert labels == [
+        ("file taxes", EnergyColumn.LOW_ENERGY.value, False),
+        ("reply to sam", EnergyColumn.QUICK_WIN.value, False),
+        ("write migration", EnergyColumn.HYPERFOCUS.value, True),
+    ]
+
+
+async def _collect_pages(fetch, page_size):
+    pages, after = [], None
+    while True:
+        page = await fetch(limit=page_size, after=after)
+        if not page:
+            return pages
+        pages.append(page)
+        after = TaskCursor.decode(TaskCursor.after(page[-1]).encode())
+
+
+@pytest.mark.asyncio
+async def test_keyset_pages_match_full_listing(db_session):
+    """Test that walking pages yields the full board order with no gaps or repeats."""
+    repo = TaskRepository(db_session)
+    energies = [EnergyColumn.HYPERFOCUS, EnergyColumn.QUICK_WIN, EnergyColumn.LOW_ENERGY]
+    for i in range(3):
+        await repo.create_many(
+            [TaskCreate(raw_input=f"t{i}-{j}", energy_column=energies[j % 3]) for j in range(9)],
+            titles=[f"T{i}-{j}" for j in range(9)],
+        )
+    some = await repo.list_by_column(EnergyColumn.QUICK_WIN, limit=2)
+    last = (await repo.list_by_column(EnergyColumn.QUICK_WIN))[-1]
+    await repo.move(some[0].id, TaskMove(before=last.id))
+
+    full = await repo.list_active()
+    pages = await _collect_pages(repo.list_active, page_size=4)
+    assert [t.id for page in pages for t in page] == [t.id for t in full]
+    assert len(full) == 27
+
+    column = await repo.list_by_column(EnergyColumn.QUICK_WIN)
+    pages = await _collect_pages(
+        lambda **kw: repo.list_by_column(EnergyColumn.QUICK_WIN, **kw), page_size=2
+    )
+    assert [t.id for page in pages for t in page] == [t.id for t in column]
+    assert column[-1].id == some[0].id
+
+
+@pytest.mark.asyncio
+async def test_move_rewrites_only_the_moved_task(db_session):
+    """Test a move between neighbours writes one row, and new tasks land on top."""
+    repo = TaskRepository(db_session)
+    x, y, z = await repo.create_many(
+        [TaskCreate(raw_input=name) for name in "xyz"], titles=["x", "y", "z"]
+    )
+    assert x.position < y.position < z.position
+
+    moved = await repo.move(z.id, TaskMove(before=x.id, after=y.id))
+    column = await repo.list_by_column(EnergyColumn.QUICK_WIN)
+    assert [t.title for t in column] == ["x", "z", "y"]
+    assert [t.updated_at for t in column if t.id != z.id] == [x.updated_at, y.updated_at]
+    assert moved.updated_at > z.updated_at
+
+    top = await repo.create(TaskCreate(raw_input="new"), title="new")
+    assert top.position < x.position
+
+    moved = await repo.move(x.id, TaskMove(energy_column=EnergyColumn.HYPERFOCUS))
+    assert moved.energy_column == EnergyColumn.HYPERFOCUS.value
+    assert ("x", EnergyColumn.HYPERFOCUS.value, True) in await repo.list_energy_labels()
+
+    with pytest.raises(MoveConflictError):
+        await repo.move(top.id, TaskMove(before=y.id, after=z.id))
+    with pytest.raises(MoveConflictError):
+        await repo.move(top.id, TaskMove(energy_column=EnergyColumn.QUICK_WIN, before=x.id))
+
+
+@pytest.mark.asyncio
+async def test_move_between_tied_neighbours_and_rebalance(db_session):
+    """Test tied neighbours get spread out, and long keys get rebalanced."""
+    repo = TaskRepository(db_session)
+    a, b, c = await repo.create_many(
+        [TaskCreate(raw_input=name) for name in "abc"], titles=["a", "b", "c"]
+    )
+    # As if a and b were created at once by two clients
+    await db_session.execute(update(Task).where(Task.id == b.id).values(position=a.position))
+    await db_session.commit()
+    [first, second, _] = await repo.list_by_column(EnergyColumn.QUICK_WIN)
+
+    await repo.move(c.id, TaskMove(before=first.id, after=second.id))
+    column = await repo.list_by_column(EnergyColumn.QUICK_WIN)
+    assert [t.id for t in column] == [first.id, c.id, second.id]
+
+    # Keep dropping cards right below the top one
+    for _ in range(12):
+        column = await repo.list_by_column(EnergyColumn.QUICK_WIN)
+        await repo.move(column[-1].id, TaskMove(before=column[0].id, after=column[1].id))
+    order = [t.id for t in await repo.list_by_column(EnergyColumn.QUICK_WIN)]
+    assert await repo.columns_to_rebalance(max_key_length=3) == ["quick_win"]
+
+    assert await repo.rebalance("quick_win") == 3
+    column = await repo.list_by_column(EnergyColumn.QUICK_WIN)
+    assert [t.id for t in column] == order
+    assert max(len(t.position) for t in column) == 2
+    assert await repo.columns_to_rebalance(max_key_length=3) == []
+
+
+@pytest.mark.asyncio
+async def test_writes_on_missing_task_report_not_found(db_session):
+    """Test that single-statement writes keep not-found semantics."""
+    repo = TaskRepository(db_session)
+    missing = uuid4()
+
+    assert await repo.update(missing, TaskUpdate(title="x")) is None
+    assert await repo.update(missing, TaskUpdate()) is None
+    assert await repo.ship(missing) is None
+    assert await repo.delete(missing) is False
+    assert await repo.move(missing, TaskMove()) is None
+
+    task = await repo.create(TaskCreate(raw_input="keep"), title="Keep")
+    updated = await repo.update(task.id, TaskUpdate(title="Kept"))
+    assert (updated.title, updated.position) == ("Kept", task.position)
+    assert updated.updated_at >= task.updated_at
+
+
+@pytest.mark.asyncio
+async def test_embed_missing_backfills_and_search_ranks(db_session):
+    """Test that tasks without embeddings get backfilled and become searchable."""
+    repo = TaskRepository(db_session)
+    embedder = HashingEmbedder()
+    for raw_input in ["fix the login auth bug", "buy groceries", "water the plants"]:
+        await repo.create(TaskCreate(raw_input=raw_input), title=raw_input)
+    await repo.ship((await repo.create(TaskCreate(raw_input="auth audit"), title="Audit")).id)
+
+    session_maker = get_async_session_maker()
+    assert await embed_missing(session_maker, embedder, batch_size=3) == 3
+    assert await embed_missing(session_maker, embedder, batch_size=3) == 1
+    assert await embed_missing(session_maker, embedder, batch_size=3) == 0
+
+    [query] = await embedder.embed(["auth"])
+    results = await repo.search(query, limit=2, ef_search=40)
+    assert results[0].title == "fix the login auth bug"
+    assert 0 < results[0].score <= 1
+    assert all(r.title != "Audit" for r in results)
+
+    with_shipped = await repo.search(query, limit=4, ef_search=40, include_shipped=True)
+    assert {r.title for r in with_shipped[:2]} == {"fix the login auth bug", "Audit"}
+
+
+@pytest.mark.asyncio
+async def test_delete_leaves_tombstone_and_purges_old_ones(db_session):
+    """Test tombstones for delta sync and their retention."""
+    repo = TaskRepository(db_session)
+    old = await repo.create(TaskCreate(raw_input="old"), title="Old")
+    task = await repo.create(TaskCreate(raw_input="new"), title="New")
+    since = await repo.snapshot_xmin()
+
+    # Embedding writes are not changes
+    await repo.set_embeddings([(task.id, [0.1] * 1536)])
+    assert await repo.list_changes(since=since, after=None, limit=10) == ([], [], None)
+
+    await repo.delete(old.id)
+    await db_session.execute(
+        update(TaskTombstone).values(deleted_at=func.now() - timedelta(days=60))
+    )
+    await db_session.commit()
+    await repo.delete(task.id, tombstone_retention=timedelta(days=30))
+
+    changed, deleted, _ = await repo.list_changes(since=since, after=None, limit=10)
+    assert changed == []
+    assert deleted == [task.id]
+
+
+@pytest.mark.asyncio
+async def test_tags_are_stored_and_filter_listings(db_session):
+    """Test tag persistence through the name cache and tag-filtered pages."""
+    repo = TaskRepository(db_session)
+    tasks = await repo.create_many(
+        [TaskCreate(raw_input=f"task {i}") for i in range(4)],
+        titles=[f"Task {i}" for i in range(4)],
+        tags=[{"auth": 0.9, " bug ": 0.9, "": 0.9}, {}, {"auth": None}, {"auth": None}],
+    )
+    links = (await db_session.execute(select(TaskTag.task_id, TaskTag.confidence))).all()
+    assert len(links) == 4
+    assert (tasks[0].id, 0.9) in links
+
+    # Known names are served from the cache without touching the tag table
+    cache = TagCache()
+    tags = TagRepository(db_session, cache)
+    ids = await tags.resolve(["auth", "bug"])
+    await db_session.execute(delete(Tag).where(Tag.name == "bug"))
+    assert await tags.resolve(["auth", "bug"]) == ids
+
+    # ... until a cached tag turns out to be gone: it is created again
+    await tags.attach({tasks[1].id: {"bug": None}})
+    assert cache.get("bug") != ids["bug"]
+    assert (await db_session.scalar(select(func.count()).select_from(Tag))) == 2
+
+    first = await repo.list_active(limit=2, tag="auth")
+    rest = await repo.list_active(limit=2, after=TaskCursor.after(first[-1]), tag="auth")
+    assert [t.id for t in first + rest] == [tasks[0].id, tasks[2].id, tasks[3].id]
+    assert [t.id for t in await repo.list_active(tag="bug")] == [tasks[1].id]
+    assert await repo.list_by_column(EnergyColumn.HYPERFOCUS, tag="auth") == []
+
+
+@pytest.mark.asyncio
+async def test_ship_counters_follow_ships_and_unships(db_session):
+    """Test that the triggers keep today's, the streak's and all-time counts."""
+    repo = TaskRepository(db_session)
+    stats = StatsRepository(db_session)
+    a, b, c = await repo.create_many(
+        [TaskCreate(raw_input=f"task {i}") for i in range(3)], titles=["A", "B", "C"]
+    )
+    assert await stats.ship_stats() == ShipStats(today=0, streak=0, all_time=0)
+
+    await repo.ship(a.id)
+    await repo.bulk([TaskBulkOperation(action=BulkAction.SHIP, ids=[a.id, b.id])])
+    assert await stats.ship_stats() == ShipStats(today=2, streak=1, all_time=2)
+
+    # A ship from yesterday makes today the second day of a streak
+    await db_session.execute(
+        update(Task).where(Task.id == a.id).values(shipped_at=Task.shipped_at - timedelta(days=1))
+    )
+    await db_session.commit()
+    assert await stats.ship_stats() == ShipStats(today=1, streak=2, all_time=2)
+
+    # Unshipping takes the ship back; deleting a shipped task does not
+    await repo.update(b.id, TaskUpdate(energy_column=EnergyColumn.QUICK_WIN))
+    assert await stats.ship_stats() == ShipStats(today=0, streak=1, all_time=1)
+    await repo.move(c.id, TaskMove(energy_column=EnergyColumn.SHIPPED))
+    await repo.delete(a.id)
+    assert await stats.ship_stats() == ShipStats(today=1, streak=2, all_time=2)
+
+
+@pytest.mark.asyncio
+async def test_daily_rollups_match_live_aggregates(db_session):
+    """Test that closed days are rolled up and reads add today's ships live."""
+    repo = TaskRepository(db_session)
+    analytics = AnalyticsRepository(db_session)
+    a, b, c = await repo.create_many(
+        [TaskCreate(raw_input=f"task {i}") for i in range(3)], titles=["A", "B", "C"]
+    )
+    await repo.update(b.id, TaskUpdate(energy_column=EnergyColumn.HYPERFOCUS))
+    for task in (a, b, c):
+        await repo.ship(task.id)
+    shipped_from = select(Task.shipped_from).where(Task.id == b.id)
+    assert await db_session.scalar(shipped_from) == EnergyColumn.HYPERFOCUS.value
+
+    # A and B shipped two days ago, an hour and a day after they were created
+    for task, cycle in ((a, timedelta(hours=1)), (b, timedelta(days=1))):
+        await db_session.execute(
+            update(Task)
+            .where(Task.id == task.id)
+            .values(
+                shipped_at=Task.shipped_at - timedelta(days=2),
+                created_at=Task.shipped_at - timedelta(days=2) - cycle,
+            )
+        )
+    await db_session.commit()
+
+    today = utc_today()
+    live = await analytics.daily(today - timedelta(days=6))
+    assert await analytics.roll_up_closed_days(31) == 2
+    assert await analytics.rolled_up_through() == today - timedelta(days=1)
+    assert await analytics.roll_up_closed_days(31) == 0
+
+    rows = await analytics.daily(today - timedelta(days=6))
+    assert sorted(rows) == sorted(live)
+    by_key = {(row.day, row.energy_column): row for row in rows}
+    assert set(by_key) == {
+        (today - timedelta(days=2), EnergyColumn.QUICK_WIN.value),
+        (today - timedelta(days=2), EnergyColumn.HYPERFOCUS.value),
+        (today, EnergyColumn.QUICK_WIN.value),
+    }
+    deep = by_key[(today - timedelta(days=2), EnergyColumn.HYPERFOCUS.value)]
+    assert (deep.shipped, deep.cycle_seconds) == (1, 86_400)
+
+    # The SQL buckets agree with the Python sketch
+    sketch, expected = QuantileSketch(), QuantileSketch()
+    for row in rows:
+        sketch.merge(row.cycle_sketch)
+    for seconds in (3600, 86_400, by_key[(today, EnergyColumn.QUICK_WIN.value)].cycle_seconds):
+        expected.add(seconds)
+    assert sketch.counts == expected.counts
+
+
+@pytest.mark.asyncio
+async def test_archive_moves_old_ships_out_of_the_board(db_session):
+    """Test archiving in batches, and that history, stats and analytics still see it."""
+    repo = TaskRepository(db_session)
+    tasks = await repo.create_many(
+        [TaskCreate(raw_input=f"task {i}") for i in range(4)],
+        titles=[f"Task {i}" for i in range(4)],
+        tags=[{"auth": 0.9, "bug": 0.9}, {}, {}, {}],
+    )
+    await repo.update(tasks[0].id, TaskUpdate(energy_column=EnergyColumn.HYPERFOCUS))
+    for task in tasks[:3]:
+        await repo.ship(task.id)
+    # Tasks 0 and 1 shipped 40 and 41 days ago, task 2 just now
+    for days, task in ((40, tasks[0]), (41, tasks[1])):
+        await db_session.execute(
+            update(Task)
+            .where(Task.id == task.id)
+            .values(shipped_at=Task.shipped_at - timedelta(days=days))
+        )
+    await db_session.commit()
+    history = await repo.list_shipped_history(10)
+    stats = await StatsRepository(db_session).ship_stats()
+    analytics = AnalyticsRepository(db_session)
+    daily = await analytics.daily(utc_today() - timedelta(days=60))
+
+    # Oldest ship first, one batch at a time
+    assert await repo.archive_shipped(timedelta(days=30), limit=1) == 1
+    assert await db_session.scalar(select(TaskArchive.id)) == tasks[1].id
+    assert await repo.archive_shipped(timedelta(days=30), limit=1) == 1
+    assert await repo.archive_shipped(timedelta(days=30), limit=1) == 0
+
+    archived = await db_session.get(TaskArchive, tasks[0].id)
+    assert (archived.tags, archived.shipped_from) == (["auth", "bug"], "hyperfocus")
+    assert archived.corrected_energy == "hyperfocus"
+    assert await repo.get_by_id(tasks[0].id) is None
+    assert [t.id for t in await repo.list_by_column(EnergyColumn.SHIPPED)] == [tasks[2].id]
+    tombstones = (await db_session.execute(select(TaskTombstone.id))).scalars().all()
+    assert set(tombstones) == {tasks[0].id, tasks[1].id}
+
+    # Tombstones past retention are purged by a batch, even an empty one
+    await db_session.execute(
+        update(TaskTombstone)
+        .where(TaskTombstone.id == tasks[1].id)
+        .values(deleted_at=func.now() - timedelta(days=60))
+    )
+    await db_session.commit()
+    assert await repo.archive_shipped(timedelta(days=30), 1, timedelta(days=30)) == 0
+    tombstones = (await db_session.execute(select(TaskTombstone.id))).scalars().all()
+    assert tombstones == [tasks[0].id]
+
+    # History pages straight across the hot and archived tasks
+    first = await repo.list_shipped_history(2)
+    rest = await repo.list_shipped_history(2, ShippedCursor.after(first[-1]))
+    assert first + rest == history
+    assert [t.id for t in history] == [tasks[2].id, tasks[0].id, tasks[1].id]
+
+    # Nothing counted or charted changes
+    assert await StatsRepository(db_session).ship_stats() == stats
+    assert sorted(await analytics.daily(utc_today() - timedelta(days=60))) == sorted(daily)
+    assert ("task 0", "hyperfocus", True) in await repo.list_energy_labels()
+
+
+@pytest.mark.asyncio
+async def test_idempotency_keys_dedupe_batches_and_expire(db_session):
+    """Test a taken key creates nothing, and old keys go with the archive batch."""
+    repo = TaskRepository(db_session)
+    items = [TaskCreate(raw_input="a"), TaskCreate(raw_input="b")]
+    assert await repo.get_for_key("k1") is None
+    tasks = await repo.create_many(items, titles=["A", "B"], idempotency_key="k1")
+
+    with pytest.raises(DuplicateRequestError):
+        await repo.create_many_pending(items, idempotency_key="k1")
+    assert await db_session.scalar(select(func.count()).select_from(Task)) == 2
+    await repo.delete(tasks[0].id)
+    assert [t.id for t in await repo.get_for_key("k1")] == [tasks[1].id]
+
+    await db_session.execute(
+        update(IdempotencyKey).values(created_at=func.now() - timedelta(days=60))
+    )
+    await db_session.commit()
+    await repo.archive_shipped(timedelta(days=30), 1, timedelta(days=30))
+    assert await repo.get_for_key("k1") is None
+
+
+@pytest.mark.asyncio
+async def test_edges_walk_both_ways_and_refuse_cycles(db_session):
+    """Test blocker/impact/lineage walks, their depth limit, and cycle detection."""
+    tasks = TaskRepository(db_session)
+    a, b, c, d, e = await tasks.create_many(
+        [TaskCreate(raw_input=name) for name in "abcde"], titles=list("abcde")
+    )
+    edges = EdgeRepository(db_session, cache=BlockerCache())
+    # a blocks b, c depends on b, a blocks c too (a shortcut), e spawned from d
+    await edges.add(a.id, b.id, TaskEdgeCreate(to_task="b", edge_type=EdgeType.BLOCKS))
+    await edges.add(c.id, b.id, TaskEdgeCreate(to_task="b", edge_type=EdgeType.DEPENDS_ON))
+    await edges.add(a.id, c.id, TaskEdgeCreate(to_task="c", edge_type=EdgeType.BLOCKS))
+    await edges.add(e.id, d.id, TaskEdgeCreate(to_task="d", edge_type=EdgeType.SPAWNED_FROM))
+
+    blockers = await edges.blockers(c.id, max_depth=10)
+    assert [(row.title, row.depth, row.via) for row in blockers] == [
+        ("a", 1, c.id),
+        ("b", 1, c.id),
+    ]
+    impact = await edges.impact(a.id, max_depth=10)
+    assert [(row.title, row.depth, row.edge_type) for row in impact] == [
+        ("b", 1, "blocks"),
+        ("c", 1, "blocks"),
+    ]
+    assert [row.title for row in await edges.impact(b.id, max_depth=1)] == ["c"]
+    assert [row.title for row in await edges.descendants(d.id, max_depth=10)] == ["e"]
+    assert [row.title for row in await edges.ancestors(e.id, max_depth=10)] == ["d"]
+
+    # c waits on b waits on a: neither b nor a can wait on c
+    for from_id, to_id, edge_type in [
+        (c.id, a.id, EdgeType.BLOCKS),
+        (a.id, c.id, EdgeType.DEPENDS_ON),
+        (b.id, c.id, EdgeType.DEPENDS_ON),
+    ]:
+        with pytest.raises(EdgeCycleError):
+            await edges.add(from_id, to_id, TaskEdgeCreate(to_task="x", edge_type=edge_type))
+    with pytest.raises(EdgeCycleError):
+        await edges.add(d.id, e.id, TaskEdgeCreate(to_task="e", edge_type=EdgeType.SPAWNED_FROM))
+    # Other graphs do not count, and related edges may go both ways
+    await edges.add(d.id, e.id, TaskEdgeCreate(to_task="e", edge_type=EdgeType.BLOCKS))
+    await edges.add(c.id, a.id, TaskEdgeCreate(to_task="a", edge_type=EdgeType.RELATED))
+    await edges.add(a.id, c.id, TaskEdgeCreate(to_task="c", edge_type=EdgeType.RELATED))
+    with pytest.raises(ValueError):
+        await edges.add(a.id, a.id, TaskEdgeCreate(to_task="a", edge_type=EdgeType.RELATED))
+    assert len(await edges.list_for_task(a.id)) == 4
+
+
+@pytest.mark.asyncio
+async def test_blocked_tasks_are_cached_until_edges_or_tasks_change(db_session):
+    """Test that blocked tasks come from the cache until an edge write or a ship."""
+    tasks = TaskRepository(db_session)
+    a, b, c = await tasks.create_many(
+        [TaskCreate(raw_input=name) for name in "abc"], titles=list("abc")
+    )
+    cache = BlockerCache()
+    edges = EdgeRepository(db_session, cache=cache)
+    edge = await edges.add(a.id, b.id, TaskEdgeCreate(to_task="b", edge_type=EdgeType.BLOCKS))
+    await edges.add(b.id, c.id, TaskEdgeCreate(to_task="c", edge_type=EdgeType.BLOCKS))
+    assert await edges.blocked() == {b.id: [a.id], c.id: [b.id]}
+
+    # Served from the cache: a write behind its back goes unseen...
+    await db_session.execute(delete(TaskEdge))
+    await db_session.commit()
+    assert await edges.blocked() == {b.id: [a.id], c.id: [b.id]}
+    # ...until a task changes
+    await tasks.ship(a.id)
+    assert await edges.blocked() == {}
+
+    await edges.add(a.id, b.id, TaskEdgeCreate(to_task="b", edge_type=EdgeType.BLOCKS))
+    await edges.add(c.id, b.id, TaskEdgeCreate(to_task="b", edge_type=EdgeType.BLOCKS))
+    # a is shipped: only c holds b up
+    assert [(task.title, blockers) for task, blockers in await edges.list_blocked()] == [
+        ("b", [c.id])
+    ]
+    assert not await edges.remove(a.id, edge.id)  # Already gone
+    await tasks.delete(c.id)
+    assert await edges.blocked() == {}
@@ -1,8 +1,15 @@
+import asyncio
+import json
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 
-from backend.kz.models import EnergyColumn
-from backend.kz.services.parser import ParsedTask, TaskParser
+from backend.kz.models import EnergyColumn, EnergySource
+from backend.kz.services.circuit_breaker import BreakerState, CircuitBreaker
+from backend.kz.services.classifier import EnergyClassifier, clean_title
+from backend.kz.services.embeddings import HashingEmbedder
+from backend.kz.services.parse_cache import ParseCache, cache_key
+from backend.kz.services.parser import PROMPT_VERSION, ParsedTask, TaskParser
 
 
 @pytest.fixture
@@ -40,7 +47,13 @@ async def test_parser_extracts_tags(mock_anthropic):
 
     # Create a mock content object with text attribute
     mock_content = MagicMock()
-    mock_content.text = '{"title": "Build Slack integration", "energy": "hyperfocus", "tags": ["slack", "integration"]}'
+    mock_content.text = json.dumps(
+        {
+            "title": "Build Slack integration",
+            "energy": "hyperfocus",
+            "tags": [{"name": "Slack", "confidence": 0.9}, {"name": "integration"}, "api"],
+        }
+    )
 
     mock_response = MagicMock()
     mock_response.content = [mock_content]
@@ -52,6 +65,8 @@ async def test_parser_extracts_tags(mock_anthropic):
 
     assert "slack" in result.tags
     assert result.energy == EnergyColumn.HYPERFOCUS
+    # Each tag keeps the confidence the model gave it, if any
+    assert result.tagged() == {"slack": 0.9, "integration": None, "api": None}
 
 
 @pytest.mark.asyncio
@@ -73,6 +88,7 @@ async def test_parser_handles_explicit_energy(mock_anthropic):
 
     # Override should take precedence
     assert result.energy == EnergyColumn.LOW_ENERGY
+    assert result.source == EnergySource.USER
 
 
 @pytest.mark.asyncio
@@ -89,3 +105,352 @@ async def test_parser_fallback_on_error(mock_anthropic):
     assert result.title == "some task that fails"
     assert result.energy == EnergyColumn.QUICK_WIN
     assert result.tags == []
+    # Not a choice anyone made: kept out of classifier training
+    assert result.source == EnergySource.FALLBACK
+
+
+def make_response(text: str) -> MagicMock:
+    """Build a mock Anthropic response carrying ``text``."""
+    mock_content = MagicMock()
+    mock_content.text = text
+    mock_response = MagicMock()
+    mock_response.content = [mock_content]
+    return mock_response
+
+
+@pytest.mark.asyncio
+async def test_parse_cache_serves_repeat_inputs(mock_anthropic):
+    """Test that identical inputs (modulo case/whitespace) hit the model once."""
+    mock_client = AsyncMock()
+    mock_client.messages.create.return_value = make_response(
+        '{"title": "Update README", "energy": "low_energy", "tags": ["docs"]}'
+    )
+    mock_anthropic.return_value = mock_client
+
+    cache = ParseCache(max_entries=16)
+    parser = TaskParser(cache=cache)
+    first = await parser.parse("update the readme")
+    second = await parser.parse("  Update   the README ")
+
+    assert first == second
+    assert mock_client.messages.create.await_count == 1
+    assert cache.stats.memory_hits == 1
+    assert cache.snapshot()["hit_rate"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_parse_cache_applies_override_after_lookup(mock_anthropic):
+    """Test that a cached parse still honors a per-request energy override."""
+    mock_client = AsyncMock()
+    mock_client.messages.create.return_value = make_response(
+        '{"title": "Update README", "energy": "quick_win", "tags": ["docs"]}'
+    )
+    mock_anthropic.return_value = mock_client
+
+    parser = TaskParser(cache=ParseCache())
+    await parser.parse("update readme")
+    result = await parser.parse("update readme", energy_override=EnergyColumn.LOW_ENERGY)
+
+    assert result.energy == EnergyColumn.LOW_ENERGY
+    assert mock_client.messages.create.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_parse_cache_coalesces_concurrent_parses(mock_anthropic):
+    """Test that concurrent identical parses share one in-flight model call."""
+
+    async def slow_create(**kwargs):
+        await asyncio.sleep(0.05)
+        return make_response('{"title": "Fix login", "energy": "quick_win", "tags": []}')
+
+    mock_client = AsyncMock()
+    mock_client.messages.create.side_effect = slow_create
+    mock_anthropic.return_value = mock_client
+
+    cache = ParseCache()
+    parser = TaskParser(cache=cache)
+    results = await asyncio.gather(*(parser.parse("fix login") for _ in range(5)))
+
+    assert {r.title for r in results} == {"Fix login"}
+    assert mock_client.messages.create.await_count == 1
+    assert cache.stats.coalesced == 4
+
+
+@pytest.mark.asyncio
+async def test_parse_cache_survives_first_caller_cancelled(mock_anthropic):
+    """Test that cancelling the caller that started a parse does not fail the others."""
+
+    async def slow_create(**kwargs):
+        await asyncio.sleep(0.05)
+        return make_response('{"title": "Fix login", "energy": "quick_win", "tags": []}')
+
+    mock_client = AsyncMock()
+    mock_client.messages.create.side_effect = slow_create
+    mock_anthropic.return_value = mock_client
+
+    parser = TaskParser(cache=ParseCache())
+    first = asyncio.create_task(parser.parse("fix login"))
+    await asyncio.sleep(0.01)
+    second = asyncio.create_task(parser.parse("fix login"))
+    await asyncio.sleep(0.01)
+    first.cancel()
+
+    result = await second
+    assert result.title == "Fix login" and not result.fallback
+    assert first.cancelled()
+    assert mock_client.messages.create.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_parse_cache_does_not_store_failures(mock_anthropic):
+    """Test that fallbacks are not cached, so the next call retries the model."""
+    mock_client = AsyncMock()
+    mock_client.messages.create.side_effect = Exception("API error")
+    mock_anthropic.return_value = mock_client
+
+    parser = TaskParser(cache=ParseCache())
+    first = await parser.parse("some task that fails")
+    second = await parser.parse("some task that fails")
+
+    assert first.fallback and second.fallback
+    assert mock_client.messages.create.await_count == 2
+
+
+def test_parse_cache_key_includes_model_and_prompt_version():
+    """Test that changing the model or prompt version changes the cache key."""
+    base = cache_key("fix login", "model-a", "1")
+    assert cache_key("Fix   LOGIN", "model-a", "1") == base
+    assert cache_key("fix login", "model-b", "1") != base
+    assert cache_key("fix login", "model-a", "2") != base
+
+
+def test_parse_cache_evicts_least_recently_used():
+    """Test the in-memory tier's LRU bound."""
+    cache = ParseCache(max_entries=2)
+    parsed = ParsedTask(title="t", energy=EnergyColumn.QUICK_WIN, tags=[])
+    cache._memory_put("a", parsed)
+    cache._memory_put("b", parsed)
+    cache._memory_get("a")
+    cache._memory_put("c", parsed)
+
+    assert list(cache._memory) == ["a", "c"]
+
+
+@pytest.mark.asyncio
+async def test_parse_many_batches_inputs_into_one_call(mock_anthropic):
+    """Test that a batch is parsed with one model call and keeps input order."""
+    mock_client = AsyncMock()
+    mock_client.messages.create.return_value = make_response(
+        '[{"title": "Fix login", "energy": "quick_win", "tags": []},'
+        ' {"title": "Rewrite parser", "energy": "hyperfocus", "tags": ["ai"]}]'
+    )
+    mock_anthropic.return_value = mock_client
+
+    parser = TaskParser()
+    results = await parser.parse_many(["fix login", "rewrite the parser"])
+
+    assert [r.title for r in results] == ["Fix login", "Rewrite parser"]
+    assert results[1].energy == EnergyColumn.HYPERFOCUS
+    assert mock_client.messages.create.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_parse_many_chunks_and_skips_cached_inputs(mock_anthropic):
+    """Test chunking by batch size, and that cached inputs never reach the model."""
+
+    async def echo_create(**kwargs):
+        lines = kwargs["messages"][0]["content"].split("Inputs:\n", 1)[1].splitlines()
+        return make_response(
+            json.dumps([{"title": line.split(". ", 1)[1].strip('"').title()} for line in lines])
+        )
+
+    mock_client = AsyncMock()
+    mock_client.messages.create.side_effect = echo_create
+    mock_anthropic.return_value = mock_client
+
+    cache = ParseCache()
+    await cache.store_many(
+        [("task b", ParsedTask(title="Task B", energy=EnergyColumn.QUICK_WIN, tags=[]))],
+        TaskParser().model,
+        PROMPT_VERSION,
+    )
+    parser = TaskParser(cache=cache)
+    parser.batch_size = 2
+    results = await parser.parse_many(["task a", "task b", "task c", "task d", "task e"])
+
+    assert [r.title for r in results] == ["Task A", "Task B", "Task C", "Task D", "Task E"]
+    # 4 misses in chunks of 2
+    assert mock_client.messages.create.await_count == 2
+    assert cache.stats.memory_hits == 1
+
+
+@pytest.mark.asyncio
+async def test_parse_many_falls_back_on_bad_batch(mock_anthropic):
+    """Test that a batch answer with the wrong length falls back per input."""
+    mock_client = AsyncMock()
+    mock_client.messages.create.return_value = make_response(
+        '[{"title": "Only one", "energy": "quick_win", "tags": []}]'
+    )
+    mock_anthropic.return_value = mock_client
+
+    parser = TaskParser()
+    results = await parser.parse_many(
+        ["first task", "second task"], energy_override=EnergyColumn.LOW_ENERGY
+    )
+
+    assert [r.title for r in results] == ["first task", "second task"]
+    assert all(r.fallback and r.energy == EnergyColumn.LOW_ENERGY for r in results)
+
+
+def test_circuit_breaker_opens_and_half_opens():
+    """Test the breaker's closed -> open -> half-open -> closed cycle."""
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=10, clock=lambda: now[0])
+
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == BreakerState.OPEN
+    assert not breaker.allow()
+
+    now[0] = 11.0
+    assert breaker.allow()  # trial call
+    assert not breaker.allow()  # only one trial at a time
+    breaker.record_success()
+    assert breaker.state == BreakerState.CLOSED
+    assert breaker.snapshot()["rejected"] == 2
+
+
+@pytest.mark.asyncio
+async def test_parser_fails_fast_when_breaker_open(mock_anthropic):
+    """Test that after repeated errors the parser stops calling the model."""
+    mock_client = AsyncMock()
+    mock_client.messages.create.side_effect = Exception("API down")
+    mock_anthropic.return_value = mock_client
+
+    parser = TaskParser()
+    parser.breaker.failure_threshold = 2
+    results = [await parser.parse(f"task {i}") for i in range(5)]
+
+    assert all(r.fallback for r in results)
+    assert mock_client.messages.create.await_count == 2
+    assert parser.snapshot()["breaker"]["state"] == "open"
+
+
+@pytest.mark.asyncio
+async def test_parser_limits_concurrent_calls(mock_anthropic):
+    """Test that no more than max_concurrency model calls run at once."""
+    peak = 0
+
+    async def slow_create(**kwargs):
+        nonlocal peak
+        peak = max(peak, parser._in_flight)
+        await asyncio.sleep(0.01)
+        return make_response('{"title": "T", "energy": "quick_win", "tags": []}')
+
+    mock_client = AsyncMock()
+    mock_client.messages.create.side_effect = slow_create
+    mock_anthropic.return_value = mock_client
+
+    parser = TaskParser()
+    parser._limiter = asyncio.Semaphore(2)
+    await asyncio.gather(*(parser.parse(f"task {i}") for i in range(6)))
+
+    assert peak == 2
+    assert mock_client.messages.create.await_count == 6
+
+
+@pytest.mark.asyncio
+async def test_parser_deadline_falls_back(mock_anthropic):
+    """Test that a hung model call is cut off at the deadline."""
+
+    async def hung_create(**kwargs):
+        await asyncio.sleep(10)
+
+    mock_client = AsyncMock()
+    mock_client.messages.create.side_effect = hung_create
+    mock_anthropic.return_value = mock_client
+
+    parser = TaskParser()
+    parser.timeout = 0.01
+    result = await parser.parse("some task")
+
+    assert result.fallback
+    assert parser.breaker.consecutive_failures == 1
+
+
+TRAINING = [
+    ("reply to email from sam", EnergyColumn.QUICK_WIN, 1.0),
+    ("reply to slack thread", EnergyColumn.QUICK_WIN, 1.0),
+    ("reply to recruiter email", EnergyColumn.QUICK_WIN, 1.0),
+    ("update docs for the api", EnergyColumn.LOW_ENERGY, 1.0),
+    ("update docs for deploys", EnergyColumn.LOW_ENERGY, 1.0),
+    ("clean up old branches", EnergyColumn.LOW_ENERGY, 1.0),
+    ("design the sync protocol", EnergyColumn.HYPERFOCUS, 1.0),
+    ("refactor the auth layer", EnergyColumn.HYPERFOCUS, 3.0),
+    ("design the billing schema", EnergyColumn.HYPERFOCUS, 1.0),
+]
+
+
+def test_energy_classifier_predicts_and_round_trips(tmp_path):
+    """Test that the classifier learns obvious patterns and survives save/load."""
+    model = EnergyClassifier.train(TRAINING)
+
+    energy, confidence = model.predict("reply to email from alex")
+    assert energy == EnergyColumn.QUICK_WIN
+    assert confidence > 0.9
+    assert model.predict("zzz qqq")[1] == 0.0
+
+    model.save(tmp_path / "model.json")
+    loaded = EnergyClassifier.load(tmp_path / "model.json")
+    assert loaded.predict("update docs for the cli") == model.predict("update docs for the cli")
+
+
+def test_clean_title_strips_filler():
+    """Test local title cleanup for short inputs."""
+    assert clean_title("  need to   update docs.") == "Update docs"
+    assert clean_title("i have to reply to sam!") == "Reply to sam"
+
+
+@pytest.mark.asyncio
+async def test_parser_uses_local_tier_when_confident(mock_anthropic):
+    """Test that confident local predictions never reach the model."""
+    mock_client = AsyncMock()
+    mock_client.messages.create.return_value = make_response(
+        '{"title": "Investigate flaky CI", "energy": "hyperfocus", "tags": ["ci"]}'
+    )
+    mock_anthropic.return_value = mock_client
+
+    parser = TaskParser(classifier=EnergyClassifier.train(TRAINING))
+    parser.local_threshold = 0.9
+    local = await parser.parse("reply to email from alex")
+    escalated = await parser.parse("investigate why ci is flaky")
+
+    assert local.title == "Reply to email from alex"
+    assert local.energy == EnergyColumn.QUICK_WIN
+    assert local.source == EnergySource.LOCAL
+    assert escalated.title == "Investigate flaky CI"
+    assert escalated.source == EnergySource.LLM
+    assert mock_client.messages.create.await_count == 1
+    assert parser.snapshot()["local"] == {
+        "enabled": True,
+        "threshold": 0.9,
+        "hits": 1,
+        "escalations": 1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_hashing_embedder_ranks_related_text_closer():
+    """Test that the offline embedder is normalized and roughly semantic."""
+    embedder = HashingEmbedder()
+    query, related, unrelated = await embedder.embed(
+        ["auth bug", "fix the authentication bug in login", "buy groceries for dinner"]
+    )
+
+    def cosine(a, b):
+        return sum(x * y for x, y in zip(a, b))
+
+    assert len(query) == 1536
+    assert abs(cosine(query, query) - 1.0) < 1e-9
+    assert cosine(query, related) > cosine(query, unrelated)
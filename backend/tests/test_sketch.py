@@ -0,0 +1,37 @@
+import random
+
+import pytest
+
+from backend.kz.sketch import RELATIVE_ACCURACY, QuantileSketch, bucket
+
+
+def test_quantiles_within_relative_accuracy():
+    """Test sketch quantiles against exact ones over a skewed sample."""
+    rng = random.Random(0)
+    values = sorted(rng.lognormvariate(9, 2) for _ in range(10_000))
+    sketch = QuantileSketch()
+    for value in values:
+        sketch.add(value)
+
+    assert sketch.count == len(values)
+    for q in (0.0, 0.5, 0.75, 0.9, 0.99, 1.0):
+        exact = max(values[int(q * (len(values) - 1))], 1.0)
+        assert sketch.quantile(q) == pytest.approx(exact, rel=RELATIVE_ACCURACY)
+
+
+def test_merged_sketches_equal_one_sketch():
+    """Test merging stored bucket counts is the same as sketching everything at once."""
+    days = [[60, 3600, 86_400], [0.5, 7200], [3 * 86_400]]
+    whole, merged = QuantileSketch(), QuantileSketch()
+    for day in days:
+        part = QuantileSketch()
+        for seconds in day:
+            whole.add(seconds)
+            part.add(seconds)
+        merged.merge({str(k): n for k, n in part.counts.items()})
+
+    assert merged.counts == whole.counts
+    assert bucket(0.5) == bucket(1) == 0
+    assert QuantileSketch().quantile(0.5) is None
+    with pytest.raises(ValueError):
+        whole.quantile(1.5)
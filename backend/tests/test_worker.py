@@ -0,0 +1,150 @@
+from datetime import timedelta
+
+import pytest
+import pytest_asyncio
+from unittest.mock import AsyncMock
+from sqlalchemy import text
+
+from backend.kz.db.database import get_async_engine, get_async_session_maker
+from backend.kz.models import (
+    Base,
+    BulkAction,
+    EnergyColumn,
+    ParseStatus,
+    TaskBulkOperation,
+    TaskCreate,
+    TaskMove,
+)
+from backend.kz.repositories import ParseJobRepository, TaskRepository
+from backend.kz.services.parser import ParsedTask
+from backend.kz.worker import ParseWorker
+
+
+@pytest_asyncio.fixture
+async def session_maker():
+    """Set up clean database and return a session maker."""
+    engine = get_async_engine()
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    yield get_async_session_maker()
+    await engine.dispose()
+
+
+def make_worker(session_maker, parsed: ParsedTask, max_attempts: int = 3) -> ParseWorker:
+    parser = AsyncMock()
+    parser.parse.return_value = parsed
+    return ParseWorker(parser, session_maker, concurrency=4, max_attempts=max_attempts)
+
+
+@pytest.mark.asyncio
+async def test_worker_enriches_pending_task(session_maker):
+    """Test that the worker writes the parsed title and energy back."""
+    async with session_maker() as session:
+        task = await TaskRepository(session).create_pending(
+            TaskCreate(raw_input="refactor the whole auth layer")
+        )
+
+    worker = make_worker(
+        session_maker,
+        ParsedTask(title="Refactor auth layer", energy=EnergyColumn.HYPERFOCUS, tags=["auth"]),
+    )
+    assert await worker.run_once() == 1
+    worker.parser.parse.assert_awaited_once_with(
+        "refactor the whole auth layer", energy_override=None
+    )
+
+    async with session_maker() as session:
+        enriched = await TaskRepository(session).get_by_id(task.id)
+        assert enriched.title == "Refactor auth layer"
+        assert enriched.energy_column == EnergyColumn.HYPERFOCUS.value
+        assert enriched.parse_status == ParseStatus.PARSED.value
+        assert await ParseJobRepository(session).count_pending() == 0
+        assert [t.id for t in await TaskRepository(session).list_active(tag="auth")] == [task.id]
+
+
+@pytest.mark.asyncio
+async def test_worker_respects_energy_override(session_maker):
+    """Test that an explicit energy column survives the deferred parse."""
+    async with session_maker() as session:
+        await TaskRepository(session).create_pending(
+            TaskCreate(raw_input="update readme", energy_column=EnergyColumn.LOW_ENERGY),
+            energy_override=EnergyColumn.LOW_ENERGY,
+        )
+
+    worker = make_worker(
+        session_maker,
+        ParsedTask(title="Update README", energy=EnergyColumn.LOW_ENERGY, tags=[]),
+    )
+    await worker.run_once()
+    worker.parser.parse.assert_awaited_once_with(
+        "update readme", energy_override=EnergyColumn.LOW_ENERGY
+    )
+
+
+@pytest.mark.asyncio
+async def test_worker_marks_task_failed_after_max_attempts(session_maker):
+    """Test that repeated parser fallbacks end with a failed parse status."""
+    async with session_maker() as session:
+        task = await TaskRepository(session).create_pending(TaskCreate(raw_input="some task"))
+
+    worker = make_worker(
+        session_maker,
+        ParsedTask(title="some task", energy=EnergyColumn.QUICK_WIN, tags=[], fallback=True),
+        max_attempts=1,
+    )
+    await worker.run_once()
+
+    async with session_maker() as session:
+        failed = await TaskRepository(session).get_by_id(task.id)
+        assert failed.title == "some task"
+        assert failed.parse_status == ParseStatus.FAILED.value
+        assert await ParseJobRepository(session).count_pending() == 0
+
+
+@pytest.mark.asyncio
+async def test_worker_rebalances_long_order_keys(session_maker):
+    """Test that idle workers shorten order keys that grew past the limit."""
+    async with session_maker() as session:
+        repo = TaskRepository(session)
+        tasks = await repo.create_many(
+            [TaskCreate(raw_input=name) for name in "abc"], titles=["a", "b", "c"]
+        )
+        for _ in range(12):  # Keep dropping c right below a
+            await repo.move(tasks[2].id, TaskMove(before=tasks[0].id, after=tasks[1].id))
+            await repo.move(tasks[1].id, TaskMove(before=tasks[0].id, after=tasks[2].id))
+
+    worker = make_worker(
+        session_maker, ParsedTask(title="", energy=EnergyColumn.QUICK_WIN, tags=[])
+    )
+    assert await worker.rebalance() == 0  # No limit set
+
+    worker.order_key_max_length = 3
+    assert await worker.rebalance() == 1
+    async with session_maker() as session:
+        column = await TaskRepository(session).list_by_column(EnergyColumn.QUICK_WIN)
+    assert [len(t.position) for t in column] == [2, 2, 2]
+
+
+@pytest.mark.asyncio
+async def test_worker_archives_old_ships(session_maker):
+    """Test that idle workers archive tasks shipped long ago, a batch at a time."""
+    async with session_maker() as session:
+        repo = TaskRepository(session)
+        tasks = await repo.create_many(
+            [TaskCreate(raw_input=name) for name in "abc"], titles=["a", "b", "c"]
+        )
+        await repo.bulk(
+            [TaskBulkOperation(action=BulkAction.SHIP, ids=[t.id for t in tasks])]
+        )
+
+    worker = make_worker(
+        session_maker, ParsedTask(title="", energy=EnergyColumn.QUICK_WIN, tags=[])
+    )
+    assert await worker.archive() == 0  # No age set
+
+    worker.archive_after, worker.archive_batch_size = timedelta(0), 2
+    assert [await worker.archive() for _ in range(3)] == [2, 1, 0]
+    async with session_maker() as session:
+        assert await TaskRepository(session).list_by_column(EnergyColumn.SHIPPED) == []
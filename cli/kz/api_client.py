@@ -7,6 +7,29 @@ import httpx
 
 from cli.kz.config import get_cli_settings
 
+# Largest page the API serves; also the page size when no limit is given.
+MAX_PAGE_SIZE = 1000
+
+# A batch waits on several chunked AI calls, so allow more than the default.
+BATCH_TIMEOUT_SECONDS = 120.0
+
+
+class APIError(httpx.HTTPStatusError):
+    """HTTP error carrying the API's ``detail`` message."""
+
+
+def raise_for_status(response: httpx.Response) -> None:
+    """Like ``Response.raise_for_status`` but surfaces the API's error detail."""
+    if response.is_success:
+        return
+    try:
+        detail = response.json()["detail"]
+    except (ValueError, KeyError, TypeError):
+        detail = response.text or response.reason_phrase
+    if isinstance(detail, dict):
+        detail = detail.get("message", detail)
+    raise APIError(str(detail), request=response.request, response=response)
+
 
 class APIClient:
     """Async HTTP client for the Kanban Zero API."""
@@ -50,26 +73,91 @@ class APIClient:
             payload["energy_column"] = energy_column
 
         response = await self.client.post("/api/tasks", json=payload)
-        response.raise_for_status()
+        raise_for_status(response)
         return response.json()
 
-    async def list_tasks(self, column: str | None = None) -> list[dict[str, Any]]:
-        """List tasks, optionally filtered by column."""
-        params = {}
-        if column:
-            params["column"] = column
-        response = await self.client.get("/api/tasks", params=params)
-        response.raise_for_status()
+    async def create_tasks(
+        self,
+        raw_inputs: list[str],
+        energy_column: str | None = None,
+        created_via: str = "cli",
+        idempotency_key: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """Create many tasks in one request.
+
+        Repeating a request with the same ``idempotency_key`` returns the
+        tasks the first one created instead of creating them again.
+        """
+        payload: dict[str, Any] = {
+            "raw_inputs": raw_inputs,
+            "created_via": created_via,
+        }
+        if energy_column:
+            payload["energy_column"] = energy_column
+        headers = {"Idempotency-Key": idempotency_key} if idempotency_key else None
+
+        response = await self.client.post(
+            "/api/tasks/batch", json=payload, headers=headers, timeout=BATCH_TIMEOUT_SECONDS
+        )
+        raise_for_status(response)
+        return response.json()
+
+    async def search_tasks(
+        self, query: str, limit: int = 10, include_shipped: bool = False
+    ) -> list[dict[str, Any]]:
+        """Semantic search over tasks, best match first."""
+        response = await self.client.post(
+            "/api/tasks/search",
+            json={"query": query, "limit": limit, "include_shipped": include_shipped},
+        )
+        raise_for_status(response)
+        return response.json()
+
+    async def get_changes(self, since: str | None = None) -> dict[str, Any]:
+        """One page of tasks changed and deleted since a delta sync cursor."""
+        params: dict[str, Any] = {"limit": MAX_PAGE_SIZE}
+        if since:
+            params["since"] = since
+        response = await self.client.get("/api/tasks/changes", params=params)
+        raise_for_status(response)
+        return response.json()
+
+    async def ship_task(self, task_id: str, if_match: str | None = None) -> dict[str, Any]:
+        """Ship (complete) a task, optionally only if its ETag still matches.
+
+        The task comes back with the ship counters under ``stats``.
+        """
+        headers = {"If-Match": if_match} if if_match else None
+        response = await self.client.post(f"/api/tasks/{task_id}/ship", headers=headers)
+        raise_for_status(response)
+        return response.json()
+
+    async def list_blocked(self) -> list[dict[str, Any]]:
+        """Unshipped tasks waiting on unshipped blockers, each with ``blocked_by``."""
+        response = await self.client.get("/api/tasks/blocked")
+        raise_for_status(response)
         return response.json()
 
-    async def ship_task(self, task_id: str) -> dict[str, Any]:
-        """Ship (complete) a task."""
-        response = await self.client.post(f"/api/tasks/{task_id}/ship")
-        response.raise_for_status()
+    async def get_graph(self, task_id: str, walk: str, depth: int | None = None) -> Any:
+        """Walk a task's edges: ``walk`` is ``blockers``, ``impact`` or ``lineage``."""
+        params = {"depth": depth} if depth else None
+        response = await self.client.get(f"/api/tasks/{task_id}/{walk}", params=params)
+        raise_for_status(response)
+        return response.json()
+
+    async def bulk(self, operations: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Run bulk operations (get, ship, move, delete) in one request."""
+        response = await self.client.post("/api/tasks/bulk", json={"operations": operations})
+        raise_for_status(response)
         return response.json()
 
     async def get_task(self, task_id: str) -> dict[str, Any]:
         """Get a specific task."""
+        task, _ = await self.get_task_with_etag(task_id)
+        return task
+
+    async def get_task_with_etag(self, task_id: str) -> tuple[dict[str, Any], str]:
+        """Get a task together with its ETag, for conditional writes."""
         response = await self.client.get(f"/api/tasks/{task_id}")
-        response.raise_for_status()
-        return response.json()
+        raise_for_status(response)
+        return response.json(), response.headers["ETag"]
@@ -1,13 +1,17 @@
 """Add task command."""
 
 import asyncio
-from typing import Annotated, Optional
+from typing import Annotated, Any, Optional
+from uuid import uuid4
 
 import typer
 from rich.console import Console
 from rich.panel import Panel
 
 from cli.kz.api_client import APIClient
+from cli.kz.display import display_sync_status
+from cli.kz.mirror import Mirror, ServerChangedError, open_mirror
+from cli.kz.sync import OFFLINE_ERRORS, online
 
 console = Console()
 
@@ -34,21 +38,54 @@ def add(
     asyncio.run(_add_task(task, energy))
 
 
-async def _add_task(task: str, energy: str | None) -> None:
-    """Async implementation of add command."""
+async def add_task(
+    mirror: Mirror, task: str, energy: str | None, client: APIClient | None = None
+) -> dict[str, Any] | None:
+    """Create a task, or queue it (returning None) if the server cannot be reached."""
     try:
-        async with APIClient() as client:
+        async with online(mirror, client) as client:
             result = await client.create_task(task, energy_column=energy)
+    except OFFLINE_ERRORS:
+        mirror.queue(
+            "create", {"raw_inputs": [task], "energy_column": energy, "key": uuid4().hex}
+        )
+        return None
+    mirror.upsert(result)
+    return result
+
 
-        icon = ENERGY_ICONS.get(result["energy_column"], "")
+def show_added(task: str, result: dict[str, Any] | None) -> None:
+    if result is None:
         console.print(
             Panel(
-                f"[bold]{result['title']}[/bold]\n\n"
-                f"{icon} {result['energy_column'].replace('_', ' ').title()}",
-                title="[green]Task Added[/green]",
-                subtitle=f"ID: {result['id'][:8]}",
+                f"[bold]{task}[/bold]\n\n[dim]Offline: added on the next sync.[/dim]",
+                title="[yellow]Task Queued[/yellow]",
             )
         )
+        return
+    icon = ENERGY_ICONS.get(result["energy_column"], "")
+    console.print(
+        Panel(
+            f"[bold]{result['title']}[/bold]\n\n"
+            f"{icon} {result['energy_column'].replace('_', ' ').title()}",
+            title="[green]Task Added[/green]",
+            subtitle=f"ID: {result['id'][:8]}",
+        )
+    )
+
+
+async def _add_task(task: str, energy: str | None) -> None:
+    """Async implementation of add command."""
+    try:
+        mirror = open_mirror()
+    except ServerChangedError as e:
+        console.print(f"[red]Error:[/red] {e}")
+        raise typer.Exit(1)
+    try:
+        show_added(task, await add_task(mirror, task, energy))
+        display_sync_status(mirror)
     except Exception as e:
         console.print(f"[red]Error:[/red] {e}")
         raise typer.Exit(1)
+    finally:
+        mirror.close()
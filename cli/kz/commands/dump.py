@@ -0,0 +1,114 @@
+"""Brain dump command: capture many tasks from stdin at once."""
+
+import asyncio
+import re
+from collections.abc import Iterable, Iterator
+from typing import Annotated, Optional
+from uuid import uuid4
+
+import typer
+from rich.console import Console
+
+from cli.kz.display import display_sync_status, display_tasks_table
+from cli.kz.mirror import ServerChangedError, open_mirror
+from cli.kz.sync import OFFLINE_ERRORS, online
+
+console = Console()
+
+# Lines sent per request. The server parses each request in batched AI calls,
+# so larger chunks mean fewer round trips without slower parsing.
+DUMP_CHUNK_SIZE = 100
+
+# Leading list markers people type out of habit: "- ", "* ", "• ", "1. ", "[ ] "
+LIST_MARKER = re.compile(r"^\s*(?:[-*•]|\d+[.)]|\[[ xX]?\])\s+")
+
+
+def dump(
+    energy: Annotated[
+        Optional[str],
+        typer.Option(
+            "--energy",
+            "-e",
+            help="Put every task in this column: hyperfocus, quick_win, low_energy",
+        ),
+    ] = None,
+) -> None:
+    """Brain dump: add one task per line from stdin.
+
+    Pipe a file in (kz dump < notes.txt) or type lines and finish with ctrl+d.
+    """
+    stdin = typer.get_text_stream("stdin")
+    if stdin.isatty():
+        console.print("[dim]Entering multi-line mode, one task per line. ctrl+d to finish.[/dim]")
+    asyncio.run(_dump_tasks(stdin, energy))
+
+
+def clean_lines(lines: Iterable[str]) -> Iterator[str]:
+    """Strip list markers and whitespace, skipping blank lines."""
+    for line in lines:
+        text = LIST_MARKER.sub("", line).strip()
+        if text:
+            yield text
+
+
+def chunked(lines: Iterable[str], size: int) -> Iterator[list[str]]:
+    """Group lines into lists of at most ``size``, yielding each as soon as it fills."""
+    chunk: list[str] = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def _dump_tasks(lines: Iterable[str], energy: str | None) -> None:
+    """Async implementation of dump command."""
+    created: list[dict] = []
+    queued: list[str] = []
+    chunks = chunked(clean_lines(lines), DUMP_CHUNK_SIZE)
+    chunk: list[str] = []
+    try:
+        mirror = open_mirror()
+    except ServerChangedError as e:
+        console.print(f"[red]Error:[/red] {e}")
+        raise typer.Exit(1)
+    try:
+        try:
+            async with online(mirror) as client:
+                for chunk in chunks:
+                    batch = await client.create_tasks(chunk, energy_column=energy)
+                    mirror.upsert(*batch)
+                    created.extend(batch)
+                    chunk = []
+        except OFFLINE_ERRORS:
+            # Keep the unsent lines (the failed chunk and the rest) for the next
+            # sync, a chunk per entry so each replays as one batch the API takes.
+            for rest in (chunk, *chunks):
+                if rest:
+                    mirror.queue(
+                        "create",
+                        {"raw_inputs": rest, "energy_column": energy, "key": uuid4().hex},
+                    )
+                    queued.extend(rest)
+        except Exception as e:
+            if created:
+                console.print(f"[yellow]Added {len(created)} tasks before failing.[/yellow]")
+            console.print(f"[red]Error:[/red] {e}")
+            raise typer.Exit(1)
+
+        if created:
+            display_tasks_table(created, title="Brain Dump")
+            console.print(
+                f"\n[green]Added {len(created)} tasks.[/green] Your head is clearer now."
+            )
+        if queued:
+            console.print(
+                f"[yellow]Offline:[/yellow] {len(queued)} tasks queued, added on the next sync."
+            )
+        if not created and not queued:
+            console.print("[dim]Nothing to add.[/dim]")
+        display_sync_status(mirror)
+    finally:
+        mirror.close()
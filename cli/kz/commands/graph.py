@@ -0,0 +1,88 @@
+"""Task graph commands: blocked, tree and impact."""
+
+import asyncio
+from typing import Annotated, Optional
+
+import typer
+from rich.console import Console
+
+from cli.kz.api_client import APIClient
+from cli.kz.display import display_blocked, display_task_graph
+
+console = Console()
+
+Depth = Annotated[
+    Optional[int],
+    typer.Option("--depth", "-d", min=1, max=100, help="Follow at most this many edges"),
+]
+
+
+def blocked(
+    task_id: Annotated[
+        Optional[str],
+        typer.Argument(help="Show what this task waits on instead (ID or prefix)"),
+    ] = None,
+    depth: Depth = None,
+) -> None:
+    """List tasks waiting on unshipped blockers."""
+    asyncio.run(_blocked(task_id, depth))
+
+
+def tree(
+    task_id: Annotated[str, typer.Argument(help="Task ID or unique prefix, e.g. 3f2a")],
+    depth: Depth = None,
+) -> None:
+    """Show a task's lineage: what it was spawned from and what grew out of it."""
+    asyncio.run(_tree(task_id, depth))
+
+
+def impact(
+    task_id: Annotated[str, typer.Argument(help="Task ID or unique prefix, e.g. 3f2a")],
+    depth: Depth = None,
+) -> None:
+    """Show everything waiting on a task, directly or not."""
+    asyncio.run(_impact(task_id, depth))
+
+
+async def _blocked(task_id: str | None, depth: int | None) -> None:
+    """Async implementation of blocked command."""
+    try:
+        async with APIClient() as client:
+            if task_id is None:
+                display_blocked(await client.list_blocked())
+                return
+            task = await client.get_task(task_id)
+            blockers = await client.get_graph(task["id"], "blockers", depth)
+        display_task_graph(task, {"waiting on": blockers})
+
+    except Exception as e:
+        console.print(f"[red]Error:[/red] {e}")
+        raise typer.Exit(1)
+
+
+async def _tree(task_id: str, depth: int | None) -> None:
+    """Async implementation of tree command."""
+    try:
+        async with APIClient() as client:
+            task = await client.get_task(task_id)
+            lineage = await client.get_graph(task["id"], "lineage", depth)
+        display_task_graph(
+            task, {"spawned from": lineage["ancestors"], "spawned": lineage["descendants"]}
+        )
+
+    except Exception as e:
+        console.print(f"[red]Error:[/red] {e}")
+        raise typer.Exit(1)
+
+
+async def _impact(task_id: str, depth: int | None) -> None:
+    """Async implementation of impact command."""
+    try:
+        async with APIClient() as client:
+            task = await client.get_task(task_id)
+            impacted = await client.get_graph(task["id"], "impact", depth)
+        display_task_graph(task, {"holds up": impacted})
+
+    except Exception as e:
+        console.print(f"[red]Error:[/red] {e}")
+        raise typer.Exit(1)
@@ -1,13 +1,12 @@
 """List tasks command."""
 
-import asyncio
-from typing import Annotated, Optional
+from typing import Annotated, Any, Optional
 
 import typer
 from rich.console import Console
 
-from cli.kz.api_client import APIClient
-from cli.kz.display import display_tasks_by_column, display_tasks_table
+from cli.kz.display import display_sync_status, display_tasks_by_column, display_tasks_table
+from cli.kz.mirror import ensure_fresh, open_mirror
 
 console = Console()
 
@@ -25,21 +24,38 @@ def list_tasks(
         bool,
         typer.Option("--table", "-t", help="Display as table instead of grouped"),
     ] = False,
+    limit: Annotated[
+        Optional[int],
+        typer.Option("--limit", "-n", min=1, help="Show at most this many tasks"),
+    ] = None,
+    fresh: Annotated[
+        bool,
+        typer.Option("--fresh", "-f", help="Sync with the server before listing"),
+    ] = False,
 ) -> None:
     """List all active tasks."""
-    asyncio.run(_list_tasks(column, table))
+    _list_tasks(column, table, limit, fresh)
 
 
-async def _list_tasks(column: str | None, as_table: bool) -> None:
-    """Async implementation of list command."""
-    try:
-        async with APIClient() as client:
-            tasks = await client.list_tasks(column=column)
+def show_tasks(tasks: list[dict[str, Any]], as_table: bool) -> None:
+    if as_table:
+        display_tasks_table(tasks)
+    else:
+        display_tasks_by_column(tasks)
 
-        if as_table:
-            display_tasks_table(tasks)
-        else:
-            display_tasks_by_column(tasks)
+
+def _list_tasks(
+    column: str | None, as_table: bool, limit: int | None, fresh: bool = False
+) -> None:
+    """Implementation of list command."""
+    try:
+        mirror = open_mirror()
+        try:
+            up_to_date = ensure_fresh(mirror, fresh)
+            show_tasks(mirror.list_tasks(column=column, limit=limit), as_table)
+            display_sync_status(mirror, stale=not up_to_date)
+        finally:
+            mirror.close()
 
     except Exception as e:
         console.print(f"[red]Error:[/red] {e}")
@@ -0,0 +1,38 @@
+"""Semantic search command."""
+
+import asyncio
+from typing import Annotated
+
+import typer
+from rich.console import Console
+
+from cli.kz.api_client import APIClient
+from cli.kz.display import display_search_results
+
+console = Console()
+
+
+def search(
+    query: Annotated[str, typer.Argument(help="What you're looking for, in your own words")],
+    limit: Annotated[
+        int, typer.Option("--limit", "-n", min=1, max=100, help="How many matches to show")
+    ] = 10,
+    shipped: Annotated[
+        bool, typer.Option("--shipped", "-s", help="Include shipped tasks")
+    ] = False,
+) -> None:
+    """Find tasks by meaning: kz search "that auth thing"."""
+    asyncio.run(_search(query, limit, shipped))
+
+
+async def _search(query: str, limit: int, shipped: bool) -> None:
+    """Async implementation of search command."""
+    try:
+        async with APIClient() as client:
+            results = await client.search_tasks(query, limit=limit, include_shipped=shipped)
+
+        display_search_results(results, query)
+
+    except Exception as e:
+        console.print(f"[red]Error:[/red] {e}")
+        raise typer.Exit(1)
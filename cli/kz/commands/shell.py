@@ -0,0 +1,176 @@
+"""Interactive shell: many commands over one connection and one open mirror."""
+
+import asyncio
+import shlex
+
+import httpx
+import typer
+from rich.console import Console
+
+from cli.kz.api_client import APIClient
+from cli.kz.commands.add import add_task, show_added
+from cli.kz.commands.list import show_tasks
+from cli.kz.commands.ship import ship_and_show
+from cli.kz.commands.wins import show_wins
+from cli.kz.config import get_cli_settings
+from cli.kz.display import display_sync_status
+from cli.kz.mirror import Mirror, ServerChangedError, open_mirror
+from cli.kz.sync import pull, replay, sync_lock
+
+try:
+    import readline  # Importing it gives input() line editing and history
+except ImportError:  # Not on every platform; the shell works without it
+    readline = None  # type: ignore[assignment]
+
+console = Console()
+
+PROMPT = "kz> "
+EXIT_WORDS = {"exit", "quit", "q"}
+COLUMNS = ["hyperfocus", "quick_win", "low_energy"]
+
+
+def shell(ctx: typer.Context) -> None:
+    """Interactive shell: run many commands over one connection."""
+    asyncio.run(_shell(ctx.parent or ctx))
+
+
+class Shell:
+    """A session: one HTTP client kept alive and the mirror kept open.
+
+    Verbs take the same arguments as the commands they stand for (those are
+    parsed by the real commands), but run against the session, so a read
+    costs at most one delta sync and a write one request on a warm
+    connection.
+    """
+
+    VERBS = ["add", "list", "ship", "wins", "sync", "help", "exit"]
+
+    def __init__(self, kz: typer.Context, client: APIClient, mirror: Mirror) -> None:
+        self.kz = kz
+        self.client = client
+        self.mirror = mirror
+        self.task_ids: list[str] = []
+
+    async def run(self) -> None:
+        self._enable_completion()
+        console.print("[dim]Kanban Zero shell. Verbs: " + ", ".join(self.VERBS) + ".[/dim]")
+        while True:
+            self.task_ids = [task["id"][:8] for task in self.mirror.list_tasks()]
+            try:
+                line = input(PROMPT)
+            except EOFError:
+                console.print()
+                return
+            except KeyboardInterrupt:
+                console.print()
+                continue
+            try:
+                words = shlex.split(line)
+            except ValueError as e:
+                console.print(f"[red]Error:[/red] {e}")
+                continue
+            if not words:
+                continue
+            if words[0] in EXIT_WORDS:
+                return
+            try:
+                await self.dispatch(words[0], words[1:])
+            except KeyboardInterrupt:
+                console.print()
+            except Exception as e:
+                console.print(f"[red]Error:[/red] {e}")
+
+    async def dispatch(self, verb: str, args: list[str]) -> None:
+        if verb == "help":
+            console.print("Verbs: " + ", ".join(self.VERBS) + ". Try '<verb> --help'.")
+            return
+        handler = getattr(self, f"do_{verb}", None)
+        command = self.kz.command.get_command(self.kz, verb)  # type: ignore[attr-defined]
+        if handler is None or command is None:
+            console.print(f"[red]Unknown verb:[/red] {verb}. Try 'help'.")
+            return
+        try:
+            params = command.make_context(verb, args, parent=self.kz).params
+        except typer.Exit:
+            return  # --help was shown
+        except Exception as e:
+            if not hasattr(e, "show"):
+                raise
+            e.show()  # click usage errors print themselves, with usage
+            return
+        await handler(**params)
+
+    async def refresh(self, fresh: bool = False) -> bool:
+        """Pull changes if the mirror is stale; False if the server is unreachable."""
+        if not fresh and self.mirror.age() <= get_cli_settings().mirror_max_age_seconds:
+            return True
+        try:
+            with sync_lock(get_cli_settings().mirror_path):
+                await replay(self.mirror, self.client)
+                await pull(self.mirror, self.client)
+        except httpx.TransportError:
+            return False
+        return True
+
+    async def do_add(self, task: str, energy: str | None) -> None:
+        show_added(task, await add_task(self.mirror, task, energy, self.client))
+
+    async def do_list(
+        self, column: str | None, table: bool, limit: int | None, fresh: bool
+    ) -> None:
+        up_to_date = await self.refresh(fresh)
+        show_tasks(self.mirror.list_tasks(column=column, limit=limit), table)
+        display_sync_status(self.mirror, stale=not up_to_date)
+
+    async def do_ship(self, task_ids: list[str]) -> None:
+        await ship_and_show(self.mirror, task_ids, self.client)
+
+    async def do_wins(self, limit: int, fresh: bool) -> None:
+        up_to_date = await self.refresh(fresh)
+        show_wins(self.mirror.list_tasks(column="quick_win", limit=limit))
+        display_sync_status(self.mirror, stale=not up_to_date)
+
+    async def do_sync(self, quiet: bool) -> None:
+        if not await self.refresh(fresh=True):
+            console.print("[yellow]Offline:[/yellow] cannot reach the server, try again later.")
+        if not quiet:
+            display_sync_status(self.mirror)
+
+    def complete(self, text: str, state: int) -> str | None:
+        """Readline completer: verbs, then task IDs and energy columns."""
+        # Whole words before the one being completed
+        words = readline.get_line_buffer()[: readline.get_begidx()].split()
+        if not words:
+            options = self.VERBS
+        elif words[-1] in ("-c", "--column", "-e", "--energy"):
+            options = COLUMNS
+        elif words[0] == "ship":
+            options = self.task_ids
+        else:
+            options = []
+        matches = [option for option in options if option.startswith(text)]
+        return matches[state] if state < len(matches) else None
+
+    def _enable_completion(self) -> None:
+        if readline is None:
+            return
+        readline.set_completer(self.complete)
+        readline.set_completer_delims(" \t")
+        readline.parse_and_bind("tab: complete")
+
+
+async def _shell(kz: typer.Context) -> None:
+    """Async implementation of shell command."""
+    try:
+        mirror = open_mirror()
+    except ServerChangedError as e:
+        console.print(f"[red]Error:[/red] {e}")
+        raise typer.Exit(1)
+    try:
+        async with APIClient() as client:
+            session = Shell(kz, client, mirror)
+            if not mirror.is_warm:
+                await session.refresh(fresh=True)
+            await session.run()
+    finally:
+        mirror.close()
@@ -1,38 +1,146 @@
 """Ship (complete) task command."""
 
 import asyncio
-from typing import Annotated
+from typing import Annotated, Any
 
 import typer
 from rich.console import Console
 from rich.panel import Panel
 
 from cli.kz.api_client import APIClient
+from cli.kz.display import display_sync_status
+from cli.kz.mirror import SHIPPED, Mirror, ServerChangedError, open_mirror
+from cli.kz.sync import OFFLINE_ERRORS, online
 
 console = Console()
 
+UUID_DIGITS = 32
+
 
 def ship(
-    task_id: Annotated[str, typer.Argument(help="Task ID (full or partial)")],
+    task_ids: Annotated[list[str], typer.Argument(help="Task IDs (full or partial)")],
 ) -> None:
-    """Ship (complete) a task. Celebrate!"""
-    asyncio.run(_ship_task(task_id))
+    """Ship (complete) tasks. Celebrate!"""
+    asyncio.run(_ship_task(task_ids))
 
 
-async def _ship_task(task_id: str) -> None:
-    """Async implementation of ship command."""
+async def ship_task(
+    mirror: Mirror, task_id: str, client: APIClient | None = None
+) -> tuple[dict[str, Any], bool]:
+    """Ship a task, or queue the ship if the server cannot be reached.
+
+    Returns the task (with the ship counters under ``stats`` when shipped
+    online) and whether the ship was queued. Partial IDs resolve against the
+    mirror, so they work offline too.
+    """
+    task = mirror.get(task_id)
+    try:
+        async with online(mirror, client) as client:
+            result = await client.ship_task(task["id"] if task else task_id)
+    except OFFLINE_ERRORS:
+        if task is None:
+            raise
+        _queue_ship(mirror, task)
+        return task, True
+    mirror.upsert({key: value for key, value in result.items() if key != "stats"})
+    return result, False
+
+
+async def ship_tasks(
+    mirror: Mirror, task_ids: list[str], client: APIClient | None = None
+) -> tuple[list[dict[str, Any]], list[str], bool]:
+    """Ship many tasks in one bulk request, or queue them while offline.
+
+    Returns the tasks, the IDs that matched no task and whether the ships
+    were queued. Every ID must be a full ID or a prefix of a mirrored task.
+    """
+    tasks = {task_id: mirror.get(task_id) for task_id in task_ids}
+    unknown = [
+        task_id
+        for task_id, task in tasks.items()
+        if task is None and len(task_id.replace("-", "")) != UUID_DIGITS
+    ]
+    if unknown:
+        raise ValueError(f"Unknown task ID(s): {', '.join(unknown)} (try 'kz sync')")
+    ids = list(dict.fromkeys(task["id"] if task else i for i, task in tasks.items()))
     try:
-        async with APIClient() as client:
-            result = await client.ship_task(task_id)
+        async with online(mirror, client) as client:
+            [result] = await client.bulk([{"action": "ship", "ids": ids}])
+    except OFFLINE_ERRORS:
+        known = [task for task in tasks.values() if task is not None]
+        for task in known:
+            _queue_ship(mirror, task)
+        return known, [i for i, task in tasks.items() if task is None], True
+    mirror.upsert(*result["tasks"])
+    return result["tasks"], result["missing"], False
+
+
+def _queue_ship(mirror: Mirror, task: dict[str, Any]) -> None:
+    if task["energy_column"] != SHIPPED:
+        mirror.queue(
+            "ship", {"title": task["title"]}, task_id=task["id"], base_updated_at=task["updated_at"]
+        )
+        mirror.upsert({**task, "energy_column": SHIPPED})
+
+
+def show_shipped(task: dict[str, Any], queued: bool) -> None:
+    console.print(
+        Panel(
+            f"[bold green]{task['title']}[/bold green]\n\n"
+            f"[green]rocket_launch[/green] Shipped!",
+            title="[green bold]Task Completed![/green bold]",
+            border_style="green",
+        )
+    )
+    if stats := task.get("stats"):
+        days = "day" if stats["streak"] == 1 else "days"
+        console.print(
+            f"Today: [bold]{stats['today']}[/bold] shipped · "
+            f"Streak: [bold]{stats['streak']}[/bold] {days} · "
+            f"All-time: [bold]{stats['all_time']}[/bold]"
+        )
+    if queued:
+        console.print("[dim]Offline: the server will hear about it on the next sync.[/dim]")
 
+
+def show_shipped_many(tasks: list[dict[str, Any]], missing: list[str], queued: bool) -> None:
+    if tasks:
+        titles = "\n".join(f"[bold green]{task['title']}[/bold green]" for task in tasks)
         console.print(
             Panel(
-                f"[bold green]{result['title']}[/bold green]\n\n"
-                f"[green]rocket_launch[/green] Shipped!",
-                title="[green bold]Task Completed![/green bold]",
+                f"{titles}\n\n[green]rocket_launch[/green] {len(tasks)} shipped!",
+                title="[green bold]Tasks Completed![/green bold]",
                 border_style="green",
             )
         )
+    if missing:
+        console.print(f"[yellow]Not found:[/yellow] {', '.join(missing)}")
+    if queued:
+        console.print("[dim]Offline: the server will hear about it on the next sync.[/dim]")
+
+
+async def ship_and_show(
+    mirror: Mirror, task_ids: list[str], client: APIClient | None = None
+) -> None:
+    """Ship one task (by itself) or many (in one bulk request) and show the result."""
+    if len(task_ids) == 1:
+        show_shipped(*await ship_task(mirror, task_ids[0], client))
+    else:
+        show_shipped_many(*await ship_tasks(mirror, task_ids, client))
+    display_sync_status(mirror)
+
+
+async def _ship_task(task_ids: list[str]) -> None:
+    """Async implementation of ship command."""
+    try:
+        mirror = open_mirror()
+    except ServerChangedError as e:
+        console.print(f"[red]Error:[/red] {e}")
+        raise typer.Exit(1)
+    try:
+        await ship_and_show(mirror, task_ids)
     except Exception as e:
         console.print(f"[red]Error:[/red] {e}")
         raise typer.Exit(1)
+    finally:
+        mirror.close()
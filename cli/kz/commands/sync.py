@@ -0,0 +1,50 @@
+"""Sync command: bring the local mirror up to date with the server."""
+
+import asyncio
+from typing import Annotated
+
+import typer
+from rich.console import Console
+
+from cli.kz.display import display_sync_status
+from cli.kz.mirror import ServerChangedError, open_mirror
+from cli.kz.sync import OFFLINE_ERRORS, sync
+
+console = Console()
+
+
+def sync_mirror(
+    quiet: Annotated[
+        bool,
+        typer.Option("--quiet", "-q", help="Print nothing; skip if a sync is already running"),
+    ] = False,
+) -> None:
+    """Send changes made offline and fetch everything new."""
+    asyncio.run(_sync(quiet))
+
+
+async def _sync(quiet: bool) -> None:
+    """Async implementation of sync command."""
+    try:
+        mirror = open_mirror()
+    except ServerChangedError as e:
+        if not quiet:
+            console.print(f"[red]Error:[/red] {e}")
+        raise typer.Exit(1)
+    try:
+        # Background refreshes must not queue up behind one another.
+        await sync(mirror, wait=not quiet)
+        if not quiet:
+            display_sync_status(mirror)
+            console.print("[green]Up to date.[/green]")
+    except Exception as e:
+        if quiet:
+            raise typer.Exit(1)
+        if isinstance(e, OFFLINE_ERRORS):
+            console.print("[yellow]Offline:[/yellow] cannot reach the server, try again later.")
+        else:
+            console.print(f"[red]Error:[/red] {e}")
+        display_sync_status(mirror)
+        raise typer.Exit(1)
+    finally:
+        mirror.close()
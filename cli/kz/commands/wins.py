@@ -1,34 +1,48 @@
 """Quick wins shortcut command."""
 
-import asyncio
+from typing import Annotated, Any
 
 import typer
 from rich.console import Console
 
-from cli.kz.api_client import APIClient
-from cli.kz.display import display_tasks_table
+from cli.kz.display import display_sync_status, display_tasks_table
+from cli.kz.mirror import ensure_fresh, open_mirror
 
 console = Console()
 
 
-def wins() -> None:
+def wins(
+    limit: Annotated[
+        int, typer.Option("--limit", "-n", min=1, help="How many quick wins to show")
+    ] = 10,
+    fresh: Annotated[
+        bool,
+        typer.Option("--fresh", "-f", help="Sync with the server before listing"),
+    ] = False,
+) -> None:
     """Show quick win tasks only. Easy dopamine hits!"""
-    asyncio.run(_show_wins())
+    _show_wins(limit, fresh)
 
 
-async def _show_wins() -> None:
-    """Async implementation of wins command."""
-    try:
-        async with APIClient() as client:
-            tasks = await client.list_tasks(column="quick_win")
+def show_wins(tasks: list[dict[str, Any]]) -> None:
+    if not tasks:
+        console.print("[yellow]No quick wins right now. Add some![/yellow]")
+        console.print("[dim]kz add 'small task' --energy quick_win[/dim]")
+        return
+    console.print("[yellow bold]bolt QUICK WINS[/yellow bold]\n")
+    display_tasks_table(tasks, title="Ready for easy wins?")
 
-        if not tasks:
-            console.print("[yellow]No quick wins right now. Add some![/yellow]")
-            console.print("[dim]kz add 'small task' --energy quick_win[/dim]")
-            return
 
-        console.print("[yellow bold]bolt QUICK WINS[/yellow bold]\n")
-        display_tasks_table(tasks, title="Ready for easy wins?")
+def _show_wins(limit: int, fresh: bool = False) -> None:
+    """Implementation of wins command."""
+    try:
+        mirror = open_mirror()
+        try:
+            up_to_date = ensure_fresh(mirror, fresh)
+            show_wins(mirror.list_tasks(column="quick_win", limit=limit))
+            display_sync_status(mirror, stale=not up_to_date)
+        finally:
+            mirror.close()
 
     except Exception as e:
         console.print(f"[red]Error:[/red] {e}")
@@ -1,23 +1,73 @@
-"""CLI configuration."""
+"""CLI configuration.
 
+Settings are read with the standard library rather than pydantic-settings:
+every command needs them, and importing pydantic would cost more than the
+rest of a ``kz list`` that is served from the local mirror.
+"""
+
+import os
+from dataclasses import dataclass, field, fields
 from functools import lru_cache
+from pathlib import Path
 
-from pydantic_settings import BaseSettings, SettingsConfigDict
 
+def default_mirror_path() -> Path:
+    """``$XDG_DATA_HOME/kz/mirror.db``, defaulting to ``~/.local/share``."""
+    data_home = os.environ.get("XDG_DATA_HOME") or Path.home() / ".local" / "share"
+    return Path(data_home) / "kz" / "mirror.db"
+
+
+def read_env_file(path: Path) -> dict[str, str]:
+    """``KEY=value`` lines of a dotenv file (missing file: nothing)."""
+    try:
+        lines = path.read_text(encoding="utf-8").splitlines()
+    except (FileNotFoundError, IsADirectoryError):
+        return {}
+    values = {}
+    for line in lines:
+        line = line.strip().removeprefix("export ")
+        if not line or line.startswith("#") or "=" not in line:
+            continue
+        key, _, value = line.partition("=")
+        value = value.strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+            value = value[1:-1]
+        else:
+            value = value.split(" #", 1)[0].rstrip()
+        values[key.strip()] = value
+    return values
 
-class CLISettings(BaseSettings):
-    """CLI settings loaded from environment."""
 
-    model_config = SettingsConfigDict(
-        env_file=".env",
-        env_file_encoding="utf-8",
-        extra="ignore",
-    )
+@dataclass(frozen=True)
+class CLISettings:
+    """CLI settings loaded from environment."""
 
     api_base_url: str = "http://localhost:8000"
 
+    # Local mirror of the board (see cli/kz/mirror.py)
+    mirror_path: Path = field(default_factory=default_mirror_path)
+    mirror_max_age_seconds: float = 30.0  # older than this, reads refresh in the background
+
+    @classmethod
+    def from_env(cls, env_file: Path = Path(".env")) -> "CLISettings":
+        """Environment variables first, then ``env_file``, then defaults.
+
+        Variables are named after the fields, in any case.
+        """
+        sources = [
+            {key.lower(): value for key, value in os.environ.items()},
+            {key.lower(): value for key, value in read_env_file(env_file).items()},
+        ]
+        values = {}
+        for f in fields(cls):
+            for source in sources:
+                if f.name in source:
+                    values[f.name] = f.type(source[f.name])
+                    break
+        return cls(**values)
+
 
 @lru_cache
 def get_cli_settings() -> CLISettings:
     """Get cached CLI settings."""
-    return CLISettings()
+    return CLISettings.from_env()
@@ -1,7 +1,12 @@
 """Rich display helpers for CLI output."""
 
+from datetime import datetime
+
 from rich.console import Console
 from rich.table import Table
+from rich.tree import Tree
+
+from cli.kz.mirror import Mirror
 
 console = Console()
 
@@ -38,6 +43,77 @@ def display_tasks_table(tasks: list[dict], title: str = "Tasks") -> None:
     console.print(table)
 
 
+def display_search_results(results: list[dict], query: str) -> None:
+    """Display semantic search matches with their similarity."""
+    if not results:
+        console.print(f"[dim]Nothing like '{query}' found.[/dim]")
+        return
+
+    table = Table(title=f"Search: {query}", show_header=True, header_style="bold")
+    table.add_column("ID", style="dim", width=8)
+    table.add_column("Title", style="bold")
+    table.add_column("Energy", justify="center")
+    table.add_column("Match", justify="right")
+
+    for task in results:
+        style, icon = ENERGY_STYLES.get(task["energy_column"], ("white", "task"))
+        table.add_row(
+            task["id"][:8],
+            task["title"],
+            f"[{style}]{icon}[/{style}]",
+            f"{task['score']:.0%}",
+        )
+
+    console.print(table)
+
+
+def display_blocked(tasks: list[dict]) -> None:
+    """Display blocked tasks with the short IDs of what they wait on."""
+    if not tasks:
+        console.print("[green]Nothing is blocked. Go ship something![/green]")
+        return
+
+    table = Table(title="Blocked", show_header=True, header_style="bold")
+    table.add_column("ID", style="dim", width=8)
+    table.add_column("Title", style="bold")
+    table.add_column("Energy", justify="center")
+    table.add_column("Waiting on", style="red")
+
+    for task in tasks:
+        style, icon = ENERGY_STYLES.get(task["energy_column"], ("white", "task"))
+        table.add_row(
+            task["id"][:8],
+            task["title"],
+            f"[{style}]{icon}[/{style}]",
+            ", ".join(blocker[:8] for blocker in task["blocked_by"]),
+        )
+
+    console.print(table)
+
+
+def add_graph_branch(tree: Tree, task_id: str, nodes: list[dict]) -> None:
+    """Hang graph walk ``nodes`` under ``tree``, each below the task it was reached via."""
+    for node in nodes:
+        if node["via"] == task_id:
+            style, icon = ENERGY_STYLES.get(node["energy_column"], ("white", "task"))
+            branch = tree.add(
+                f"[{style}]{icon}[/{style}] {node['title']} "
+                f"[dim]({node['id'][:8]}, {node['edge_type'].replace('_', ' ')})[/dim]"
+            )
+            add_graph_branch(branch, node["id"], nodes)
+
+
+def display_task_graph(task: dict, branches: dict[str, list[dict]]) -> None:
+    """Display a task with graph walks from it as a tree, one labelled branch per walk."""
+    tree = Tree(f"[bold]{task['title']}[/bold] [dim]({task['id'][:8]})[/dim]")
+    for label, nodes in branches.items():
+        if nodes:
+            add_graph_branch(tree.add(f"[dim]{label}[/dim]"), task["id"], nodes)
+        else:
+            tree.add(f"[dim]{label}: none[/dim]")
+    console.print(tree)
+
+
 def display_tasks_by_column(tasks: list[dict]) -> None:
     """Display tasks grouped by energy column."""
     columns = {
@@ -51,9 +127,25 @@ def display_tasks_by_column(tasks: list[dict]) -> None:
         if col in columns:
             columns[col].append(task)
 
+    # One print for the whole board: each print call is rendered and flushed
+    # separately, which dominated listing time for a long board.
+    lines = []
     for col_name, col_tasks in columns.items():
         if col_tasks:
             style, icon = ENERGY_STYLES.get(col_name, ("white", "task"))
-            console.print(f"\n[{style} bold]{icon} {col_name.upper().replace('_', ' ')}[/{style} bold]")
+            lines.append(f"\n[{style} bold]{icon} {col_name.upper().replace('_', ' ')}[/{style} bold]")
             for task in col_tasks:
-                console.print(f"  [{style}]•[/{style}] {task['title']} [dim]({task['id'][:8]})[/dim]")
+                lines.append(f"  [{style}]•[/{style}] {task['title']} [dim]({task['id'][:8]})[/dim]")
+    if lines:
+        console.print("\n".join(lines), highlight=False)
+
+
+def display_sync_status(mirror: Mirror, stale: bool = False) -> None:
+    """Show conflicts found by earlier syncs and writes still waiting to sync."""
+    for message in mirror.pop_conflicts():
+        console.print(f"[yellow]Sync conflict:[/yellow] {message}")
+    if stale and mirror.synced_at is not None:
+        synced = datetime.fromtimestamp(mirror.synced_at).strftime("%H:%M")
+        console.print(f"[dim]Offline: showing tasks as of {synced}.[/dim]")
+    if pending := mirror.pending_count():
+        console.print(f"[dim]{pending} change(s) waiting to sync.[/dim]")
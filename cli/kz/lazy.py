@@ -0,0 +1,53 @@
+"""Commands that are imported only when they run.
+
+Building a Typer app imports every command function up front, and with them
+rich, httpx and everything else the commands use, even for ``kz --version``.
+Here each command is registered by import path and one-line help instead, so
+``kz --help`` lists it and ``kz <command>`` loads just that command.
+"""
+
+import importlib
+from functools import cached_property
+from typing import Any, ClassVar
+
+import typer
+from typer.core import TyperCommand, TyperGroup
+
+
+class LazyCommand(TyperCommand):
+    """Stands in for a command, knowing only its name and help until it runs."""
+
+    def __init__(self, name: str, import_path: str, help: str) -> None:
+        super().__init__(name, help=help)
+        self.import_path = import_path
+
+    @cached_property
+    def command(self) -> TyperCommand:
+        """The real command, built from ``module:function`` as Typer would."""
+        module, _, function = self.import_path.partition(":")
+        app = typer.Typer(add_completion=False)
+        app.command(self.name)(getattr(importlib.import_module(module), function))
+        command = typer.main.get_command(app)
+        assert isinstance(command, TyperCommand)
+        return command
+
+    def make_context(
+        self,
+        info_name: str | None,
+        args: list[str],
+        parent: typer.Context | None = None,
+        **extra: Any,
+    ) -> typer.Context:
+        # The context belongs to the real command, so it parses and invokes.
+        return self.command.make_context(info_name, args, parent, **extra)
+
+
+class LazyGroup(TyperGroup):
+    """Typer group that adds ``lazy_commands``: name -> (``module:function``, help)."""
+
+    lazy_commands: ClassVar[dict[str, tuple[str, str]]] = {}
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        for name, (import_path, help) in self.lazy_commands.items():
+            self.add_command(LazyCommand(name, import_path, help))
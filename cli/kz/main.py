@@ -5,15 +5,49 @@ from typing import Annotated, Optional
 import typer
 
 from cli.kz import __version__
-from cli.kz.commands.add import add
-from cli.kz.commands.list import list_tasks
-from cli.kz.commands.ship import ship
-from cli.kz.commands.wins import wins
+from cli.kz.lazy import LazyGroup
+
+# Commands load on first use (see cli/kz/lazy.py). Keep each help line in
+# step with the first line of the command's docstring.
+COMMANDS = {
+    "add": ("cli.kz.commands.add:add", "Add a new task with AI parsing."),
+    "blocked": ("cli.kz.commands.graph:blocked", "List tasks waiting on unshipped blockers."),
+    "dump": ("cli.kz.commands.dump:dump", "Brain dump: add one task per line from stdin."),
+    "impact": (
+        "cli.kz.commands.graph:impact",
+        "Show everything waiting on a task, directly or not.",
+    ),
+    "list": ("cli.kz.commands.list:list_tasks", "List all active tasks."),
+    "search": (
+        "cli.kz.commands.search:search",
+        'Find tasks by meaning: kz search "that auth thing".',
+    ),
+    "shell": (
+        "cli.kz.commands.shell:shell",
+        "Interactive shell: run many commands over one connection.",
+    ),
+    "ship": ("cli.kz.commands.ship:ship", "Ship (complete) tasks. Celebrate!"),
+    "sync": (
+        "cli.kz.commands.sync:sync_mirror",
+        "Send changes made offline and fetch everything new.",
+    ),
+    "tree": (
+        "cli.kz.commands.graph:tree",
+        "Show a task's lineage: what it was spawned from and what grew out of it.",
+    ),
+    "wins": ("cli.kz.commands.wins:wins", "Show quick win tasks only. Easy dopamine hits!"),
+}
+
+
+class Commands(LazyGroup):
+    lazy_commands = COMMANDS
+
 
 app = typer.Typer(
     name="kz",
     help="Kanban Zero - AI-native, energy-aware task management for ADHD brains",
     no_args_is_help=True,
+    cls=Commands,
 )
 
 
@@ -35,12 +69,5 @@ def main(
     pass
 
 
-# Register commands
-app.command()(add)
-app.command("list")(list_tasks)
-app.command()(ship)
-app.command()(wins)
-
-
 if __name__ == "__main__":
     app()
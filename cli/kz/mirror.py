@@ -0,0 +1,296 @@
+"""Local SQLite mirror of the board.
+
+Reads render from here without touching the network. The mirror is kept
+current by delta sync against ``/api/tasks/changes`` (see ``cli.kz.sync``),
+and writes made while the server is unreachable wait in an outbox until the
+next sync replays them.
+"""
+
+import json
+import sqlite3
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from cli.kz.config import get_cli_settings
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS task (
+    id TEXT PRIMARY KEY,
+    energy_column TEXT NOT NULL,
+    position TEXT NOT NULL,
+    created_ts REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_task_board
+    ON task (energy_column, position, created_ts DESC, id DESC);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    op TEXT NOT NULL,
+    task_id TEXT,
+    payload TEXT NOT NULL,
+    base_updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS conflict (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    message TEXT NOT NULL
+);
+"""
+
+# Bump when the task table changes shape; older mirrors are refilled.
+SCHEMA_VERSION = 1
+
+SHIPPED = "shipped"
+HEX_DIGITS = set("0123456789abcdef")
+
+
+class AmbiguousTaskIdError(Exception):
+    """A short task ID matches more than one mirrored task."""
+
+
+class ServerChangedError(Exception):
+    """The server changed while writes made offline still wait for the old one."""
+
+
+@dataclass(frozen=True)
+class OutboxEntry:
+    """A write made offline, waiting to be replayed against the server."""
+
+    id: int
+    op: str
+    task_id: str | None
+    payload: dict[str, Any]
+    base_updated_at: str | None
+
+
+class Mirror:
+    """Tasks, sync cursor and pending writes in one SQLite file.
+
+    The database runs in WAL mode, so a background sync never blocks reads.
+    """
+
+    def __init__(self, path: Path, base_url: str) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=5.0, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        if self.db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            # Tasks and the sync position go; queued writes stay
+            self.db.executescript("DROP TABLE IF EXISTS task; DROP TABLE IF EXISTS meta")
+            self.db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.db.executescript(SCHEMA)
+        # A mirror only makes sense against the server it was filled from,
+        # and queued writes must only ever be replayed against that server
+        previous = self._meta("base_url")
+        if previous not in (None, base_url):
+            if pending := self.pending_count():
+                self.db.close()
+                raise ServerChangedError(
+                    f"{pending} change(s) made offline are waiting to sync to {previous}. "
+                    f"Set API_BASE_URL back to it and run 'kz sync' before switching "
+                    f"servers, or delete {path} to drop them."
+                )
+            self.reset()
+        self._set_meta("base_url", base_url)
+
+    def close(self) -> None:
+        self.db.close()
+
+    # Reads
+
+    def list_tasks(
+        self, column: str | None = None, limit: int | None = None
+    ) -> list[dict[str, Any]]:
+        """Tasks in board order: one column, or every active one."""
+        where = "energy_column = ?" if column else "energy_column != ?"
+        rows = self.db.execute(
+            f"SELECT data FROM task WHERE {where} "
+            "ORDER BY energy_column, position, created_ts DESC, id DESC LIMIT ?",
+            [column or SHIPPED, limit if limit is not None else -1],
+        )
+        return [json.loads(data) for (data,) in rows]
+
+    def get(self, id_or_prefix: str) -> dict[str, Any] | None:
+        """A task by full ID or unique prefix (dashes ignored), if mirrored."""
+        digits = id_or_prefix.replace("-", "").lower()
+        if not digits or not set(digits) <= HEX_DIGITS:
+            return None
+        rows = self.db.execute(
+            "SELECT data FROM task WHERE replace(id, '-', '') LIKE ? LIMIT 2", [digits + "%"]
+        ).fetchall()
+        if len(rows) > 1:
+            raise AmbiguousTaskIdError(f"Task ID '{id_or_prefix}' is ambiguous")
+        return json.loads(rows[0][0]) if rows else None
+
+    # Sync state
+
+    @property
+    def cursor(self) -> str | None:
+        return self._meta("cursor")
+
+    @property
+    def synced_at(self) -> float | None:
+        value = self._meta("synced_at")
+        return float(value) if value is not None else None
+
+    @property
+    def is_warm(self) -> bool:
+        """Whether a full sync has completed at least once."""
+        return self.synced_at is not None
+
+    def age(self) -> float:
+        """Seconds since the last completed sync (infinite if never)."""
+        synced_at = self.synced_at
+        return time.time() - synced_at if synced_at is not None else float("inf")
+
+    def apply_changes(
+        self, changed: list[dict[str, Any]], deleted: list[str], cursor: str, complete: bool
+    ) -> None:
+        """Apply one page of a delta sync atomically, together with its cursor.
+
+        ``complete`` marks the last page, which makes the mirror current.
+        """
+        with self._transaction():
+            self._upsert(changed)
+            self.db.executemany("DELETE FROM task WHERE id = ?", [(i,) for i in deleted])
+            self._set_meta("cursor", cursor)
+            if complete:
+                self._set_meta("synced_at", str(time.time()))
+
+    def upsert(self, *tasks: dict[str, Any]) -> None:
+        """Store tasks the server just returned."""
+        with self._transaction():
+            self._upsert(list(tasks))
+
+    def delete(self, task_id: str) -> None:
+        self.db.execute("DELETE FROM task WHERE id = ?", [task_id])
+
+    def reset(self) -> None:
+        """Forget every task and the sync position; the next sync starts over."""
+        with self._transaction():
+            self.db.execute("DELETE FROM task")
+            self.db.execute("DELETE FROM meta WHERE key IN ('cursor', 'synced_at')")
+
+    # Offline writes
+
+    def queue(
+        self,
+        op: str,
+        payload: dict[str, Any],
+        task_id: str | None = None,
+        base_updated_at: str | None = None,
+    ) -> None:
+        """Queue a write for replay. ``base_updated_at`` is the version it was made against."""
+        self.db.execute(
+            "INSERT INTO outbox (op, task_id, payload, base_updated_at) VALUES (?, ?, ?, ?)",
+            [op, task_id, json.dumps(payload), base_updated_at],
+        )
+
+    def pending(self) -> list[OutboxEntry]:
+        rows = self.db.execute(
+            "SELECT id, op, task_id, payload, base_updated_at FROM outbox ORDER BY id"
+        )
+        return [
+            OutboxEntry(id, op, task_id, json.loads(payload), base)
+            for id, op, task_id, payload, base in rows
+        ]
+
+    def pending_count(self) -> int:
+        return self.db.execute("SELECT count(*) FROM outbox").fetchone()[0]
+
+    def settle(self, entry: OutboxEntry, conflict: str | None = None) -> None:
+        """Remove a replayed write, recording why if it could not be applied."""
+        with self._transaction():
+            self.db.execute("DELETE FROM outbox WHERE id = ?", [entry.id])
+            if conflict:
+                self.db.execute("INSERT INTO conflict (message) VALUES (?)", [conflict])
+
+    def pop_conflicts(self) -> list[str]:
+        """Conflicts found by earlier syncs that the user has not seen yet."""
+        rows = self.db.execute("SELECT id, message FROM conflict ORDER BY id").fetchall()
+        if rows:
+            self.db.execute("DELETE FROM conflict WHERE id <= ?", [rows[-1][0]])
+        return [message for _, message in rows]
+
+    # Internals
+
+    def _transaction(self) -> sqlite3.Connection:
+        # In autocommit mode the connection context manager does not open a
+        # transaction, so start one explicitly.
+        self.db.execute("BEGIN IMMEDIATE")
+        return self.db
+
+    def _upsert(self, tasks: list[dict[str, Any]]) -> None:
+        self.db.executemany(
+            "INSERT OR REPLACE INTO task (id, energy_column, position, created_ts, data) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [
+                (
+                    t["id"],
+                    t["energy_column"],
+                    t.get("position", ""),
+                    datetime.fromisoformat(t["created_at"]).timestamp(),
+                    json.dumps(t),
+                )
+                for t in tasks
+            ],
+        )
+
+    def _meta(self, key: str) -> str | None:
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", [key]).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", [key, value])
+
+
+def open_mirror() -> Mirror:
+    settings = get_cli_settings()
+    return Mirror(settings.mirror_path, settings.api_base_url)
+
+
+def ensure_fresh(mirror: Mirror, fresh: bool = False) -> bool:
+    """Make the mirror fit to read from; returns False if it may be stale.
+
+    Syncs in the foreground when asked to or when the mirror has never been
+    filled, and otherwise leaves refreshing to a detached ``kz sync`` while
+    the current command renders what it has. An empty mirror with no server
+    to fill it from is an error.
+    """
+    if fresh or not mirror.is_warm:
+        # Imported here so that reading a warm mirror, the common case,
+        # never loads asyncio or the HTTP client.
+        import asyncio
+
+        import httpx
+
+        from cli.kz.sync import sync
+
+        try:
+            asyncio.run(sync(mirror))
+        except httpx.TransportError:
+            if not mirror.is_warm:
+                raise
+            return False
+    elif mirror.age() > get_cli_settings().mirror_max_age_seconds or mirror.pending_count():
+        refresh_in_background()
+    return True
+
+
+def refresh_in_background() -> None:
+    """Start a detached ``kz sync`` so the next command reads fresher data."""
+    try:
+        subprocess.Popen(
+            [sys.executable, "-m", "cli.kz.main", "sync", "--quiet"],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except OSError:
+        pass  # Best effort: the next command tries again
@@ -0,0 +1,166 @@
+"""Keeping the local mirror in step with the server.
+
+A sync first replays the outbox (writes made offline), then pulls every
+change since the mirror's cursor. Reads only wait for it when they must
+(see ``cli.kz.mirror.ensure_fresh``).
+"""
+
+from collections.abc import AsyncIterator, Iterator
+from contextlib import AsyncExitStack, asynccontextmanager, contextmanager
+from pathlib import Path
+
+import httpx
+
+from cli.kz.api_client import APIClient, APIError
+from cli.kz.config import get_cli_settings
+from cli.kz.mirror import SHIPPED, Mirror, OutboxEntry
+
+try:
+    import fcntl
+except ImportError:  # Windows: syncs are not serialized
+    fcntl = None  # type: ignore[assignment]
+
+# The request never reached the server, so queueing it cannot apply it twice.
+# (A timed-out write may have landed, so timeouts after connecting are errors.)
+OFFLINE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+
+
+@contextmanager
+def sync_lock(mirror_path: Path, wait: bool = True) -> Iterator[bool]:
+    """Hold the sync lock for a mirror; yields False if busy and not waiting.
+
+    Without it, a background refresh and a foreground ``kz ship`` could both
+    replay the same outbox entry.
+    """
+    if fcntl is None:
+        yield True
+        return
+    with open(f"{mirror_path}.lock", "w") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | (0 if wait else fcntl.LOCK_NB))
+        except BlockingIOError:
+            yield False
+            return
+        yield True
+
+
+async def pull(mirror: Mirror, client: APIClient) -> int:
+    """Apply every change since the mirror's cursor; returns how many."""
+    applied = 0
+    while True:
+        try:
+            page = await client.get_changes(mirror.cursor)
+        except APIError as e:
+            # The cursor is older than the server's tombstones: start over.
+            if e.response.status_code == 410 and mirror.cursor:
+                mirror.reset()
+                continue
+            raise
+        mirror.apply_changes(
+            page["changed"], page["deleted"], page["cursor"], complete=not page["has_more"]
+        )
+        applied += len(page["changed"]) + len(page["deleted"])
+        if not page["has_more"]:
+            return applied
+
+
+async def replay(mirror: Mirror, client: APIClient) -> int:
+    """Send queued writes in order; returns how many were settled.
+
+    A write that no longer applies (the task changed or went away while we
+    were offline) or that the server rejects is dropped and recorded as a
+    conflict for the user to see. If the server becomes unreachable again,
+    or fails with a server error, the rest stay queued.
+    """
+    entries = mirror.pending()
+    for entry in entries:
+        try:
+            conflict = await _replay_entry(mirror, client, entry)
+        except APIError as e:
+            if not _rejected(e.response.status_code):
+                raise
+            # Sending it again would fail the same way and hold up the rest
+            conflict = f"{_describe(entry)}: the server rejected it ({e})"
+        mirror.settle(entry, conflict)
+    return len(entries)
+
+
+def _rejected(status_code: int) -> bool:
+    """Whether a write failed for good: a client error other than timeout or rate limit."""
+    return 400 <= status_code < 500 and status_code not in (408, 429)
+
+
+def _describe(entry: OutboxEntry) -> str:
+    if entry.op == "create":
+        raw_inputs = entry.payload["raw_inputs"]
+        return f"Not added {len(raw_inputs)} task(s) starting '{raw_inputs[0][:40]}'"
+    if entry.op == "ship" and entry.task_id is not None:
+        return f"Not shipped '{entry.payload.get('title', entry.task_id[:8])}'"
+    return f"Dropped offline change '{entry.op}'"
+
+
+async def _replay_entry(mirror: Mirror, client: APIClient, entry: OutboxEntry) -> str | None:
+    if entry.op == "create":
+        # The key makes a replay of a create that did land (say, one whose
+        # response timed out) return those tasks rather than add them again.
+        created = await client.create_tasks(
+            entry.payload["raw_inputs"],
+            energy_column=entry.payload.get("energy_column"),
+            idempotency_key=entry.payload.get("key"),
+        )
+        mirror.upsert(*created)
+        return None
+
+    if entry.op == "ship":
+        assert entry.task_id is not None
+        title = entry.payload.get("title", entry.task_id[:8])
+        try:
+            current, etag = await client.get_task_with_etag(entry.task_id)
+        except APIError as e:
+            if e.response.status_code != 404:
+                raise
+            mirror.delete(entry.task_id)
+            return f"Not shipped '{title}': it was deleted on the server"
+        if current["energy_column"] == SHIPPED:
+            mirror.upsert(current)
+            return None
+        if current["updated_at"] != entry.base_updated_at:
+            mirror.upsert(current)
+            return f"Not shipped '{title}': it changed on the server while you were offline"
+        try:
+            shipped = await client.ship_task(entry.task_id, if_match=etag)
+        except APIError as e:
+            if e.response.status_code != 412:
+                raise
+            return f"Not shipped '{title}': it changed on the server while you were offline"
+        shipped.pop("stats", None)
+        mirror.upsert(shipped)
+        return None
+
+    return f"Dropped unknown offline change '{entry.op}'"
+
+
+async def sync(mirror: Mirror, wait: bool = True) -> bool:
+    """Replay the outbox, then pull. Returns False if another sync holds the lock."""
+    with sync_lock(get_cli_settings().mirror_path, wait) as locked:
+        if not locked:
+            return False
+        async with APIClient() as client:
+            await replay(mirror, client)
+            await pull(mirror, client)
+    return True
+
+
+@asynccontextmanager
+async def online(mirror: Mirror, client: APIClient | None = None) -> AsyncIterator[APIClient]:
+    """A client for writing through to the server (``client``, or a new one).
+
+    The outbox is replayed first, so writes reach the server in the order
+    they were made.
+    """
+    with sync_lock(get_cli_settings().mirror_path):
+        async with AsyncExitStack() as stack:
+            if client is None:
+                client = await stack.enter_async_context(APIClient())
+            await replay(mirror, client)
+            yield client
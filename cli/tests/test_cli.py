@@ -1,12 +1,37 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
 from unittest.mock import AsyncMock, patch
 
+import httpx
+import pytest
+import typer
 from typer.testing import CliRunner
 
-from cli.kz.main import app
+from cli.kz.api_client import APIError
+from cli.kz.config import get_cli_settings
+from cli.kz.main import COMMANDS, app, main
+from cli.kz.mirror import Mirror, ServerChangedError, open_mirror
 
 runner = CliRunner()
 
 
+@pytest.fixture(autouse=True)
+def mirror_path(tmp_path, monkeypatch):
+    """Give each test its own local mirror and no background syncs."""
+    monkeypatch.setenv("MIRROR_PATH", str(tmp_path / "mirror.db"))
+    get_cli_settings.cache_clear()
+    with patch("cli.kz.mirror.refresh_in_background") as refresh:
+        yield refresh
+    get_cli_settings.cache_clear()
+
+
+def changes(*tasks, has_more=False):
+    """A delta sync page carrying ``tasks``."""
+    return {"changed": list(tasks), "deleted": [], "cursor": "c1", "has_more": has_more}
+
+
 def test_app_version():
     """Test --version flag."""
     result = runner.invoke(app, ["--version"])
@@ -21,6 +46,64 @@ def test_app_help():
     assert "Kanban Zero" in result.stdout
 
 
+def test_command_registry_help_matches_docstrings():
+    """Test the help shown before a command loads is the command's own."""
+    for name, (import_path, help) in COMMANDS.items():
+        result = runner.invoke(app, [name, "--help"])
+        assert result.exit_code == 0, name
+        module, _, function = import_path.partition(":")
+        docstring = getattr(__import__(module, fromlist=[function]), function).__doc__
+        assert docstring.splitlines()[0] == help, name
+
+
+def test_lazy_command_help_matches_eager_command():
+    """Test a lazily loaded command's --help is what registering it directly shows."""
+    eager = typer.Typer(name="kz")
+    eager.callback()(main)
+    for name, (import_path, _) in COMMANDS.items():
+        module, _, function = import_path.partition(":")
+        eager.command(name)(getattr(__import__(module, fromlist=[function]), function))
+
+    for name in COMMANDS:
+        lazy_help = runner.invoke(app, [name, "--help"], prog_name="kz").stdout
+        assert lazy_help == runner.invoke(eager, [name, "--help"], prog_name="kz").stdout, name
+        assert "--install-completion" not in lazy_help, name
+
+
+def loaded_modules(args, env=None):
+    """Heavy modules a fresh ``kz <args>`` process imported."""
+    script = (
+        "import runpy, sys\n"
+        f"sys.argv = ['kz', *{args!r}]\n"
+        "try:\n"
+        "    runpy.run_module('cli.kz.main', run_name='__main__')\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "heavy = ['asyncio', 'httpx', 'pydantic', 'cli.kz.api_client', 'cli.kz.commands.add']\n"
+        "print(' '.join(m for m in heavy if m in sys.modules), file=sys.stderr)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=Path(__file__).parents[2],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stderr.split()
+
+
+def test_startup_loads_only_what_the_command_needs(tmp_path, monkeypatch):
+    """Test --version loads no command, and a warm list never loads the network stack."""
+    assert loaded_modules(["--version"]) == []
+
+    mirror = Mirror(tmp_path / "mirror.db", get_cli_settings().api_base_url)
+    mirror.apply_changes([], [], "c1", complete=True)
+    mirror.close()
+    monkeypatch.setenv("MIRROR_MAX_AGE_SECONDS", "inf")
+    assert loaded_modules(["list"], env=dict(os.environ)) == []
+
+
 def test_add_command_help():
     """Test add command shows help."""
     result = runner.invoke(app, ["add", "--help"])
@@ -28,7 +111,7 @@ def test_add_command_help():
     assert "Add a new task" in result.stdout
 
 
-@patch("cli.kz.commands.add.APIClient")
+@patch("cli.kz.sync.APIClient")
 def test_add_task(mock_client_class):
     """Test adding a task."""
     mock_client = AsyncMock()
@@ -36,6 +119,7 @@ def test_add_task(mock_client_class):
         "id": "123e4567-e89b-12d3-a456-426614174000",
         "title": "Fix the auth bug",
         "energy_column": "quick_win",
+        "created_at": "2025-01-01T00:00:00Z",
     }
     mock_client_class.return_value.__aenter__.return_value = mock_client
 
@@ -45,7 +129,7 @@ def test_add_task(mock_client_class):
     assert "Fix the auth bug" in result.stdout
 
 
-@patch("cli.kz.commands.add.APIClient")
+@patch("cli.kz.sync.APIClient")
 def test_add_task_with_energy(mock_client_class):
     """Test adding a task with explicit energy."""
     mock_client = AsyncMock()
@@ -53,6 +137,7 @@ def test_add_task_with_energy(mock_client_class):
         "id": "123e4567-e89b-12d3-a456-426614174000",
         "title": "Refactor the whole thing",
         "energy_column": "hyperfocus",
+        "created_at": "2025-01-01T00:00:00Z",
     }
     mock_client_class.return_value.__aenter__.return_value = mock_client
 
@@ -62,11 +147,11 @@ def test_add_task_with_energy(mock_client_class):
     mock_client.create_task.assert_called_once()
 
 
-@patch("cli.kz.commands.list.APIClient")
+@patch("cli.kz.sync.APIClient")
 def test_list_tasks(mock_client_class):
     """Test listing tasks."""
     mock_client = AsyncMock()
-    mock_client.list_tasks.return_value = [
+    mock_client.get_changes.return_value = changes(
         {
             "id": "123e4567-e89b-12d3-a456-426614174000",
             "title": "Task One",
@@ -79,7 +164,7 @@ def test_list_tasks(mock_client_class):
             "energy_column": "hyperfocus",
             "created_at": "2025-01-01T00:00:00Z",
         },
-    ]
+    )
     mock_client_class.return_value.__aenter__.return_value = mock_client
 
     result = runner.invoke(app, ["list"])
@@ -87,29 +172,69 @@ def test_list_tasks(mock_client_class):
     assert result.exit_code == 0
     assert "Task One" in result.stdout
     assert "Task Two" in result.stdout
+    # The empty mirror was filled in the foreground, from the start
+    mock_client.get_changes.assert_called_once_with(None)
 
 
-@patch("cli.kz.commands.list.APIClient")
+@patch("cli.kz.sync.APIClient")
+def test_list_reads_warm_mirror_without_network(mock_client_class, mirror_path):
+    """Test a fresh mirror answers list alone, and a stale one refreshes in the background."""
+    mock_client = AsyncMock()
+    mock_client.get_changes.return_value = changes(
+        {
+            "id": "123e4567-e89b-12d3-a456-426614174000",
+            "title": "Task One",
+            "energy_column": "quick_win",
+            "created_at": "2025-01-01T00:00:00Z",
+        },
+    )
+    mock_client_class.return_value.__aenter__.return_value = mock_client
+    runner.invoke(app, ["list"])
+    mock_client_class.reset_mock()
+
+    result = runner.invoke(app, ["list"])
+
+    assert result.exit_code == 0
+    assert "Task One" in result.stdout
+    mock_client_class.assert_not_called()
+    mirror_path.assert_not_called()
+
+    with patch("cli.kz.mirror.time.time", return_value=float("inf")):
+        result = runner.invoke(app, ["list"])
+
+    assert "Task One" in result.stdout
+    mock_client_class.assert_not_called()
+    mirror_path.assert_called_once()
+
+
+@patch("cli.kz.sync.APIClient")
 def test_list_tasks_by_column(mock_client_class):
     """Test listing tasks filtered by column."""
     mock_client = AsyncMock()
-    mock_client.list_tasks.return_value = [
+    mock_client.get_changes.return_value = changes(
         {
             "id": "123e4567-e89b-12d3-a456-426614174000",
             "title": "Quick Task",
             "energy_column": "quick_win",
             "created_at": "2025-01-01T00:00:00Z",
         },
-    ]
+        {
+            "id": "223e4567-e89b-12d3-a456-426614174000",
+            "title": "Deep Task",
+            "energy_column": "hyperfocus",
+            "created_at": "2025-01-01T00:00:00Z",
+        },
+    )
     mock_client_class.return_value.__aenter__.return_value = mock_client
 
     result = runner.invoke(app, ["list", "--column", "quick_win"])
 
     assert result.exit_code == 0
-    mock_client.list_tasks.assert_called_once_with(column="quick_win")
+    assert "Quick Task" in result.stdout
+    assert "Deep Task" not in result.stdout
 
 
-@patch("cli.kz.commands.ship.APIClient")
+@patch("cli.kz.sync.APIClient")
 def test_ship_task(mock_client_class):
     """Test shipping a task."""
     mock_client = AsyncMock()
@@ -117,7 +242,9 @@ def test_ship_task(mock_client_class):
         "id": "123e4567-e89b-12d3-a456-426614174000",
         "title": "Completed Task",
         "energy_column": "shipped",
+        "created_at": "2025-01-01T00:00:00Z",
         "shipped_at": "2025-01-01T12:00:00Z",
+        "stats": {"today": 3, "streak": 1, "all_time": 42},
     }
     mock_client_class.return_value.__aenter__.return_value = mock_client
 
@@ -125,23 +252,358 @@ def test_ship_task(mock_client_class):
 
     assert result.exit_code == 0
     assert "Shipped" in result.stdout or "shipped" in result.stdout.lower()
+    assert "Streak: 1 day" in result.stdout
+    assert "All-time: 42" in result.stdout
 
 
-@patch("cli.kz.commands.wins.APIClient")
+@patch("cli.kz.sync.APIClient")
 def test_wins_command(mock_client_class):
     """Test wins command (quick_win shortcut)."""
     mock_client = AsyncMock()
-    mock_client.list_tasks.return_value = [
+    mock_client.get_changes.return_value = changes(
+        *(
+            {
+                "id": f"{i}23e4567-e89b-12d3-a456-426614174000",
+                "title": f"Quick Win {i}",
+                "energy_column": "quick_win",
+                "created_at": "2025-01-01T00:00:00Z",
+            }
+            for i in range(3)
+        )
+    )
+    mock_client_class.return_value.__aenter__.return_value = mock_client
+
+    result = runner.invoke(app, ["wins", "--limit", "2"])
+
+    assert result.exit_code == 0
+    assert result.stdout.count("Quick Win") == 2
+
+
+@patch("cli.kz.sync.APIClient")
+def test_dump_command(mock_client_class):
+    """Test brain dump sends cleaned stdin lines in one batch."""
+    mock_client = AsyncMock()
+    mock_client.create_tasks.side_effect = lambda lines, energy_column=None: [
         {
-            "id": "123e4567-e89b-12d3-a456-426614174000",
-            "title": "Quick Win",
+            "id": f"{i:08d}-0000",
+            "title": line.title(),
             "energy_column": "quick_win",
             "created_at": "2025-01-01T00:00:00Z",
+        }
+        for i, line in enumerate(lines)
+    ]
+    mock_client_class.return_value.__aenter__.return_value = mock_client
+
+    result = runner.invoke(app, ["dump"], input="- fix login\n\n* update readme\n3. call bob\n")
+
+    assert result.exit_code == 0
+    mock_client.create_tasks.assert_called_once_with(
+        ["fix login", "update readme", "call bob"], energy_column=None
+    )
+    assert "Added 3 tasks" in result.stdout
+
+
+@patch("cli.kz.commands.search.APIClient")
+def test_search_command(mock_client_class):
+    """Test semantic search shows matches with their score."""
+    mock_client = AsyncMock()
+    mock_client.search_tasks.return_value = [
+        {
+            "id": "123e4567-e89b-12d3-a456-426614174000",
+            "title": "Fix the auth bug",
+            "energy_column": "quick_win",
+            "score": 0.82,
         },
     ]
     mock_client_class.return_value.__aenter__.return_value = mock_client
 
-    result = runner.invoke(app, ["wins"])
+    result = runner.invoke(app, ["search", "that auth thing"])
+
+    assert result.exit_code == 0
+    assert "Fix the auth bug" in result.stdout
+    assert "82%" in result.stdout
+    mock_client.search_tasks.assert_called_once_with(
+        "that auth thing", limit=10, include_shipped=False
+    )
+
+
+@patch("cli.kz.sync.APIClient")
+def test_ship_many_tasks_in_one_request(mock_client_class):
+    """Test shipping several tasks sends one bulk request, resolving prefixes locally."""
+    tasks = [
+        {
+            "id": f"{n}23e4567-e89b-12d3-a456-426614174000",
+            "title": f"Task {n}",
+            "energy_column": "quick_win",
+            "created_at": "2025-01-01T00:00:00Z",
+            "updated_at": "2025-01-01T00:00:00Z",
+        }
+        for n in (1, 2)
+    ]
+    unknown = "323e4567-e89b-12d3-a456-426614174000"
+    mock_client = AsyncMock()
+    mock_client.get_changes.return_value = changes(*tasks)
+    mock_client.bulk.return_value = [
+        {
+            "action": "ship",
+            "tasks": [{**task, "energy_column": "shipped"} for task in tasks],
+            "deleted": [],
+            "missing": [unknown],
+        }
+    ]
+    mock_client_class.return_value.__aenter__.return_value = mock_client
+    runner.invoke(app, ["list"])
+
+    result = runner.invoke(app, ["ship", "123e", "223e", unknown])
+
+    assert result.exit_code == 0
+    assert "Task 1" in result.stdout and "Task 2" in result.stdout
+    assert "2 shipped!" in result.stdout
+    assert f"Not found: {unknown}" in result.stdout
+    mock_client.bulk.assert_called_once_with(
+        [{"action": "ship", "ids": [tasks[0]["id"], tasks[1]["id"], unknown]}]
+    )
+    mock_client.ship_task.assert_not_called()
+
+    result = runner.invoke(app, ["ship", "123e", "nope"])
+    assert result.exit_code == 1
+    assert "Unknown task ID(s): nope" in result.stdout
+
+
+@patch("cli.kz.sync.APIClient")
+def test_offline_ship_is_queued_and_replayed(mock_client_class):
+    """Test ship works offline by prefix, then replays with the ETag it read."""
+    task = {
+        "id": "123e4567-e89b-12d3-a456-426614174000",
+        "title": "Offline Task",
+        "energy_column": "quick_win",
+        "created_at": "2025-01-01T00:00:00Z",
+        "updated_at": "2025-01-01T00:00:00Z",
+    }
+    mock_client = AsyncMock()
+    mock_client.get_changes.return_value = changes(task)
+    mock_client_class.return_value.__aenter__.return_value = mock_client
+    runner.invoke(app, ["list"])
+
+    mock_client.ship_task.side_effect = httpx.ConnectError("offline")
+    result = runner.invoke(app, ["ship", "123e"])
+
+    assert result.exit_code == 0
+    assert "Shipped" in result.stdout
+    assert "1 change(s) waiting to sync" in result.stdout
+    mirror = open_mirror()
+    assert mirror.list_tasks() == []
+    mirror.close()
+
+    mock_client.ship_task.reset_mock(side_effect=True)
+    mock_client.ship_task.return_value = {**task, "energy_column": "shipped"}
+    mock_client.get_task_with_etag.return_value = (task, '"abc"')
+    result = runner.invoke(app, ["sync"])
+
+    assert result.exit_code == 0
+    mock_client.ship_task.assert_called_once_with(task["id"], if_match='"abc"')
+    assert "waiting to sync" not in result.stdout
+
+
+@patch("cli.kz.sync.APIClient")
+def test_offline_ship_conflict(mock_client_class):
+    """Test a queued ship is dropped, and reported, if the task changed meanwhile."""
+    task = {
+        "id": "123e4567-e89b-12d3-a456-426614174000",
+        "title": "Contested Task",
+        "energy_column": "quick_win",
+        "created_at": "2025-01-01T00:00:00Z",
+        "updated_at": "2025-01-01T00:00:00Z",
+    }
+    mock_client = AsyncMock()
+    mock_client.get_changes.return_value = changes(task)
+    mock_client.ship_task.side_effect = httpx.ConnectError("offline")
+    mock_client_class.return_value.__aenter__.return_value = mock_client
+    runner.invoke(app, ["list"])
+    runner.invoke(app, ["ship", task["id"]])
+
+    edited = {**task, "energy_column": "hyperfocus", "updated_at": "2025-01-02T00:00:00Z"}
+    mock_client.get_task_with_etag.return_value = (edited, '"def"')
+    mock_client.get_changes.return_value = changes(edited)
+    result = runner.invoke(app, ["sync"])
+
+    assert result.exit_code == 0
+    assert "Sync conflict" in result.stdout
+    assert "Contested Task" in result.stdout
+    assert mock_client.ship_task.call_count == 1
+    mirror = open_mirror()
+    assert [t["energy_column"] for t in mirror.list_tasks()] == ["hyperfocus"]
+    assert mirror.pending_count() == 0
+    mirror.close()
+
+
+@patch("cli.kz.sync.APIClient")
+def test_offline_add_is_queued(mock_client_class):
+    """Test add queues the raw text when the server is unreachable."""
+    mock_client = AsyncMock()
+    mock_client.create_task.side_effect = httpx.ConnectError("offline")
+    mock_client_class.return_value.__aenter__.return_value = mock_client
+
+    result = runner.invoke(app, ["add", "call the dentist"])
+
+    assert result.exit_code == 0
+    assert "Task Queued" in result.stdout
+    mirror = open_mirror()
+    [entry] = mirror.pending()
+    key = entry.payload.pop("key")
+    assert entry.payload == {"raw_inputs": ["call the dentist"], "energy_column": None}
+    mirror.close()
+
+    # A replay whose response is lost is sent again with the same key
+    mock_client.create_tasks.side_effect = httpx.ReadTimeout("timed out")
+    assert runner.invoke(app, ["sync"]).exit_code == 1
+    mock_client.create_tasks.side_effect = None
+    mock_client.create_tasks.return_value = []
+    mock_client.get_changes.return_value = changes()
+    assert runner.invoke(app, ["sync"]).exit_code == 0
+    keys = {call.kwargs["idempotency_key"] for call in mock_client.create_tasks.call_args_list}
+    assert keys == {key}
+    mirror = open_mirror()
+    assert mirror.pending_count() == 0
+    mirror.close()
+
+
+@patch("cli.kz.sync.APIClient")
+def test_offline_dump_is_queued_in_chunks_and_rejects_are_dropped(mock_client_class):
+    """Test a long offline dump queues a batch per chunk, and a rejected one is not retried."""
+    mock_client = AsyncMock()
+    mock_client.create_tasks.side_effect = httpx.ConnectError("offline")
+    mock_client_class.return_value.__aenter__.return_value = mock_client
+
+    lines = "".join(f"task {i}\n" for i in range(250))
+    result = runner.invoke(app, ["dump"], input=lines)
+
+    assert result.exit_code == 0
+    assert "250 tasks queued" in result.stdout
+    mirror = open_mirror()
+    assert [len(e.payload["raw_inputs"]) for e in mirror.pending()] == [100, 100, 50]
+    mirror.close()
+
+    request = httpx.Request("POST", "http://test/api/tasks/batch")
+    rejected = APIError("Too many inputs", request=request, response=httpx.Response(422))
+    mock_client.create_tasks.reset_mock()
+    mock_client.create_tasks.side_effect = [rejected, [], []]
+    mock_client.get_changes.return_value = changes()
+    result = runner.invoke(app, ["sync"])
+
+    assert result.exit_code == 0
+    assert mock_client.create_tasks.call_count == 3
+    mock_client.get_changes.assert_called()
+    assert "Not added 100 task(s) starting 'task 0'" in result.stdout
+    mirror = open_mirror()
+    assert mirror.pending_count() == 0
+    mirror.close()
+
+
+def test_queued_writes_keep_their_server():
+    """Test switching servers keeps queued writes and refuses until they are synced."""
+    path = Path(os.environ["MIRROR_PATH"])
+    mirror = Mirror(path, "http://old:8000")
+    mirror.apply_changes([], [], "c1", complete=True)
+    mirror.queue("create", {"raw_inputs": ["call the dentist"], "energy_column": None})
+    mirror.close()
+
+    with pytest.raises(ServerChangedError, match="http://old:8000"):
+        Mirror(path, "http://new:8000")
+
+    mirror = Mirror(path, "http://old:8000")
+    [entry] = mirror.pending()
+    mirror.settle(entry)
+    mirror.close()
+
+    # Nothing waiting: the mirror starts over against the new server
+    mirror = Mirror(path, "http://new:8000")
+    assert not mirror.is_warm
+    mirror.close()
+
+
+@patch("cli.kz.commands.shell.APIClient")
+def test_shell_reuses_one_client(mock_client_class):
+    """Test the shell runs several verbs over one client and completes task IDs."""
+    task = {
+        "id": "123e4567-e89b-12d3-a456-426614174000",
+        "title": "Shell Task",
+        "energy_column": "quick_win",
+        "created_at": "2025-01-01T00:00:00Z",
+        "updated_at": "2025-01-01T00:00:00Z",
+    }
+    mock_client = AsyncMock()
+    mock_client.get_changes.return_value = changes(task)
+    mock_client.ship_task.return_value = {**task, "energy_column": "shipped"}
+    mock_client_class.return_value.__aenter__.return_value = mock_client
+
+    result = runner.invoke(app, ["shell"], input="list\nwins --limit x\nship 123e\nexit\n")
+
+    assert result.exit_code == 0
+    assert "Shell Task" in result.stdout
+    assert "Invalid value for '--limit'" in result.output
+    assert "Shipped!" in result.stdout
+    mock_client_class.assert_called_once()
+    mock_client.ship_task.assert_called_once_with(task["id"])
+
+
+def test_shell_completion():
+    """Test tab completion offers verbs, then mirrored task IDs and columns."""
+    from cli.kz.commands.shell import Shell
+
+    shell = Shell(None, None, None)
+    shell.task_ids = ["123e4567", "223e4567"]
+
+    def complete(line, text):
+        with patch("cli.kz.commands.shell.readline") as readline:
+            readline.get_line_buffer.return_value = line
+            readline.get_begidx.return_value = len(line) - len(text)
+            matches, state = [], 0
+            while (match := shell.complete(text, state)) is not None:
+                matches.append(match)
+                state += 1
+            return matches
+
+    assert complete("sh", "sh") == ["ship"]
+    assert complete("ship 2", "2") == ["223e4567"]
+    assert complete("ship ", "") == ["123e4567", "223e4567"]
+    assert complete("list -c q", "q") == ["quick_win"]
+
+
+@patch("cli.kz.commands.graph.APIClient")
+def test_graph_commands(mock_client_class):
+    """Test blocked lists waiting tasks and impact nests what a task holds up."""
+    mock_client = AsyncMock()
+    root = {"id": "aaaa1111-0000-0000-0000-000000000000", "title": "Design the API"}
+
+    def node(id, title, via, depth):
+        return {
+            "id": id,
+            "title": title,
+            "energy_column": "hyperfocus",
+            "via": via,
+            "depth": depth,
+            "edge_type": "blocks",
+        }
+
+    build = node("bbbb2222-0000-0000-0000-000000000000", "Build it", root["id"], 1)
+    launch = node("cccc3333-0000-0000-0000-000000000000", "Launch it", build["id"], 2)
+    mock_client.list_blocked.return_value = [{**build, "blocked_by": [root["id"]]}]
+    mock_client.get_task.return_value = root
+    mock_client.get_graph.return_value = [build, launch]
+    mock_client_class.return_value.__aenter__.return_value = mock_client
+
+    result = runner.invoke(app, ["blocked"])
+    assert result.exit_code == 0
+    assert "Build it" in result.stdout
+    assert "aaaa1111" in result.stdout
 
+    result = runner.invoke(app, ["impact", "aaaa", "--depth", "2"])
     assert result.exit_code == 0
-    mock_client.list_tasks.assert_called_once_with(column="quick_win")
+    mock_client.get_graph.assert_called_once_with(root["id"], "impact", 2)
+    lines = result.stdout.splitlines()
+    build_line = next(i for i, line in enumerate(lines) if "Build it" in line)
+    launch_line = next(i for i, line in enumerate(lines) if "Launch it" in line)
+    # Launch hangs below Build, one level deeper
+    assert launch_line > build_line
+    assert lines[launch_line].index("Launch") > lines[build_line].index("Build")
@@ -0,0 +1,136 @@
+"""Benchmark CLI cold start.
+
+Times ``kz --version``, ``kz --help`` and ``kz list`` (served from a warm
+local mirror, so no server is needed) as fresh processes, and shows where
+``kz list`` spends its import time according to ``python -X importtime``.
+
+    python scripts/bench_cli_startup.py              # this working tree
+    python scripts/bench_cli_startup.py --rev HEAD~1 # compare with a commit
+
+Run from the repository root with the CLI's dependencies installed.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+COMMANDS = [["--version"], ["--help"], ["list"]]
+API_BASE_URL = "http://localhost:8000"
+
+
+def seed_mirror(path: Path, tasks: int) -> None:
+    """Fill a mirror as a completed sync would, so ``kz list`` stays offline."""
+    sys.path.insert(0, str(ROOT))
+    from cli.kz.mirror import Mirror
+
+    columns = ["hyperfocus", "quick_win", "low_energy"]
+    mirror = Mirror(path, API_BASE_URL)
+    mirror.apply_changes(
+        [
+            {
+                "id": str(uuid.uuid4()),
+                "title": f"Task {i}",
+                "energy_column": columns[i % 3],
+                "position": f"a{i:05d}",
+                "created_at": "2026-01-01T00:00:00+00:00",
+            }
+            for i in range(tasks)
+        ],
+        [],
+        cursor="bench",
+        complete=True,
+    )
+    mirror.close()
+
+
+@contextmanager
+def checkout(rev: str | None):
+    """The tree to benchmark: this one, or ``rev`` in a temporary worktree."""
+    if rev is None:
+        yield ROOT
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        subprocess.run(["git", "-C", ROOT, "worktree", "add", "--detach", tmp, rev], check=True)
+        try:
+            yield Path(tmp)
+        finally:
+            subprocess.run(["git", "-C", ROOT, "worktree", "remove", "--force", tmp], check=True)
+
+
+def time_command(tree: Path, args: list[str], env: dict[str, str], runs: int) -> list[float]:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-m", "cli.kz.main", *args],
+            cwd=tree,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            check=True,
+        )
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def import_breakdown(tree: Path, env: dict[str, str], top: int) -> list[tuple[int, str]]:
+    """Slowest top-level imports of ``kz list``, as (cumulative µs, module)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "cli.kz.main", "list"],
+        cwd=tree,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not name.startswith("  "):  # Top level: imported directly, not as a dependency
+            imports.append((int(cumulative), name.strip()))
+    return sorted(imports, reverse=True)[:top]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rev", help="Benchmark this git revision instead of the working tree")
+    parser.add_argument("--runs", type=int, default=20, help="Runs per command")
+    parser.add_argument("--tasks", type=int, default=200, help="Tasks in the mirror")
+    parser.add_argument("--top", type=int, default=10, help="Imports to show")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, checkout(args.rev) as tree:
+        mirror_path = Path(tmp) / "mirror.db"
+        seed_mirror(mirror_path, args.tasks)
+        env = {
+            **os.environ,
+            "API_BASE_URL": API_BASE_URL,
+            "MIRROR_PATH": str(mirror_path),
+            "MIRROR_MAX_AGE_SECONDS": "inf",  # never spawn a background sync
+        }
+
+        print(f"Cold start, {args.runs} runs each ({args.rev or 'working tree'}):")
+        for command in COMMANDS:
+            timings = time_command(tree, command, env, args.runs)
+            print(
+                f"  kz {' '.join(command):<10} median {statistics.median(timings):6.1f} ms"
+                f"  min {min(timings):6.1f} ms"
+            )
+
+        print("\nSlowest top-level imports of kz list (cumulative):")
+        for cumulative, name in import_breakdown(tree, env, args.top):
+            print(f"  {cumulative / 1000:6.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -27,20 +27,28 @@ export function Board() {
     }
   }, []);
 
+  const upsertTask = useCallback((task: Task) => {
+    setTasks((prev) =>
+      prev.some((t) => t.id === task.id)
+        ? prev.map((t) => (t.id === task.id ? task : t))
+        : [task, ...prev]
+    );
+  }, []);
+
   useEffect(() => {
     fetchTasks();
-  }, [fetchTasks]);
+    return api.tasks.subscribe({
+      onTask: upsertTask,
+      onDelete: (id) => setTasks((prev) => prev.filter((t) => t.id !== id)),
+      onReset: fetchTasks,
+    });
+  }, [fetchTasks, upsertTask]);
 
-  const handleTaskAdded = useCallback((task: Task) => {
-    setTasks((prev) => [task, ...prev]);
-  }, []);
+  const handleTaskAdded = upsertTask;
 
   const handleShipTask = async (id: string) => {
     try {
-      const shipped = await api.tasks.ship(id);
-      setTasks((prev) =>
-        prev.map((t) => (t.id === id ? shipped : t))
-      );
+      upsertTask(await api.tasks.ship(id));
     } catch (e) {
       console.error('Failed to ship task:', e);
     }
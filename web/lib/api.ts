@@ -1,4 +1,13 @@
-import { Task, CreateTaskInput, UpdateTaskInput, EnergyColumn } from './types';
+import {
+  Task,
+  CreateTaskInput,
+  UpdateTaskInput,
+  MoveTaskInput,
+  EnergyColumn,
+  ShipStats,
+  ShippedTask,
+  BlockedTask,
+} from './types';
 
 const API_BASE = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
 
@@ -34,9 +43,46 @@ async function fetchAPI<T>(
 
 export const api = {
   tasks: {
-    list: (column?: EnergyColumn): Promise<Task[]> => {
-      const params = column ? `?column=${column}` : '';
-      return fetchAPI<Task[]>(`/api/tasks${params}`);
+    list: async (column?: EnergyColumn, tag?: string): Promise<Task[]> => {
+      // Follow keyset pages until the server stops sending a next cursor
+      const tasks: Task[] = [];
+      const params = new URLSearchParams({ limit: '1000' });
+      if (column) params.set('column', column);
+      if (tag) params.set('tag', tag);
+      for (;;) {
+        const response = await fetch(`${API_BASE}/api/tasks?${params}`);
+        if (!response.ok) {
+          throw new APIError(response.status, await response.text());
+        }
+        tasks.push(...(await response.json()));
+        const cursor = response.headers.get('X-Next-Cursor');
+        if (!cursor) return tasks;
+        params.set('cursor', cursor);
+      }
+    },
+
+    // One page of shipped tasks, newest first, archived ones included.
+    // Pass the returned cursor back to fetch the next page.
+    history: async (
+      cursor?: string,
+      limit = 50
+    ): Promise<{ tasks: Task[]; cursor: string | null }> => {
+      const params = new URLSearchParams({ limit: String(limit) });
+      if (cursor) params.set('cursor', cursor);
+      const response = await fetch(`${API_BASE}/api/tasks/history?${params}`);
+      if (!response.ok) {
+        throw new APIError(response.status, await response.text());
+      }
+      return {
+        tasks: await response.json(),
+        cursor: response.headers.get('X-Next-Cursor'),
+      };
+    },
+
+    // Tasks waiting on unshipped blockers; cheap enough to fetch with every
+    // board load to mark blocked cards.
+    blocked: (): Promise<BlockedTask[]> => {
+      return fetchAPI<BlockedTask[]>('/api/tasks/blocked');
     },
 
     get: (id: string): Promise<Task> => {
@@ -57,16 +103,49 @@ export const api = {
       });
     },
 
+    move: (id: string, data: MoveTaskInput): Promise<Task> => {
+      return fetchAPI<Task>(`/api/tasks/${id}/move`, {
+        method: 'POST',
+        body: JSON.stringify(data),
+      });
+    },
+
     delete: (id: string): Promise<void> => {
       return fetchAPI<void>(`/api/tasks/${id}`, {
         method: 'DELETE',
       });
     },
 
-    ship: (id: string): Promise<Task> => {
-      return fetchAPI<Task>(`/api/tasks/${id}/ship`, {
+    ship: (id: string): Promise<ShippedTask> => {
+      return fetchAPI<ShippedTask>(`/api/tasks/${id}/ship`, {
         method: 'POST',
       });
     },
+
+    // Live board changes. EventSource reconnects on its own and resumes via
+    // Last-Event-ID; `reset` means events were lost and the board must be refetched.
+    subscribe: (handlers: {
+      onTask: (task: Task) => void;
+      onDelete: (id: string) => void;
+      onReset: () => void;
+    }): (() => void) => {
+      const source = new EventSource(`${API_BASE}/api/tasks/events`);
+      for (const type of ['created', 'updated', 'shipped']) {
+        source.addEventListener(type, (e) =>
+          handlers.onTask(JSON.parse((e as MessageEvent).data))
+        );
+      }
+      source.addEventListener('deleted', (e) =>
+        handlers.onDelete(JSON.parse((e as MessageEvent).data).id)
+      );
+      source.addEventListener('reset', handlers.onReset);
+      return () => source.close();
+    },
+  },
+
+  stats: {
+    get: (): Promise<ShipStats> => {
+      return fetchAPI<ShipStats>('/api/stats');
+    },
   },
 };
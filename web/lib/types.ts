@@ -1,16 +1,20 @@
 export type EnergyColumn = 'hyperfocus' | 'quick_win' | 'low_energy' | 'shipped';
 
+export type ParseStatus = 'pending' | 'parsed' | 'failed';
+
 export interface Task {
   id: string;
   title: string;
   body: string | null;
   raw_input: string;
   energy_column: EnergyColumn;
-  position: number;
+  // Order key: cards sort by comparing these as plain strings
+  position: string;
   created_at: string;
   updated_at: string;
   shipped_at: string | null;
   created_via: 'cli' | 'slack' | 'web' | 'api';
+  parse_status: ParseStatus;
 }
 
 export interface CreateTaskInput {
@@ -23,5 +27,27 @@ export interface UpdateTaskInput {
   title?: string;
   body?: string;
   energy_column?: EnergyColumn;
-  position?: number;
+}
+
+// Drop a card between `before` (the card above) and `after` (the card below).
+export interface MoveTaskInput {
+  energy_column?: EnergyColumn;
+  before?: string | null;
+  after?: string | null;
+}
+
+// Ship counters; days are UTC days.
+export interface ShipStats {
+  today: number;
+  streak: number;
+  all_time: number;
+}
+
+// An unshipped task waiting on unshipped blockers (task IDs).
+export interface BlockedTask extends Task {
+  blocked_by: string[];
+}
+
+export interface ShippedTask extends Task {
+  stats: ShipStats;
 }